@@ -73,13 +73,24 @@ def _make_typed_handler(tool: Tool):
     # Create the wrapper function
     execute_fn = tool.execute
 
-    def handler(*args, **kwargs):
+    def _filtered(args, kwargs) -> dict:
         bound = sig.bind(*args, **kwargs)
         bound.apply_defaults()
         # Filter out None values (optional params not provided)
-        filtered = {k: v for k, v in bound.arguments.items() if v is not None}
-        result = execute_fn(**filtered)
-        return json.dumps(result, default=str)
+        return {k: v for k, v in bound.arguments.items() if v is not None}
+
+    if tool.async_func is not None:
+        # Tools with a coroutine twin run on FastMCP's event loop instead
+        # of blocking it
+        aexecute_fn = tool.aexecute
+
+        async def handler(*args, **kwargs):
+            result = await aexecute_fn(**_filtered(args, kwargs))
+            return json.dumps(result, default=str)
+    else:
+        def handler(*args, **kwargs):
+            result = execute_fn(**_filtered(args, kwargs))
+            return json.dumps(result, default=str)
 
     # Set metadata that FastMCP reads
     handler.__name__ = tool.name
@@ -107,14 +107,30 @@ def build_full_registry(
                 ArtifactStore,
                 configure as _configure_memory,
                 create_memory_tools,
+                ShardedArtifactStore,
                 default_db_path,
+                default_shard_root,
+                start_background_maintenance,
             )
 
             _record = _os.environ.get(
                 "PRISM_ARTIFACT_RECORDING", ""
             ).strip().lower() in {"1", "true", "yes", "on"}
-            _store = ArtifactStore(default_db_path())
+            # month|session: one DB file per partition, recall federated
+            # across them; the single-file DB stays readable as legacy
+            _sharding = _os.environ.get("PRISM_ARTIFACT_SHARDING", "").strip().lower()
+            if _sharding:
+                _store = ShardedArtifactStore(
+                    default_shard_root(),
+                    partition=_sharding,
+                    legacy_db=default_db_path(),
+                )
+            else:
+                _store = ArtifactStore(default_db_path())
             _configure_memory(store=_store, record_enabled=_record)
+            # Compaction every PRISM_ARTIFACT_MAINTENANCE_INTERVAL s; it only
+            # deletes artifacts once a PRISM_ARTIFACT_MAX_* limit is set
+            start_background_maintenance(_store)
             create_memory_tools(registry)
         except Exception as e:
             logger.warning("memory subsystem disabled: %s", e)
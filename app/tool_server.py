@@ -9,6 +9,7 @@ to stdout.  Methods: list_tools, call_tool.
 import json
 import os
 import sys
+import threading
 
 # CRITICAL: this worker writes line-delimited JSON-RPC to stdout. Some tools
 # import heavy ML libraries (e.g. MACE → mace/tools/cg.py) that print() a
@@ -29,6 +30,47 @@ def _env_flag(name: str, default: bool) -> bool:
     return value.strip().lower() not in {"0", "false", "no", "off"}
 
 
+def _preload_mace() -> None:
+    """Warm the MACE calculators named in ``MACE_MCP_PRELOAD`` in the background.
+
+    Format: ``head[:device[:dtype]]``, comma-separated (e.g.
+    ``omat_pbe,matpes_r2scan:cuda:float32``). Jobs that arrive first
+    simply wait for (or share) the load.
+
+    ``MACE_MCP_PREWARM_MU`` (comma-separated elements, e.g. ``Fe,Ti,Nb``)
+    then fills the pure-element μ reference table for each preloaded
+    calculator (the default one if ``MACE_MCP_PRELOAD`` is unset). The
+    ``mace_prewarm_references`` tool runs the same fill as a tracked job.
+    """
+    spec = os.getenv("MACE_MCP_PRELOAD", "").strip()
+    elements = [el.strip() for el in os.getenv("MACE_MCP_PREWARM_MU", "").split(",") if el.strip()]
+    if not spec and not elements:
+        return
+
+    def run():
+        try:
+            from app.tools.simulation.mace.core.calculator import (
+                DEFAULT_DTYPE,
+                DEFAULT_HEAD,
+                get_calculator_pool,
+                parse_preload_spec,
+            )
+
+            keys = parse_preload_spec(spec) if spec else [(DEFAULT_HEAD, None, DEFAULT_DTYPE)]
+            get_calculator_pool().preload(keys)
+            if elements:
+                from app.tools.simulation.mace_bridge import get_mace_bridge
+
+                # The bridge's own backend, so μ lands in the runner's cache root
+                backend = get_mace_bridge().backends["local"]
+                for head, device, dtype in keys:
+                    backend.prewarm_references(elements, head=head, dtype=dtype, device=device)
+        except Exception as exc:
+            print(f"MACE preload failed: {exc}", file=sys.stderr)
+
+    threading.Thread(target=run, name="mace-preload", daemon=True).start()
+
+
 def _handle(registry, request: dict) -> dict:
     method = request.get("method")
     if method is None:
@@ -74,6 +116,7 @@ def main():
         enable_mcp=enable_mcp,
         enable_plugins=enable_plugins,
     )
+    _preload_mace()
 
     for line in sys.stdin:
         line = line.strip()
@@ -7,12 +7,14 @@ through this method, so attaching behavior here is the only place that
 catches every path. Earlier designs that monkey-patched at bootstrap broke
 the MCP path because mcp_server captures `tool.execute` as a bound method
 at registration time; bound methods cache `(func, instance)` and don't
-see later class-level patches.
+see later class-level patches. `Tool.aexecute` (the async path for tools
+with an `async_func`) shares the same error handling and recording.
 """
 
+import asyncio
 import logging
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +34,9 @@ class Tool:
     # (search_artifacts, fetch_artifact, list_artifacts, show_scratchpad) MUST set
     # this False to avoid pointless self-indexing and infinite recursion.
     record_artifacts: bool = True
+    # Optional coroutine twin of `func` for async hosts (the MCP server).
+    # Same arguments and result contract; see `aexecute`.
+    async_func: Optional[Callable[..., Awaitable[Any]]] = None
 
     def execute(self, **kwargs) -> dict:
         """Execute the tool with given arguments.
@@ -51,7 +56,26 @@ class Tool:
         """
         try:
             result = self.func(**kwargs)
-        except TypeError as e:
+        except Exception as e:
+            return self._error_result(e)
+        return self._record_result(kwargs, result)
+
+    async def aexecute(self, **kwargs) -> dict:
+        """Async counterpart of `execute` for hosts running an event loop.
+
+        Awaits `async_func` when the tool has one; otherwise runs the sync
+        `execute` in a worker thread. Same error contract and recording.
+        """
+        if self.async_func is None:
+            return await asyncio.to_thread(self.execute, **kwargs)
+        try:
+            result = await self.async_func(**kwargs)
+        except Exception as e:
+            return self._error_result(e)
+        return self._record_result(kwargs, result)
+
+    def _error_result(self, e: Exception) -> dict:
+        if isinstance(e, TypeError):
             logger.exception("tool '%s' raised TypeError", self.name)
             out = {"error": f"TypeError: {e}", "tool": self.name}
             if "argument" in str(e):
@@ -62,9 +86,10 @@ class Tool:
                     "check parameter names and retry"
                 )
             return out
-        except Exception as e:
-            logger.exception("tool '%s' failed", self.name)
-            return {"error": f"{type(e).__name__}: {e}", "tool": self.name}
+        logger.exception("tool '%s' failed", self.name)
+        return {"error": f"{type(e).__name__}: {e}", "tool": self.name}
+
+    def _record_result(self, kwargs: dict, result: Any) -> Any:
         if not self.record_artifacts:
             return result
         # Lazy import to avoid a circular dependency at module load. The
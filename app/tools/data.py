@@ -10,7 +10,6 @@ from app.tools.base import Tool, ToolRegistry
 
 def _search_materials(**kwargs) -> dict:
     """Search materials via the PRISM federated search engine."""
-    import asyncio
     from app.tools.search_engine import SearchEngine, MaterialSearchQuery, PropertyRange
     from app.tools.search_engine.providers.registry import build_registry
 
@@ -46,7 +45,7 @@ def _search_materials(**kwargs) -> dict:
         )
         registry = build_registry()
         engine = SearchEngine(registry=registry)
-        result = asyncio.run(engine.search(query))
+        result = engine.search_sync(query)
 
         materials = []
         for m in result.materials:
@@ -159,6 +159,24 @@ def _mace_phonon_harmonic(**kwargs: Any) -> dict[str, Any]:
         return {"error": str(e), "type": type(e).__name__}
 
 
+def _mace_prewarm_references(**kwargs: Any) -> dict[str, Any]:
+    err = _guard()
+    if err:
+        return err
+    try:
+        from app.tools.simulation.mace.primitives import prewarm_references
+        from app.tools.simulation.mace.schemas import PrewarmReferencesInput
+        from app.tools.simulation.mace_bridge import get_mace_bridge
+
+        inp = PrewarmReferencesInput(**_present(kwargs, "elements", "options"))
+        bridge = get_mace_bridge()
+        handle = _run_async(prewarm_references(inp, bridge.runner, bridge.backends))
+        return _ok_dump(handle)
+    except Exception as e:  # noqa: BLE001
+        logger.exception("mace_prewarm_references failed")
+        return {"error": str(e), "type": type(e).__name__}
+
+
 def _mace_compute_elastic(**kwargs: Any) -> dict[str, Any]:
     err = _guard()
     if err:
@@ -658,6 +676,36 @@ def create_mace_tools(registry: ToolRegistry) -> None:
         source_detail="app.tools.mace",
     ))
 
+    registry.register(Tool(
+        name="mace_prewarm_references",
+        description=(
+            "Relax the pure-element ground states for a set of elements and store "
+            "their chemical potentials (μ) in the persistent reference table, as one "
+            "batch job on the local backend. Later formation-energy and solute jobs "
+            "with the same head/dtype then skip those relaxations. Returns a "
+            "JobHandle resolving to mu_eV_per_atom plus which elements were "
+            "computed and which were already cached."
+        ),
+        input_schema={
+            "type": "object",
+            "properties": {
+                "elements": {
+                    "type": "array",
+                    "items": {"type": "string", "pattern": "^[A-Z][a-z]?$"},
+                    "minItems": 1,
+                    "description": "Element symbols, e.g. ['Fe', 'Ti', 'Nb'].",
+                },
+                "options": _PRIMITIVE_OPTIONS_SCHEMA,
+            },
+            "required": ["elements"],
+            "additionalProperties": False,
+        },
+        func=_mace_prewarm_references,
+        requires_approval=True,
+        source="builtin",
+        source_detail="app.tools.mace",
+    ))
+
     # --- Control plane (read-only; no approval needed) --------------------
 
     registry.register(Tool(
@@ -776,7 +824,11 @@ def create_mace_tools(registry: ToolRegistry) -> None:
                 "cache_uri": {
                     "type": "string",
                     "pattern": "^cache://",
-                    "description": "URI from JobHandle.result.structure_cif_ref.",
+                    "description": (
+                        "URI from JobHandle.result.structure_cif_ref, or an MD "
+                        "traj_ref with an optional frame index "
+                        "(cache://<key>/traj/<i>; last frame if omitted)."
+                    ),
                 },
             },
             "required": ["cache_uri"],
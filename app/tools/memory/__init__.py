@@ -15,15 +15,25 @@ the runtime configuration set via `recorder.configure()`.
 See docs/stateful_tools_2026.md for the full architecture.
 """
 from app.tools.memory.embedder import (
+    CachedEmbedder,
     Embedder,
     HashEmbedder,
     STEmbedder,
     get_default_embedder,
     reset_default_embedder,
 )
+from app.tools.memory.maintenance import (
+    MaintenanceTask,
+    RetentionPolicy,
+    run_maintenance,
+    start_background_maintenance,
+)
 from app.tools.memory.recorder import (
+    EmbedQueue,
     augment_with_artifact_id,
     configure,
+    embed_queue_stats,
+    flush_embeddings,
     get_embedder,
     get_store,
     is_configured,
@@ -31,21 +41,33 @@ from app.tools.memory.recorder import (
     reset,
     resolve_session_id,
     should_record,
+    shutdown_embeddings,
 )
+from app.tools.memory.sharded import ShardedArtifactStore, default_shard_root
 from app.tools.memory.store import (
     ArtifactRow,
     ArtifactStore,
     default_db_path,
 )
-from app.tools.memory.tool import create_memory_tools
+from app.tools.memory.tool import (
+    RecallCache,
+    clear_recall_cache,
+    create_memory_tools,
+    recall_cache_stats,
+)
+from app.tools.memory.vector_index import VectorIndex
 
 __all__ = [
     # Store
     "ArtifactRow",
     "ArtifactStore",
     "default_db_path",
+    "ShardedArtifactStore",
+    "default_shard_root",
+    "VectorIndex",
     # Embedder
     "Embedder",
+    "CachedEmbedder",
     "HashEmbedder",
     "STEmbedder",
     "get_default_embedder",
@@ -60,6 +82,18 @@ __all__ = [
     "reset",
     "should_record",
     "augment_with_artifact_id",
+    "EmbedQueue",
+    "flush_embeddings",
+    "embed_queue_stats",
+    "shutdown_embeddings",
+    # Maintenance
+    "RetentionPolicy",
+    "MaintenanceTask",
+    "run_maintenance",
+    "start_background_maintenance",
     # Tools
     "create_memory_tools",
+    "RecallCache",
+    "recall_cache_stats",
+    "clear_recall_cache",
 ]
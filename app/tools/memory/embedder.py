@@ -11,6 +11,10 @@ Supports multiple backends behind one interface:
 `get_default_embedder()` returns the best available backend, with the
 choice logged at INFO so we can see which is in use.
 
+`CachedEmbedder` wraps any backend with the store's persistent
+text-hash -> vector cache, so a summary that was embedded once (in any
+process sharing the DB) is never embedded again.
+
 The Rust harness can later inject a callback-based backend that calls
 the EmbeddingGemma instance loaded for Stage 2.1 retrieval. The
 interface stays the same; only the constructor changes.
@@ -22,7 +26,10 @@ import hashlib
 import logging
 import math
 import threading
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from app.tools.memory.store import ArtifactStore
 
 logger = logging.getLogger(__name__)
 
@@ -37,8 +44,18 @@ class Embedder(abc.ABC):
     @abc.abstractmethod
     def embed(self, text: str) -> list[float]: ...
 
+    @property
+    def model_id(self) -> str:
+        """Identifies the vector space; part of the embedding-cache key."""
+        return f"{type(self).__name__}/{self.dim}"
+
     def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        """Default sequential batch — backends override for true batching."""
+        """Default sequential batch — backends override for true batching.
+
+        The recorder's embedding queue coalesces summaries from several
+        tool calls into one call here, so backends with per-call overhead
+        (model forward passes, RPC) should implement it natively.
+        """
         return [self.embed(t) for t in texts]
 
 
@@ -58,6 +75,10 @@ class HashEmbedder(Embedder):
     def dim(self) -> int:
         return self._dim
 
+    @property
+    def model_id(self) -> str:
+        return f"hash/{self._dim}"
+
     def embed(self, text: str) -> list[float]:
         # Build a vector by hashing the text into chunks. Sin transform
         # produces stable [-1, 1] values. Trivially reproducible.
@@ -84,6 +105,9 @@ class STEmbedder(Embedder):
     _model_lock = threading.Lock()
     _instances: dict[str, "STEmbedder"] = {}
 
+    # Texts per forward pass inside one embed_batch call
+    batch_size = 64
+
     def __new__(cls, model_name: str = "all-MiniLM-L6-v2") -> "STEmbedder":
         # Singleton per model_name — model load is expensive
         with cls._model_lock:
@@ -111,6 +135,11 @@ class STEmbedder(Embedder):
         assert self._dim_cached is not None
         return self._dim_cached
 
+    @property
+    def model_id(self) -> str:
+        # Known without loading the model, so cache hits skip the load
+        return f"st/{self._model_name}"
+
     def embed(self, text: str) -> list[float]:
         self._ensure_loaded()
         # convert_to_numpy=True returns ndarray; tolist for SQLite portability
@@ -129,11 +158,75 @@ class STEmbedder(Embedder):
         clean = [t if t else " " for t in texts]
         vecs = self._model.encode(  # type: ignore[union-attr]
             clean,
+            batch_size=self.batch_size,
             convert_to_numpy=True,
             normalize_embeddings=True,
             show_progress_bar=False,
         )
-        return [[float(x) for x in v] for v in vecs]
+        return vecs.tolist()
+
+
+class CachedEmbedder(Embedder):
+    """Consult the artifact store's embedding cache before the wrapped backend.
+
+    Keys are sha256(model_id NUL text), so swapping models never returns a
+    vector from another space. Texts repeated within one batch are embedded
+    once. Cache read/write failures degrade to plain embedding.
+    """
+
+    def __init__(self, inner: Embedder, cache: "ArtifactStore") -> None:
+        self.inner = inner
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    @property
+    def dim(self) -> int:
+        return self.inner.dim
+
+    @property
+    def model_id(self) -> str:
+        return self.inner.model_id
+
+    def _key(self, text: str) -> str:
+        raw = f"{self.model_id}\0{text}".encode("utf-8", errors="replace")
+        return hashlib.sha256(raw).hexdigest()
+
+    def embed(self, text: str) -> list[float]:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        keys = [self._key(t) for t in texts]
+        unique = list(dict.fromkeys(keys))
+        try:
+            found = self.cache.get_cached_embeddings(unique)
+        except Exception as e:
+            logger.debug("embedding cache read failed: %s", e)
+            found = {}
+        todo = {k: t for k, t in zip(keys, texts) if k not in found}
+        if todo:
+            fresh = dict(zip(todo, self.inner.embed_batch(list(todo.values()))))
+            try:
+                self.cache.put_cached_embeddings(fresh)
+            except Exception as e:
+                logger.debug("embedding cache write failed: %s", e)
+            found.update(fresh)
+        with self._stats_lock:
+            self.hits += len(unique) - len(todo)
+            self.misses += len(todo)
+        return [found[k] for k in keys]
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
 
 
 _DEFAULT_LOCK = threading.Lock()
@@ -0,0 +1,288 @@
+"""Retention and compaction for the artifact store.
+
+`artifacts.db` grows with every recorded tool output. This module bounds
+it: a `RetentionPolicy` names the limits (age, on-disk size, number of
+sessions kept), `run_maintenance` applies them and then compacts the DB.
+
+Eviction order:
+
+1. Artifacts older than `max_age_days`.
+2. Artifacts outside the `max_sessions` most recently active sessions.
+3. While the DB is over `max_bytes`: least-recently-recalled first, using
+   the hit counts `ArtifactStore.recall` keeps. Artifacts never recalled
+   age out by creation time.
+
+Every limit is off by default, so out of the box maintenance deletes
+nothing. It only flushes hit counts, merges the FTS5 indexes, drops
+orphaned rows and runs an incremental VACUUM. Eviction starts once a
+limit is configured, through `PRISM_ARTIFACT_MAX_AGE_DAYS`,
+`PRISM_ARTIFACT_MAX_MB`, `PRISM_ARTIFACT_MAX_SESSIONS` or
+`PRISM_ARTIFACT_MAX_EMBEDDING_CACHE`, the CLI flags, or an explicit
+`RetentionPolicy`.
+
+Artifacts promoted to the knowledge graph are kept unless the policy says
+otherwise. Deleted content owners hand their payload to a surviving
+duplicate (see `ArtifactStore.delete_artifacts`), so dedup never loses data.
+
+Run it three ways:
+
+- `python3 -m app.tools.memory.maintenance [--dry-run] [--vacuum]`
+- `start_background_maintenance(store)` — a daemon thread, started at
+  bootstrap every `PRISM_ARTIFACT_MAINTENANCE_INTERVAL` seconds (default
+  3600, 0 disables).
+- `run_maintenance(store, policy)` from code.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from app.tools.memory.sharded import PARTITIONS, ShardedArtifactStore
+from app.tools.memory.store import ArtifactStore, default_db_path
+
+logger = logging.getLogger(__name__)
+
+# Rows deleted per transaction — keeps the write lock short for recorders
+_BATCH = 500
+
+_DEFAULT_INTERVAL_S = 3600.0
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Limits for `run_maintenance`. `None` disables a limit (the default)."""
+
+    max_age_days: Optional[float] = None
+    max_bytes: Optional[int] = None
+    max_sessions: Optional[int] = None
+    keep_promoted: bool = True
+    max_embedding_cache: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        """Read PRISM_ARTIFACT_MAX_AGE_DAYS / _MAX_MB / _MAX_SESSIONS /
+        _MAX_EMBEDDING_CACHE.
+
+        Unset or `0` leaves that limit off.
+        """
+        policy = cls()
+        age = _env_number("PRISM_ARTIFACT_MAX_AGE_DAYS", float)
+        if age is not None:
+            policy = replace(policy, max_age_days=age or None)
+        mb = _env_number("PRISM_ARTIFACT_MAX_MB", float)
+        if mb is not None:
+            policy = replace(policy, max_bytes=int(mb * 1024 * 1024) or None)
+        sessions = _env_number("PRISM_ARTIFACT_MAX_SESSIONS", int)
+        if sessions is not None:
+            policy = replace(policy, max_sessions=sessions or None)
+        cache = _env_number("PRISM_ARTIFACT_MAX_EMBEDDING_CACHE", int)
+        if cache is not None:
+            policy = replace(policy, max_embedding_cache=cache or None)
+        return policy
+
+
+def _env_number(name: str, kind):
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return None
+    try:
+        return kind(raw)
+    except ValueError:
+        logger.warning("ignoring %s=%r: not a number", name, raw)
+        return None
+
+
+def _evict(store: ArtifactStore, dry_run: bool, **select) -> int:
+    """Delete every candidate `select` yields, in batches."""
+    if dry_run:
+        return len(store.eviction_candidates(limit=-1, **select))
+    total = 0
+    while True:
+        ids = store.eviction_candidates(limit=_BATCH, **select)
+        if not ids:
+            return total
+        deleted = store.delete_artifacts(ids)
+        total += deleted
+        if deleted < len(ids):
+            return total
+
+
+def run_maintenance(
+    store: ArtifactStore,
+    policy: Optional[RetentionPolicy] = None,
+    *,
+    optimize: bool = False,
+    vacuum: Optional[bool] = None,
+    dry_run: bool = False,
+) -> dict:
+    """Apply `policy` to `store`, then compact it.
+
+    Returns per-stage counts plus the store's size before and after.
+    `dry_run` only counts what the age and session limits would delete
+    (size-driven eviction depends on what is freed, so it reports 0).
+    """
+    policy = policy or RetentionPolicy.from_env()
+    store.flush_hits()
+    report: dict = {"policy": asdict(policy), "dry_run": dry_run, "before": store.storage_stats()}
+    include_promoted = not policy.keep_promoted
+
+    evicted = {"age": 0, "sessions": 0, "size": 0}
+    if policy.max_age_days is not None:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=policy.max_age_days)
+        evicted["age"] = _evict(
+            store, dry_run,
+            created_before=cutoff.isoformat(timespec="seconds"),
+            include_promoted=include_promoted,
+        )
+    if policy.max_sessions is not None:
+        evicted["sessions"] = _evict(
+            store, dry_run,
+            keep_sessions=policy.max_sessions,
+            include_promoted=include_promoted,
+        )
+    if policy.max_bytes is not None and not dry_run:
+        evicted["size"] = _evict_to_size(store, policy.max_bytes, include_promoted)
+    report["evicted"] = evicted
+
+    if policy.max_embedding_cache is not None and not dry_run:
+        report["embedding_cache_trimmed"] = store.trim_embedding_cache(policy.max_embedding_cache)
+    if not dry_run:
+        report["compact"] = store.compact(optimize=optimize, full_vacuum=vacuum)
+    report["after"] = store.storage_stats()
+    return report
+
+
+def _evict_to_size(store: ArtifactStore, max_bytes: int, include_promoted: bool) -> int:
+    """LRU-evict until the live pages fit in `max_bytes`.
+
+    Deleting rows frees pages inside the file, so `used_bytes` (pages in
+    use) drops as we go even before any vacuum. Each round deletes a slice
+    sized by the average artifact footprint.
+    """
+    total = 0
+    while True:
+        stats = store.storage_stats()
+        over = stats["used_bytes"] - max_bytes
+        if over <= 0 or not stats["artifacts"]:
+            return total
+        per_artifact = max(1, stats["used_bytes"] // stats["artifacts"])
+        want = min(_BATCH, max(1, -(-over // per_artifact)))
+        ids = store.eviction_candidates(lru=True, limit=want, include_promoted=include_promoted)
+        if not ids:
+            return total
+        deleted = store.delete_artifacts(ids)
+        if not deleted:
+            return total
+        total += deleted
+
+
+class MaintenanceTask:
+    """Daemon thread running `run_maintenance` every `interval_s` seconds."""
+
+    def __init__(
+        self,
+        store: ArtifactStore,
+        policy: Optional[RetentionPolicy] = None,
+        interval_s: float = _DEFAULT_INTERVAL_S,
+    ) -> None:
+        self.store = store
+        self.policy = policy
+        self.interval_s = interval_s
+        self.last_report: Optional[dict] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name=f"maintenance-{Path(store.db_path).stem}",
+        )
+
+    def start(self) -> "MaintenanceTask":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.last_report = run_maintenance(self.store, self.policy)
+                ev = self.last_report["evicted"]
+                if any(ev.values()):
+                    logger.info("artifact maintenance evicted %s", ev)
+            except Exception as e:
+                logger.warning("artifact maintenance failed: %s", e)
+
+
+def start_background_maintenance(
+    store: ArtifactStore,
+    policy: Optional[RetentionPolicy] = None,
+    interval_s: Optional[float] = None,
+) -> Optional[MaintenanceTask]:
+    """Start a `MaintenanceTask`; None when the interval is 0."""
+    if interval_s is None:
+        interval_s = _env_number("PRISM_ARTIFACT_MAINTENANCE_INTERVAL", float)
+        if interval_s is None:
+            interval_s = _DEFAULT_INTERVAL_S
+    if interval_s <= 0:
+        return None
+    return MaintenanceTask(store, policy, interval_s).start()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(
+        prog="python3 -m app.tools.memory.maintenance",
+        description="Apply retention limits to the artifact store and compact it.",
+    )
+    ap.add_argument("--db", type=Path, default=None, help="artifact DB (default: ~/.prism/artifacts.db)")
+    ap.add_argument("--shards", type=Path, default=None, help="sharded store directory instead of --db")
+    ap.add_argument("--partition", choices=PARTITIONS, default="month", help="with --shards")
+    ap.add_argument("--max-age-days", type=float, help="0 disables")
+    ap.add_argument("--max-mb", type=float, help="0 disables")
+    ap.add_argument("--max-sessions", type=int, help="0 disables")
+    ap.add_argument("--max-embedding-cache", type=int, help="cached embeddings kept; 0 disables")
+    ap.add_argument("--include-promoted", action="store_true", help="also evict promoted artifacts")
+    ap.add_argument("--optimize", action="store_true", help="full FTS5 optimize instead of merge")
+    ap.add_argument("--vacuum", action="store_true", help="force a full VACUUM")
+    ap.add_argument("--dry-run", action="store_true", help="count age/session evictions only")
+    args = ap.parse_args(argv)
+
+    policy = RetentionPolicy.from_env()
+    if args.max_age_days is not None:
+        policy = replace(policy, max_age_days=args.max_age_days or None)
+    if args.max_mb is not None:
+        policy = replace(policy, max_bytes=int(args.max_mb * 1024 * 1024) or None)
+    if args.max_sessions is not None:
+        policy = replace(policy, max_sessions=args.max_sessions or None)
+    if args.max_embedding_cache is not None:
+        policy = replace(policy, max_embedding_cache=args.max_embedding_cache or None)
+    if args.include_promoted:
+        policy = replace(policy, keep_promoted=False)
+
+    if args.shards is not None:
+        store = ShardedArtifactStore(args.shards, partition=args.partition)
+    else:
+        store = ArtifactStore(args.db or default_db_path())
+    try:
+        report = run_maintenance(
+            store, policy,
+            optimize=args.optimize,
+            vacuum=True if args.vacuum else None,
+            dry_run=args.dry_run,
+        )
+    finally:
+        store.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
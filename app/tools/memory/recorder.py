@@ -12,15 +12,26 @@ Configuration lives in module-level state. `configure()` is called once
 during bootstrap with a configured `ArtifactStore` + `Embedder` + session
 id. Until configured (i.e. in tests, or in a CLI mode that doesn't want
 memory), `record_if_enabled` is a no-op pass-through.
+
+Embeddings are computed off the tool's return path by a bounded
+`EmbedQueue`: summaries from several tool calls are coalesced into one
+`embed_batch` call and backfilled with one store transaction per batch.
+`flush_embeddings()` drains it; an atexit hook does the same on shutdown.
+Both paths embed through `CachedEmbedder`, so repeated summaries are
+served from the store's embedding cache.
 """
 from __future__ import annotations
 
+import atexit
 import logging
 import os
+import queue
 import threading
+import time
+from dataclasses import dataclass
 from typing import Any, Optional
 
-from app.tools.memory.embedder import Embedder, get_default_embedder
+from app.tools.memory.embedder import CachedEmbedder, Embedder, get_default_embedder
 from app.tools.memory.store import (
     ArtifactStore,
     _canonical_json,
@@ -110,6 +121,8 @@ _CONFIG: dict[str, Any] = {
     "embedder": None,
     "session_id": None,
     "embed_async": True,
+    # CachedEmbedder over (embedder, store), rebuilt when either changes
+    "cached_embedder": None,
     # Whether record_if_enabled actually WRITES. A configured store with
     # record_enabled=False serves reads (search/fetch/list over historical
     # artifacts) without duplicating new outputs — the Rust provenance store
@@ -161,11 +174,24 @@ def get_store() -> Optional[ArtifactStore]:
 
 
 def get_embedder() -> Embedder:
-    """Return the configured embedder, falling back to default."""
-    e = _CONFIG["embedder"]
-    if e is not None:
+    """Return the configured embedder, falling back to default.
+
+    With a store configured the embedder is wrapped in `CachedEmbedder`
+    (memoized), so repeated summaries and queries hit the store's
+    embedding cache instead of the model.
+    """
+    e = _CONFIG["embedder"] or get_default_embedder()
+    store = _CONFIG["store"]
+    if store is None:
         return e
-    return get_default_embedder()
+    cached = _CONFIG["cached_embedder"]
+    if cached is None or cached.inner is not e or cached.cache is not store:
+        with _LOCK:
+            cached = _CONFIG["cached_embedder"]
+            if cached is None or cached.inner is not e or cached.cache is not store:
+                cached = CachedEmbedder(e, store)
+                _CONFIG["cached_embedder"] = cached
+    return cached
 
 
 def resolve_session_id() -> str:
@@ -177,9 +203,11 @@ def resolve_session_id() -> str:
 
 def reset() -> None:
     """For tests — clear all configuration so the next configure() starts clean."""
+    shutdown_embeddings()
     with _LOCK:
         _CONFIG["store"] = None
         _CONFIG["embedder"] = None
+        _CONFIG["cached_embedder"] = None
         _CONFIG["session_id"] = None
         _CONFIG["embed_async"] = True
         _CONFIG["record_enabled"] = True
@@ -189,38 +217,222 @@ def reset() -> None:
 # Background embedding
 # ---------------------------------------------------------------------------
 
-def _embed_in_background(
-    *,
-    artifact_id: str,
-    summary: str,
-    record_summaries: list[str],
-    store: ArtifactStore,
-    embedder: Embedder,
-) -> None:
-    """Compute embeddings + backfill them into the store. Run on a daemon thread."""
+def _embed_texts(embedder: Embedder, texts: list[str]) -> list[Optional[list[float]]]:
+    """One embed_batch call; per-item fallback so one bad text can't sink the rest."""
     try:
-        artifact_emb = embedder.embed(summary)
-        rec_embs: list[Optional[list[float]]] = []
-        if record_summaries:
+        out: list[Optional[list[float]]] = list(embedder.embed_batch(texts))
+        while len(out) < len(texts):
+            out.append(None)
+        return out
+    except Exception as e:
+        logger.debug("batch embed failed (%s); per-item fallback", e)
+    out = []
+    for t in texts:
+        try:
+            out.append(embedder.embed(t))
+        except Exception:
+            out.append(None)
+    return out
+
+
+@dataclass
+class _EmbedJob:
+    artifact_id: str
+    summary: str
+    record_summaries: list[str]
+
+
+def _embed_jobs(store: ArtifactStore, embedder: Embedder, jobs: list[_EmbedJob]) -> int:
+    """Embed every summary of `jobs` in one batch; backfill in one transaction.
+
+    Returns the number of texts embedded. Never raises.
+    """
+    texts: list[str] = []
+    for job in jobs:
+        texts.append(job.summary)
+        texts.extend(job.record_summaries)
+    try:
+        vecs = _embed_texts(embedder, texts)
+        updates = []
+        pos = 0
+        for job in jobs:
+            n = len(job.record_summaries)
+            updates.append((
+                job.artifact_id,
+                vecs[pos],
+                vecs[pos + 1:pos + 1 + n] if n else None,
+            ))
+            pos += 1 + n
+        store.update_embeddings(updates)
+    except Exception as e:
+        logger.warning(
+            "background embed failed for %s: %s",
+            ", ".join(j.artifact_id for j in jobs), e,
+        )
+    return len(texts)
+
+
+class EmbedQueue:
+    """Bounded queue + worker pool that batches embedding backfills.
+
+    A worker takes the oldest job, then keeps pulling queued jobs for up to
+    `linger_s` (or until `max_batch` texts) so summaries from back-to-back
+    tool calls share one `embed_batch` call and one store transaction.
+    `submit` never blocks: when `max_pending` jobs are waiting it returns
+    False and the caller embeds inline instead (backpressure, not loss).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_pending: int = 256,
+        max_batch: int = 512,
+        linger_s: float = 0.05,
+        workers: int = 1,
+    ) -> None:
+        self.max_batch = max_batch
+        self.linger_s = linger_s
+        self._q: queue.Queue[Optional[tuple[ArtifactStore, Embedder, _EmbedJob]]] = (
+            queue.Queue(maxsize=max_pending)
+        )
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._closed = False
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "overflow": 0,
+            "batches": 0,
+            "texts": 0,
+            "embed_seconds": 0.0,
+        }
+        self._workers = [
+            threading.Thread(target=self._run, daemon=True, name=f"embed-worker-{i}")
+            for i in range(max(1, workers))
+        ]
+        for w in self._workers:
+            w.start()
+
+    def submit(self, store: ArtifactStore, embedder: Embedder, job: _EmbedJob) -> bool:
+        with self._cond:
+            if self._closed:
+                return False
+            try:
+                self._q.put_nowait((store, embedder, job))
+            except queue.Full:
+                self._stats["overflow"] += 1
+                return False
+            self._pending += 1
+            self._stats["submitted"] += 1
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted job is backfilled. False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def shutdown(self, timeout: Optional[float] = 5.0) -> bool:
+        """Drain queued work, then stop the workers."""
+        with self._cond:
+            self._closed = True
+        drained = self.flush(timeout)
+        for _ in self._workers:
             try:
-                batched = embedder.embed_batch(record_summaries)
-                rec_embs = list(batched)
-                while len(rec_embs) < len(record_summaries):
-                    rec_embs.append(None)
-            except Exception as e:
-                logger.debug("batch embed failed (%s); per-item fallback", e)
-                for s in record_summaries:
-                    try:
-                        rec_embs.append(embedder.embed(s))
-                    except Exception:
-                        rec_embs.append(None)
-        store.update_embedding(
-            artifact_id=artifact_id,
-            embedding=artifact_emb,
-            record_embeddings=rec_embs if record_summaries else None,
+                self._q.put_nowait(None)
+            except queue.Full:
+                break
+        return drained
+
+    def stats(self) -> dict:
+        with self._cond:
+            st = dict(self._stats)
+            st["depth"] = self._pending
+        st["mean_batch_size"] = st["texts"] / st["batches"] if st["batches"] else 0.0
+        st["texts_per_second"] = (
+            st["texts"] / st["embed_seconds"] if st["embed_seconds"] else 0.0
         )
-    except Exception as e:
-        logger.warning("background embed failed for %s: %s", artifact_id, e)
+        return st
+
+    def _run(self) -> None:
+        while True:
+            first = self._q.get()
+            if first is None:
+                return
+            batch = [first]
+            texts = 1 + len(first[2].record_summaries)
+            deadline = time.monotonic() + self.linger_s
+            stop = False
+            while texts < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._q.get(timeout=remaining) if remaining > 0 else self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                texts += 1 + len(item[2].record_summaries)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch: list[tuple[ArtifactStore, Embedder, _EmbedJob]]) -> None:
+        # Jobs normally share one store + embedder; group in case configure()
+        # swapped either mid-stream.
+        groups: dict[tuple[int, int], list[tuple[ArtifactStore, Embedder, _EmbedJob]]] = {}
+        for item in batch:
+            groups.setdefault((id(item[0]), id(item[1])), []).append(item)
+        for items in groups.values():
+            store, embedder = items[0][0], items[0][1]
+            started = time.monotonic()
+            n = _embed_jobs(store, embedder, [job for _, _, job in items])
+            elapsed = time.monotonic() - started
+            with self._cond:
+                self._stats["batches"] += 1
+                self._stats["texts"] += n
+                self._stats["embed_seconds"] += elapsed
+                self._stats["completed"] += len(items)
+                self._pending -= len(items)
+                self._cond.notify_all()
+
+
+_QUEUE: Optional[EmbedQueue] = None
+
+
+def _get_queue() -> EmbedQueue:
+    global _QUEUE
+    with _LOCK:
+        if _QUEUE is None:
+            _QUEUE = EmbedQueue()
+        return _QUEUE
+
+
+def flush_embeddings(timeout: Optional[float] = None) -> bool:
+    """Wait for queued embedding backfills. True if the queue drained."""
+    q = _QUEUE
+    return True if q is None else q.flush(timeout)
+
+
+def embed_queue_stats() -> dict:
+    """Queue depth + throughput counters for the background embedder."""
+    q = _QUEUE
+    if q is None:
+        return {"depth": 0, "submitted": 0, "completed": 0, "overflow": 0,
+                "batches": 0, "texts": 0, "embed_seconds": 0.0,
+                "mean_batch_size": 0.0, "texts_per_second": 0.0}
+    return q.stats()
+
+
+def shutdown_embeddings(timeout: Optional[float] = 5.0) -> bool:
+    """Drain and stop the background embedder. Registered with atexit."""
+    global _QUEUE
+    with _LOCK:
+        q, _QUEUE = _QUEUE, None
+    return True if q is None else q.shutdown(timeout)
+
+
+atexit.register(shutdown_embeddings)
 
 
 # ---------------------------------------------------------------------------
@@ -265,26 +477,8 @@ def record_if_enabled(
     rec_summaries = [_summarize_record(r, i) for i, r in enumerate(records or [])]
     record_count = len(records) if records else None
 
-    if _CONFIG["embed_async"]:
-        threading.Thread(
-            target=_embed_in_background,
-            kwargs=dict(
-                artifact_id=artifact_id,
-                summary=summary,
-                record_summaries=rec_summaries,
-                store=store,
-                embedder=embedder,
-            ),
-            daemon=True,
-            name=f"embed-{artifact_id}",
-        ).start()
-    else:
-        _embed_in_background(
-            artifact_id=artifact_id,
-            summary=summary,
-            record_summaries=rec_summaries,
-            store=store,
-            embedder=embedder,
-        )
+    job = _EmbedJob(artifact_id, summary, rec_summaries)
+    if not (_CONFIG["embed_async"] and _get_queue().submit(store, embedder, job)):
+        _embed_jobs(store, embedder, [job])
 
     return augment_with_artifact_id(result, artifact_id, record_count)
@@ -0,0 +1,541 @@
+"""Sharded artifact store — one SQLite file per month or per session.
+
+One `artifacts.db` shared by every agent subprocess serializes all
+`BEGIN IMMEDIATE` writers on one lock, and its FTS index grows without
+bound. `ShardedArtifactStore` partitions the store into independent
+`ArtifactStore` files under one directory (default
+`~/.prism/artifacts.shards/`):
+
+- `partition="month"` — `shard-m202610.db`: writes land in the current
+  month's file; older months go cold.
+- `partition="session"` — `shard-s<hash>.db`: each agent session writes
+  its own file, so concurrent agents never share a write lock, and
+  session-scoped recall touches exactly one file.
+
+Artifact ids carry their shard (`art_<tag>_<random>`), so `get`,
+`update_embedding`, `mark_promoted` and deletes route straight to one file.
+Shards this process doesn't write to are opened read-only
+(`mode=ro`), kept in a small LRU, and never take a write lock.
+
+Recall fans out over the shards in scope on a worker pool. Each shard
+produces its four candidate rankings (BM25 / vector, artifacts / records)
+inside its own snapshot; all of them are RRF-fused together, newest shard
+first, exactly as a single store fuses its own four. An existing single
+`artifacts.db` can be mounted as a read-only legacy shard (tag "") so its
+history stays recallable.
+
+Enabled at bootstrap with `PRISM_ARTIFACT_SHARDING=month|session`.
+Hit counts are only kept for shards this process writes; cold shards
+age out whole under the retention policies (maintenance.py), and shards
+left empty are deleted by `compact()`.
+
+Every process that opens a shard first takes a shared `flock` on its
+sidecar `shard-<tag>.db.lock` and holds it until `close()` (or until a
+read-only shard leaves the LRU). `compact()` deletes an empty shard only
+if it can take that lock exclusively without waiting, i.e. no other
+process has the file open, and never the current month's shard. An
+opener blocks while a drop is in progress, then sees the file is gone.
+The sidecar itself is never deleted, so every process locks the same inode.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import itertools
+import logging
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Optional
+
+from app.tools.memory.store import ArtifactRow, ArtifactStore, default_db_path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no advisory locks (Windows)
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+PARTITIONS = ("month", "session")
+
+# Read-only shards kept open at once (each holds connections + maybe an index)
+_MAX_OPEN_SHARDS = 32
+
+_EMBEDDING_CACHE_FILE = "embedding-cache.db"
+
+
+def default_shard_root() -> Path:
+    """`<default db>.shards/`, next to the single-file store."""
+    return default_db_path().with_suffix(".shards")
+
+
+def _shard_tag(partition: str, session_id: str, now: Optional[datetime] = None) -> str:
+    if partition == "month":
+        return "m" + (now or datetime.now(timezone.utc)).strftime("%Y%m")
+    return "s" + hashlib.sha1(session_id.encode("utf-8")).hexdigest()[:10]
+
+
+def _tag_of(artifact_id: str) -> str:
+    """Shard tag embedded in an artifact id; "" for untagged (legacy) ids."""
+    parts = artifact_id.split("_")
+    return parts[1] if len(parts) == 3 and parts[0] == "art" else ""
+
+
+class ShardedArtifactStore:
+    """`ArtifactStore` API over one SQLite file per month or session."""
+
+    def __init__(
+        self,
+        root: Optional[Path | str] = None,
+        *,
+        partition: str = "month",
+        legacy_db: Optional[Path | str] = None,
+        vector_index: bool = True,
+        embedding_dtype: str = "float16",
+        max_open: int = _MAX_OPEN_SHARDS,
+        workers: int = 4,
+    ) -> None:
+        if partition not in PARTITIONS:
+            raise ValueError(f"unknown partition {partition!r}; valid: {PARTITIONS}")
+        self.root = Path(root) if root else default_shard_root()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.partition = partition
+        self.legacy_db = Path(legacy_db) if legacy_db else None
+        self.embedding_dtype = embedding_dtype
+        self.max_open = max_open
+        self._vector_index = vector_index
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._writers: dict[str, ArtifactStore] = {}
+        self._readers: OrderedDict[str, ArtifactStore] = OrderedDict()
+        # tag -> open sidecar holding this process's shared lock on the shard
+        self._holds: dict[str, IO[bytes]] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._generations = itertools.count(1)
+        self._generation = 0
+        # Embedding cache is shared by every shard, so it gets its own file
+        self._cache = ArtifactStore(
+            self.root / _EMBEDDING_CACHE_FILE, vector_index=False,
+            embedding_dtype=embedding_dtype,
+        )
+
+    @property
+    def db_path(self) -> Path:
+        return self.root
+
+    @property
+    def generation(self) -> int:
+        """See `ArtifactStore.generation`; moves on writes through this router."""
+        return self._generation
+
+    def _bump_generation(self) -> None:
+        self._generation = next(self._generations)
+
+    # ------------------------------------------------------------------
+    # Shards
+    # ------------------------------------------------------------------
+
+    def _path(self, tag: str) -> Optional[Path]:
+        if not tag:
+            return self.legacy_db
+        return self.root / f"shard-{tag}.db"
+
+    def shard_tags(self) -> list[str]:
+        """Every shard on disk, most recently written first; legacy last."""
+        paths = sorted(
+            self.root.glob("shard-*.db"), key=lambda p: p.stat().st_mtime, reverse=True,
+        )
+        tags = [p.stem[len("shard-"):] for p in paths]
+        if self.legacy_db is not None and self.legacy_db.exists():
+            tags.append("")
+        return tags
+
+    def _lock_path(self, tag: str) -> Path:
+        return self.root / f"shard-{tag}.db.lock"
+
+    def _hold(self, tag: str) -> None:
+        """Take this process's shared lock on shard `tag` (waits out a drop)."""
+        if not tag or fcntl is None:
+            return
+        with self._lock:
+            if tag in self._holds:
+                return
+        fh = open(self._lock_path(tag), "a+b")
+        fcntl.flock(fh.fileno(), fcntl.LOCK_SH)
+        with self._lock:
+            if tag not in self._holds:
+                self._holds[tag] = fh
+                return
+        fh.close()  # another thread got there first
+
+    def _release(self, tag: str) -> None:
+        with self._lock:
+            fh = self._holds.pop(tag, None)
+        if fh is not None:
+            fh.close()
+
+    def _writer(self, tag: str) -> ArtifactStore:
+        """Writable store for `tag`, kept open for this process's lifetime."""
+        if tag not in self._writers:
+            self._hold(tag)
+        with self._lock:
+            store = self._writers.get(tag)
+            if store is None:
+                store = ArtifactStore(
+                    self._path(tag), vector_index=self._vector_index,
+                    embedding_dtype=self.embedding_dtype, id_tag=tag or None,
+                )
+                self._writers[tag] = store
+                # Writers serve reads too; a read-only twin is just dropped
+                self._readers.pop(tag, None)
+            return store
+
+    def _reader(self, tag: str) -> Optional[ArtifactStore]:
+        """This process's writer for `tag`, else a read-only store (LRU)."""
+        with self._lock:
+            store = self._writers.get(tag) or self._readers.get(tag)
+            if store is not None:
+                if tag in self._readers:
+                    self._readers.move_to_end(tag)
+                return store
+        path = self._path(tag)
+        if path is None:
+            return None
+        self._hold(tag)
+        if not path.exists():
+            self._release(tag)
+            return None
+        store = ArtifactStore(
+            path, vector_index=self._vector_index,
+            embedding_dtype=self.embedding_dtype, read_only=True,
+        )
+        evicted = []
+        with self._lock:
+            existing = self._writers.get(tag) or self._readers.get(tag)
+            if existing is not None:
+                return existing
+            self._readers[tag] = store
+            while len(self._readers) > self.max_open:
+                # Not closed: a concurrent recall may still hold it, and its
+                # connections go when the last reference does
+                old, _ = self._readers.popitem(last=False)
+                if old not in self._writers:
+                    evicted.append(old)
+        for old in evicted:
+            self._release(old)
+        return store
+
+    @contextmanager
+    def _writable(self, tag: str) -> Iterator[Optional[ArtifactStore]]:
+        """A writer for maintenance on `tag`, closed after unless we write it anyway."""
+        with self._lock:
+            store = self._writers.get(tag)
+        if store is not None:
+            yield store
+            return
+        path = self._path(tag)
+        if path is not None:
+            self._hold(tag)
+        if path is None or not path.exists():
+            yield None
+            return
+        store = ArtifactStore(
+            path, vector_index=self._vector_index,
+            embedding_dtype=self.embedding_dtype, id_tag=tag or None,
+        )
+        try:
+            yield store
+        finally:
+            store.close()
+
+    def _shards_for(self, session_id: Optional[str]) -> list[ArtifactStore]:
+        if self.partition == "session" and session_id:
+            tags = [_shard_tag("session", session_id)]
+            if self.legacy_db is not None and self.legacy_db.exists():
+                tags.append("")
+        else:
+            tags = self.shard_tags()
+        return [s for s in (self._reader(t) for t in tags) if s is not None]
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self._workers, thread_name_prefix="shard-recall",
+                    )
+        return self._pool
+
+    def _by_tag(self, artifact_ids: Iterable[str]) -> dict[str, list[str]]:
+        groups: dict[str, list[str]] = {}
+        for aid in artifact_ids:
+            groups.setdefault(_tag_of(aid), []).append(aid)
+        return groups
+
+    def close(self) -> None:
+        with self._lock:
+            stores = list(self._writers.values()) + list(self._readers.values())
+            self._writers, self._readers = {}, OrderedDict()
+            pool, self._pool = self._pool, None
+            holds, self._holds = list(self._holds.values()), {}
+        if pool is not None:
+            pool.shutdown(wait=True)
+        for store in stores:
+            store.close()
+        for fh in holds:
+            fh.close()
+        self._cache.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def record(self, *, session_id: str, **kwargs: Any) -> str:
+        if not session_id:
+            raise ValueError("session_id required")
+        tag = _shard_tag(self.partition, session_id)
+        artifact_id = self._writer(tag).record(session_id=session_id, **kwargs)
+        self._bump_generation()
+        return artifact_id
+
+    def update_embedding(
+        self,
+        *,
+        artifact_id: str,
+        embedding: Optional[Iterable[float]] = None,
+        record_embeddings: Optional[list[Optional[Iterable[float]]]] = None,
+    ) -> None:
+        self.update_embeddings([(artifact_id, embedding, record_embeddings)])
+
+    def update_embeddings(self, updates: list[tuple[str, Any, Any]]) -> None:
+        groups: dict[str, list[tuple[str, Any, Any]]] = {}
+        for update in updates:
+            groups.setdefault(_tag_of(update[0]), []).append(update)
+        for tag, group in groups.items():
+            self._writer(tag).update_embeddings(group)
+        self._bump_generation()
+
+    def mark_promoted(self, artifact_id: str) -> None:
+        self._writer(_tag_of(artifact_id)).mark_promoted(artifact_id)
+        self._bump_generation()
+
+    def get_cached_embeddings(self, text_hashes: list[str]) -> dict[str, list[float]]:
+        return self._cache.get_cached_embeddings(text_hashes)
+
+    def put_cached_embeddings(self, items: dict[str, Iterable[float]]) -> None:
+        self._cache.put_cached_embeddings(items)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def get(self, artifact_id: str) -> Optional[ArtifactRow]:
+        store = self._reader(_tag_of(artifact_id))
+        return store.get(artifact_id) if store is not None else None
+
+    def get_record(self, artifact_id: str, record_idx: int) -> Optional[Any]:
+        store = self._reader(_tag_of(artifact_id))
+        return store.get_record(artifact_id, record_idx) if store is not None else None
+
+    def list_artifacts(
+        self,
+        *,
+        session_id: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        since: Optional[str] = None,
+        limit: int = 20,
+    ) -> list[dict]:
+        rows: list[dict] = []
+        for store in self._shards_for(session_id):
+            rows.extend(store.list_artifacts(
+                session_id=session_id, tool_name=tool_name, since=since, limit=limit,
+            ))
+        rows.sort(key=lambda r: r["created_at"], reverse=True)
+        return rows[:limit]
+
+    # ------------------------------------------------------------------
+    # Federated recall
+    # ------------------------------------------------------------------
+
+    def recall(
+        self,
+        *,
+        query_text: str,
+        query_embedding: Optional[list[float]] = None,
+        session_id: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        limit: int = 10,
+        candidate_pool: int = 100,
+        parallel: bool = False,
+    ) -> list[dict]:
+        """`ArtifactStore.recall` over every shard in scope, RRF-fused.
+
+        Shards run concurrently; each reads one snapshot of its own file.
+        With a single shard in scope this is that shard's `recall`.
+        """
+        shards = self._shards_for(session_id)
+        if len(shards) == 1:
+            return shards[0].recall(
+                query_text=query_text, query_embedding=query_embedding,
+                session_id=session_id, tool_name=tool_name, limit=limit,
+                candidate_pool=candidate_pool, parallel=parallel,
+            )
+        args = (query_text, query_embedding, session_id, tool_name, candidate_pool)
+        pool = self._executor()
+        futures = [pool.submit(s._run_rankers, s._rankers(*args)) for s in shards]
+        hits = ArtifactStore._fuse([r for f in futures for r in f.result()], limit)
+        self._note_hits(h["artifact_id"] for h in hits)
+        return hits
+
+    async def arecall(
+        self,
+        *,
+        query_text: str,
+        query_embedding: Optional[list[float]] = None,
+        session_id: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        limit: int = 10,
+        candidate_pool: int = 100,
+    ) -> list[dict]:
+        """Async `recall`: shard fan-out on the worker pool, loop stays free."""
+        loop = asyncio.get_running_loop()
+        pool = self._executor()
+        shards = await loop.run_in_executor(pool, self._shards_for, session_id)
+        args = (query_text, query_embedding, session_id, tool_name, candidate_pool)
+        results = await asyncio.gather(*(
+            loop.run_in_executor(pool, s._run_rankers, s._rankers(*args)) for s in shards
+        ))
+        hits = ArtifactStore._fuse([r for shard in results for r in shard], limit)
+        await loop.run_in_executor(pool, self._note_hits, [h["artifact_id"] for h in hits])
+        return hits
+
+    def _note_hits(self, artifact_ids: Iterable[str]) -> None:
+        groups = self._by_tag(artifact_ids)
+        with self._lock:
+            owners = [(self._writers.get(tag), ids) for tag, ids in groups.items()]
+        for store, ids in owners:
+            if store is not None:
+                store._note_hits(ids)
+
+    # ------------------------------------------------------------------
+    # Retention (the surface maintenance.run_maintenance uses)
+    # ------------------------------------------------------------------
+
+    def flush_hits(self) -> int:
+        with self._lock:
+            writers = list(self._writers.values())
+        return sum(w.flush_hits() for w in writers)
+
+    def storage_stats(self) -> dict:
+        """Summed over shards, plus the shard count and the shared cache."""
+        totals = {"used_bytes": 0, "file_bytes": 0, "free_pages": 0, "artifacts": 0}
+        sessions: set[str] = set()
+        tags = self.shard_tags()
+        for tag in tags:
+            store = self._reader(tag)
+            if store is None:
+                continue
+            st = store.storage_stats()
+            for key in totals:
+                totals[key] += st[key]
+            sessions.update(s for s, _ in store.session_activity())
+        cache = self._cache.storage_stats()
+        totals["used_bytes"] += cache["used_bytes"]
+        totals["file_bytes"] += cache["file_bytes"]
+        return {
+            **totals,
+            "sessions": len(sessions),
+            "embedding_cache": cache["embedding_cache"],
+            "shards": len(tags),
+        }
+
+    def eviction_candidates(
+        self,
+        *,
+        keep_sessions: Optional[int] = None,
+        limit: int = 500,
+        **select: Any,
+    ) -> list[str]:
+        """Candidates from the least recently written shards first.
+
+        Within a shard the order is `ArtifactStore.eviction_candidates`'s;
+        `keep_sessions` is ranked across all shards.
+        """
+        if keep_sessions is not None:
+            activity: dict[str, str] = {}
+            for store in self._shards_for(None):
+                for session, last in store.session_activity():
+                    activity[session] = max(last, activity.get(session, last))
+            ranked = sorted(activity, key=activity.__getitem__, reverse=True)
+            select["keep_session_ids"] = ranked[:keep_sessions]
+        out: list[str] = []
+        for tag in reversed(self.shard_tags()):
+            store = self._reader(tag)
+            if store is None:
+                continue
+            want = -1 if limit < 0 else limit - len(out)
+            out.extend(store.eviction_candidates(limit=want, **select))
+            if 0 <= limit <= len(out):
+                break
+        return out
+
+    def delete_artifacts(self, artifact_ids: list[str]) -> int:
+        deleted = 0
+        for tag, ids in self._by_tag(artifact_ids).items():
+            with self._writable(tag) as store:
+                if store is not None:
+                    deleted += store.delete_artifacts(ids)
+        if deleted:
+            self._bump_generation()
+        return deleted
+
+    def trim_embedding_cache(self, max_entries: int) -> int:
+        return self._cache.trim_embedding_cache(max_entries)
+
+    def compact(self, **kwargs: Any) -> dict:
+        """Compact every shard; delete cold shards left with no artifacts.
+
+        An empty shard another process still has open is compacted and
+        kept; a later `compact()` drops it once it is released.
+        """
+        out: dict[str, Any] = {"shards": {}, "dropped": []}
+        current = _shard_tag("month", "") if self.partition == "month" else None
+        for tag in self.shard_tags():
+            with self._lock:
+                active = tag in self._writers
+            with self._writable(tag) as store:
+                if store is None:
+                    continue
+                empty = store.storage_stats()["artifacts"] == 0
+                if not empty or active or not tag or tag == current:
+                    out["shards"][tag or "legacy"] = store.compact(**kwargs)
+                    continue
+            if self._drop_shard(tag):
+                out["dropped"].append(tag)
+        out["shards"]["embedding-cache"] = self._cache.compact(**kwargs)
+        return out
+
+    def _drop_shard(self, tag: str) -> bool:
+        """Delete shard `tag` if no process holds it; False if one does."""
+        if fcntl is None:
+            return False
+        with self._lock:
+            self._readers.pop(tag, None)
+        self._release(tag)
+        path = self._path(tag)
+        with open(self._lock_path(tag), "a+b") as fh:
+            try:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                logger.debug("artifact shard %s still open elsewhere; kept", path.name)
+                return False
+            for p in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+                p.unlink(missing_ok=True)
+            shutil.rmtree(path.with_name(path.name + "-vec"), ignore_errors=True)
+        logger.info("dropped empty artifact shard %s", path.name)
+        return True
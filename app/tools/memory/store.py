@@ -4,11 +4,35 @@ Single DB at the configured path (default: ~/.prism/artifacts.db).
 WAL mode + production PRAGMAs (busy_timeout, mmap, cache, temp_store).
 Hybrid recall: BM25 (FTS5) + cosine (per-row vectors) + RRF fusion.
 
+VECTOR INDEX: vector recall goes through a persistent IVF-flat index
+(`vector_index.py`) stored in `<db>-vec/` next to the DB, so it scores
+the whole corpus instead of the newest few hundred rows. Every embedding
+write appends to `embedding_log` inside the same transaction; the index
+replays the log past its watermark, which keeps it consistent across
+processes. With the index off (or no NumPy) recall scans the newest
+candidate rows instead, scored with one matmul over a per-process cached
+matrix when NumPy is available.
+
+EMBEDDINGS: stored L2-normalized as float16 by default (int8 + per-vector
+scale optional), 2-4x smaller than raw float32. Legacy f32 BLOBs stay
+readable and are rewritten in the background after the v3 migration.
+
+DEDUP: results are content-addressed by sha256 of their canonical JSON.
+A repeat result gets its own artifact row but references the first
+copy's result, record rows and vectors (`content_of`).
+
+RETENTION: recall() counts hits per artifact (buffered, flushed in
+batches) so `maintenance.py` can evict least-recently-recalled rows.
+delete_artifacts() removes rows, FTS entries and vectors; compact() runs
+FTS5 merge/optimize and incremental VACUUM.
+
 ATOMICITY: Every record() / update_embedding() is one BEGIN IMMEDIATE
 transaction. On any error mid-record the artifact is rolled back.
 
-THREADING: Each public method opens its own connection. The store is
-thread-safe under WAL mode + busy_timeout=5000.
+THREADING: Each thread gets one pooled connection (PRAGMAs applied once,
+prepared statements cached by sqlite3) that lives as long as the thread.
+The store is thread-safe under WAL mode + busy_timeout=5000. recall()
+runs its four sub-searches inside one read snapshot.
 
 PROCESS: Multi-process safe — multiple PRISM agent subprocesses can
 share the same DB file under WAL.
@@ -18,7 +42,12 @@ section for the rationale behind the single-DB + FTS5 hybrid choices.
 """
 from __future__ import annotations
 
+import asyncio
 import base64
+import functools
+import hashlib
+import heapq
+import itertools
 import json
 import logging
 import os
@@ -26,10 +55,16 @@ import secrets
 import sqlite3
 import struct
 import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Iterable, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from app.tools.memory.vector_index import VectorIndex, numpy_available
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +73,18 @@ logger = logging.getLogger(__name__)
 # Schema. FTS5 virtual table is content-shared with `artifacts.summary` so we
 # don't double-store text. Per-record FTS5 mirrors `artifact_records.record_summary`.
 # ---------------------------------------------------------------------------
-_SCHEMA_VERSION = 1
+_SCHEMA_VERSION = 5
+
+# Decoded candidate matrices kept per process for the row-scan path
+_SCAN_CACHE_SIZE = 16
+
+# Prepared statements kept per pooled connection
+_STATEMENT_CACHE_SIZE = 256
+
+# Recall hits are buffered and written in one transaction once this many
+# artifacts are pending, or _HIT_FLUSH_SECONDS after the last write
+_HIT_FLUSH_EVERY = 64
+_HIT_FLUSH_SECONDS = 60.0
 
 _SCHEMA = """
 CREATE TABLE IF NOT EXISTS schema_version (
@@ -56,7 +102,11 @@ CREATE TABLE IF NOT EXISTS artifacts (
     record_count    INTEGER,
     bytes_size      INTEGER NOT NULL,
     created_at      TEXT NOT NULL,
-    promoted_to_kg  INTEGER NOT NULL DEFAULT 0
+    promoted_to_kg  INTEGER NOT NULL DEFAULT 0,
+    content_hash    TEXT,
+    content_of      TEXT,
+    hit_count       INTEGER NOT NULL DEFAULT 0,
+    last_hit_at     TEXT
 );
 
 CREATE TABLE IF NOT EXISTS artifact_records (
@@ -101,15 +151,109 @@ CREATE TRIGGER IF NOT EXISTS artifacts_au AFTER UPDATE OF summary ON artifacts B
     UPDATE artifacts_fts SET summary = new.summary WHERE rowid = new.rowid;
 END;
 
--- For artifact_records (composite key, so we use a hash-derived rowid by
--- joining artifact_id + record_idx via concatenation in a string column):
+-- For artifact_records: records_fts shares artifact_records' rowid (since
+-- v5), so deletes and owner hand-overs are rowid lookups, not FTS scans.
+-- Rowids survive incremental vacuum; a full VACUUM is followed by
+-- ArtifactStore._rebuild_fts().
 CREATE TRIGGER IF NOT EXISTS records_ai AFTER INSERT ON artifact_records BEGIN
-    INSERT INTO records_fts(record_summary, artifact_id, record_idx)
-    VALUES (new.record_summary, new.artifact_id, new.record_idx);
+    INSERT INTO records_fts(rowid, record_summary, artifact_id, record_idx)
+    VALUES (new.rowid, new.record_summary, new.artifact_id, new.record_idx);
 END;
+CREATE TRIGGER IF NOT EXISTS records_ad AFTER DELETE ON artifact_records BEGIN
+    DELETE FROM records_fts WHERE rowid = old.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS records_au AFTER UPDATE OF artifact_id ON artifact_records BEGIN
+    UPDATE records_fts SET artifact_id = new.artifact_id WHERE rowid = new.rowid;
+END;
+
+-- Append-only log of embedding writes (record_idx NULL = artifact-level).
+-- The vector index replays it past its watermark to stay current.
+CREATE TABLE IF NOT EXISTS embedding_log (
+    seq             INTEGER PRIMARY KEY AUTOINCREMENT,
+    artifact_id     TEXT NOT NULL,
+    record_idx      INTEGER
+);
+
+-- Persistent text -> embedding cache, keyed by sha256(model_id NUL text)
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    text_hash       TEXT PRIMARY KEY,
+    embedding       BLOB NOT NULL
+);
+"""
+
+# Indexes on columns that older databases only gain through _MIGRATIONS,
+# so they are created after the migration step rather than in _SCHEMA.
+_SCHEMA_POST = """
+CREATE INDEX IF NOT EXISTS idx_artifacts_content    ON artifacts(content_hash);
+CREATE INDEX IF NOT EXISTS idx_artifacts_content_of ON artifacts(content_of);
+"""
+
+# Forward migrations, keyed by the version they upgrade TO. Each runs
+# inside the BEGIN IMMEDIATE transaction opened by _init_schema, after
+# _SCHEMA has created any new tables. Scripts are split with
+# sqlite3.complete_statement, so trigger bodies are fine.
+_MIGRATIONS: dict[int, str] = {
+    # v2: seed embedding_log with every vector written before it existed
+    2: """
+    INSERT INTO embedding_log (artifact_id, record_idx)
+        SELECT id, NULL FROM artifacts WHERE embedding IS NOT NULL
+        ORDER BY rowid;
+    INSERT INTO embedding_log (artifact_id, record_idx)
+        SELECT artifact_id, record_idx FROM artifact_records
+        WHERE embedding IS NOT NULL ORDER BY rowid;
+    """,
+    # v3: quantized embedding BLOBs. Readers accept both layouts, so the
+    # schema flip is free; legacy f32 rows are rewritten afterwards by
+    # requantize_embeddings() in small batches (see ArtifactStore.__init__).
+    3: "",
+    # v4: content-addressed dedup. content_hash is backfilled for older
+    # rows in the background (see backfill_content_hashes()).
+    4: """
+    ALTER TABLE artifacts ADD COLUMN content_hash TEXT;
+    ALTER TABLE artifacts ADD COLUMN content_of TEXT;
+    """,
+    # v5: retention. Recall hit counters drive LRU eviction, and
+    # records_fts is re-keyed on artifact_records.rowid so the new delete
+    # trigger can find its rows.
+    5: """
+    ALTER TABLE artifacts ADD COLUMN hit_count INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE artifacts ADD COLUMN last_hit_at TEXT;
+    DELETE FROM records_fts;
+    INSERT INTO records_fts(rowid, record_summary, artifact_id, record_idx)
+        SELECT rowid, record_summary, artifact_id, record_idx FROM artifact_records;
+    DROP TRIGGER IF EXISTS records_ai;
+    CREATE TRIGGER records_ai AFTER INSERT ON artifact_records BEGIN
+        INSERT INTO records_fts(rowid, record_summary, artifact_id, record_idx)
+        VALUES (new.rowid, new.record_summary, new.artifact_id, new.record_idx);
+    END;
+    """,
+}
+
+
+# Re-key both FTS tables on their source rowids (after a full VACUUM)
+_REBUILD_FTS = """
+DELETE FROM artifacts_fts;
+INSERT INTO artifacts_fts(rowid, summary, tool_name, artifact_id)
+    SELECT rowid, summary, tool_name, id FROM artifacts;
+DELETE FROM records_fts;
+INSERT INTO records_fts(rowid, record_summary, artifact_id, record_idx)
+    SELECT rowid, record_summary, artifact_id, record_idx FROM artifact_records;
 """
 
 
+def _statements(script: str) -> Iterator[str]:
+    """Split a SQL script into complete statements (trigger bodies included)."""
+    buf = ""
+    for line in script.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            if buf.strip():
+                yield buf
+            buf = ""
+    if buf.strip():
+        yield buf
+
+
 @dataclass(frozen=True)
 class ArtifactRow:
     """Read-only view of one artifact row."""
@@ -137,10 +281,15 @@ class ArtifactRow:
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _new_artifact_id() -> str:
-    """Stable short id; ~5e9 collisions per billion is fine for laptop scale."""
+def _new_artifact_id(tag: Optional[str] = None) -> str:
+    """Stable short id; ~5e9 collisions per billion is fine for laptop scale.
+
+    A `tag` (the shard name, see sharded.py) is embedded as
+    `art_<tag>_<random>` so the id alone routes back to its DB file.
+    """
     raw = secrets.token_bytes(5)
-    return "art_" + base64.b32encode(raw).decode("ascii").rstrip("=").lower()
+    suffix = base64.b32encode(raw).decode("ascii").rstrip("=").lower()
+    return f"art_{tag}_{suffix}" if tag else "art_" + suffix
 
 
 def _canonical_json(obj: Any) -> str:
@@ -148,20 +297,135 @@ def _canonical_json(obj: Any) -> str:
     return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
 
 
-def _vec_to_blob(vec: Optional[Iterable[float]]) -> Optional[bytes]:
+def _content_hash(result_json: str) -> str:
+    """Address of a canonical result; equal hashes share record rows."""
+    return hashlib.sha256(result_json.encode("utf-8")).hexdigest()
+
+
+# Embedding BLOB formats. Legacy rows are raw little-endian f32 with no
+# header. Quantized rows start with a 4-byte header whose bit pattern is a
+# quiet-NaN f32, so it can never be the first element of a real embedding:
+#   float16: header + f16[d]                (unit L2 norm)
+#   int8:    header + f32 scale + i8[d]     (unit L2 norm, value = i8 * scale)
+EMBEDDING_DTYPES = ("float32", "float16", "int8")
+_HDR_F16 = b"\x16\x00\xc0\x7f"
+_HDR_I8 = b"\x08\x00\xc0\x7f"
+
+
+def _unit(arr: list[float]) -> list[float]:
+    norm = sum(x * x for x in arr) ** 0.5
+    return [x / norm for x in arr] if norm else arr
+
+
+def _vec_to_blob(
+    vec: Optional[Iterable[float]],
+    dtype: str = "float32",
+) -> Optional[bytes]:
     if vec is None:
         return None
-    arr = list(vec)
-    return struct.pack(f"<{len(arr)}f", *arr)
+    arr = [float(x) for x in vec]
+    n = len(arr)
+    if dtype == "float32":
+        return struct.pack(f"<{n}f", *arr)
+    # Cosine is scale-invariant, so quantized formats store unit vectors
+    unit = _unit(arr)
+    if dtype == "float16":
+        return _HDR_F16 + struct.pack(f"<{n}e", *unit)
+    if dtype == "int8":
+        scale = max((abs(x) for x in unit), default=0.0) / 127.0 or 1.0
+        codes = [max(-127, min(127, round(x / scale))) for x in unit]
+        return _HDR_I8 + struct.pack(f"<f{n}b", scale, *codes)
+    raise ValueError(f"unknown embedding dtype {dtype!r}; valid: {EMBEDDING_DTYPES}")
+
+
+def _blob_format(blob: bytes) -> tuple[str, int]:
+    """(dtype, dimension) of an embedding BLOB."""
+    head = blob[:4]
+    if head == _HDR_F16:
+        return "float16", (len(blob) - 4) // 2
+    if head == _HDR_I8:
+        return "int8", len(blob) - 8
+    return "float32", len(blob) // 4
 
 
 def _blob_to_vec(blob: Optional[bytes]) -> Optional[list[float]]:
     if blob is None or len(blob) == 0:
         return None
-    n = len(blob) // 4
+    dtype, n = _blob_format(blob)
+    if dtype == "float16":
+        return list(struct.unpack(f"<{n}e", blob[4:]))
+    if dtype == "int8":
+        scale, *codes = struct.unpack(f"<f{n}b", blob[4:])
+        return [c * scale for c in codes]
     return list(struct.unpack(f"<{n}f", blob))
 
 
+@dataclass(frozen=True)
+class _PackedVectors:
+    """Unit-norm vectors kept in their storage precision.
+
+    `codes` is (N, d) float32 / float16 / int8; int8 rows carry a per-row
+    `scales`. Scoring runs on the codes directly, so a cached float16
+    matrix takes half the memory of the float32 one and int8 a quarter.
+    """
+    codes: Any
+    scales: Any = None
+
+    def __len__(self) -> int:
+        return int(self.codes.shape[0])
+
+    def scores(self, q: Any) -> Any:
+        s = self.codes @ q
+        return s * self.scales if self.scales is not None else s
+
+
+def _blobs_to_matrix(blobs: list[bytes], dim: int) -> _PackedVectors:
+    """Decode same-dimension BLOBs with one np.frombuffer per format.
+
+    Homogeneous input stays quantized; a mix of formats (mid-migration)
+    is widened to float32. Rows come back L2-normalized.
+    """
+    import numpy as np
+
+    if not blobs:
+        return _PackedVectors(np.zeros((0, dim), dtype=np.float32))
+    formats = {_blob_format(b)[0] for b in blobs}
+    if formats == {"float16"}:
+        body = b"".join(b[4:] for b in blobs)
+        return _PackedVectors(np.frombuffer(body, dtype="<f2").reshape(len(blobs), dim))
+    if formats == {"int8"}:
+        rec = np.dtype([("scale", "<f4"), ("codes", "i1", (dim,))])
+        packed = np.frombuffer(b"".join(b[4:] for b in blobs), dtype=rec)
+        return _PackedVectors(packed["codes"], packed["scale"].astype(np.float32))
+    if formats == {"float32"}:
+        mat = np.frombuffer(b"".join(blobs), dtype="<f4").reshape(len(blobs), dim)
+    else:
+        mat = np.asarray([_blob_to_vec(b) for b in blobs], dtype=np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return _PackedVectors((mat / norms).astype(np.float32, copy=False))
+
+
+def _top_k(vectors: _PackedVectors, query: list[float], k: int) -> list[int]:
+    """Row numbers of the k best cosine matches, best first.
+
+    One matmul over the packed codes + argpartition.
+    """
+    import numpy as np
+
+    n = len(vectors)
+    if n == 0 or k <= 0:
+        return []
+    q = np.asarray(query, dtype=np.float32)
+    qn = float(np.linalg.norm(q))
+    if qn == 0.0:
+        scores = np.zeros(n, dtype=np.float32)
+    else:
+        scores = vectors.scores(q / qn)
+    top = np.argpartition(-scores, k - 1)[:k] if n > k else np.arange(n)
+    return [int(i) for i in top[np.argsort(-scores[top], kind="stable")]]
+
+
 def _cosine(a: list[float], b: list[float]) -> float:
     """Cosine similarity. NumPy if available; pure Python otherwise."""
     if len(a) != len(b):
@@ -260,6 +524,67 @@ def _rrf(rankings: list[list[Any]], k: int = 60) -> list[tuple[Any, float]]:
     return sorted(scores.items(), key=lambda t: t[1], reverse=True)
 
 
+def _rrf_top(rankings: list[list[Any]], limit: int, k: int = 60) -> list[tuple[Any, float]]:
+    """`_rrf(rankings, k)[:limit]`, reading the rankings only as deep as needed.
+
+    Walks all rankings one rank at a time. After depth d an item's fused
+    score is at least what it has collected, and at most that plus
+    1/(k+d+1) for every ranking it could still appear in. Once the
+    limit-th best lower bound beats every other item's upper bound
+    (including items not seen yet) the top set can no longer change;
+    its exact scores and tie order are then read off the full rankings.
+    """
+    if limit <= 0:
+        return []
+    longest = max((len(r) for r in rankings), default=0)
+    partial: dict[Any, float] = {}
+    seen_in: dict[Any, int] = {}
+    settled: Optional[list[Any]] = None
+    for depth in range(longest):
+        for ranking in rankings:
+            if depth < len(ranking):
+                item = ranking[depth]
+                partial[item] = partial.get(item, 0.0) + 1.0 / (k + depth + 1)
+                seen_in[item] = seen_in.get(item, 0) + 1
+        live = sum(1 for r in rankings if len(r) > depth + 1)
+        if live == 0 or len(partial) < limit:
+            continue
+        step = 1.0 / (k + depth + 2)
+        top = heapq.nlargest(limit, partial, key=partial.__getitem__)
+        floor = partial[top[-1]]
+        if floor <= live * step:  # an unseen item could still make it
+            continue
+        members = set(top)
+        if all(
+            partial[item] + min(live, len(rankings) - seen_in[item]) * step < floor
+            for item in partial if item not in members
+        ):
+            settled = top
+            break
+    if settled is None:
+        return _rrf(rankings, k)[:limit]
+
+    # Exact scores for the settled set, summed in the same order as _rrf;
+    # ties break on first appearance (ranking index, then rank) like _rrf's
+    # insertion order
+    exact: list[tuple[float, int, int, Any]] = []
+    for item in settled:
+        score = 0.0
+        first: Optional[tuple[int, int]] = None
+        for i, ranking in enumerate(rankings):
+            try:
+                rank = ranking.index(item) + 1
+            except ValueError:
+                continue
+            score += 1.0 / (k + rank)
+            if first is None:
+                first = (i, rank)
+        assert first is not None
+        exact.append((-score, first[0], first[1], item))
+    exact.sort(key=lambda t: t[:3])
+    return [(item, -neg) for neg, _, _, item in exact]
+
+
 # ---------------------------------------------------------------------------
 # Default DB path
 # ---------------------------------------------------------------------------
@@ -287,19 +612,105 @@ class ArtifactStore:
     via BM25 (FTS5) + cosine (per-row vectors) + RRF fusion.
     """
 
-    def __init__(self, db_path: Optional[Path | str] = None) -> None:
+    def __init__(
+        self,
+        db_path: Optional[Path | str] = None,
+        *,
+        vector_index: bool = True,
+        embedding_dtype: str = "float16",
+        id_tag: Optional[str] = None,
+        read_only: bool = False,
+    ) -> None:
+        if embedding_dtype not in EMBEDDING_DTYPES:
+            raise ValueError(
+                f"unknown embedding dtype {embedding_dtype!r}; valid: {EMBEDDING_DTYPES}"
+            )
         self.db_path = Path(db_path) if db_path else default_db_path()
+        # Embedded in new artifact ids (see _new_artifact_id)
+        self.id_tag = id_tag
+        # Read-only stores open `mode=ro` connections: recall and reads
+        # only, no write lock taken, no hit tracking
+        self.read_only = read_only
+        if read_only and not self.db_path.exists():
+            raise FileNotFoundError(self.db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         # serialize writes within this process so we don't trip
         # SQLITE_BUSY at high tool-call rates; readers go straight through
         self._write_lock = threading.Lock()
-        self._init_schema()
+        # thread ident -> (thread, connection); see _connection()
+        self._pool_lock = threading.Lock()
+        self._pool: dict[int, tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._pool_pid = os.getpid()
+        self._recall_pool: Optional[ThreadPoolExecutor] = None
+        # artifact id -> recall hits not yet written (see flush_hits)
+        self._hits_lock = threading.Lock()
+        self._pending_hits: Counter[str] = Counter()
+        self._hits_flushed_at = time.monotonic()
+        # Bumped after every committed content change; see `generation`
+        self._generations = itertools.count(1)
+        self._generation = 0
+        # ANN index is loaded lazily on first vector recall; until then
+        # writes only append to embedding_log
+        self._use_index = vector_index and numpy_available()
+        self._index_lock = threading.Lock()
+        self._indexes: Optional[tuple[VectorIndex, VectorIndex]] = None
+        # (kind, session, tool, pool, dim) -> (embedding_log head, hits, matrix)
+        self._scan_lock = threading.Lock()
+        self._scan_cache: OrderedDict[tuple, tuple[int, list[dict], Any]] = OrderedDict()
+        # New embeddings are written in this format; older rows keep theirs
+        self.embedding_dtype = embedding_dtype
+        self._requantize_thread: Optional[threading.Thread] = None
+        if read_only and self._schema_current():
+            return
+        previous = self._init_schema()
+        if previous is not None and not read_only:
+            # Online migration: rewrite legacy f32 vectors and hash older
+            # results off the caller's path
+            self._requantize_thread = threading.Thread(
+                target=self._migrate_rows_quietly,
+                args=(previous,),
+                daemon=True,
+                name=f"migrate-{self.db_path.name}",
+            )
+            self._requantize_thread.start()
+
+    @property
+    def generation(self) -> int:
+        """Increases after every record / embedding update / promotion /
+        delete made through this instance — a cheap staleness check for
+        recall caches. Writes by other processes don't move it."""
+        return self._generation
+
+    def _bump_generation(self) -> None:
+        # next() on a count is atomic, so concurrent writers never collapse
+        # two bumps into one
+        self._generation = next(self._generations)
 
-    def _connect(self) -> sqlite3.Connection:
+    @property
+    def index_dir(self) -> Path:
+        """Directory holding the persistent vector index, next to the DB."""
+        return self.db_path.with_name(self.db_path.name + "-vec")
+
+    def _connect(self, *, read_only: Optional[bool] = None) -> sqlite3.Connection:
         # isolation_level=None lets us drive transactions explicitly with BEGIN/COMMIT
-        conn = sqlite3.connect(self.db_path, timeout=10.0, isolation_level=None)
-        # Production PRAGMAs — these MUST be set on every connection
-        conn.execute("PRAGMA journal_mode = WAL")
+        # check_same_thread=False only so close() can reap the pool; each
+        # connection is still used by exactly one thread
+        if self.read_only if read_only is None else read_only:
+            conn = sqlite3.connect(
+                f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True,
+                timeout=10.0, isolation_level=None,
+                check_same_thread=False, cached_statements=_STATEMENT_CACHE_SIZE,
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path, timeout=10.0, isolation_level=None,
+                check_same_thread=False, cached_statements=_STATEMENT_CACHE_SIZE,
+            )
+            # Takes effect only on a new (empty) DB; older files are converted
+            # by the one-time VACUUM in compact()
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            # Production PRAGMAs — these MUST be set on every connection
+            conn.execute("PRAGMA journal_mode = WAL")
         conn.execute("PRAGMA synchronous = NORMAL")
         conn.execute("PRAGMA busy_timeout = 5000")
         conn.execute("PRAGMA mmap_size = 8388608")
@@ -308,16 +719,117 @@ class ArtifactStore:
         conn.execute("PRAGMA foreign_keys = ON")
         return conn
 
-    def _init_schema(self) -> None:
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's pooled connection, opened on first use.
+
+        Connections (and their statement caches) live as long as their
+        thread; ones left behind by finished threads are closed on the next
+        checkout, and a forked child never reuses its parent's handles.
+        """
+        ident = threading.get_ident()
+        current = threading.current_thread()
+        entry = self._pool.get(ident)
+        if entry is not None and entry[0] is current and self._pool_pid == os.getpid():
+            return entry[1]
+        with self._pool_lock:
+            if self._pool_pid != os.getpid():
+                self._pool = {}
+                self._pool_pid = os.getpid()
+            for key, (thread, stale) in list(self._pool.items()):
+                if key == ident or not thread.is_alive():
+                    del self._pool[key]
+                    stale.close()
+            conn = self._connect()
+            self._pool[ident] = (current, conn)
+        return conn
+
+    @contextmanager
+    def _snapshot(self) -> Iterator[sqlite3.Connection]:
+        """Run the enclosed reads against one WAL snapshot.
+
+        Re-entrant: a snapshot opened while this thread is already inside
+        one joins the outer transaction.
+        """
+        conn = self._connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close all pooled connections; the next call reopens lazily.
+
+        Meant for shutdown and tests — don't call it while other threads
+        are mid-query on this store.
+        """
+        with self._pool_lock:
+            entries = list(self._pool.values())
+            self._pool = {}
+            recall_pool, self._recall_pool = self._recall_pool, None
+        if recall_pool is not None:
+            recall_pool.shutdown(wait=True)
+        for _, conn in entries:
+            conn.close()
+
+    def _schema_current(self) -> bool:
+        """True when the file is already at _SCHEMA_VERSION (read-only open)."""
         conn = self._connect()
+        try:
+            row = conn.execute("SELECT version FROM schema_version LIMIT 1").fetchone()
+        except sqlite3.OperationalError:
+            return False
+        finally:
+            conn.close()
+        return row is not None and row[0] == _SCHEMA_VERSION
+
+    def _init_schema(self) -> Optional[int]:
+        """Create / migrate the schema. Returns the version migrated from, if any."""
+        migrated_from: Optional[int] = None
+        # Schema changes need a writable handle even for a read-only store
+        conn = self._connect(read_only=False)
         try:
             conn.executescript(_SCHEMA)
-            cur = conn.execute("SELECT version FROM schema_version LIMIT 1")
-            row = cur.fetchone()
-            if row is None:
-                conn.execute("INSERT INTO schema_version(version) VALUES (?)", (_SCHEMA_VERSION,))
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT version FROM schema_version LIMIT 1").fetchone()
+                if row is None:
+                    conn.execute(
+                        "INSERT INTO schema_version(version) VALUES (?)",
+                        (_SCHEMA_VERSION,),
+                    )
+                elif row[0] < _SCHEMA_VERSION:
+                    migrated_from = row[0]
+                    self._migrate(conn, row[0])
+                    conn.execute("UPDATE schema_version SET version = ?", (_SCHEMA_VERSION,))
+                for stmt in _statements(_SCHEMA_POST):
+                    conn.execute(stmt)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
         finally:
             conn.close()
+        return migrated_from
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection, from_version: int) -> None:
+        for version in range(from_version + 1, _SCHEMA_VERSION + 1):
+            script = _MIGRATIONS.get(version)
+            if not script:
+                continue
+            logger.info("migrating artifact store schema to v%d", version)
+            for stmt in _statements(script):
+                try:
+                    conn.execute(stmt)
+                except sqlite3.OperationalError as e:
+                    # ADD COLUMN re-run against a DB whose version row was
+                    # rolled back by hand; the column is already there
+                    if "duplicate column" not in str(e):
+                        raise
 
     # ------------------------------------------------------------------
     # Recording
@@ -334,46 +846,73 @@ class ArtifactStore:
         embedding: Optional[Iterable[float]] = None,
         record_embeddings: Optional[list[Optional[Iterable[float]]]] = None,
     ) -> str:
-        """Insert one artifact + per-record rows atomically. Returns the artifact id."""
+        """Insert one artifact + per-record rows atomically. Returns the artifact id.
+
+        Results are content-addressed: when an identical canonical result
+        is already stored, the new artifact keeps its own session, args,
+        summary and FTS row but points at the first copy (`content_of`)
+        instead of duplicating its result, record rows and embeddings.
+        """
         if not tool_name:
             raise ValueError("tool_name required")
         if not session_id:
             raise ValueError("session_id required")
 
-        artifact_id = _new_artifact_id()
+        artifact_id = _new_artifact_id(self.id_tag)
         args_json = _canonical_json(args)
         result_json = _canonical_json(result)
+        content_hash = _content_hash(result_json)
         sum_text = summary or _summarize(result, tool_name)
         records = _extract_records(result)
         record_count = len(records) if records else None
         bytes_size = len(result_json.encode("utf-8"))
         created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        emb_blob = _vec_to_blob(embedding, self.embedding_dtype)
+        rec_embs = record_embeddings or [None] * len(records or ())
+        if records and len(rec_embs) != len(records):
+            rec_embs = [None] * len(records)
 
         with self._write_lock:
-            conn = self._connect()
+            conn = self._connection()
             try:
                 conn.execute("BEGIN IMMEDIATE")
+                owner = conn.execute(
+                    """
+                    SELECT id, summary, embedding FROM artifacts
+                    WHERE content_hash = ? AND content_of IS NULL
+                    LIMIT 1
+                    """,
+                    (content_hash,),
+                ).fetchone()
+                if owner is not None and emb_blob is None and owner[1] == sum_text:
+                    # Same text, same vector — reuse it instead of re-embedding
+                    emb_blob = owner[2]
                 conn.execute(
                     """
                     INSERT INTO artifacts (id, session_id, tool_name, args_json,
                                            result_json, summary, embedding,
                                            record_count, bytes_size, created_at,
-                                           promoted_to_kg)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+                                           promoted_to_kg, content_hash, content_of)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
                     """,
                     (artifact_id, session_id, tool_name, args_json,
-                     result_json, sum_text, _vec_to_blob(embedding),
-                     record_count, bytes_size, created_at),
+                     "" if owner else result_json, sum_text, emb_blob,
+                     record_count, bytes_size, created_at,
+                     content_hash, owner[0] if owner else None),
                 )
-                if records:
-                    rec_embs = record_embeddings or [None] * len(records)
-                    if len(rec_embs) != len(records):
-                        rec_embs = [None] * len(records)
+                logged: list[tuple[str, Optional[int]]] = []
+                if emb_blob is not None:
+                    logged.append((artifact_id, None))
+                if records and owner is not None:
+                    logged.extend(self._share_records(conn, owner[0], artifact_id, rec_embs))
+                elif records:
                     rows = []
                     for i, rec in enumerate(records):
                         rec_summary = _summarize_record(rec, i)
-                        rec_emb = _vec_to_blob(rec_embs[i])
+                        rec_emb = _vec_to_blob(rec_embs[i], self.embedding_dtype)
                         rows.append((artifact_id, i, _canonical_json(rec), rec_summary, rec_emb))
+                        if rec_emb is not None:
+                            logged.append((artifact_id, i))
                     conn.executemany(
                         """
                         INSERT INTO artifact_records
@@ -383,14 +922,54 @@ class ArtifactStore:
                         """,
                         rows,
                     )
+                self._log_embeddings(conn, logged)
                 conn.execute("COMMIT")
             except Exception:
                 conn.execute("ROLLBACK")
                 raise
-            finally:
-                conn.close()
+        self._bump_generation()
+        if logged:
+            self._refresh_index()
         return artifact_id
 
+    def _share_records(
+        self,
+        conn: sqlite3.Connection,
+        owner_id: str,
+        artifact_id: str,
+        rec_embs: list[Optional[Iterable[float]]],
+    ) -> list[tuple[str, Optional[int]]]:
+        """Point a duplicate artifact at its owner's record rows.
+
+        Fills any owner vectors still missing from `rec_embs`, then returns
+        the embedding_log keys for both: the owner's freshly filled rows and
+        one `(artifact_id, i)` per embedded record, so the duplicate's own
+        session/tool can find the shared vectors.
+        """
+        logged: list[tuple[str, Optional[int]]] = []
+        for i, emb in enumerate(rec_embs):
+            if emb is None:
+                continue
+            cur = conn.execute(
+                """
+                UPDATE artifact_records SET embedding = ?
+                WHERE artifact_id = ? AND record_idx = ? AND embedding IS NULL
+                """,
+                (_vec_to_blob(emb, self.embedding_dtype), owner_id, i),
+            )
+            if cur.rowcount:
+                logged.append((owner_id, i))
+        rows = conn.execute(
+            """
+            SELECT record_idx FROM artifact_records
+            WHERE artifact_id = ? AND embedding IS NOT NULL
+            ORDER BY record_idx
+            """,
+            (owner_id,),
+        ).fetchall()
+        logged.extend((artifact_id, r[0]) for r in rows)
+        return logged
+
     def update_embedding(
         self,
         *,
@@ -399,82 +978,665 @@ class ArtifactStore:
         record_embeddings: Optional[list[Optional[Iterable[float]]]] = None,
     ) -> None:
         """Backfill embeddings asynchronously after record() returned."""
+        self.update_embeddings([(artifact_id, embedding, record_embeddings)])
+
+    def update_embeddings(
+        self,
+        updates: list[tuple[
+            str,
+            Optional[Iterable[float]],
+            Optional[list[Optional[Iterable[float]]]],
+        ]],
+    ) -> None:
+        """Backfill `(artifact_id, embedding, record_embeddings)` for many
+        artifacts in one transaction — the recorder's batch path."""
+        logged: list[tuple[str, Optional[int]]] = []
         with self._write_lock:
-            conn = self._connect()
+            conn = self._connection()
             try:
                 conn.execute("BEGIN IMMEDIATE")
-                if embedding is not None:
-                    conn.execute(
-                        "UPDATE artifacts SET embedding = ? WHERE id = ?",
-                        (_vec_to_blob(embedding), artifact_id),
-                    )
-                if record_embeddings is not None:
-                    for i, emb in enumerate(record_embeddings):
-                        if emb is None:
-                            continue
-                        conn.execute(
-                            """
-                            UPDATE artifact_records
-                            SET embedding = ?
-                            WHERE artifact_id = ? AND record_idx = ?
-                            """,
-                            (_vec_to_blob(emb), artifact_id, i),
+                for artifact_id, embedding, record_embeddings in updates:
+                    if embedding is not None:
+                        cur = conn.execute(
+                            "UPDATE artifacts SET embedding = ? WHERE id = ?",
+                            (_vec_to_blob(embedding, self.embedding_dtype), artifact_id),
                         )
+                        if cur.rowcount:
+                            logged.append((artifact_id, None))
+                    if record_embeddings is not None:
+                        owner = conn.execute(
+                            "SELECT content_of FROM artifacts WHERE id = ?",
+                            (artifact_id,),
+                        ).fetchone()
+                        if owner is not None and owner[0] is not None:
+                            logged.extend(self._share_records(
+                                conn, owner[0], artifact_id, record_embeddings,
+                            ))
+                            continue
+                        for i, emb in enumerate(record_embeddings):
+                            if emb is None:
+                                continue
+                            cur = conn.execute(
+                                """
+                                UPDATE artifact_records
+                                SET embedding = ?
+                                WHERE artifact_id = ? AND record_idx = ?
+                                """,
+                                (_vec_to_blob(emb, self.embedding_dtype), artifact_id, i),
+                            )
+                            if cur.rowcount:
+                                logged.append((artifact_id, i))
+                self._log_embeddings(conn, logged)
                 conn.execute("COMMIT")
             except Exception:
                 conn.execute("ROLLBACK")
                 raise
-            finally:
-                conn.close()
+        self._bump_generation()
+        if logged:
+            self._refresh_index()
+
+    def requantize_embeddings(self, *, batch_size: int = 256) -> int:
+        """Rewrite legacy raw-f32 embeddings into `embedding_dtype`.
+
+        Runs as a series of short BEGIN IMMEDIATE transactions so readers
+        and other writers interleave freely. Vectors keep their direction,
+        so the ANN index and embedding_log are left alone. Returns the
+        number of BLOBs rewritten.
+        """
+        if self.embedding_dtype == "float32":
+            return 0
+        total = 0
+        for table in ("artifacts", "artifact_records"):
+            while True:
+                with self._write_lock:
+                    conn = self._connection()
+                    try:
+                        conn.execute("BEGIN IMMEDIATE")
+                        rows = conn.execute(
+                            f"""
+                            SELECT rowid, embedding FROM {table}
+                            WHERE embedding IS NOT NULL
+                              AND substr(embedding, 1, 4) NOT IN (?, ?)
+                            LIMIT ?
+                            """,
+                            (_HDR_F16, _HDR_I8, batch_size),
+                        ).fetchall()
+                        conn.executemany(
+                            f"UPDATE {table} SET embedding = ? WHERE rowid = ?",
+                            [
+                                (_vec_to_blob(_blob_to_vec(blob), self.embedding_dtype), rowid)
+                                for rowid, blob in rows
+                            ],
+                        )
+                        conn.execute("COMMIT")
+                    except Exception:
+                        conn.execute("ROLLBACK")
+                        raise
+                total += len(rows)
+                if len(rows) < batch_size:
+                    break
+        if total:
+            logger.info("requantized %d embeddings to %s", total, self.embedding_dtype)
+        return total
+
+    def backfill_content_hashes(self, *, batch_size: int = 256) -> int:
+        """Hash results recorded before v4 so new calls can dedup against them.
+
+        Older rows are only given a hash — existing duplicates among them
+        keep their own record rows. Returns the number of rows hashed.
+        """
+        total = 0
+        while True:
+            with self._write_lock:
+                conn = self._connection()
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    rows = conn.execute(
+                        """
+                        SELECT rowid, result_json FROM artifacts
+                        WHERE content_hash IS NULL AND content_of IS NULL
+                        LIMIT ?
+                        """,
+                        (batch_size,),
+                    ).fetchall()
+                    conn.executemany(
+                        "UPDATE artifacts SET content_hash = ? WHERE rowid = ?",
+                        [(_content_hash(result_json), rowid) for rowid, result_json in rows],
+                    )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            total += len(rows)
+            if len(rows) < batch_size:
+                break
+        return total
+
+    def _migrate_rows_quietly(self, previous: int) -> None:
+        try:
+            if previous < 3:
+                self.requantize_embeddings()
+            if previous < 4:
+                self.backfill_content_hashes()
+        except Exception as e:
+            logger.warning("artifact row migration stopped: %s", e)
 
     def mark_promoted(self, artifact_id: str) -> None:
         with self._write_lock:
-            conn = self._connect()
+            conn = self._connection()
+            conn.execute(
+                "UPDATE artifacts SET promoted_to_kg = 1 WHERE id = ?",
+                (artifact_id,),
+            )
+        self._bump_generation()
+
+    # ------------------------------------------------------------------
+    # Embedding cache (text hash -> vector), consulted by CachedEmbedder
+    # ------------------------------------------------------------------
+
+    def get_cached_embeddings(self, text_hashes: list[str]) -> dict[str, list[float]]:
+        """Look up cached vectors. Missing hashes are simply absent."""
+        found: dict[str, list[float]] = {}
+        if not text_hashes:
+            return found
+        conn = self._connection()
+        # stay well under SQLITE_MAX_VARIABLE_NUMBER on old builds
+        for start in range(0, len(text_hashes), 500):
+            chunk = text_hashes[start:start + 500]
+            rows = conn.execute(
+                f"""
+                SELECT text_hash, embedding FROM embedding_cache
+                WHERE text_hash IN ({','.join('?' * len(chunk))})
+                """,
+                chunk,
+            ).fetchall()
+            for text_hash, blob in rows:
+                vec = _blob_to_vec(blob)
+                if vec:
+                    found[text_hash] = vec
+        return found
+
+    def put_cached_embeddings(self, items: dict[str, Iterable[float]]) -> None:
+        """Store vectors by text hash in `embedding_dtype`. First write wins."""
+        rows = [
+            (text_hash, _vec_to_blob(vec, self.embedding_dtype))
+            for text_hash, vec in items.items()
+            if vec is not None
+        ]
+        if not rows:
+            return
+        with self._write_lock:
+            conn = self._connection()
             try:
-                conn.execute(
-                    "UPDATE artifacts SET promoted_to_kg = 1 WHERE id = ?",
-                    (artifact_id,),
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT OR IGNORE INTO embedding_cache (text_hash, embedding) VALUES (?, ?)",
+                    rows,
                 )
-            finally:
-                conn.close()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
 
     # ------------------------------------------------------------------
-    # Reading
+    # Retention: hit tracking, deletion, compaction (see maintenance.py)
     # ------------------------------------------------------------------
 
-    def get(self, artifact_id: str) -> Optional[ArtifactRow]:
-        conn = self._connect()
-        try:
-            row = conn.execute(
+    def _note_hits(self, artifact_ids: Iterable[str]) -> None:
+        if self.read_only:
+            return
+        with self._hits_lock:
+            self._pending_hits.update(artifact_ids)
+            due = (
+                len(self._pending_hits) >= _HIT_FLUSH_EVERY
+                or time.monotonic() - self._hits_flushed_at >= _HIT_FLUSH_SECONDS
+            )
+        if due:
+            try:
+                self.flush_hits()
+            except sqlite3.Error as e:
+                logger.debug("recall hit flush failed (%s); will retry", e)
+
+    def flush_hits(self) -> int:
+        """Write buffered recall hit counts. Returns the artifacts touched."""
+        with self._hits_lock:
+            pending, self._pending_hits = self._pending_hits, Counter()
+            self._hits_flushed_at = time.monotonic()
+        if not pending:
+            return 0
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._write_lock:
+            conn = self._connection()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    """
+                    UPDATE artifacts SET hit_count = hit_count + ?, last_hit_at = ?
+                    WHERE id = ?
+                    """,
+                    [(n, now, aid) for aid, n in pending.items()],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                with self._hits_lock:
+                    self._pending_hits.update(pending)
+                raise
+        return len(pending)
+
+    def storage_stats(self) -> dict:
+        """Page-level DB size plus row counts, for the retention policies."""
+        conn = self._connection()
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        artifacts, sessions = conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT session_id) FROM artifacts"
+        ).fetchone()
+        return {
+            "used_bytes": (page_count - freelist) * page_size,
+            "file_bytes": page_count * page_size,
+            "free_pages": freelist,
+            "artifacts": artifacts,
+            "sessions": sessions,
+            "embedding_cache": conn.execute(
+                "SELECT COUNT(*) FROM embedding_cache"
+            ).fetchone()[0],
+        }
+
+    def eviction_candidates(
+        self,
+        *,
+        created_before: Optional[str] = None,
+        keep_sessions: Optional[int] = None,
+        keep_session_ids: Optional[Iterable[str]] = None,
+        lru: bool = False,
+        limit: int = 500,
+        include_promoted: bool = False,
+    ) -> list[str]:
+        """Artifact ids a retention policy may delete, oldest use first.
+
+        `created_before` selects by age, `keep_sessions` everything outside
+        the N most recently active sessions (or outside `keep_session_ids`,
+        when the caller ranked sessions itself), and `lru=True` everything,
+        ordered by last recall hit (creation time if never hit), then by
+        hit count. Promoted artifacts are skipped unless asked for.
+        """
+        clauses = ["1=1"]
+        params: list[Any] = []
+        if not include_promoted:
+            clauses.append("promoted_to_kg = 0")
+        if created_before is not None:
+            clauses.append("created_at < ?")
+            params.append(created_before)
+        if keep_sessions is not None:
+            clauses.append(
+                """session_id NOT IN (
+                    SELECT session_id FROM artifacts GROUP BY session_id
+                    ORDER BY MAX(created_at) DESC, MAX(rowid) DESC LIMIT ?
+                )"""
+            )
+            params.append(keep_sessions)
+        if keep_session_ids is not None:
+            keep = list(keep_session_ids)
+            clauses.append(f"session_id NOT IN ({','.join('?' * len(keep))})")
+            params.extend(keep)
+        if (created_before is None and keep_sessions is None
+                and keep_session_ids is None and not lru):
+            return []
+        params.append(limit)
+        conn = self._connection()
+        rows = conn.execute(
+            f"""
+            SELECT id FROM artifacts
+            WHERE {' AND '.join(clauses)}
+            ORDER BY COALESCE(last_hit_at, created_at) ASC, hit_count ASC, rowid ASC
+            LIMIT ?
+            """,
+            params,
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def session_activity(self) -> list[tuple[str, str]]:
+        """`(session_id, last created_at)` per session, most recent first."""
+        conn = self._connection()
+        return [
+            (r[0], r[1]) for r in conn.execute(
                 """
-                SELECT id, session_id, tool_name, args_json, result_json,
-                       summary, record_count, bytes_size, created_at,
-                       promoted_to_kg
-                FROM artifacts WHERE id = ?
+                SELECT session_id, MAX(created_at) FROM artifacts
+                GROUP BY session_id ORDER BY MAX(created_at) DESC, MAX(rowid) DESC
+                """
+            )
+        ]
+
+    def delete_artifacts(self, artifact_ids: list[str]) -> int:
+        """Delete artifacts with their records, FTS rows and vectors.
+
+        A deleted content owner (see record()) hands its result and record
+        rows to its oldest surviving duplicate, which becomes the owner.
+        Returns the number of artifacts deleted.
+        """
+        ids = list(dict.fromkeys(artifact_ids))
+        if not ids:
+            return 0
+        self.flush_hits()
+        deleted = 0
+        index_keys: list[tuple[str, Optional[int]]] = []
+        with self._write_lock:
+            conn = self._connection()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for start in range(0, len(ids), 400):
+                    chunk = ids[start:start + 400]
+                    marks = ",".join("?" * len(chunk))
+                    heirs = conn.execute(
+                        f"""
+                        SELECT a.id, a.result_json, (
+                            SELECT d.id FROM artifacts d
+                            WHERE d.content_of = a.id AND d.id NOT IN ({marks})
+                            ORDER BY d.rowid LIMIT 1
+                        )
+                        FROM artifacts a
+                        WHERE a.id IN ({marks}) AND a.content_of IS NULL
+                        """,
+                        chunk + chunk,
+                    ).fetchall()
+                    for owner, result_json, heir in heirs:
+                        if heir is not None:
+                            self._hand_over(conn, owner, heir, result_json)
+                    index_keys.extend(conn.execute(
+                        f"SELECT artifact_id, record_idx FROM embedding_log "
+                        f"WHERE artifact_id IN ({marks})",
+                        chunk,
+                    ).fetchall())
+                    deleted += conn.execute(
+                        f"DELETE FROM artifacts WHERE id IN ({marks})", chunk,
+                    ).rowcount
+                    # keep the newest row so MAX(seq) never moves backwards
+                    conn.execute(
+                        f"""
+                        DELETE FROM embedding_log
+                        WHERE artifact_id IN ({marks})
+                          AND seq < (SELECT MAX(seq) FROM embedding_log)
+                        """,
+                        chunk,
+                    )
+                if deleted:
+                    # Advance the log head so every process drops its cached
+                    # scan matrices; the marker joins no artifact
+                    conn.execute(
+                        "INSERT INTO embedding_log (artifact_id, record_idx) VALUES ('', NULL)"
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        # Tombstone in the persisted index too, so deleted keys don't take
+        # top-k slots in processes that open it later
+        indexes = self._load_indexes() if index_keys else None
+        if indexes is not None:
+            art_idx, rec_idx = indexes
+            art_idx.remove(k for k in index_keys if k[1] is None)
+            rec_idx.remove(k for k in index_keys if k[1] is not None)
+            self.flush_index()
+        if deleted:
+            self._bump_generation()
+            logger.info("deleted %d artifacts from %s", deleted, self.db_path)
+        return deleted
+
+    @staticmethod
+    def _hand_over(conn: sqlite3.Connection, owner: str, heir: str, result_json: str) -> None:
+        conn.execute(
+            "UPDATE artifacts SET result_json = ?, content_of = NULL WHERE id = ?",
+            (result_json, heir),
+        )
+        conn.execute(
+            "UPDATE artifacts SET content_of = ? WHERE content_of = ? AND id != ?",
+            (heir, owner, heir),
+        )
+        conn.execute(
+            "UPDATE artifact_records SET artifact_id = ? WHERE artifact_id = ?",
+            (heir, owner),
+        )
+        # The heir's own keys may predate the owner's record vectors
+        conn.execute(
+            """
+            INSERT INTO embedding_log (artifact_id, record_idx)
+            SELECT ?, record_idx FROM artifact_records
+            WHERE artifact_id = ? AND embedding IS NOT NULL
+            """,
+            (heir, heir),
+        )
+
+    def trim_embedding_cache(self, max_entries: int) -> int:
+        """Drop the oldest embedding-cache rows beyond `max_entries`."""
+        with self._write_lock:
+            conn = self._connection()
+            return conn.execute(
+                """
+                DELETE FROM embedding_cache WHERE rowid IN (
+                    SELECT rowid FROM embedding_cache ORDER BY rowid DESC
+                    LIMIT -1 OFFSET ?
+                )
                 """,
-                (artifact_id,),
-            ).fetchone()
-            if row is None:
-                return None
-            return ArtifactRow(
-                id=row[0], session_id=row[1], tool_name=row[2],
-                args_json=row[3], result_json=row[4], summary=row[5],
-                record_count=row[6], bytes_size=row[7], created_at=row[8],
-                promoted_to_kg=bool(row[9]),
+                (max_entries,),
+            ).rowcount
+
+    def compact(
+        self,
+        *,
+        optimize: bool = False,
+        merge_pages: int = 500,
+        full_vacuum: Optional[bool] = None,
+    ) -> dict:
+        """FTS5 segment maintenance, orphan cleanup, then vacuum.
+
+        Runs a bounded FTS5 `merge` (or a full `optimize`) on both FTS
+        tables and drops rows whose artifact is gone (`embedding_log`
+        entries other than the head, records left by DBs written without
+        foreign keys). Then `incremental_vacuum` returns free pages to the OS.
+        A DB created before auto_vacuum=INCREMENTAL needs one full VACUUM
+        to convert; by default that only happens once a quarter of its
+        pages are free. After a full VACUUM the FTS tables are re-keyed,
+        since VACUUM may renumber rowids.
+        """
+        out: dict[str, Any] = {}
+        with self._write_lock:
+            conn = self._connection()
+            for table in ("artifacts_fts", "records_fts"):
+                if optimize:
+                    conn.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+                else:
+                    conn.execute(
+                        f"INSERT INTO {table}({table}, rank) VALUES ('merge', ?)",
+                        (merge_pages,),
+                    )
+            out["fts"] = "optimize" if optimize else f"merge({merge_pages})"
+            out["orphans"] = conn.execute(
+                """
+                DELETE FROM embedding_log
+                WHERE artifact_id NOT IN (SELECT id FROM artifacts)
+                  AND seq < (SELECT MAX(seq) FROM embedding_log)
+                """
+            ).rowcount + conn.execute(
+                "DELETE FROM artifact_records WHERE artifact_id NOT IN (SELECT id FROM artifacts)"
+            ).rowcount
+
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            incremental = conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+            if full_vacuum is None:
+                full_vacuum = not incremental and before * 4 >= page_count > 0
+            if full_vacuum:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+                self._rebuild_fts(conn)
+                out["vacuum"] = "full"
+            elif incremental:
+                conn.execute("PRAGMA incremental_vacuum").fetchall()
+                out["vacuum"] = "incremental"
+            else:
+                out["vacuum"] = "skipped"
+            out["pages_freed"] = before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        return out
+
+    @staticmethod
+    def _rebuild_fts(conn: sqlite3.Connection) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for stmt in _statements(_REBUILD_FTS):
+                conn.execute(stmt)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ------------------------------------------------------------------
+    # Vector index maintenance
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _log_embeddings(
+        conn: sqlite3.Connection,
+        keys: list[tuple[str, Optional[int]]],
+    ) -> None:
+        if keys:
+            conn.executemany(
+                "INSERT INTO embedding_log (artifact_id, record_idx) VALUES (?, ?)",
+                keys,
             )
-        finally:
-            conn.close()
 
-    def get_record(self, artifact_id: str, record_idx: int) -> Optional[Any]:
-        conn = self._connect()
+    def _load_indexes(self) -> Optional[tuple[VectorIndex, VectorIndex]]:
+        """Open (or create) the artifact + record indexes on first use."""
+        if not self._use_index:
+            return None
+        with self._index_lock:
+            if self._indexes is None:
+                try:
+                    self._indexes = (
+                        VectorIndex(self.index_dir / "artifacts"),
+                        VectorIndex(self.index_dir / "records"),
+                    )
+                except Exception as e:
+                    logger.warning("vector index unavailable (%s); using row scan", e)
+                    self._use_index = False
+                    return None
+            return self._indexes
+
+    def _refresh_index(self) -> None:
+        """Fold new embedding_log rows into the index, if it's loaded.
+
+        Called after every embedding write. A process that has never run a
+        vector recall doesn't pay for loading the index here — it catches
+        up from the log on first use instead.
+        """
+        if self._indexes is None:
+            return
         try:
-            row = conn.execute(
-                "SELECT record_json FROM artifact_records WHERE artifact_id = ? AND record_idx = ?",
-                (artifact_id, record_idx),
-            ).fetchone()
-            return json.loads(row[0]) if row else None
-        finally:
-            conn.close()
+            self._sync_index()
+        except Exception as e:
+            logger.debug("vector index refresh failed (%s); will retry on recall", e)
+
+    def _sync_index(self) -> Optional[tuple[VectorIndex, VectorIndex]]:
+        indexes = self._load_indexes()
+        if indexes is None:
+            return None
+        art_idx, rec_idx = indexes
+        with self._index_lock:
+            # One read snapshot so the watermark matches the rows we read
+            with self._snapshot() as conn:
+                head = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM embedding_log").fetchone()[0]
+                for idx in indexes:
+                    if idx.watermark > head:
+                        # DB was replaced underneath a stale index; rebuild
+                        logger.info("vector index %s ahead of DB; rebuilding", idx.path)
+                        idx.clear()
+                if art_idx.watermark < head:
+                    rows = conn.execute(
+                        """
+                        SELECT l.artifact_id, a.embedding, a.session_id, a.tool_name
+                        FROM embedding_log l
+                        JOIN artifacts a ON a.id = l.artifact_id
+                        WHERE l.seq > ? AND l.seq <= ? AND l.record_idx IS NULL
+                          AND a.embedding IS NOT NULL
+                        ORDER BY l.seq
+                        """,
+                        (art_idx.watermark, head),
+                    ).fetchall()
+                    art_idx.add(
+                        (((r[0], None), _blob_to_vec(r[1]), r[2], r[3]) for r in rows),
+                        watermark=head,
+                    )
+                if rec_idx.watermark < head:
+                    rows = conn.execute(
+                        """
+                        SELECT l.artifact_id, l.record_idx, ar.embedding,
+                               a.session_id, a.tool_name
+                        FROM embedding_log l
+                        JOIN artifacts a ON a.id = l.artifact_id
+                        JOIN artifact_records ar
+                          ON ar.artifact_id = COALESCE(a.content_of, a.id)
+                         AND ar.record_idx = l.record_idx
+                        WHERE l.seq > ? AND l.seq <= ? AND l.record_idx IS NOT NULL
+                          AND ar.embedding IS NOT NULL
+                        ORDER BY l.seq
+                        """,
+                        (rec_idx.watermark, head),
+                    ).fetchall()
+                    rec_idx.add(
+                        (((r[0], r[1]), _blob_to_vec(r[2]), r[3], r[4]) for r in rows),
+                        watermark=head,
+                    )
+        return indexes
+
+    def flush_index(self) -> None:
+        """Persist any index rows added since the last snapshot."""
+        if self._indexes is None:
+            return
+        with self._index_lock:
+            for idx in self._indexes:
+                idx.flush()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def get(self, artifact_id: str) -> Optional[ArtifactRow]:
+        conn = self._connection()
+        row = conn.execute(
+            """
+            SELECT a.id, a.session_id, a.tool_name, a.args_json,
+                   COALESCE(o.result_json, a.result_json),
+                   a.summary, a.record_count, a.bytes_size, a.created_at,
+                   a.promoted_to_kg
+            FROM artifacts a
+            LEFT JOIN artifacts o ON o.id = a.content_of
+            WHERE a.id = ?
+            """,
+            (artifact_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return ArtifactRow(
+            id=row[0], session_id=row[1], tool_name=row[2],
+            args_json=row[3], result_json=row[4], summary=row[5],
+            record_count=row[6], bytes_size=row[7], created_at=row[8],
+            promoted_to_kg=bool(row[9]),
+        )
+
+    def get_record(self, artifact_id: str, record_idx: int) -> Optional[Any]:
+        conn = self._connection()
+        row = conn.execute(
+            """
+            SELECT ar.record_json
+            FROM artifacts a
+            JOIN artifact_records ar ON ar.artifact_id = COALESCE(a.content_of, a.id)
+            WHERE a.id = ? AND ar.record_idx = ?
+            """,
+            (artifact_id, record_idx),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
 
     def list_artifacts(
         self,
@@ -496,30 +1658,27 @@ class ArtifactStore:
             clauses.append("created_at >= ?")
             params.append(since)
         params.append(limit)
-        conn = self._connect()
-        try:
-            rows = conn.execute(
-                f"""
-                SELECT id, tool_name, summary, record_count, bytes_size,
-                       created_at, promoted_to_kg, session_id
-                FROM artifacts
-                WHERE {' AND '.join(clauses)}
-                ORDER BY created_at DESC, rowid DESC
-                LIMIT ?
-                """,
-                params,
-            ).fetchall()
-            return [
-                {
-                    "artifact_id": r[0], "tool": r[1], "summary": r[2],
-                    "record_count": r[3], "bytes_size": r[4],
-                    "created_at": r[5], "promoted_to_kg": bool(r[6]),
-                    "session_id": r[7],
-                }
-                for r in rows
-            ]
-        finally:
-            conn.close()
+        conn = self._connection()
+        rows = conn.execute(
+            f"""
+            SELECT id, tool_name, summary, record_count, bytes_size,
+                   created_at, promoted_to_kg, session_id
+            FROM artifacts
+            WHERE {' AND '.join(clauses)}
+            ORDER BY created_at DESC, rowid DESC
+            LIMIT ?
+            """,
+            params,
+        ).fetchall()
+        return [
+            {
+                "artifact_id": r[0], "tool": r[1], "summary": r[2],
+                "record_count": r[3], "bytes_size": r[4],
+                "created_at": r[5], "promoted_to_kg": bool(r[6]),
+                "session_id": r[7],
+            }
+            for r in rows
+        ]
 
     # ------------------------------------------------------------------
     # Hybrid recall — BM25 + vector + RRF fusion
@@ -534,64 +1693,123 @@ class ArtifactStore:
         tool_name: Optional[str] = None,
         limit: int = 10,
         candidate_pool: int = 100,
+        parallel: bool = False,
     ) -> list[dict]:
         """Hybrid recall: BM25 (FTS5) + cosine over vectors, RRF-fused.
 
         If `query_embedding` is None, falls back to BM25-only.
 
+        By default the four rankers run in turn inside one read snapshot.
+        With `parallel=True` they run concurrently on the recall worker
+        pool, each on its own connection (and so its own WAL snapshot) —
+        SQLite and NumPy both release the GIL, so the BM25 and vector
+        searches overlap.
+
         Returns hits ordered by RRF score descending. Each hit can be
         artifact-level (no `record_idx`) or record-level (`record_idx` set).
         """
-        # BM25 candidate sets
-        bm25_artifacts = self._bm25_artifact_search(
-            query_text, session_id=session_id, tool_name=tool_name,
-            limit=candidate_pool,
+        rankers = self._rankers(
+            query_text, query_embedding, session_id, tool_name, candidate_pool,
         )
-        bm25_records = self._bm25_record_search(
-            query_text, session_id=session_id, tool_name=tool_name,
-            limit=candidate_pool,
+        if parallel:
+            pool = self._recall_executor()
+            results = [f.result() for f in [pool.submit(r) for r in rankers]]
+        else:
+            results = self._run_rankers(rankers)
+        hits = self._fuse(results, limit)
+        self._note_hits(h["artifact_id"] for h in hits)
+        return hits
+
+    async def arecall(
+        self,
+        *,
+        query_text: str,
+        query_embedding: Optional[list[float]] = None,
+        session_id: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        limit: int = 10,
+        candidate_pool: int = 100,
+    ) -> list[dict]:
+        """Async `recall(parallel=True)`: the rankers run on the recall
+        worker pool while the caller's event loop stays free."""
+        loop = asyncio.get_running_loop()
+        pool = self._recall_executor()
+        rankers = self._rankers(
+            query_text, query_embedding, session_id, tool_name, candidate_pool,
         )
+        results = await asyncio.gather(*(loop.run_in_executor(pool, r) for r in rankers))
+        hits = self._fuse(list(results), limit)
+        # may flush to the DB, so keep it off the loop too
+        await loop.run_in_executor(pool, self._note_hits, [h["artifact_id"] for h in hits])
+        return hits
 
+    def _rankers(
+        self,
+        query_text: str,
+        query_embedding: Optional[list[float]],
+        session_id: Optional[str],
+        tool_name: Optional[str],
+        candidate_pool: int,
+    ) -> list[Callable[[], list[dict]]]:
+        """The four candidate generators, in fusion order:
+        BM25 artifacts, vector artifacts, BM25 records, vector records."""
+        filters = {"session_id": session_id, "tool_name": tool_name, "limit": candidate_pool}
+        rankers: list[Callable[[], list[dict]]] = [
+            functools.partial(self._bm25_artifact_search, query_text, **filters),
+            functools.partial(self._bm25_record_search, query_text, **filters),
+        ]
         # Vector candidate sets (only if embedding provided)
         if query_embedding is not None:
-            vec_artifacts = self._vec_artifact_search(
-                query_embedding, session_id=session_id, tool_name=tool_name,
-                limit=candidate_pool,
-            )
-            vec_records = self._vec_record_search(
-                query_embedding, session_id=session_id, tool_name=tool_name,
-                limit=candidate_pool,
-            )
-        else:
-            vec_artifacts = []
-            vec_records = []
+            rankers.insert(1, functools.partial(
+                self._vec_artifact_search, query_embedding, **filters,
+            ))
+            rankers.append(functools.partial(
+                self._vec_record_search, query_embedding, **filters,
+            ))
+        return rankers
+
+    def _run_rankers(self, rankers: list[Callable[[], list[dict]]]) -> list[list[dict]]:
+        # All four candidate sets read one snapshot, so a concurrent
+        # record() can't show up in some rankings but not others
+        with self._snapshot():
+            return [r() for r in rankers]
 
+    @staticmethod
+    def _fuse(results: list[list[dict]], limit: int) -> list[dict]:
         # Build ranking lists keyed by a hashable item identifier.
         # Artifact-level hits use (id, None); record-level use (artifact_id, record_idx).
         def _key(hit: dict) -> tuple[str, Optional[int]]:
             return (hit["artifact_id"], hit.get("record_idx"))
 
-        # Map keys → metadata for final lookup
+        rankings = [[_key(h) for h in hits] for hits in results]
+        ranked = _rrf_top(rankings, limit)
+
+        # Metadata for the winners only, from the first ranker that saw them
+        wanted = {key for key, _ in ranked}
         meta: dict[tuple[str, Optional[int]], dict] = {}
-        for hit in bm25_artifacts + vec_artifacts + bm25_records + vec_records:
-            k = _key(hit)
-            if k not in meta:
-                meta[k] = hit
-
-        ranked = _rrf([
-            [_key(h) for h in bm25_artifacts],
-            [_key(h) for h in vec_artifacts],
-            [_key(h) for h in bm25_records],
-            [_key(h) for h in vec_records],
-        ])
+        for hits, keys in zip(results, rankings):
+            for hit, key in zip(hits, keys):
+                if key in wanted and key not in meta:
+                    meta[key] = hit
 
         out: list[dict] = []
-        for key, score in ranked[:limit]:
+        for key, score in ranked:
             entry = dict(meta[key])
             entry["score"] = score
             out.append(entry)
         return out
 
+    def _recall_executor(self) -> ThreadPoolExecutor:
+        """Worker threads for parallel recall; long-lived, so each keeps
+        its pooled connection and statement cache between calls."""
+        if self._recall_pool is None:
+            with self._pool_lock:
+                if self._recall_pool is None:
+                    self._recall_pool = ThreadPoolExecutor(
+                        max_workers=4, thread_name_prefix="artifact-recall",
+                    )
+        return self._recall_pool
+
     # ------------------------------------------------------------------
     # Internal: BM25 + vector candidate generators
     # ------------------------------------------------------------------
@@ -607,7 +1825,7 @@ class ArtifactStore:
         if not query.strip():
             return []
         # FTS5 MATCH against artifact summaries; join back to artifacts for filters
-        conn = self._connect()
+        conn = self._connection()
         try:
             rows = conn.execute(
                 """
@@ -635,8 +1853,6 @@ class ArtifactStore:
         except sqlite3.OperationalError as e:
             logger.debug("FTS5 artifact search failed (%s); skipping", e)
             return []
-        finally:
-            conn.close()
 
     def _bm25_record_search(
         self,
@@ -648,16 +1864,18 @@ class ArtifactStore:
     ) -> list[dict]:
         if not query.strip():
             return []
-        conn = self._connect()
+        conn = self._connection()
         try:
             rows = conn.execute(
                 """
-                SELECT records_fts.artifact_id, records_fts.record_idx,
+                SELECT a.id, records_fts.record_idx,
                        records_fts.record_summary, a.tool_name,
                        a.session_id, a.created_at,
                        bm25(records_fts) AS rank
                 FROM records_fts
-                JOIN artifacts a ON a.id = records_fts.artifact_id
+                JOIN artifacts a
+                  ON a.id = records_fts.artifact_id
+                  OR a.content_of = records_fts.artifact_id
                 WHERE records_fts MATCH ?
                   AND (? IS NULL OR a.session_id = ?)
                   AND (? IS NULL OR a.tool_name = ?)
@@ -678,8 +1896,6 @@ class ArtifactStore:
         except sqlite3.OperationalError as e:
             logger.debug("FTS5 record search failed (%s); skipping", e)
             return []
-        finally:
-            conn.close()
 
     def _vec_artifact_search(
         self,
@@ -689,6 +1905,13 @@ class ArtifactStore:
         tool_name: Optional[str],
         limit: int,
     ) -> list[dict]:
+        indexes = self._sync_index()
+        if indexes is not None:
+            hits = indexes[0].search(
+                query_embedding, limit, session_id=session_id, tool_name=tool_name,
+            )
+            return self._hydrate_artifact_hits([key[0] for key, _ in hits])
+
         clauses = ["a.embedding IS NOT NULL"]
         params: list[Any] = []
         if session_id:
@@ -697,37 +1920,28 @@ class ArtifactStore:
         if tool_name:
             clauses.append("a.tool_name = ?")
             params.append(tool_name)
-        params.append(min(limit * 5, 500))  # candidate pool for cosine
-
-        conn = self._connect()
-        try:
-            rows = conn.execute(
-                f"""
-                SELECT a.id, a.tool_name, a.summary, a.created_at,
-                       a.embedding, a.record_count, a.session_id
-                FROM artifacts a
-                WHERE {' AND '.join(clauses)}
-                ORDER BY a.created_at DESC
-                LIMIT ?
-                """,
-                params,
-            ).fetchall()
-
-            scored: list[tuple[float, dict]] = []
-            for r in rows:
-                emb = _blob_to_vec(r[4])
-                if not emb:
-                    continue
-                s = _cosine(query_embedding, emb)
-                scored.append((s, {
-                    "artifact_id": r[0], "tool": r[1], "summary": r[2],
-                    "created_at": r[3], "record_count": r[5],
-                    "session_id": r[6],
-                }))
-            scored.sort(key=lambda t: t[0], reverse=True)
-            return [h for _, h in scored[:limit]]
-        finally:
-            conn.close()
+        pool = min(limit * 5, 500)  # candidate pool for cosine
+        params.append(pool)
+
+        return self._scan_search(
+            ("artifacts", session_id, tool_name, pool),
+            f"""
+            SELECT a.id, a.tool_name, a.summary, a.created_at,
+                   a.record_count, a.session_id, a.embedding
+            FROM artifacts a
+            WHERE {' AND '.join(clauses)}
+            ORDER BY a.created_at DESC
+            LIMIT ?
+            """,
+            params,
+            lambda r: {
+                "artifact_id": r[0], "tool": r[1], "summary": r[2],
+                "created_at": r[3], "record_count": r[4],
+                "session_id": r[5],
+            },
+            query_embedding,
+            limit,
+        )
 
     def _vec_record_search(
         self,
@@ -737,6 +1951,13 @@ class ArtifactStore:
         tool_name: Optional[str],
         limit: int,
     ) -> list[dict]:
+        indexes = self._sync_index()
+        if indexes is not None:
+            hits = indexes[1].search(
+                query_embedding, limit, session_id=session_id, tool_name=tool_name,
+            )
+            return self._hydrate_record_hits([key for key, _ in hits])
+
         clauses = ["ar.embedding IS NOT NULL"]
         params: list[Any] = []
         if session_id:
@@ -745,38 +1966,132 @@ class ArtifactStore:
         if tool_name:
             clauses.append("a.tool_name = ?")
             params.append(tool_name)
-        params.append(min(limit * 5, 500))
+        pool = min(limit * 5, 500)
+        params.append(pool)
+
+        return self._scan_search(
+            ("records", session_id, tool_name, pool),
+            f"""
+            SELECT a.id, ar.record_idx, ar.record_summary,
+                   a.tool_name, a.session_id, a.created_at, ar.embedding
+            FROM artifact_records ar
+            JOIN artifacts a
+              ON a.id = ar.artifact_id OR a.content_of = ar.artifact_id
+            WHERE {' AND '.join(clauses)}
+            ORDER BY a.created_at DESC
+            LIMIT ?
+            """,
+            params,
+            lambda r: {
+                "artifact_id": r[0], "record_idx": r[1],
+                "summary": r[2], "tool": r[3],
+                "session_id": r[4], "created_at": r[5],
+            },
+            query_embedding,
+            limit,
+        )
 
-        conn = self._connect()
-        try:
-            rows = conn.execute(
-                f"""
-                SELECT ar.artifact_id, ar.record_idx, ar.record_summary,
-                       ar.embedding, a.tool_name, a.session_id, a.created_at
-                FROM artifact_records ar
-                JOIN artifacts a ON a.id = ar.artifact_id
-                WHERE {' AND '.join(clauses)}
-                ORDER BY a.created_at DESC
-                LIMIT ?
-                """,
-                params,
-            ).fetchall()
+    def _scan_search(
+        self,
+        cache_key: tuple,
+        sql: str,
+        params: list[Any],
+        to_hit: Callable[[tuple], dict],
+        query_embedding: list[float],
+        limit: int,
+    ) -> list[dict]:
+        """Row-scan vector search, used when the ANN index is off.
 
+        `sql` must select the embedding BLOB as its last column. With NumPy
+        the candidate BLOBs are decoded once into a normalized matrix that
+        is cached per process until `embedding_log` moves, so repeated
+        recalls in a session only pay one matmul.
+        """
+        conn = self._connection()
+        if not numpy_available():
+            rows = conn.execute(sql, params).fetchall()
             scored: list[tuple[float, dict]] = []
             for r in rows:
-                emb = _blob_to_vec(r[3])
+                emb = _blob_to_vec(r[-1])
                 if not emb:
                     continue
-                s = _cosine(query_embedding, emb)
-                scored.append((s, {
-                    "artifact_id": r[0], "record_idx": r[1],
-                    "summary": r[2], "tool": r[4],
-                    "session_id": r[5], "created_at": r[6],
-                }))
+                scored.append((_cosine(query_embedding, emb), to_hit(r)))
             scored.sort(key=lambda t: t[0], reverse=True)
             return [h for _, h in scored[:limit]]
-        finally:
-            conn.close()
+
+        dim = len(query_embedding)
+        key = cache_key + (dim,)
+        head = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM embedding_log").fetchone()[0]
+        with self._scan_lock:
+            cached = self._scan_cache.get(key)
+            if cached is not None and cached[0] == head:
+                self._scan_cache.move_to_end(key)
+        if cached is None or cached[0] != head:
+            rows = conn.execute(sql, params).fetchall()
+            # Vectors of another dimension (embedder swapped) can't match
+            rows = [r for r in rows if r[-1] and _blob_format(r[-1])[1] == dim]
+            cached = (head, [to_hit(r) for r in rows],
+                      _blobs_to_matrix([r[-1] for r in rows], dim))
+            with self._scan_lock:
+                self._scan_cache[key] = cached
+                self._scan_cache.move_to_end(key)
+                while len(self._scan_cache) > _SCAN_CACHE_SIZE:
+                    self._scan_cache.popitem(last=False)
+
+        _, hits, vectors = cached
+        order = _top_k(vectors, query_embedding, limit)
+        return [hits[i] for i in order]
+
+    def _hydrate_artifact_hits(self, artifact_ids: list[str]) -> list[dict]:
+        """Metadata for index hits, in hit order. Rows gone from the DB drop out."""
+        if not artifact_ids:
+            return []
+        conn = self._connection()
+        rows = conn.execute(
+            f"""
+            SELECT id, tool_name, summary, created_at, record_count, session_id
+            FROM artifacts
+            WHERE id IN ({','.join('?' * len(artifact_ids))})
+            """,
+            artifact_ids,
+        ).fetchall()
+        by_id = {
+            r[0]: {
+                "artifact_id": r[0], "tool": r[1], "summary": r[2],
+                "created_at": r[3], "record_count": r[4], "session_id": r[5],
+            }
+            for r in rows
+        }
+        return [by_id[a] for a in artifact_ids if a in by_id]
+
+    def _hydrate_record_hits(self, keys: list[tuple[str, Optional[int]]]) -> list[dict]:
+        if not keys:
+            return []
+        conn = self._connection()
+        rows = conn.execute(
+            f"""
+            WITH wanted(artifact_id, record_idx) AS (
+                VALUES {','.join(['(?, ?)'] * len(keys))}
+            )
+            SELECT a.id, ar.record_idx, ar.record_summary,
+                   a.tool_name, a.session_id, a.created_at
+            FROM wanted w
+            JOIN artifacts a ON a.id = w.artifact_id
+            JOIN artifact_records ar
+              ON ar.artifact_id = COALESCE(a.content_of, a.id)
+             AND ar.record_idx = w.record_idx
+            """,
+            [v for key in keys for v in key],
+        ).fetchall()
+        by_key = {
+            (r[0], r[1]): {
+                "artifact_id": r[0], "record_idx": r[1],
+                "summary": r[2], "tool": r[3],
+                "session_id": r[4], "created_at": r[5],
+            }
+            for r in rows
+        }
+        return [by_key[k] for k in keys if k in by_key]
 
     @staticmethod
     def _fts_escape(query: str) -> str:
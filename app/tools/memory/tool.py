@@ -10,7 +10,12 @@ See docs/stateful_tools_2026.md for the full architecture.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from typing import Any, Optional
 
 from app.tools.base import Tool, ToolRegistry
@@ -24,49 +29,188 @@ from app.tools.memory.recorder import (
 logger = logging.getLogger(__name__)
 
 
-def _recall(**kwargs) -> dict:
-    """Hybrid (BM25 + vector + RRF) semantic recall over local artifacts."""
-    store = get_store()
-    if store is None:
-        return {"error": "Artifact store not configured. Memory tools are disabled."}
+# ---------------------------------------------------------------------------
+# Recall result cache
+# ---------------------------------------------------------------------------
+
+_RECALL_CACHE_SIZE = 256
+# Another process's writes don't move this process's store generation;
+# the TTL bounds how long a cached hit list can miss them
+_RECALL_CACHE_TTL_S = 30.0
+
+
+class RecallCache:
+    """LRU of recall hit lists, keyed on (query, filters, store generation).
+
+    One LRU per store (held weakly). A store's `generation` moves on every
+    record / embedding update / promotion / delete, so entries from an
+    older generation are dropped instead of served. A hit skips both the
+    query embedding and SQLite.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = _RECALL_CACHE_SIZE,
+        ttl_s: float = _RECALL_CACHE_TTL_S,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        # store -> (generation, key -> (stored_at, hits))
+        self._stores: weakref.WeakKeyDictionary[
+            Any, tuple[int, OrderedDict[tuple, tuple[float, list[dict]]]]
+        ] = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, store: Any, params: dict) -> tuple[Optional[tuple], Optional[list[dict]]]:
+        """`(key, hits)`; hits is None on a miss. Read the key before
+        querying, so results are filed under the generation they saw."""
+        generation = getattr(store, "generation", None)
+        if generation is None:
+            return None, None
+        key = (
+            generation, params["query_text"], params["session_id"],
+            params["tool_name"], params["limit"],
+        )
+        with self._lock:
+            gen, entries = self._stores.get(store, (None, None))
+            found = entries.get(key) if entries is not None and gen == generation else None
+            if found is not None and time.monotonic() - found[0] < self.ttl_s:
+                entries.move_to_end(key)
+                self.hits += 1
+                return key, [dict(h) for h in found[1]]
+            self.misses += 1
+        return key, None
+
+    def put(self, store: Any, key: Optional[tuple], hits: list[dict]) -> None:
+        if key is None:
+            return
+        with self._lock:
+            gen, entries = self._stores.get(store, (None, None))
+            if gen != key[0]:
+                if gen is not None and gen > key[0]:
+                    return  # a write landed while we queried
+                entries = OrderedDict()
+                self._stores[store] = (key[0], entries)
+            entries[key] = (time.monotonic(), [dict(h) for h in hits])
+            entries.move_to_end(key)
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stores = weakref.WeakKeyDictionary()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = sum(len(e) for _, e in self._stores.values())
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": size,
+            }
+
+
+_RECALL_CACHE = RecallCache()
+
+
+def recall_cache_stats() -> dict:
+    """Hit / miss counters of the `search_artifacts` result cache."""
+    return _RECALL_CACHE.stats()
+
+
+def clear_recall_cache() -> None:
+    _RECALL_CACHE.clear()
 
+
+def _note_cached_hits(store: Any, hits: list[dict]) -> None:
+    # Served from cache, but still a use for LRU retention (in-memory)
+    note = getattr(store, "_note_hits", None)
+    if note is not None:
+        note([h["artifact_id"] for h in hits])
+
+
+def _recall_params(kwargs: dict) -> dict:
+    """Validate recall args; returns store.recall kwargs or {"error": ...}."""
     query = kwargs.get("query")
     if not query:
         return {"error": "`query` is required"}
 
     scope = kwargs.get("scope", "session")
-    tool_filter = kwargs.get("tool")
-    limit = int(kwargs.get("limit", 10))
-
     if scope not in ("session", "all"):
         return {"error": f"Unknown scope '{scope}'. Valid: 'session', 'all'."}
 
     session_id: Optional[str] = (
         resolve_session_id() if scope == "session" else None
     )
+    return {
+        "query_text": query,
+        "session_id": session_id,
+        "tool_name": kwargs.get("tool"),
+        "limit": int(kwargs.get("limit", 10)),
+    }
 
+
+def _embed_query(query: str) -> Optional[list[float]]:
     embedder: Embedder = get_embedder()
     try:
-        query_emb = embedder.embed(query)
+        return embedder.embed(query)
     except Exception as e:
         logger.warning("recall embedding failed (%s); falling back to BM25-only", e)
-        query_emb = None
-
-    hits = store.recall(
-        query_text=query,
-        query_embedding=query_emb,
-        session_id=session_id,
-        tool_name=tool_filter,
-        limit=limit,
-    )
+        return None
+
+
+def _recall_result(kwargs: dict, hits: list[dict]) -> dict:
     return {
-        "query": query,
-        "scope": scope,
+        "query": kwargs["query"],
+        "scope": kwargs.get("scope", "session"),
         "hits": hits,
         "count": len(hits),
     }
 
 
+def _recall(**kwargs) -> dict:
+    """Hybrid (BM25 + vector + RRF) semantic recall over local artifacts."""
+    store = get_store()
+    if store is None:
+        return {"error": "Artifact store not configured. Memory tools are disabled."}
+    params = _recall_params(kwargs)
+    if "error" in params:
+        return params
+
+    key, hits = _RECALL_CACHE.lookup(store, params)
+    if hits is not None:
+        _note_cached_hits(store, hits)
+        return _recall_result(kwargs, hits)
+    hits = store.recall(query_embedding=_embed_query(params["query_text"]), **params)
+    _RECALL_CACHE.put(store, key, hits)
+    return _recall_result(kwargs, hits)
+
+
+async def _arecall(**kwargs) -> dict:
+    """Async `_recall` for the MCP server: the query embedding and the four
+    rankers run off the event loop, the rankers concurrently."""
+    store = get_store()
+    if store is None:
+        return {"error": "Artifact store not configured. Memory tools are disabled."}
+    params = _recall_params(kwargs)
+    if "error" in params:
+        return params
+
+    key, hits = _RECALL_CACHE.lookup(store, params)
+    if hits is not None:
+        _note_cached_hits(store, hits)
+        return _recall_result(kwargs, hits)
+    query_emb = await asyncio.to_thread(_embed_query, params["query_text"])
+    hits = await store.arecall(query_embedding=query_emb, **params)
+    _RECALL_CACHE.put(store, key, hits)
+    return _recall_result(kwargs, hits)
+
+
 def _fetch_artifact(**kwargs) -> dict:
     """Get the full verbatim data for one artifact (or one record of it)."""
     store = get_store()
@@ -286,6 +430,7 @@ def create_memory_tools(registry: ToolRegistry) -> None:
         description=_RECALL_DESCRIPTION,
         input_schema=_RECALL_SCHEMA,
         func=_recall,
+        async_func=_arecall,
         record_artifacts=False,
     ))
     registry.register(Tool(
@@ -0,0 +1,550 @@
+"""Vector index — persistent IVF-flat ANN index for artifact recall.
+
+One `VectorIndex` holds L2-normalized float32 vectors for one embedding
+space (artifact summaries or record summaries). Search is exact cosine
+over the whole corpus while it is small, and IVF-flat (spherical k-means
+coarse quantizer, probe the `nprobe` nearest lists) once it passes
+`train_threshold` rows.
+
+The SQLite DB stays the source of truth. The index is a derived cache
+that `ArtifactStore` keeps current by replaying `embedding_log` rows past
+the index `watermark`; losing or deleting the index directory only costs
+a rebuild.
+
+PERSISTENCE: `<dir>/meta.json` names the current snapshot; its vector
+matrix (`vectors.<snapshot>.npy`) is memory-mapped read-only on load, rows
+appended since then live in an in-memory tail until the next `save()`.
+Snapshot names carry the writer's pid and a random token, so processes
+saving at the same time never write the same file. Each file is written
+under a temp name and renamed into place. meta.json is then replaced,
+under an exclusive lock on `meta.lock`, only if it still names the
+snapshot this instance last loaded or published (compare-and-swap). A
+save that loses the race discards its files and keeps its rows dirty for
+the next attempt, so concurrent processes never read a torn index.
+
+THREADING: all public methods take the instance lock.
+
+NumPy is required. Callers check `numpy_available()` and fall back to the
+store's row-scan search when it isn't installed.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Key of one indexed vector: (artifact_id, record_idx). Artifact-level
+# vectors use record_idx=None.
+IndexKey = tuple[str, Optional[int]]
+
+_META_VERSION = 1
+
+
+@contextmanager
+def _exclusive(lock_path: Path) -> Iterator[None]:
+    """Hold an exclusive advisory lock on `lock_path` (no-op without fcntl)."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(lock_path, "a+b") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def _read_meta(path: Path) -> Optional[dict]:
+    try:
+        return json.loads((path / "meta.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _snapshot_name(meta: Optional[dict]) -> Optional[str]:
+    """Snapshot file stem named by `meta` (pre-token indexes used the generation)."""
+    if meta is None:
+        return None
+    return str(meta.get("snapshot") or meta.get("generation"))
+
+
+def numpy_available() -> bool:
+    try:
+        import numpy  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+class VectorIndex:
+    """Persistent IVF-flat index over L2-normalized float32 vectors."""
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        train_threshold: int = 4096,
+        nprobe: int = 8,
+        save_every: int = 512,
+    ) -> None:
+        import numpy as np
+
+        self._np = np
+        self.path = Path(path)
+        self.train_threshold = train_threshold
+        self.nprobe = nprobe
+        self.save_every = save_every
+        self._lock = threading.RLock()
+
+        self.dim: Optional[int] = None
+        self.watermark = 0
+        self._gen = 0
+        # Snapshot stem this instance last loaded or published
+        self._snapshot: Optional[str] = None
+        self._n = 0
+        # rows [0, _base_n) live in the memory-mapped snapshot, the rest in _tail
+        self._base: Any = None
+        self._base_n = 0
+        self._tail: Any = None
+        self._keys: list[IndexKey] = []
+        self._row_of: dict[IndexKey, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._sess = np.zeros(0, dtype=np.int32)
+        self._tool = np.zeros(0, dtype=np.int32)
+        self._sessions: list[str] = []
+        self._session_code: dict[str, int] = {}
+        self._tools: list[str] = []
+        self._tool_code: dict[str, int] = {}
+        self._centroids: Any = None
+        self._trained_n = 0
+        self._dirty = 0
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._alive[: self._n].sum())
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def add(
+        self,
+        items: Iterable[tuple[IndexKey, Any, str, str]],
+        *,
+        watermark: Optional[int] = None,
+    ) -> int:
+        """Append `(key, vector, session_id, tool_name)` items.
+
+        A key that is already indexed is superseded: the old row is
+        tombstoned and the new vector appended. Vectors whose dimension
+        differs from the index dimension are skipped. Returns the number
+        of rows added.
+        """
+        np = self._np
+        with self._lock:
+            vecs: list[Any] = []
+            keys: list[IndexKey] = []
+            sess: list[int] = []
+            tools: list[int] = []
+            for key, vec, session_id, tool_name in items:
+                arr = np.asarray(vec, dtype=np.float32).reshape(-1)
+                if self.dim is None:
+                    self.dim = int(arr.shape[0])
+                if arr.shape[0] != self.dim:
+                    logger.debug("vector index: skip %s (dim %d != %d)",
+                                 key, arr.shape[0], self.dim)
+                    continue
+                vecs.append(arr)
+                keys.append(key)
+                sess.append(self._code(self._sessions, self._session_code, session_id))
+                tools.append(self._code(self._tools, self._tool_code, tool_name))
+
+            if vecs:
+                mat = _normalize_rows(np, np.vstack(vecs))
+                start = self._n
+                self._append_rows(mat)
+                self._grow_meta(len(vecs))
+                stop = start + len(vecs)
+                for offset, key in enumerate(keys):
+                    old = self._row_of.get(key)
+                    if old is not None:
+                        self._alive[old] = False
+                    self._row_of[key] = start + offset
+                self._keys.extend(keys)
+                self._alive[start:stop] = True
+                self._sess[start:stop] = sess
+                self._tool[start:stop] = tools
+                self._assign[start:stop] = self._nearest_list(mat)
+                self._n = stop
+                self._dirty += len(vecs)
+
+            if watermark is not None:
+                self.watermark = max(self.watermark, int(watermark))
+
+            if self._n >= self.train_threshold and self._n >= 2 * max(self._trained_n, 1):
+                self._train()
+            if self._dirty >= self.save_every:
+                self.save()
+            return len(vecs)
+
+    def remove(self, keys: Iterable[IndexKey]) -> int:
+        """Tombstone indexed keys. Returns how many were live."""
+        removed = 0
+        with self._lock:
+            for key in keys:
+                row = self._row_of.pop(key, None)
+                if row is not None and self._alive[row]:
+                    self._alive[row] = False
+                    removed += 1
+            self._dirty += removed
+        return removed
+
+    def clear(self) -> None:
+        """Drop every vector (used before a full rebuild)."""
+        with self._lock:
+            self._reset_state()
+            self._dirty += 1
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query: Iterable[float],
+        k: int,
+        *,
+        session_id: Optional[str] = None,
+        tool_name: Optional[str] = None,
+    ) -> list[tuple[IndexKey, float]]:
+        """Top-k `(key, cosine)` pairs, best first."""
+        np = self._np
+        with self._lock:
+            n = self._n
+            if n == 0 or k <= 0 or self.dim is None:
+                return []
+            q = np.asarray(list(query), dtype=np.float32).reshape(-1)
+            if q.shape[0] != self.dim:
+                return []
+            qn = float(np.linalg.norm(q))
+            if qn == 0.0:
+                return []
+            q = q / qn
+
+            mask = self._alive[:n].copy()
+            if session_id is not None:
+                code = self._session_code.get(session_id)
+                if code is None:
+                    return []
+                mask &= self._sess[:n] == code
+            if tool_name is not None:
+                code = self._tool_code.get(tool_name)
+                if code is None:
+                    return []
+                mask &= self._tool[:n] == code
+
+            if self._centroids is not None:
+                nprobe = min(self.nprobe, self._centroids.shape[0])
+                near = np.argpartition(-(self._centroids @ q), nprobe - 1)[:nprobe]
+                probe = np.zeros(self._centroids.shape[0], dtype=bool)
+                probe[near] = True
+                probed = mask & probe[self._assign[:n]]
+                # Restrictive filters can leave the probed lists short;
+                # fall back to an exact scan over the filtered rows.
+                if int(probed.sum()) >= k:
+                    mask = probed
+
+            rows = np.flatnonzero(mask)
+            if rows.size == 0:
+                return []
+            scores = self._score(rows, q)
+            if rows.size > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(rows.size)
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self._keys[int(rows[i])], float(scores[i])) for i in top]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self) -> bool:
+        """Write a new snapshot and publish it if nobody else has since.
+
+        Returns False when another process published first; the rows stay
+        dirty and the next `save()` retries against that snapshot.
+        """
+        np = self._np
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            name = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+            vec_file = self.path / f"vectors.{name}.npy"
+            state_file = self.path / f"state.{name}.npz"
+            dim = self.dim or 0
+            tmp_vec = vec_file.with_name(vec_file.name + ".tmp")
+            out = np.lib.format.open_memmap(
+                tmp_vec, mode="w+", dtype=np.float32, shape=(self._n, dim),
+            )
+            for start, block in self._chunks():
+                out[start:start + block.shape[0]] = block
+            out.flush()
+            del out
+            os.replace(tmp_vec, vec_file)
+            tmp_state = state_file.with_name(state_file.name + ".tmp")
+            with open(tmp_state, "wb") as fh:
+                np.savez(
+                    fh,
+                    alive=self._alive[: self._n],
+                    assign=self._assign[: self._n],
+                    sess=self._sess[: self._n],
+                    tool=self._tool[: self._n],
+                    centroids=(self._centroids if self._centroids is not None
+                               else np.zeros((0, dim), np.float32)),
+                )
+            os.replace(tmp_state, state_file)
+
+            with _exclusive(self.path / "meta.lock"):
+                current = _read_meta(self.path)
+                on_disk = _snapshot_name(current)
+                if on_disk != self._snapshot:
+                    # Another process published since we last loaded/saved
+                    for f in (vec_file, state_file):
+                        f.unlink(missing_ok=True)
+                    logger.debug("vector index %s: snapshot %s superseded by %s",
+                                 self.path.name, self._snapshot, on_disk)
+                    self._snapshot = on_disk
+                    self._gen = int(current["generation"]) if current else 0
+                    return False
+                gen = self._gen + 1
+                meta = {
+                    "version": _META_VERSION,
+                    "generation": gen,
+                    "snapshot": name,
+                    "dim": self.dim,
+                    "count": self._n,
+                    "watermark": self.watermark,
+                    "trained_n": self._trained_n,
+                    "keys": [[a, -1 if r is None else r] for a, r in self._keys],
+                    "sessions": self._sessions,
+                    "tools": self._tools,
+                }
+                tmp = self.path / f"meta.json.{name}.tmp"
+                tmp.write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+                os.replace(tmp, self.path / "meta.json")
+
+            old = self._snapshot
+            self._gen = gen
+            self._snapshot = name
+            self._base = np.load(vec_file, mmap_mode="r") if self._n else None
+            self._base_n = self._n
+            self._tail = None
+            self._dirty = 0
+            if old:
+                for stale in (self.path / f"vectors.{old}.npy",
+                              self.path / f"state.{old}.npz"):
+                    try:
+                        stale.unlink()
+                    except OSError:
+                        pass  # already gone; readers keep their open mmap
+            return True
+
+    def flush(self) -> None:
+        """Save only if rows were added since the last snapshot."""
+        with self._lock:
+            if self._dirty:
+                self.save()
+
+    def _load(self) -> None:
+        np = self._np
+        meta_file = self.path / "meta.json"
+        if not meta_file.exists():
+            return
+        try:
+            meta = json.loads(meta_file.read_text(encoding="utf-8"))
+            if meta.get("version") != _META_VERSION:
+                raise ValueError(f"unsupported index version {meta.get('version')}")
+            gen = int(meta["generation"])
+            name = _snapshot_name(meta)
+            count = int(meta["count"])
+            base = np.load(self.path / f"vectors.{name}.npy", mmap_mode="r")
+            with np.load(self.path / f"state.{name}.npz") as state:
+                alive = np.array(state["alive"], dtype=bool)
+                assign = np.array(state["assign"], dtype=np.int32)
+                sess = np.array(state["sess"], dtype=np.int32)
+                tool = np.array(state["tool"], dtype=np.int32)
+                centroids = np.array(state["centroids"], dtype=np.float32)
+            if base.shape[0] != count or alive.shape[0] != count:
+                raise ValueError("index snapshot row counts disagree")
+        except Exception as e:
+            logger.warning("vector index at %s unreadable (%s); rebuilding", self.path, e)
+            self._reset_state()
+            # Let the rebuilt index replace the unreadable snapshot
+            self._snapshot = _snapshot_name(_read_meta(self.path))
+            return
+
+        self._gen = gen
+        self._snapshot = name
+        self.dim = meta.get("dim")
+        self.watermark = int(meta.get("watermark", 0))
+        self._trained_n = int(meta.get("trained_n", 0))
+        self._base = base if count else None
+        self._base_n = count
+        self._n = count
+        self._keys = [(a, None if r < 0 else int(r)) for a, r in meta["keys"]]
+        self._alive, self._assign, self._sess, self._tool = alive, assign, sess, tool
+        self._row_of = {k: i for i, k in enumerate(self._keys) if alive[i]}
+        self._sessions = list(meta.get("sessions", []))
+        self._session_code = {s: i for i, s in enumerate(self._sessions)}
+        self._tools = list(meta.get("tools", []))
+        self._tool_code = {t: i for i, t in enumerate(self._tools)}
+        self._centroids = centroids if centroids.shape[0] else None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _reset_state(self) -> None:
+        np = self._np
+        self.dim = None
+        self.watermark = 0
+        self._n = 0
+        self._base = None
+        self._base_n = 0
+        self._tail = None
+        self._keys = []
+        self._row_of = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._sess = np.zeros(0, dtype=np.int32)
+        self._tool = np.zeros(0, dtype=np.int32)
+        self._sessions, self._session_code = [], {}
+        self._tools, self._tool_code = [], {}
+        self._centroids = None
+        self._trained_n = 0
+
+    @staticmethod
+    def _code(vocab: list[str], codes: dict[str, int], value: str) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = len(vocab)
+            vocab.append(value)
+            codes[value] = code
+        return code
+
+    def _tail_rows(self) -> int:
+        return self._n - self._base_n
+
+    def _append_rows(self, mat: Any) -> None:
+        np = self._np
+        used = self._tail_rows()
+        need = used + mat.shape[0]
+        if self._tail is None or self._tail.shape[0] < need:
+            cap = max(need, 2 * (0 if self._tail is None else self._tail.shape[0]), 64)
+            grown = np.empty((cap, self.dim), dtype=np.float32)
+            if used:
+                grown[:used] = self._tail[:used]
+            self._tail = grown
+        self._tail[used:need] = mat
+
+    def _grow_meta(self, extra: int) -> None:
+        np = self._np
+        need = self._n + extra
+        if self._alive.shape[0] >= need:
+            return
+        cap = max(need, 2 * self._alive.shape[0], 64)
+
+        def grow(arr: Any, dtype: Any) -> Any:
+            out = np.zeros(cap, dtype=dtype)
+            out[: self._n] = arr[: self._n]
+            return out
+
+        self._alive = grow(self._alive, bool)
+        self._assign = grow(self._assign, np.int32)
+        self._sess = grow(self._sess, np.int32)
+        self._tool = grow(self._tool, np.int32)
+
+    def _gather(self, rows: Any) -> Any:
+        """Vectors for the given ascending row numbers."""
+        np = self._np
+        split = int(np.searchsorted(rows, self._base_n))
+        parts = []
+        if split:
+            parts.append(np.asarray(self._base[rows[:split]]))
+        if split < rows.size:
+            parts.append(self._tail[rows[split:] - self._base_n])
+        return np.vstack(parts) if len(parts) > 1 else parts[0]
+
+    def _chunks(self, size: int = 65536) -> Iterable[tuple[int, Any]]:
+        """(start, block) pairs covering rows [0, n) without a full copy."""
+        for start in range(0, self._base_n, size):
+            yield start, self._base[start:min(start + size, self._base_n)]
+        if self._tail_rows():
+            yield self._base_n, self._tail[: self._tail_rows()]
+
+    def _score(self, rows: Any, q: Any) -> Any:
+        """Cosine of `q` against the given rows (stored vectors are unit-norm)."""
+        np = self._np
+        if rows.size == self._n:
+            return np.concatenate([block @ q for _, block in self._chunks()])
+        return self._gather(rows) @ q
+
+    def _nearest_list(self, mat: Any) -> Any:
+        np = self._np
+        if self._centroids is None:
+            return np.zeros(mat.shape[0], dtype=np.int32)
+        return np.argmax(mat @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _train(self, iterations: int = 10, sample: int = 50_000) -> None:
+        """Spherical k-means over live rows; reassigns every row."""
+        np = self._np
+        live = np.flatnonzero(self._alive[: self._n])
+        if live.size == 0:
+            return
+        nlist = max(1, int(np.sqrt(live.size)))
+        rng = np.random.default_rng(0)
+        pick = live if live.size <= sample else np.sort(rng.choice(live, sample, replace=False))
+        data = self._gather(pick)
+        centroids = data[rng.choice(data.shape[0], nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, data)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0.0
+            sums[~empty] /= norms[~empty]
+            sums[empty] = centroids[empty]
+            centroids = sums.astype(np.float32)
+        self._centroids = centroids
+        for start, block in self._chunks():
+            self._assign[start:start + block.shape[0]] = self._nearest_list(block)
+        self._trained_n = self._n
+        self._dirty += 1
+        logger.info("vector index %s trained: %d lists over %d rows",
+                    self.path.name, nlist, live.size)
+
+
+def _normalize_rows(np: Any, mat: Any) -> Any:
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return (mat / norms).astype(np.float32, copy=False)
@@ -1 +1 @@
-"""Search cache — RAM + disk backed, queryable."""
+"""Search cache — SQLite-backed, shared across processes, queryable."""
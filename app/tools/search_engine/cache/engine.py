@@ -1,14 +1,128 @@
-"""In-memory + disk-backed search cache."""
+"""SQLite-backed search cache, shared between processes.
+
+Every tool-server process opens the same ``search_cache.db`` under the
+cache dir, so a ``materials_search`` in a fresh process is answered from
+earlier sessions' results. Layout:
+
+- ``materials``: one row per material, keyed by ``<first source>:<id>``
+  (bare ids collide across providers) and stored once however many
+  cached queries return it.
+- ``queries``: one row per query hash with the result envelope (log,
+  warnings, timing), the ordered material keys it references, the
+  query's filters and whether the result is complete (every provider
+  answered in full and fewer than ``limit`` materials came back).
+
+A miss on the exact hash falls back to ``get_containing``: a fresh entry
+whose filters subsume the new query's (``MaterialSearchQuery.subsumes``)
+is filtered locally instead of fanning out again. Complete entries
+always answer; truncated ones only when enough of their materials pass.
+
+Entries expire after their TTL; past ``max_entries`` queries or
+``max_bytes`` of payload the least-recently-hit queries are evicted and
+materials no query references any more are dropped. The entry count and
+byte total live in a one-row ``totals`` table kept by triggers, so a put
+reads two numbers instead of scanning both tables, and eviction (with the
+expired-entry purge) only runs once a cap is crossed. Hits are counted in
+memory and written in one batch (``_HIT_FLUSH_EVERY`` entries or
+``_HIT_FLUSH_SECONDS``), and before anything that reads them. A small
+in-process LRU of decoded results sits in front of the DB;
+``load_from_disk`` warms it at startup with the most recently used fresh
+entries.
+
+``disk_dir=None`` keeps the same schema in an in-memory DB (tests,
+throwaway engines).
+"""
 from __future__ import annotations
 
 import json
+import logging
+import sqlite3
+import threading
 import time
+from collections import Counter, OrderedDict
 from dataclasses import dataclass, field
 from pathlib import Path
 
-from app.tools.search_engine.query import MaterialSearchQuery
+from app.tools.search_engine.postfilter import post_filter
+from app.tools.search_engine.query import COMPOSITION_FIELDS, RANGE_FIELDS, MaterialSearchQuery
 from app.tools.search_engine.result import Material, SearchResult
 
+logger = logging.getLogger(__name__)
+
+DB_NAME = "search_cache.db"
+
+# Cache hits are buffered and written in one transaction once this many
+# entries are pending, or _HIT_FLUSH_SECONDS after the last write
+_HIT_FLUSH_EVERY = 64
+_HIT_FLUSH_SECONDS = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS materials (
+    key        TEXT PRIMARY KEY,
+    id         TEXT NOT NULL,
+    data       TEXT NOT NULL,
+    bytes      INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_materials_id ON materials(id);
+CREATE TABLE IF NOT EXISTS queries (
+    key           TEXT PRIMARY KEY,
+    envelope      TEXT NOT NULL,
+    material_keys TEXT NOT NULL,
+    bytes         INTEGER NOT NULL,
+    created_at    REAL NOT NULL,
+    ttl           REAL NOT NULL,
+    last_hit      REAL NOT NULL,
+    hit_count     INTEGER NOT NULL DEFAULT 0,
+    filters       TEXT,
+    complete      INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_queries_last_hit ON queries(last_hit);
+"""
+
+# Columns added after the first release of the DB; older rows keep NULL
+# filters and are never used for containment lookups
+_ADDED_COLUMNS = {
+    "filters": "ALTER TABLE queries ADD COLUMN filters TEXT",
+    "complete": "ALTER TABLE queries ADD COLUMN complete INTEGER NOT NULL DEFAULT 0",
+}
+
+# Running entry count and payload bytes. Seeded from the tables when first
+# created (an older DB), then kept by triggers. REPLACE only fires the
+# delete triggers with recursive_triggers on, which _connect sets.
+_TOTALS = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS totals (
+    id      INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    bytes   INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals (id, entries, bytes) SELECT 0,
+    (SELECT COUNT(*) FROM queries),
+    (SELECT COALESCE(SUM(bytes), 0) FROM queries)
+        + (SELECT COALESCE(SUM(bytes), 0) FROM materials);
+CREATE TRIGGER IF NOT EXISTS queries_insert AFTER INSERT ON queries BEGIN
+    UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.bytes;
+END;
+CREATE TRIGGER IF NOT EXISTS queries_delete AFTER DELETE ON queries BEGIN
+    UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.bytes;
+END;
+CREATE TRIGGER IF NOT EXISTS materials_insert AFTER INSERT ON materials BEGIN
+    UPDATE totals SET bytes = bytes + NEW.bytes;
+END;
+CREATE TRIGGER IF NOT EXISTS materials_delete AFTER DELETE ON materials BEGIN
+    UPDATE totals SET bytes = bytes - OLD.bytes;
+END;
+COMMIT;
+"""
+
+# Drops materials no cached query references any more
+_DROP_ORPHANS = """
+DELETE FROM materials WHERE key NOT IN (
+    SELECT j.value FROM queries, json_each(queries.material_keys) AS j
+)
+"""
+
 
 @dataclass
 class CachedResult:
@@ -22,81 +136,414 @@ class CachedResult:
         return (time.time() - self.timestamp) < self.ttl
 
 
+def material_key(m: Material) -> str:
+    """Storage key: the first provider plus its id (ids alone collide)."""
+    return f"{m.sources[0] if m.sources else ''}:{m.id}"
+
+
+def is_complete(result: SearchResult) -> bool:
+    """True when ``result`` holds every material its query matches.
+
+    Needs at least one provider, all of them answered in full (no
+    timeouts, failures, skips or truncated pagination), and fewer than
+    ``limit`` materials so the fuser's cap was not what stopped it.
+    Fusion merges rows, so the fused count alone proves nothing: each
+    provider must also have returned fewer than ``limit`` raw rows.
+    """
+    if not result.query_log or len(result.materials) >= result.query.limit:
+        return False
+    return all(
+        log.status == "success" and not log.truncated and not log.error_type
+        and log.result_count < result.query.limit
+        for log in result.query_log
+    )
+
+
 class SearchCache:
-    """In-memory + disk-backed search cache."""
+    """Query results + material index in SQLite, fronted by a small LRU."""
 
-    def __init__(self, disk_dir: Path | None = None, default_ttl: float = 86400):
-        self._query_cache: dict[str, CachedResult] = {}
-        self._material_index: dict[str, Material] = {}
-        self._disk_dir = disk_dir
+    def __init__(
+        self,
+        disk_dir: Path | None = None,
+        default_ttl: float = 86400,
+        *,
+        max_entries: int = 5000,
+        max_bytes: int = 256 * 1024 * 1024,
+        memory_entries: int = 64,
+    ):
+        self._disk_dir = Path(disk_dir) if disk_dir else None
         self._default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory_entries = memory_entries
+        self._memory: OrderedDict[str, CachedResult] = OrderedDict()
+        self._lock = threading.RLock()
+        self._containment_hits = 0
+        # query key -> (hits not yet written, time of the last one)
+        self._pending_hits: Counter[str] = Counter()
+        self._pending_last_hit: dict[str, float] = {}
+        self._hits_flushed_at = time.monotonic()
+        self._conn = self._connect()
+
+    # ------------------------------------------------------------------
+    # Connection
+    # ------------------------------------------------------------------
+
+    @property
+    def db_path(self) -> Path | None:
+        return self._disk_dir / DB_NAME if self._disk_dir else None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._disk_dir is None:
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+        else:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA recursive_triggers=ON")
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(queries)")}
+        for name, ddl in _ADDED_COLUMNS.items():
+            if name not in columns:
+                conn.execute(ddl)
+        conn.commit()
+        conn.executescript(_TOTALS)
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._flush_hits()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.debug("cache hit flush failed on close: %s", e)
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Get / put
+    # ------------------------------------------------------------------
 
     def get(self, query: MaterialSearchQuery) -> SearchResult | None:
         key = query.query_hash()
-        cached = self._query_cache.get(key)
-        if cached and cached.is_fresh:
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and not cached.is_fresh:
+                del self._memory[key]
+                cached = None
+            if cached is None:
+                cached = self._load(key)
+                if cached is None:
+                    return None
+                self._remember(key, cached)
+            else:
+                self._memory.move_to_end(key)
             cached.hit_count += 1
-            result = cached.result.model_copy()
-            result.cached = True
-            return result
+            self._note_hit(key)
+        result = cached.result.model_copy()
+        result.cached = True
+        return result
+
+    def get_containing(self, query: MaterialSearchQuery) -> SearchResult | None:
+        """Answer ``query`` from a fresh cached result of a broader query.
+
+        Candidates are entries whose filters subsume ``query``'s, complete
+        ones first, then most recently hit. A complete candidate is always
+        an answer; a truncated one only if at least ``query.limit`` of its
+        materials pass ``query``'s filters. Returns ``None`` otherwise.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, filters, complete FROM queries "
+                "WHERE filters IS NOT NULL AND created_at + ttl > ? "
+                "ORDER BY complete DESC, last_hit DESC",
+                (time.time(),),
+            ).fetchall()
+        for key, filters, complete in rows:
+            try:
+                broader = MaterialSearchQuery.model_validate_json(filters)
+            except Exception:
+                continue
+            if not broader.subsumes(query):
+                continue
+            with self._lock:
+                cached = self._memory.get(key)
+                if cached is None or not cached.is_fresh:
+                    cached = self._load(key)
+                    if cached is None:
+                        continue
+                    self._remember(key, cached)
+            # subsumes() guarantees the remaining filters are equal
+            matched = post_filter(
+                cached.result.materials, query, COMPOSITION_FIELDS + RANGE_FIELDS,
+            )
+            if not complete and len(matched) < query.limit:
+                continue
+            with self._lock:
+                cached.hit_count += 1
+                self._containment_hits += 1
+                self._note_hit(key)
+            matched = matched[:query.limit]
+            return cached.result.model_copy(update={
+                "materials": matched,
+                "total_count": len(matched),
+                "query": query,
+                "cached": True,
+            })
         return None
 
     def put(self, query: MaterialSearchQuery, result: SearchResult) -> None:
         key = query.query_hash()
-        self._query_cache[key] = CachedResult(
-            result=result, ttl=self._default_ttl,
-        )
+        now = time.time()
+        rows = {}
         for m in result.materials:
-            self._material_index[m.id] = m
+            data = m.model_dump_json()
+            rows[material_key(m)] = (material_key(m), m.id, data, len(data), now)
+        keys = json.dumps([material_key(m) for m in result.materials])
+        envelope = result.model_copy(update={"materials": []}).model_dump_json()
+        filters = query.model_dump_json(exclude_none=True)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO materials (key, id, data, bytes, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows.values(),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries "
+                "(key, envelope, material_keys, bytes, created_at, ttl, last_hit, hit_count, "
+                "filters, complete) VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?)",
+                (key, envelope, keys, len(envelope) + len(keys), now, self._default_ttl, now,
+                 filters, int(is_complete(result))),
+            )
+            self._pending_hits.pop(key, None)
+            self._pending_last_hit.pop(key, None)
+            entries, size = self._totals()
+            if entries > self.max_entries or size > self.max_bytes:
+                self._enforce_limits()
+            self._conn.commit()
+            self._remember(key, CachedResult(result=result, timestamp=now, ttl=self._default_ttl))
+
+    def _load(self, key: str) -> CachedResult | None:
+        row = self._conn.execute(
+            "SELECT envelope, material_keys, created_at, ttl, hit_count FROM queries WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        envelope, keys, created_at, ttl, hits = row
+        if time.time() - created_at >= ttl:
+            self._conn.execute("DELETE FROM queries WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        try:
+            result = SearchResult.model_validate_json(envelope)
+            result.materials = self._materials(json.loads(keys))
+        except Exception as e:
+            logger.debug("dropping unreadable cache entry %s: %s", key, e)
+            self._conn.execute("DELETE FROM queries WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        return CachedResult(result=result, timestamp=created_at, ttl=ttl, hit_count=hits)
+
+    def _materials(self, keys: list[str]) -> list[Material]:
+        by_key: dict[str, Material] = {}
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for k, data in self._conn.execute(
+                f"SELECT key, data FROM materials WHERE key IN ({marks})", chunk,
+            ):
+                by_key[k] = Material.model_validate_json(data)
+        return [by_key[k] for k in keys if k in by_key]
+
+    def _remember(self, key: str, cached: CachedResult) -> None:
+        self._memory[key] = cached
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Hit tracking
+    # ------------------------------------------------------------------
+
+    def _note_hit(self, key: str) -> None:
+        """Count a hit on ``key``; written with the next batch. Caller holds the lock."""
+        self._pending_hits[key] += 1
+        self._pending_last_hit[key] = time.time()
+        if (
+            len(self._pending_hits) >= _HIT_FLUSH_EVERY
+            or time.monotonic() - self._hits_flushed_at >= _HIT_FLUSH_SECONDS
+        ):
+            try:
+                self._flush_hits()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.debug("cache hit flush failed (%s); will retry", e)
+
+    def _flush_hits(self) -> None:
+        """Write buffered hits in the current transaction. Caller holds the lock."""
+        pending, self._pending_hits = self._pending_hits, Counter()
+        last_hit, self._pending_last_hit = self._pending_last_hit, {}
+        self._hits_flushed_at = time.monotonic()
+        if not pending:
+            return
+        try:
+            self._conn.executemany(
+                "UPDATE queries SET hit_count = hit_count + ?, last_hit = MAX(last_hit, ?) "
+                "WHERE key = ?",
+                [(n, last_hit[k], k) for k, n in pending.items()],
+            )
+        except sqlite3.Error:
+            self._pending_hits.update(pending)
+            self._pending_last_hit.update(last_hit)
+            raise
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _enforce_limits(self) -> int:
+        """Purge expired entries, then LRU-evict down to the caps."""
+        self._flush_hits()  # eviction order is last_hit
+        now = time.time()
+        evicted = self._conn.execute(
+            "DELETE FROM queries WHERE created_at + ttl <= ?", (now,),
+        ).rowcount
+        n, _ = self._totals()
+        if n > self.max_entries:
+            evicted += self._conn.execute(
+                "DELETE FROM queries WHERE key IN "
+                "(SELECT key FROM queries ORDER BY last_hit LIMIT ?)",
+                (n - self.max_entries,),
+            ).rowcount
+        if evicted:
+            self._conn.execute(_DROP_ORPHANS)
+        while True:
+            # Evict a tenth of the remaining entries per round
+            n, size = self._totals()
+            if size <= self.max_bytes or not n:
+                break
+            evicted += self._conn.execute(
+                "DELETE FROM queries WHERE key IN "
+                "(SELECT key FROM queries ORDER BY last_hit LIMIT ?)",
+                (max(1, n // 10),),
+            ).rowcount
+            self._conn.execute(_DROP_ORPHANS)
+        if evicted:
+            live = {k for k, in self._conn.execute("SELECT key FROM queries")}
+            for k in [k for k in self._memory if k not in live]:
+                del self._memory[k]
+        return evicted
+
+    def _totals(self) -> tuple[int, int]:
+        """``(entries, payload bytes)`` from the trigger-kept ``totals`` row."""
+        return self._conn.execute("SELECT entries, bytes FROM totals").fetchone()
+
+    # ------------------------------------------------------------------
+    # Material index
+    # ------------------------------------------------------------------
 
     def get_material(self, material_id: str) -> Material | None:
-        return self._material_index.get(material_id)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM materials WHERE id = ? ORDER BY updated_at DESC LIMIT 1",
+                (material_id,),
+            ).fetchone()
+        return Material.model_validate_json(row[0]) if row else None
 
     def get_all_materials(self) -> list[Material]:
-        return list(self._material_index.values())
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM materials").fetchall()
+        return [Material.model_validate_json(data) for data, in rows]
+
+    # ------------------------------------------------------------------
+    # Housekeeping
+    # ------------------------------------------------------------------
 
     def stats(self) -> dict:
-        return {
-            "query_count": len(self._query_cache),
-            "material_count": len(self._material_index),
-            "fresh_queries": sum(1 for c in self._query_cache.values() if c.is_fresh),
-            "total_hits": sum(c.hit_count for c in self._query_cache.values()),
-        }
+        with self._lock:
+            self._flush_hits()
+            self._conn.commit()
+            now = time.time()
+            queries, fresh, hits = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(created_at + ttl > ?), 0), "
+                "COALESCE(SUM(hit_count), 0) FROM queries",
+                (now,),
+            ).fetchone()
+            materials, = self._conn.execute("SELECT COUNT(*) FROM materials").fetchone()
+            return {
+                "query_count": queries,
+                "material_count": materials,
+                "fresh_queries": fresh,
+                "total_hits": hits,
+                "containment_hits": self._containment_hits,
+                "bytes": self._totals()[1],
+                "memory_entries": len(self._memory),
+                "path": str(self.db_path) if self.db_path else None,
+            }
 
     def clear(self) -> None:
-        self._query_cache.clear()
-        self._material_index.clear()
+        with self._lock:
+            self._memory.clear()
+            self._pending_hits.clear()
+            self._pending_last_hit.clear()
+            self._conn.execute("DELETE FROM queries")
+            self._conn.execute("DELETE FROM materials")
+            self._conn.commit()
 
     def flush_to_disk(self) -> None:
-        if not self._disk_dir:
-            return
-        self._disk_dir.mkdir(parents=True, exist_ok=True)
-        for key, cached in self._query_cache.items():
-            path = self._disk_dir / f"{key}.json"
-            data = {
-                "query": cached.result.query.model_dump(mode="json"),
-                "result": cached.result.model_dump(mode="json"),
-                "timestamp": cached.timestamp,
-                "ttl": cached.ttl,
-            }
-            path.write_text(json.dumps(data))
+        """Apply TTL and size limits now and write buffered hits.
 
-    def load_from_disk(self) -> None:
-        if not self._disk_dir or not self._disk_dir.exists():
-            return
+        Puts only evict once a cap is crossed; this also purges expired
+        entries and the materials of entries dropped on read.
+        """
+        with self._lock:
+            if not self._enforce_limits():
+                self._conn.execute(_DROP_ORPHANS)
+            self._conn.commit()
+
+    def load_from_disk(self) -> int:
+        """Warm the in-process LRU from the DB; returns entries loaded.
+
+        Also imports (and removes) ``*.json`` entries left by the old
+        one-file-per-query cache in the same directory.
+        """
+        if self._disk_dir is None:
+            return 0
+        self._import_legacy_json()
+        with self._lock:
+            keys = [
+                k for k, in self._conn.execute(
+                    "SELECT key FROM queries WHERE created_at + ttl > ? "
+                    "ORDER BY last_hit DESC LIMIT ?",
+                    (time.time(), self._memory_entries),
+                )
+            ]
+            loaded = 0
+            for key in reversed(keys):
+                cached = self._load(key)
+                if cached is not None:
+                    self._remember(key, cached)
+                    loaded += 1
+        return loaded
+
+    def _import_legacy_json(self) -> None:
         for path in self._disk_dir.glob("*.json"):
             try:
                 data = json.loads(path.read_text())
                 result = SearchResult.model_validate(data["result"])
-                cached = CachedResult(
-                    result=result,
-                    timestamp=data.get("timestamp", time.time()),
-                    ttl=data.get("ttl", self._default_ttl),
-                )
-                if cached.is_fresh:
-                    key = path.stem
-                    self._query_cache[key] = cached
-                    for m in result.materials:
-                        self._material_index[m.id] = m
             except Exception:
-                continue  # skip corrupt cache entries
+                continue  # not a cache entry (e.g. provider_health.json)
+            timestamp = data.get("timestamp", time.time())
+            ttl = data.get("ttl", self._default_ttl)
+            if time.time() - timestamp < ttl:
+                self.put(result.query, result)
+                with self._lock:
+                    self._conn.execute(
+                        "UPDATE queries SET created_at = ?, ttl = ? WHERE key = ?",
+                        (timestamp, ttl, result.query.query_hash()),
+                    )
+                    self._conn.commit()
+                    self._memory.pop(result.query.query_hash(), None)
+            path.unlink(missing_ok=True)
@@ -3,16 +3,21 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
 import time
+from dataclasses import dataclass
 from pathlib import Path
 
 from app.tools.search_engine.cache.engine import SearchCache
-from app.tools.search_engine.fusion import fuse_materials
+from app.tools.search_engine.fusion import IncrementalFuser
+from app.tools.search_engine.http import HTTPClientPool, get_http_pool, run_sync
+from app.tools.search_engine.postfilter import post_filter
 from app.tools.search_engine.providers.base import Provider
 from app.tools.search_engine.providers.registry import ProviderRegistry
-from app.tools.search_engine.query import MaterialSearchQuery
+from app.tools.search_engine.query import COMPOSITION_FIELDS, MaterialSearchQuery
 from app.tools.search_engine.resilience.circuit_breaker import HealthManager
+from app.tools.search_engine.resilience.scheduler import LatencyScheduler
 from app.tools.search_engine.result import Material, ProviderQueryLog, SearchResult
 from app.tools.search_engine.translator import QueryTranslator
 
@@ -32,12 +37,40 @@ def _sanitize_error(msg: str) -> str:
 
 DEFAULT_HEALTH_PATH = Path.home() / ".prism" / "cache" / "provider_health.json"
 
+# Concurrent provider requests per search (and per search_many batch)
+MAX_CONCURRENCY = 8
+
+
+@dataclass
+class _Prefetched:
+    """One provider's answer to a query, taken from a merged batch request."""
+    materials: list[Material]
+    query_sent: str
+
+
+def _sibling_key(query: MaterialSearchQuery) -> str:
+    """Queries with equal keys differ only in their element lists (and limit)."""
+    return json.dumps(
+        query.model_dump(
+            exclude_none=True, mode="json", exclude={*COMPOSITION_FIELDS, "limit"},
+        ),
+        sort_keys=True,
+    )
+
 
 class SearchEngine:
     """Federated materials database search engine.
 
     Ties together provider registry, query translation, caching,
     circuit breakers, and result fusion into a single ``search()`` call.
+
+    HTTP providers without a pool of their own are bound to ``http``
+    (default: the process-wide ``HTTPClientPool``), so the whole fan-out
+    shares keep-alive connections; ``close()`` releases them.
+
+    Provider order, per-page timeouts and hedged first-page requests come
+    from ``scheduler`` (default: a ``LatencyScheduler`` over the health
+    statistics); ``global_timeout`` is the upper bound it works within.
     """
 
     def __init__(
@@ -46,29 +79,169 @@ class SearchEngine:
         cache: SearchCache | None = None,
         health_manager: HealthManager | None = None,
         global_timeout: float = 5.0,
+        http: HTTPClientPool | None = None,
+        scheduler: LatencyScheduler | None = None,
     ):
         self._registry = registry
         self._cache = cache or SearchCache(disk_dir=DEFAULT_CACHE_DIR)
+        # Earlier sessions' results (other processes share the DB)
+        self._cache.load_from_disk()
         self._health = health_manager or HealthManager(persist_path=DEFAULT_HEALTH_PATH)
         self._health.load()
+        self._scheduler = scheduler or LatencyScheduler(self._health)
         self._global_timeout = global_timeout
+        self._http = http or get_http_pool()
+        for p in registry.get_all():
+            if getattr(p, "_http", False) is None:
+                p._http = self._http
+
+    @property
+    def http(self) -> HTTPClientPool:
+        return self._http
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     async def search(self, query: MaterialSearchQuery) -> SearchResult:
-        """Fan out to providers, collect, fuse, rank, return."""
-        start = time.time()
-
-        # 1. Cache check
-        cached = self._cache.get(query)
+        """Fan out to providers, fuse pages as they stream in, return."""
+        # 1. Cache check: exact hit, else a broader cached query filtered locally
+        cached = self._cached(query)
         if cached is not None:
             return cached
+        result = await self._search(query, asyncio.Semaphore(MAX_CONCURRENCY), {})
+        self._health.save()
+        return result
+
+    async def search_many(
+        self,
+        queries: list[MaterialSearchQuery],
+        concurrency: int = MAX_CONCURRENCY,
+    ) -> list[SearchResult]:
+        """Run several searches as one batch; results follow ``queries``' order.
+
+        Identical queries run once. Every provider request of the batch
+        shares one ``concurrency`` budget. Queries that differ only in
+        their element lists are first merged into a single OR request per
+        provider that supports it (``Provider.search_union``); the rows
+        are split back per query locally. A query's share of a merged
+        answer is used only when it is provably complete. Otherwise that
+        provider is asked separately.
+        """
+        start = time.time()
+        unique: dict[str, MaterialSearchQuery] = {}
+        for q in queries:
+            unique.setdefault(q.query_hash(), q)
+        results: dict[str, SearchResult] = {}
+        misses: list[MaterialSearchQuery] = []
+        for key, q in unique.items():
+            cached = self._cached(q)
+            if cached is not None:
+                results[key] = cached
+            else:
+                misses.append(q)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        prefetched = await self._prefetch_merged(misses, semaphore)
+        searched = await asyncio.gather(*(
+            self._search(q, semaphore, prefetched.get(q.query_hash(), {})) for q in misses
+        ))
+        results.update(zip((q.query_hash() for q in misses), searched))
+        if misses:
+            self._health.save()
+        logger.debug(
+            "search_many: %d queries, %d unique, %d searched in %.0f ms",
+            len(queries), len(unique), len(misses), (time.time() - start) * 1000,
+        )
+        return [results[q.query_hash()] for q in queries]
+
+    def search_many_sync(
+        self, queries: list[MaterialSearchQuery], timeout: float | None = None,
+    ) -> list[SearchResult]:
+        """Blocking ``search_many`` on the long-lived search I/O loop."""
+        return run_sync(self.search_many(queries), timeout=timeout)
+
+    def _cached(self, query: MaterialSearchQuery) -> SearchResult | None:
+        return self._cache.get(query) or self._cache.get_containing(query)
+
+    async def _prefetch_merged(
+        self,
+        queries: list[MaterialSearchQuery],
+        semaphore: asyncio.Semaphore,
+    ) -> dict[str, dict[str, _Prefetched]]:
+        """Answer sibling queries with one merged request per provider.
+
+        Returns ``{query_hash: {provider_id: _Prefetched}}`` for every
+        (query, provider) pair the merged answers fully cover.
+        """
+        groups: dict[str, list[MaterialSearchQuery]] = {}
+        for q in queries:
+            groups.setdefault(_sibling_key(q), []).append(q)
+        jobs = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            for p in self._registry.get_capable(members[0]):
+                if self._health.get(p.id).should_query() and all(
+                    p.capabilities.can_handle(q) for q in members
+                ):
+                    jobs.append(self._merged_request(p, members, semaphore))
+        out: dict[str, dict[str, _Prefetched]] = {}
+        for answers in await asyncio.gather(*jobs):
+            for key, pid, pre in answers:
+                out.setdefault(key, {})[pid] = pre
+        return out
+
+    async def _merged_request(
+        self,
+        provider: Provider,
+        members: list[MaterialSearchQuery],
+        semaphore: asyncio.Semaphore,
+    ) -> list[tuple[str, str, _Prefetched]]:
+        pushed = [provider.capabilities.pushdown(q)[0] for q in members]
+        start = time.time()
+        try:
+            async with semaphore:
+                merged = await provider.search_union(pushed)
+        except Exception as e:
+            # e.g. a filter grammar without OR; the per-query requests
+            # still run, so this is not a provider failure
+            logger.debug("merged request to %s failed: %s", provider.id, e)
+            return []
+        if merged is None:
+            return []
+        materials, query_sent = merged
+        self._health.get(provider.id).record_success((time.time() - start) * 1000)
+        # Short of the summed limits proves nothing if the provider stopped
+        # early (page cap, unfollowed next link, dropped entries)
+        complete = not getattr(materials, "more", False) and (
+            len(materials) < sum(q.limit for q in pushed)
+        )
+        answers = []
+        for q, pq in zip(members, pushed):
+            own = post_filter(materials, pq, COMPOSITION_FIELDS)
+            if complete or len(own) >= q.limit:
+                answers.append((q.query_hash(), provider.id, _Prefetched(own, query_sent)))
+        return answers
+
+    async def _search(
+        self,
+        query: MaterialSearchQuery,
+        semaphore: asyncio.Semaphore,
+        prefetched: dict[str, _Prefetched],
+    ) -> SearchResult:
+        """Steps 2-8 of ``search`` under a caller-owned concurrency budget.
+
+        Providers with an entry in ``prefetched`` replay it instead of
+        being queried.
+        """
+        start = time.time()
 
         # 2. Select capable providers with healthy circuits
         capable = self._registry.get_capable(query)
-        providers = [p for p in capable if self._health.get(p.id).should_query()]
+        providers = self._scheduler.order(
+            [p for p in capable if self._health.get(p.id).should_query()]
+        )
 
         if not providers:
             return SearchResult(
@@ -83,53 +256,53 @@ class SearchEngine:
         # 3. Fan out async with concurrency limit + early termination
         # Use a semaphore to avoid hammering 20+ providers simultaneously.
         # 8 concurrent connections is a good balance between speed and
-        # being a good citizen to the OPTIMADE federation.
-        semaphore = asyncio.Semaphore(8)
-        # Early-return: once we have 2x the requested limit from fast
-        # providers, cancel remaining slow ones. We over-fetch 2x so
-        # fusion (dedup across providers) still yields enough results.
-        early_target = query.limit * 2
-        early_event = asyncio.Event()
-        collected = {"count": 0}
+        # being a good citizen to the OPTIMADE federation. Tasks are
+        # created in scheduler order and the semaphore is FIFO, so the
+        # best yield-per-ms providers get the slots first.
+        # Pages are fused as they arrive; once query.limit unique
+        # materials are held, providers still queued are skipped and the
+        # ones mid-pagination are cancelled.
+        fuser = IncrementalFuser(limit=query.limit)
+        done = asyncio.Event()
 
         async def _guarded_query(p):
-            if early_event.is_set():
-                return [], ProviderQueryLog(
-                    provider_id=p.id,
-                    provider_name=p.name,
-                    endpoint_url=self._get_endpoint_url(p),
-                    query_sent="",
-                    started_at=time.time(),
-                    completed_at=time.time(),
-                    latency_ms=0,
-                    status="skipped",
-                    error_message="Early termination — enough results from fast providers",
-                )
+            if done.is_set():
+                return self._skipped_log(p)
             async with semaphore:
-                materials, log = await self._query_provider(p, query)
-                collected["count"] += len(materials)
-                if collected["count"] >= early_target and not early_event.is_set():
-                    early_event.set()
-                return materials, log
+                if done.is_set():
+                    return self._skipped_log(p)
+                return await self._stream_provider(p, query, fuser, done, prefetched.get(p.id))
 
         tasks = {p.id: asyncio.create_task(_guarded_query(p)) for p in providers}
-        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        async def _cutoff():
+            await done.wait()
+            for t in tasks.values():
+                t.cancel()
+
+        cutoff = asyncio.create_task(_cutoff())
+        try:
+            results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        finally:
+            cutoff.cancel()
         provider_results = dict(zip(tasks.keys(), results))
 
-        # 4. Collect results + build audit trail
-        all_materials: list[Material] = []
+        # 4. Build audit trail (materials are already in the fuser)
         query_log: list[ProviderQueryLog] = []
         warnings: list[str] = []
 
         for pid, result in provider_results.items():
             provider = next(p for p in providers if p.id == pid)
-            if isinstance(result, BaseException):
+            if isinstance(result, asyncio.CancelledError):
+                # Cancelled by the cutoff before it started running
+                query_log.append(self._skipped_log(provider))
+            elif isinstance(result, BaseException):
                 self._health.get(pid).record_failure()
                 log = ProviderQueryLog(
                     provider_id=pid,
                     provider_name=provider.name,
                     endpoint_url=self._get_endpoint_url(provider),
-                    query_sent=QueryTranslator.to_optimade(query),
+                    query_sent=self._query_sent(provider, query),
                     started_at=start,
                     completed_at=time.time(),
                     latency_ms=(time.time() - start) * 1000,
@@ -140,15 +313,15 @@ class SearchEngine:
                 query_log.append(log)
                 warnings.append(f"Provider '{pid}' failed: {type(result).__name__}")
             else:
-                materials, log_entry = result
-                all_materials.extend(materials)
-                query_log.append(log_entry)
+                query_log.append(result)
+                if result.status == "success" and result.error_type:
+                    warnings.append(
+                        f"Provider '{pid}' stopped after {result.pages_fetched} "
+                        f"page(s): {result.error_type}"
+                    )
 
-        # 5. Fuse duplicates across providers
-        fused = fuse_materials(all_materials)
-
-        # 6. Apply limit
-        fused = fused[: query.limit]
+        # 5-6. Fused, capped at query.limit by the fuser
+        fused = fuser.materials()
 
         # 7. Build result
         search_result = SearchResult(
@@ -160,12 +333,23 @@ class SearchEngine:
             search_time_ms=(time.time() - start) * 1000,
         )
 
-        # 8. Cache and persist health
+        # 8. Cache (the caller persists health)
         self._cache.put(query, search_result)
-        self._health.save()
 
         return search_result
 
+    def search_sync(self, query: MaterialSearchQuery, timeout: float | None = None) -> SearchResult:
+        """Blocking ``search`` for sync callers.
+
+        Runs on the long-lived search I/O loop rather than a fresh loop
+        per call, so pooled connections survive from one call to the next.
+        """
+        return run_sync(self.search(query), timeout=timeout)
+
+    def close(self) -> None:
+        """Close the pooled HTTP clients; they reopen on the next search."""
+        self._http.close()
+
     def get_provider_status(self) -> dict[str, dict]:
         """Health dashboard for all known providers."""
         return {pid: h.to_dict() for pid, h in self._health._health.items()}
@@ -174,51 +358,177 @@ class SearchEngine:
     # Internal helpers
     # ------------------------------------------------------------------
 
-    async def _query_provider(
-        self,
-        provider: Provider,
-        query: MaterialSearchQuery,
-    ) -> tuple[list[Material], ProviderQueryLog]:
-        """Query a single provider with timeout and audit logging."""
-        start = time.time()
-        endpoint_url = self._get_endpoint_url(provider)
-        query_sent = QueryTranslator.to_optimade(query)
+    def _provider_timeout(self, provider: Provider) -> float:
+        """Per-page timeout: the lower of the global and the provider's own,
+        tightened by the scheduler once the provider has latency history.
 
-        # Determine per-provider timeout — use the minimum of the
-        # global timeout and the per-provider configured timeout.
-        # This ensures the global timeout always caps slow providers.
+        This ensures the global timeout always caps slow providers.
+        """
         timeout = self._global_timeout
         if hasattr(provider, "_endpoint") and provider._endpoint:
             ep = provider._endpoint
             if hasattr(ep, "behavior") and ep.behavior:
                 per_provider = ep.behavior.timeout_ms / 1000
                 timeout = min(timeout, per_provider)
+        return self._scheduler.timeout(provider.id, timeout)
 
+    async def _hedged_first_page(
+        self,
+        provider: Provider,
+        query: MaterialSearchQuery,
+        pages,
+        timeout: float,
+        hedge_after: float,
+    ):
+        """Race ``pages`` against a duplicate request started after ``hedge_after``.
+
+        Returns ``(generator to keep paginating, first page, hedged)``; the
+        losing generator is closed. A failure of one request is ignored
+        while the other is still running. Raises ``StopAsyncIteration`` for
+        an empty result and ``TimeoutError`` if nothing answers in ``timeout``.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        primary = asyncio.ensure_future(pages.__anext__())
+        backup = hedge = winner = None
+        tasks = {primary}
         try:
-            materials = await asyncio.wait_for(
-                provider.search(query),
-                timeout=timeout,
-            )
-            latency = (time.time() - start) * 1000
-            self._health.get(provider.id).record_success(latency)
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                hedge = provider.search_pages(query)
+                backup = asyncio.ensure_future(hedge.__anext__())
+                tasks.add(backup)
+            pending, error = set(tasks), None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, deadline - loop.time()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    break
+                for t in done:
+                    exc = t.exception()
+                    if exc is None or isinstance(exc, StopAsyncIteration):
+                        winner = t
+                        break
+                    error = error or exc
+            if winner is None:
+                raise error or asyncio.TimeoutError()
+            if winner is backup:
+                return hedge, backup.result(), True
+            return pages, primary.result(), backup is not None
+        finally:
+            losers = [t for t in tasks if t is not winner]
+            for t in losers:
+                t.cancel()
+            await asyncio.gather(*losers, return_exceptions=True)
+            if hedge is not None:
+                await (pages if winner is backup else hedge).aclose()
 
-            log = ProviderQueryLog(
-                provider_id=provider.id,
-                provider_name=provider.name,
-                endpoint_url=endpoint_url,
-                query_sent=query_sent,
-                started_at=start,
-                completed_at=time.time(),
-                latency_ms=latency,
-                status="success",
-                http_status_code=200,
-                result_count=len(materials),
-            )
-            return materials, log
+    @staticmethod
+    def _query_sent(provider: Provider, query: MaterialSearchQuery) -> str:
+        """The OPTIMADE filter for the part of ``query`` pushed down to ``provider``."""
+        pushed, _ = provider.capabilities.pushdown(query)
+        return QueryTranslator.to_optimade(pushed, provider.capabilities.property_fields)
+
+    def _skipped_log(self, provider: Provider) -> ProviderQueryLog:
+        now = time.time()
+        return ProviderQueryLog(
+            provider_id=provider.id,
+            provider_name=provider.name,
+            endpoint_url=self._get_endpoint_url(provider),
+            query_sent="",
+            started_at=now,
+            completed_at=now,
+            latency_ms=0,
+            status="skipped",
+            pages_fetched=0,
+            error_message="Early termination — enough results from fast providers",
+        )
 
-        except asyncio.TimeoutError:
+    async def _stream_provider(
+        self,
+        provider: Provider,
+        query: MaterialSearchQuery,
+        fuser: IncrementalFuser,
+        done: asyncio.Event,
+        prefetched: _Prefetched | None = None,
+    ) -> ProviderQueryLog:
+        """Fold one provider's pages into ``fuser`` with per-page timeouts.
+
+        The provider is sent only the filters it evaluates server-side;
+        the rest are applied to each page before it reaches the fuser, so
+        rows that violate the query are never fused. A failure on the
+        first page propagates (the caller records it as an error); a
+        failure or timeout on a later page keeps what was already fetched
+        and marks the log ``truncated``, as does a last page the provider
+        flags ``more`` (see ``Page``). Sets ``done`` once the fuser
+        holds ``query.limit`` materials. With ``prefetched`` the rows of
+        a merged batch request are replayed as one page instead.
+        """
+        start = time.time()
+        endpoint_url = self._get_endpoint_url(provider)
+        pushed, residual = provider.capabilities.pushdown(query)
+        query_sent = self._query_sent(provider, query)
+        timeout = self._provider_timeout(provider)
+
+        hedge_after = self._scheduler.hedge_after(provider.id, timeout)
+
+        if prefetched is not None:
+            query_sent, hedge_after = prefetched.query_sent, None
+            pages = _replay(prefetched.materials)
+        else:
+            pages = provider.search_pages(pushed)
+        n_pages = 0
+        count = 0
+        rejected = 0
+        first_latency = 0.0
+        truncated = False
+        hedged = False
+        error: BaseException | None = None
+        try:
+            while True:
+                try:
+                    if not n_pages and hedge_after is not None:
+                        pages, page, hedged = await self._hedged_first_page(
+                            provider, pushed, pages, timeout, hedge_after,
+                        )
+                    else:
+                        page = await asyncio.wait_for(pages.__anext__(), timeout=timeout)
+                except StopAsyncIteration:
+                    break
+                except asyncio.CancelledError:
+                    truncated = True
+                    break
+                except Exception as e:
+                    if not n_pages and not isinstance(e, asyncio.TimeoutError):
+                        raise  # re-raise for gather(return_exceptions=True) to capture
+                    error, truncated = e, True
+                    break
+                if not n_pages:
+                    first_latency = (time.time() - start) * 1000
+                    if prefetched is None:
+                        self._health.get(provider.id).record_success(first_latency)
+                n_pages += 1
+                count += len(page)
+                # The provider stopped with rows left on the server
+                truncated = truncated or getattr(page, "more", False)
+                if residual:
+                    kept = post_filter(page, query, residual)
+                    rejected += len(page) - len(kept)
+                    page = kept
+                fuser.add(page)
+                if fuser.full:
+                    done.set()
+                if done.is_set():
+                    truncated = True
+                    break
+        finally:
+            await pages.aclose()
+
+        if not n_pages and isinstance(error, asyncio.TimeoutError):
             self._health.get(provider.id).record_failure()
-            log = ProviderQueryLog(
+            return ProviderQueryLog(
                 provider_id=provider.id,
                 provider_name=provider.name,
                 endpoint_url=endpoint_url,
@@ -227,13 +537,34 @@ class SearchEngine:
                 completed_at=time.time(),
                 latency_ms=(time.time() - start) * 1000,
                 status="timeout",
+                pages_fetched=0,
                 error_type="TimeoutError",
                 error_message=f"Timed out after {timeout}s",
             )
-            return [], log
-
-        except Exception:
-            raise  # re-raise for gather(return_exceptions=True) to capture
+        if not n_pages and truncated:
+            # Cancelled by the cutoff before its first page arrived
+            return self._skipped_log(provider)
+
+        if n_pages and prefetched is None:
+            self._health.get(provider.id).record_yield(count - rejected)
+        return ProviderQueryLog(
+            provider_id=provider.id,
+            provider_name=provider.name,
+            endpoint_url=endpoint_url,
+            query_sent=query_sent,
+            started_at=start,
+            completed_at=time.time(),
+            latency_ms=first_latency,
+            status="success",
+            http_status_code=200,
+            result_count=count,
+            rejected_count=rejected,
+            hedged=hedged,
+            pages_fetched=n_pages,
+            truncated=truncated,
+            error_type=type(error).__name__ if error else None,
+            error_message=_sanitize_error(str(error) or type(error).__name__) if error else None,
+        )
 
     @staticmethod
     def _get_endpoint_url(provider: Provider) -> str:
@@ -243,3 +574,8 @@ class SearchEngine:
             if url:
                 return url
         return provider.id
+
+
+async def _replay(materials: list[Material]):
+    """A prefetched answer as a one-page ``search_pages`` stream."""
+    yield materials
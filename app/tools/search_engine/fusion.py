@@ -1,8 +1,6 @@
 """Cross-provider material fusion -- merge, dedup, rank."""
 from __future__ import annotations
 
-from collections import defaultdict
-
 from app.tools.search_engine.result import Material, PropertyValue
 
 
@@ -29,50 +27,83 @@ def _merge_property(
     return existing
 
 
+_MERGED_PROPERTIES = (
+    "space_group", "band_gap", "formation_energy", "energy_above_hull",
+    "bulk_modulus", "debye_temperature", "lattice_vectors", "crystal_system",
+)
+
+
+class IncrementalFuser:
+    """Fuse materials page by page as providers stream them in.
+
+    Keeps one merged record per identity key, in first-seen order. Once
+    ``limit`` unique materials are held, new identities are dropped, but
+    records already held still pick up sources and properties from later
+    pages. Memory is bounded by ``limit``, not by the pages fetched.
+    """
+
+    def __init__(self, limit: int | None = None):
+        self.limit = limit
+        self._groups: dict[str, Material] = {}
+        # Keys whose record is a private copy (safe to mutate)
+        self._owned: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    @property
+    def full(self) -> bool:
+        return self.limit is not None and len(self._groups) >= self.limit
+
+    def add(self, materials: list[Material]) -> int:
+        """Fold ``materials`` in; returns how many new identities they added."""
+        added = 0
+        for m in materials:
+            key = _fusion_key(m)
+            base = self._groups.get(key)
+            if base is None:
+                if self.full:
+                    continue
+                self._groups[key] = m
+                added += 1
+                continue
+            if key not in self._owned:
+                # First is the base: copy before merging into it
+                base = self._groups[key] = base.model_copy(deep=True)
+                self._owned.add(key)
+            _merge_into(base, m)
+        return added
+
+    def materials(self) -> list[Material]:
+        return list(self._groups.values())
+
+
+def _merge_into(base: Material, other: Material) -> None:
+    merged_sources = list(base.sources)
+    merged_extra = dict(base.extra_properties)
+    for src in other.sources:
+        if src not in merged_sources:
+            merged_sources.append(src)
+
+    # Merge standard properties
+    for prop_name in _MERGED_PROPERTIES:
+        merged_val = _merge_property(
+            getattr(base, prop_name), getattr(other, prop_name), prop_name, merged_extra,
+            other.sources[0] if other.sources else "unknown",
+        )
+        setattr(base, prop_name, merged_val)
+
+    # Merge extra_properties
+    for k, v in other.extra_properties.items():
+        if k not in merged_extra:
+            merged_extra[k] = v
+
+    base.sources = merged_sources
+    base.extra_properties = merged_extra
+
+
 def fuse_materials(materials: list[Material]) -> list[Material]:
     """Group by identity, merge properties across providers."""
-    if not materials:
-        return []
-
-    groups: dict[str, list[Material]] = defaultdict(list)
-    for m in materials:
-        groups[_fusion_key(m)].append(m)
-
-    fused = []
-    for key, group in groups.items():
-        if len(group) == 1:
-            fused.append(group[0])
-            continue
-
-        # Merge: first material is the base
-        base = group[0].model_copy(deep=True)
-        merged_sources = list(base.sources)
-        merged_extra = dict(base.extra_properties)
-
-        for other in group[1:]:
-            for src in other.sources:
-                if src not in merged_sources:
-                    merged_sources.append(src)
-
-            # Merge standard properties
-            for prop_name in ("space_group", "band_gap", "formation_energy",
-                              "energy_above_hull", "bulk_modulus", "debye_temperature",
-                              "lattice_vectors", "crystal_system"):
-                existing_val = getattr(base, prop_name)
-                incoming_val = getattr(other, prop_name)
-                merged_val = _merge_property(
-                    existing_val, incoming_val, prop_name, merged_extra,
-                    other.sources[0] if other.sources else "unknown",
-                )
-                setattr(base, prop_name, merged_val)
-
-            # Merge extra_properties
-            for k, v in other.extra_properties.items():
-                if k not in merged_extra:
-                    merged_extra[k] = v
-
-        base.sources = merged_sources
-        base.extra_properties = merged_extra
-        fused.append(base)
-
-    return fused
+    fuser = IncrementalFuser()
+    fuser.add(materials)
+    return fuser.materials()
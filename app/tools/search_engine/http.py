@@ -0,0 +1,212 @@
+"""Pooled async HTTP client shared by the HTTP-backed providers.
+
+Every `OptimadeProvider.search` used to open its own `httpx.AsyncClient`,
+so each of the 20+ federation endpoints paid DNS + TCP + TLS setup on
+every `materials_search`. `HTTPClientPool` keeps one long-lived client
+per event loop (httpx connections are bound to the loop that opened
+them), with keep-alive connections reused across searches:
+
+- HTTP/2 when the `h2` package is installed (`httpx[http2]`): one
+  multiplexed connection per host; HTTP/1.1 keep-alive otherwise.
+- `per_host` caps concurrent requests to one host, so a burst of pages
+  against one endpoint can't starve the rest of the fan-out.
+- `close()` / `aclose()` shut the clients down; the process-wide pool
+  from `get_http_pool()` is closed at exit.
+
+Sync callers (the MCP tools) used to spin a fresh event loop per call,
+which would strand the pooled connections on a dead loop. `run_sync`
+instead runs coroutines on one long-lived background loop, so the
+connections opened by one `materials_search` serve the next.
+`SearchEngine` holds the pool it is given (default: the process-wide
+one) and exposes this as `search_sync` / `close`.
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import importlib.util
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Coroutine, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_TIMEOUT_S = 10.0
+
+T = TypeVar("T")
+
+
+def http2_available() -> bool:
+    """True when httpx can negotiate HTTP/2 (the optional `h2` package)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class HTTPClientPool:
+    """One keep-alive `httpx.AsyncClient` per event loop, plus per-host limits."""
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = 64,
+        max_keepalive: int = 32,
+        keepalive_expiry: float = 60.0,
+        per_host: int = 6,
+        http2: Optional[bool] = None,
+        headers: Optional[dict[str, str]] = None,
+        transport: Any = None,
+    ) -> None:
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.per_host = per_host
+        self.http2 = http2_available() if http2 is None else http2
+        self.headers = {"Accept": "application/json", **(headers or {})}
+        # Custom transport (tests, replay harnesses); None = real network
+        self._transport = transport
+        self._lock = threading.Lock()
+        # loop -> (client, host -> semaphore)
+        self._clients: dict[asyncio.AbstractEventLoop, tuple[Any, dict[str, asyncio.Semaphore]]] = {}
+        self._stats = {"requests": 0, "clients_opened": 0}
+
+    def _entry(self) -> tuple[Any, dict[str, asyncio.Semaphore]]:
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._clients.get(loop)
+            if entry is not None and not entry[0].is_closed:
+                return entry
+            # Loops that closed without closing their client: their
+            # sockets died with the loop, nothing left to await
+            for stale in [lp for lp in self._clients if lp.is_closed()]:
+                del self._clients[stale]
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=_DEFAULT_TIMEOUT_S,
+                headers=self.headers,
+                follow_redirects=True,
+                transport=self._transport,
+            )
+            entry = (client, {})
+            self._clients[loop] = entry
+            self._stats["clients_opened"] += 1
+            return entry
+
+    def client(self) -> Any:
+        """This event loop's pooled `httpx.AsyncClient`."""
+        return self._entry()[0]
+
+    @asynccontextmanager
+    async def _host_slot(self, host: str) -> AsyncIterator[None]:
+        _, slots = self._entry()
+        sem = slots.get(host)
+        if sem is None:
+            sem = slots.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with sem:
+            yield
+
+    async def get(
+        self,
+        url: str,
+        *,
+        params: Optional[dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        headers: Optional[dict[str, str]] = None,
+    ) -> Any:
+        """GET through the pool; `timeout` overrides the default per request."""
+        import httpx
+
+        client = self.client()
+        async with self._host_slot(httpx.URL(url).host):
+            with self._lock:
+                self._stats["requests"] += 1
+            return await client.get(
+                url, params=params, headers=headers,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "open_clients": sum(1 for c, _ in self._clients.values() if not c.is_closed),
+                "http2": self.http2,
+            }
+
+    async def aclose(self) -> None:
+        """Close this loop's client (call from the loop that used it)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._clients.pop(loop, None)
+        if entry is not None:
+            await entry[0].aclose()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Close every client from outside its loop; safe to call twice."""
+        with self._lock:
+            entries, self._clients = list(self._clients.items()), {}
+        for loop, (client, _) in entries:
+            if client.is_closed or loop.is_closed():
+                continue
+            try:
+                if loop.is_running():
+                    asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout)
+                else:
+                    loop.run_until_complete(client.aclose())
+            except Exception as e:
+                logger.debug("closing pooled HTTP client failed: %s", e)
+
+
+_SHARED: Optional[HTTPClientPool] = None
+_IO_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_http_pool() -> HTTPClientPool:
+    """The process-wide pool, created on first use and closed at exit."""
+    global _SHARED
+    with _SHARED_LOCK:
+        if _SHARED is None:
+            _SHARED = HTTPClientPool()
+            atexit.register(_SHARED.close)
+        return _SHARED
+
+
+def _io_loop() -> asyncio.AbstractEventLoop:
+    global _IO_LOOP
+    with _SHARED_LOCK:
+        if _IO_LOOP is None or _IO_LOOP.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True, name="search-io").start()
+            atexit.register(_stop_io_loop, loop)
+            _IO_LOOP = loop
+        return _IO_LOOP
+
+
+def _stop_io_loop(loop: asyncio.AbstractEventLoop) -> None:
+    # Close the pooled clients on their own loop while it still runs
+    if _SHARED is not None:
+        _SHARED.close()
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """Run `coro` on the long-lived background loop and wait for it.
+
+    Must not be called from that loop itself (it would deadlock).
+    """
+    loop = _io_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync called from the search I/O loop")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
@@ -0,0 +1,152 @@
+"""Client-side evaluation of query predicates on ``Material`` records.
+
+Each provider evaluates the filters its capabilities allow server-side
+(``ProviderCapabilities.pushdown``). The engine checks the rest here, page
+by page, before fusion. A page becomes a columnar NumPy view: one boolean
+column per queried element and one float column per range property
+(``n_elements`` included), NaN where the value is missing. Each predicate
+is then one array expression ANDed into a row mask.
+
+Semantics follow the providers' own filters. A range rejects rows without
+a numeric value. Formula, space group and crystal system compare
+normalised strings.
+"""
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Iterable
+
+import numpy as np
+
+from app.tools.search_engine.query import COMPOSITION_FIELDS, RANGE_FIELDS, MaterialSearchQuery
+from app.tools.search_engine.result import Material
+
+# Every predicate a MaterialSearchQuery can carry
+FILTER_FIELDS = (
+    *COMPOSITION_FIELDS, "formula", *RANGE_FIELDS, "space_group", "crystal_system",
+)
+
+_FORMULA_TOKEN = re.compile(r"([A-Z][a-z]?)(\d*\.?\d*)")
+
+
+def _number(value) -> float:
+    """A property's numeric value, or NaN when missing or non-numeric."""
+    if value is None:
+        return math.nan
+    if not isinstance(value, (int, float)):
+        value = value.value
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return math.nan
+    return float(value)
+
+
+def normalize_label(value) -> str | None:
+    """Space group / crystal system label (or its PropertyValue) for comparison."""
+    if value is None:
+        return None
+    return str(getattr(value, "value", value)).replace(" ", "").lower()
+
+
+def reduced_formula(formula: str) -> str:
+    """Canonical reduced form: elements sorted, integer counts divided by their gcd.
+
+    Formulas with groups or other syntax the tokenizer does not cover are
+    returned with whitespace removed, so they still compare exactly.
+    """
+    compact = formula.replace(" ", "")
+    tokens = _FORMULA_TOKEN.findall(compact)
+    if not tokens or "".join(el + n for el, n in tokens) != compact:
+        return compact
+    counts: dict[str, float] = {}
+    for el, n in tokens:
+        counts[el] = counts.get(el, 0.0) + (float(n) if n else 1.0)
+    if all(c.is_integer() for c in counts.values()):
+        div = math.gcd(*(int(c) for c in counts.values()))
+        counts = {el: c / div for el, c in counts.items()}
+    return "".join(
+        el + ("" if c == 1 else f"{c:g}") for el, c in sorted(counts.items())
+    )
+
+
+def element_matrix(materials: list[Material], symbols: list[str]) -> np.ndarray:
+    """``(len(materials), len(symbols))`` bool array: material row contains symbol."""
+    index = {el: j for j, el in enumerate(symbols)}
+    out = np.zeros((len(materials), len(symbols)), dtype=bool)
+    for i, m in enumerate(materials):
+        for el in m.elements:
+            j = index.get(el)
+            if j is not None:
+                out[i, j] = True
+    return out
+
+
+def residual_mask(
+    materials: list[Material],
+    query: MaterialSearchQuery,
+    fields: Iterable[str] | None = None,
+) -> np.ndarray:
+    """Row mask of ``materials`` passing ``query``'s predicates in ``fields``.
+
+    ``fields`` defaults to every predicate (``FILTER_FIELDS``); fields the
+    query leaves unset are skipped.
+    """
+    names = FILTER_FIELDS if fields is None else tuple(fields)
+    active = [f for f in names if getattr(query, f) not in (None, [])]
+    mask = np.ones(len(materials), dtype=bool)
+    if not materials or not active:
+        return mask
+
+    composition = [f for f in active if f in COMPOSITION_FIELDS]
+    if composition:
+        symbols = sorted({el for f in composition for el in getattr(query, f)})
+        col = {el: j for j, el in enumerate(symbols)}
+        has = element_matrix(materials, symbols)
+        if "elements" in composition:
+            mask &= has[:, [col[el] for el in query.elements]].all(axis=1)
+        if "elements_any" in composition:
+            mask &= has[:, [col[el] for el in query.elements_any]].any(axis=1)
+        if "exclude_elements" in composition:
+            mask &= ~has[:, [col[el] for el in query.exclude_elements]].any(axis=1)
+
+    for name in active:
+        if name not in RANGE_FIELDS:
+            continue
+        rng = getattr(query, name)
+        values = np.fromiter(
+            (_number(getattr(m, name)) for m in materials), dtype=float, count=len(materials),
+        )
+        # NaN compares False, so missing values fail either bound
+        if rng.min is not None:
+            mask &= values >= rng.min
+        if rng.max is not None:
+            mask &= values <= rng.max
+
+    if "formula" in active:
+        want = reduced_formula(query.formula)
+        mask &= np.fromiter(
+            (reduced_formula(m.formula) == want for m in materials), dtype=bool, count=len(materials),
+        )
+    if "space_group" in active:
+        want = normalize_label(query.space_group)
+        mask &= np.fromiter(
+            (normalize_label(m.space_group) == want for m in materials), dtype=bool, count=len(materials),
+        )
+    if "crystal_system" in active:
+        want = normalize_label(query.crystal_system)
+        mask &= np.fromiter(
+            (normalize_label(m.crystal_system) == want for m in materials), dtype=bool, count=len(materials),
+        )
+    return mask
+
+
+def post_filter(
+    materials: list[Material],
+    query: MaterialSearchQuery,
+    fields: Iterable[str] | None = None,
+) -> list[Material]:
+    """The ``materials`` passing ``query``'s predicates in ``fields``, in order."""
+    mask = residual_mask(materials, query, fields)
+    if mask.all():
+        return materials
+    return [m for m, keep in zip(materials, mask) if keep]
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
 from pydantic import BaseModel
 
@@ -9,33 +10,70 @@ from app.tools.search_engine.query import MaterialSearchQuery
 from app.tools.search_engine.result import Material
 
 
+# Query field -> the capability name providers declare for it
+_FIELD_CAPABILITIES = {
+    "elements": "elements", "elements_any": "elements",
+    "exclude_elements": "elements", "formula": "formula",
+    "n_elements": "nelements", "space_group": "space_group",
+    "crystal_system": "crystal_system",
+    "band_gap": "band_gap", "formation_energy": "formation_energy",
+    "energy_above_hull": "energy_above_hull",
+    "bulk_modulus": "bulk_modulus", "debye_temperature": "debye_temperature",
+}
+
+
 class ProviderCapabilities(BaseModel):
-    """What this provider can filter on and return."""
+    """What this provider can filter on and return.
+
+    ``property_fields`` maps query properties (``band_gap``, ...) to the
+    provider's own response field (``_oqmd_band_gap``, ...). A query field
+    the provider can filter on is pushed down to the server; one it only
+    returns is evaluated client-side (see ``postfilter``).
+    """
     filterable_fields: set[str] = set()
     returned_properties: set[str] = set()
     provider_specific_fields: list[str] = []
+    property_fields: dict[str, str] = {}
     supports_pagination: bool = True
     max_results: int | None = None
 
+    def _capability_names(self, query: MaterialSearchQuery) -> dict[str, str]:
+        """Query field -> capability name, for every filter ``query`` sets."""
+        query_data = query.model_dump(exclude_none=True)
+        return {
+            field_name: _FIELD_CAPABILITIES[field_name]
+            for field_name in query_data
+            if field_name in _FIELD_CAPABILITIES
+        }
+
     def can_handle(self, query: MaterialSearchQuery) -> bool:
-        """Check if this provider can handle the query's filters."""
-        field_map = {
-            "elements": "elements", "elements_any": "elements",
-            "exclude_elements": "elements", "formula": "formula",
-            "n_elements": "nelements", "space_group": "space_group",
-            "crystal_system": "crystal_system",
-            "band_gap": "band_gap", "formation_energy": "formation_energy",
-            "energy_above_hull": "energy_above_hull",
-            "bulk_modulus": "bulk_modulus", "debye_temperature": "debye_temperature",
+        """Check every filter is evaluable: server-side, or on returned data."""
+        evaluable = self.filterable_fields | self.returned_properties | set(self.property_fields)
+        return all(cap in evaluable for cap in self._capability_names(query).values())
+
+    def pushdown(self, query: MaterialSearchQuery) -> tuple[MaterialSearchQuery, set[str]]:
+        """Split ``query`` into (what the server evaluates, fields left to the client)."""
+        residual = {
+            field_name for field_name, cap in self._capability_names(query).items()
+            if cap not in self.filterable_fields
         }
-        query_data = query.model_dump(exclude_none=True)
-        for field_name in query_data:
-            if field_name in ("providers", "limit"):
-                continue
-            cap_name = field_map.get(field_name)
-            if cap_name and cap_name not in self.filterable_fields:
-                return False
-        return True
+        if not residual:
+            return query, residual
+        return query.model_copy(update={f: None for f in residual}), residual
+
+
+class Page(list):
+    """One page of ``search_pages`` output.
+
+    ``more`` is set on the last page a provider yields when it stopped
+    with rows left on the server: at the requested limit, at a page cap,
+    or with a next link still pending. A plain list counts as
+    ``more=False``.
+    """
+
+    def __init__(self, materials=(), more: bool = False):
+        super().__init__(materials)
+        self.more = more
 
 
 class Provider(ABC):
@@ -50,6 +88,29 @@ class Provider(ABC):
         """Execute search, return normalized materials."""
         ...
 
+    async def search_pages(self, query: MaterialSearchQuery) -> AsyncIterator[list[Material]]:
+        """Yield results page by page. Default: all of ``search`` as one page.
+
+        Paginating providers override this so the engine can fuse pages as
+        they arrive and stop fetching once it has ``query.limit`` materials.
+        A provider that stops early yields its last page as a ``Page`` with
+        ``more=True``.
+        """
+        yield await self.search(query)
+
+    async def search_union(
+        self, queries: list[MaterialSearchQuery],
+    ) -> tuple[list[Material], str] | None:
+        """Answer the OR of ``queries`` in one request, or ``None`` if unsupported.
+
+        Returns the matching materials (up to the summed limits) and the
+        query string that was sent. The materials should be a ``Page``
+        whose ``more`` is set if the provider stopped with matches left.
+        ``SearchEngine.search_many`` splits the rows back per query.
+        Default: unsupported.
+        """
+        return None
+
     async def health_check(self) -> bool:
         """Ping the provider. Default: return True."""
         return True
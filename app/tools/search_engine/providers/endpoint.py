@@ -26,6 +26,8 @@ class CapabilitiesConfig(BaseModel):
     filterable_fields: list[str] = Field(default_factory=list)
     returned_properties: list[str] = Field(default_factory=list)
     provider_specific_fields: list[str] = Field(default_factory=list)
+    # Query property -> provider response field, e.g. band_gap -> _oqmd_band_gap
+    property_fields: dict[str, str] = Field(default_factory=dict)
     supports_pagination: bool = True
     page_limit_values: list[int] | None = None
 
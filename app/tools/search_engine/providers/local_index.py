@@ -0,0 +1,457 @@
+"""Offline materials index -- a Provider answering from a local SQLite file.
+
+Harvested OPTIMADE / MP results are stored one row per material in
+``materials_index.db`` (default ``~/.prism/cache/``, or
+``$PRISM_MATERIALS_INDEX``). Each row has:
+
+- ``mask_lo`` / ``mask_hi``: element-presence bitmask, one bit per symbol
+  in ``ELEMENT_BITS`` order, split into two signed 64-bit integers.
+- One nullable REAL column per range property, plus the reduced formula
+  and normalised space group / crystal system labels.
+- The full ``Material`` JSON, decoded only for rows a query returns.
+
+``search`` works on a columnar NumPy copy of the filter columns, loaded
+once and reloaded when a write bumps the index generation. ``elements``,
+``elements_any`` and ``exclude_elements`` are AND / AND-NOT tests on the
+bitmask arrays. Each range property is kept as an argsort order plus
+sorted values, so a range is two binary searches.
+
+With ``PRISM_SEARCH_OFFLINE=1`` it is the only provider ``build_registry``
+registers, so hosts without outbound network still answer
+``materials_search``. Online it is left out unless opted in with
+``PRISM_SEARCH_LOCAL_INDEX=1``: it answers in microseconds, so next to
+live providers it would fill ``limit`` first and the early cutoff would
+cancel them.
+
+Fill it incrementally:
+
+- ``python3 -m app.tools.search_engine.providers.local_index harvest
+  --chemsys Fe-O --chemsys Ni-Al`` runs federated searches. Queries
+  harvested within ``--max-age-hours`` are skipped.
+- ``... import-cache`` copies every material in the search cache DB.
+- ``... stats`` prints row counts.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.tools.search_engine.postfilter import normalize_label, reduced_formula
+from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+from app.tools.search_engine.query import RANGE_FIELDS, VALID_ELEMENTS, MaterialSearchQuery
+from app.tools.search_engine.result import Material
+
+if TYPE_CHECKING:
+    from app.tools.search_engine.cache.engine import SearchCache
+    from app.tools.search_engine.engine import SearchEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = Path.home() / ".prism" / "cache" / "materials_index.db"
+INDEX_ENV = "PRISM_MATERIALS_INDEX"
+OFFLINE_ENV = "PRISM_SEARCH_OFFLINE"
+LOCAL_ENV = "PRISM_SEARCH_LOCAL_INDEX"
+
+# Bit position of each element in the presence mask
+ELEMENT_BITS = {el: i for i, el in enumerate(sorted(VALID_ELEMENTS))}
+
+_PROPERTIES = tuple(f for f in RANGE_FIELDS if f != "n_elements")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS materials (
+    key             TEXT PRIMARY KEY,
+    mask_lo         INTEGER NOT NULL,
+    mask_hi         INTEGER NOT NULL,
+    n_elements      INTEGER NOT NULL,
+    {", ".join(f"{p} REAL" for p in _PROPERTIES)},
+    reduced_formula TEXT NOT NULL,
+    space_group     TEXT,
+    crystal_system  TEXT,
+    data            TEXT NOT NULL,
+    updated_at      REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS harvests (
+    query_hash   TEXT PRIMARY KEY,
+    query        TEXT NOT NULL,
+    count        INTEGER NOT NULL,
+    harvested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0);
+"""
+
+
+def default_index_path() -> Path:
+    return Path(os.environ.get(INDEX_ENV) or DEFAULT_INDEX_PATH)
+
+
+def element_mask(elements: Iterable[str]) -> tuple[int, int]:
+    """Unsigned (low, high) 64-bit words with one bit set per element."""
+    bits = 0
+    for el in elements:
+        bits |= 1 << ELEMENT_BITS[el]
+    return bits & 0xFFFF_FFFF_FFFF_FFFF, bits >> 64
+
+
+def _signed(word: int) -> int:
+    """Store an unsigned 64-bit word in SQLite's signed INTEGER."""
+    return word - (1 << 64) if word >= 1 << 63 else word
+
+
+def _number(value) -> float | None:
+    value = getattr(value, "value", None)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+@dataclass
+class _Columns:
+    """Columnar copy of the filter columns, row ``i`` is ``rowids[i]``."""
+    generation: int
+    rowids: np.ndarray
+    mask_lo: np.ndarray
+    mask_hi: np.ndarray
+    # name -> (row positions sorted by value, the sorted values); NULLs left out
+    sorted_props: dict[str, tuple[np.ndarray, np.ndarray]]
+    reduced_formula: np.ndarray
+    space_group: np.ndarray
+    crystal_system: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.rowids)
+
+
+class LocalMaterialsIndex:
+    """SQLite-backed materials table with an in-memory columnar query path."""
+
+    def __init__(self, path: Path | None = None):
+        self._path = Path(path) if path else None
+        self._lock = threading.RLock()
+        self._columns: _Columns | None = None
+        if self._path is None:
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        else:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self._path), timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @property
+    def path(self) -> Path | None:
+        return self._path
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(self, materials: Iterable[Material]) -> int:
+        """Upsert ``materials`` (keyed by first source + id); returns rows written."""
+        from app.tools.search_engine.cache.engine import material_key
+
+        now = time.time()
+        rows = []
+        for m in materials:
+            try:
+                lo, hi = element_mask(m.elements)
+            except KeyError:
+                logger.debug("skipping %s: unknown element in %s", m.id, m.elements)
+                continue
+            rows.append((
+                material_key(m), _signed(lo), _signed(hi), m.n_elements,
+                *(_number(getattr(m, p)) for p in _PROPERTIES),
+                reduced_formula(m.formula),
+                normalize_label(m.space_group),
+                normalize_label(m.crystal_system),
+                m.model_dump_json(), now,
+            ))
+        if not rows:
+            return 0
+        columns = (
+            "key", "mask_lo", "mask_hi", "n_elements", *_PROPERTIES,
+            "reduced_formula", "space_group", "crystal_system", "data", "updated_at",
+        )
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns[1:])
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT INTO materials ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT(key) DO UPDATE SET {updates}",
+                rows,
+            )
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+            self._conn.commit()
+        return len(rows)
+
+    def record_harvest(self, query: MaterialSearchQuery, count: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO harvests (query_hash, query, count, harvested_at) "
+                "VALUES (?, ?, ?, ?)",
+                (query.query_hash(), query.model_dump_json(exclude_none=True), count, time.time()),
+            )
+            self._conn.commit()
+
+    def harvested_at(self, query: MaterialSearchQuery) -> float | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT harvested_at FROM harvests WHERE query_hash = ?", (query.query_hash(),),
+            ).fetchone()
+        return row[0] if row else None
+
+    def import_cache(self, cache: SearchCache) -> int:
+        """Copy every material in ``cache`` into the index."""
+        return self.add(cache.get_all_materials())
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _generation(self) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return row[0]
+
+    def columns(self) -> _Columns:
+        """The columnar view, reloaded if the DB changed since the last load."""
+        with self._lock:
+            generation = self._generation()
+            if self._columns is not None and self._columns.generation == generation:
+                return self._columns
+            rows = self._conn.execute(
+                f"SELECT rowid, mask_lo, mask_hi, n_elements, {', '.join(_PROPERTIES)}, "
+                "reduced_formula, space_group, crystal_system FROM materials ORDER BY rowid"
+            ).fetchall()
+            n_props = len(_PROPERTIES)
+            cols = list(zip(*rows)) if rows else [()] * (7 + n_props)
+            sorted_props = {}
+            for i, name in enumerate(("n_elements", *_PROPERTIES)):
+                values = np.array(cols[3 + i], dtype=float)
+                valid = np.flatnonzero(~np.isnan(values))
+                order = valid[np.argsort(values[valid], kind="stable")]
+                sorted_props[name] = (order, values[order])
+            self._columns = _Columns(
+                generation=generation,
+                rowids=np.array(cols[0], dtype=np.int64),
+                mask_lo=np.array(cols[1], dtype=np.int64).view(np.uint64),
+                mask_hi=np.array(cols[2], dtype=np.int64).view(np.uint64),
+                sorted_props=sorted_props,
+                reduced_formula=np.array(cols[4 + n_props], dtype=object),
+                space_group=np.array(cols[5 + n_props], dtype=object),
+                crystal_system=np.array(cols[6 + n_props], dtype=object),
+            )
+            return self._columns
+
+    def select(self, query: MaterialSearchQuery) -> np.ndarray:
+        """Row positions (into ``columns()``) matching every filter of ``query``."""
+        cols = self.columns()
+        mask = np.ones(len(cols), dtype=bool)
+        if query.elements:
+            lo, hi = (np.uint64(w) for w in element_mask(query.elements))
+            mask &= ((cols.mask_lo & lo) == lo) & ((cols.mask_hi & hi) == hi)
+        if query.elements_any:
+            lo, hi = (np.uint64(w) for w in element_mask(query.elements_any))
+            mask &= ((cols.mask_lo & lo) | (cols.mask_hi & hi)) != 0
+        if query.exclude_elements:
+            lo, hi = (np.uint64(w) for w in element_mask(query.exclude_elements))
+            mask &= ((cols.mask_lo & lo) | (cols.mask_hi & hi)) == 0
+        for name in RANGE_FIELDS:
+            rng = getattr(query, name)
+            if rng is None or (rng.min is None and rng.max is None):
+                continue
+            order, values = cols.sorted_props[name]
+            i = 0 if rng.min is None else np.searchsorted(values, rng.min, side="left")
+            j = len(values) if rng.max is None else np.searchsorted(values, rng.max, side="right")
+            in_range = np.zeros(len(cols), dtype=bool)
+            in_range[order[i:j]] = True
+            mask &= in_range
+        if query.formula:
+            mask &= cols.reduced_formula == reduced_formula(query.formula)
+        if query.space_group:
+            mask &= cols.space_group == normalize_label(query.space_group)
+        if query.crystal_system:
+            mask &= cols.crystal_system == normalize_label(query.crystal_system)
+        return np.flatnonzero(mask)
+
+    def search(self, query: MaterialSearchQuery) -> list[Material]:
+        """Materials matching ``query``, at most ``query.limit``, in insertion order."""
+        positions = self.select(query)[:query.limit]
+        if not len(positions):
+            return []
+        rowids = self.columns().rowids[positions].tolist()
+        by_rowid: dict[int, str] = {}
+        with self._lock:
+            for i in range(0, len(rowids), 500):
+                chunk = rowids[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                by_rowid.update(self._conn.execute(
+                    f"SELECT rowid, data FROM materials WHERE rowid IN ({marks})", chunk,
+                ))
+        return [Material.model_validate_json(by_rowid[r]) for r in rowids if r in by_rowid]
+
+    def stats(self) -> dict:
+        with self._lock:
+            materials, = self._conn.execute("SELECT COUNT(*) FROM materials").fetchone()
+            harvests, = self._conn.execute("SELECT COUNT(*) FROM harvests").fetchone()
+            return {
+                "material_count": materials,
+                "harvest_count": harvests,
+                "generation": self._generation(),
+                "path": str(self._path) if self._path else None,
+            }
+
+
+class LocalIndexProvider(Provider):
+    """Serves ``materials_search`` from a ``LocalMaterialsIndex``."""
+
+    id = "local_index"
+    name = "Local materials index"
+
+    def __init__(self, index: LocalMaterialsIndex):
+        self._index = index
+        fields = {"elements", "formula", "nelements", "space_group", "crystal_system", *_PROPERTIES}
+        self.capabilities = ProviderCapabilities(
+            filterable_fields=fields,
+            returned_properties=fields,
+            supports_pagination=False,
+        )
+
+    @property
+    def index(self) -> LocalMaterialsIndex:
+        return self._index
+
+    async def search(self, query: MaterialSearchQuery) -> list[Material]:
+        return self._index.search(query)
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def offline_mode() -> bool:
+    return os.environ.get(OFFLINE_ENV, "").lower() in ("1", "true", "yes")
+
+
+def local_index_opt_in() -> bool:
+    """Whether an online registry should also serve from the local index."""
+    return os.environ.get(LOCAL_ENV, "").lower() in ("1", "true", "yes")
+
+
+# ----------------------------------------------------------------------
+# Harvesting
+# ----------------------------------------------------------------------
+
+
+async def harvest(
+    engine: SearchEngine,
+    index: LocalMaterialsIndex,
+    queries: Iterable[MaterialSearchQuery],
+    max_age_s: float = 86400,
+) -> dict:
+    """Run each query through ``engine`` and upsert the results into ``index``.
+
+    Queries harvested less than ``max_age_s`` ago are skipped, so a
+    re-run only fetches what is new or stale. A query is only recorded as
+    harvested when every provider answered in full. If some timed out,
+    failed or were truncated, its materials are still added, but it counts
+    as ``partial`` and the next run tries it again.
+    """
+    report = {"queries": 0, "skipped": 0, "materials": 0, "partial": 0, "failed": 0}
+    now = time.time()
+    for query in queries:
+        last = index.harvested_at(query)
+        if last is not None and now - last < max_age_s:
+            report["skipped"] += 1
+            continue
+        result = await engine.search(query)
+        report["queries"] += 1
+        if not any(log.status == "success" for log in result.query_log):
+            report["failed"] += 1
+            continue
+        report["materials"] += index.add(result.materials)
+        if all(log.status == "success" and not log.truncated for log in result.query_log):
+            index.record_harvest(query, len(result.materials))
+        else:
+            report["partial"] += 1
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(
+        prog="python3 -m app.tools.search_engine.providers.local_index",
+        description="Fill or inspect the offline materials index.",
+    )
+    ap.add_argument("--index", type=Path, default=None, help=f"index DB (default: ${INDEX_ENV} or {DEFAULT_INDEX_PATH})")
+    sub = ap.add_subparsers(dest="command", required=True)
+    h = sub.add_parser("harvest", help="fetch from the federation into the index")
+    h.add_argument("--chemsys", action="append", default=[], help="e.g. Fe-O; repeatable")
+    h.add_argument("--all-elements", action="store_true", help="one query per element")
+    h.add_argument("--limit", type=int, default=1000, help="materials per query")
+    h.add_argument("--max-age-hours", type=float, default=24.0, help="re-harvest queries older than this")
+    c = sub.add_parser("import-cache", help="copy materials from the search cache DB")
+    c.add_argument("--cache-dir", type=Path, default=None, help="search cache dir (default: ~/.prism/cache)")
+    sub.add_parser("stats", help="print index counts")
+    args = ap.parse_args(argv)
+    if args.command == "harvest" and offline_mode():
+        # the offline registry has no remote providers to harvest from
+        ap.error(f"harvest needs the network; unset {OFFLINE_ENV}")
+
+    index = LocalMaterialsIndex(args.index or default_index_path())
+    try:
+        if args.command == "harvest":
+            from app.tools.search_engine.cache.engine import SearchCache
+            from app.tools.search_engine.engine import SearchEngine
+            from app.tools.search_engine.providers.registry import build_registry
+
+            systems = [s.split("-") for s in args.chemsys]
+            if args.all_elements:
+                systems += [[el] for el in sorted(VALID_ELEMENTS)]
+            queries = [MaterialSearchQuery(elements=els, limit=args.limit) for els in systems]
+            from app.tools.search_engine.http import run_sync
+
+            # no shared cache: a partial answer must not be replayed on the retry
+            engine = SearchEngine(
+                build_registry(local_index=False), cache=SearchCache(disk_dir=None),
+            )
+            try:
+                report = run_sync(harvest(engine, index, queries, args.max_age_hours * 3600))
+            finally:
+                engine.close()
+        elif args.command == "import-cache":
+            from app.tools.search_engine.cache.engine import SearchCache
+            from app.tools.search_engine.engine import DEFAULT_CACHE_DIR
+
+            cache = SearchCache(disk_dir=args.cache_dir or DEFAULT_CACHE_DIR)
+            try:
+                report = {"materials": index.import_cache(cache)}
+            finally:
+                cache.close()
+        else:
+            report = {}
+        report["index"] = index.stats()
+    finally:
+        index.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
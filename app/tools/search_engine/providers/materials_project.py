@@ -1,11 +1,33 @@
-"""Materials Project native API provider — wraps MPRester."""
+"""Materials Project native API provider — wraps MPRester.
+
+MPRester is synchronous. Calling it inline from ``search`` stalled the
+event loop, and every other provider in the fan-out with it, until MP
+answered. Requests now run on a dedicated thread pool. Each worker thread
+keeps one MPRester per API key, so its HTTP session stays open across
+searches. A query is split into ``CHUNK_SIZE`` pages (``_page``), up to
+``MAX_PARALLEL_CHUNKS`` of them in flight at once. ``search_pages`` yields
+each page's parsed materials as soon as it lands.
+
+Page skipping relies on the ``_page`` argument of ``summary.search``,
+documented there from mp-api 0.46 (``MIN_PAGED_MP_API``). Whether the
+installed client takes it is checked from its signature. A client without
+it (the 0.45 floor in pyproject) gets one sequential request through the
+public ``num_chunks`` / ``chunk_size`` arguments instead.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import inspect
 import logging
+import math
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator
 
-from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+from app.tools.search_engine.providers.base import Page, Provider, ProviderCapabilities
 from app.tools.search_engine.providers.endpoint import ProviderEndpoint
 from app.tools.search_engine.query import MaterialSearchQuery
 from app.tools.search_engine.result import Material, PropertyValue
@@ -13,6 +35,65 @@ from app.tools.search_engine.translator import QueryTranslator
 
 logger = logging.getLogger(__name__)
 
+# Documents per request, and requests in flight (process-wide)
+CHUNK_SIZE = 100
+MAX_PARALLEL_CHUNKS = 4
+
+# First mp-api release whose summary.search documents ``_page``
+MIN_PAGED_MP_API = "0.46"
+
+_SUMMARY_FIELDS = [
+    "material_id",
+    "formula_pretty",
+    "elements",
+    "nelements",
+    "band_gap",
+    "formation_energy_per_atom",
+    "energy_above_hull",
+    "symmetry",
+]
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_thread_state = threading.local()
+
+
+def _mp_executor() -> ThreadPoolExecutor:
+    """The thread pool all MP requests run on (created on first use)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_PARALLEL_CHUNKS, thread_name_prefix="mp-rester",
+            )
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+        return _executor
+
+
+def _rester(api_key: str):
+    """This worker thread's MPRester for ``api_key``, kept open for reuse.
+
+    A requests session is not safe to share between threads, so each
+    worker owns its clients instead of sharing one.
+    """
+    resters = getattr(_thread_state, "resters", None)
+    if resters is None:
+        resters = _thread_state.resters = {}
+    mpr = resters.get(api_key)
+    if mpr is None:
+        from mp_api.client import MPRester
+
+        mpr = resters[api_key] = MPRester(api_key, mute_progress_bars=True)
+    return mpr
+
+
+def _accepts_page(search) -> bool:
+    """Whether ``summary.search`` takes ``_page`` (mp-api >= MIN_PAGED_MP_API)."""
+    try:
+        return "_page" in inspect.signature(search).parameters
+    except (TypeError, ValueError):
+        return False
+
 
 class MaterialsProjectProvider(Provider):
     """Materials Project native API via MPRester."""
@@ -27,42 +108,104 @@ class MaterialsProjectProvider(Provider):
         )
 
     async def search(self, query: MaterialSearchQuery) -> list[Material]:
+        materials: list[Material] = []
+        async for page in self.search_pages(query):
+            materials.extend(page)
+        return materials
+
+    async def search_pages(
+        self, query: MaterialSearchQuery,
+    ) -> AsyncIterator[list[Material]]:
+        """Yield each chunk's materials as it arrives, up to ``query.limit``.
+
+        Chunks finish in any order. A short chunk marks the end of the
+        results, so no later pages are requested. The page that reaches
+        ``query.limit`` is marked ``more`` unless its chunk came back
+        short. Pages still in flight when the caller stops iterating are
+        cancelled.
+        """
         api_key = self._resolve_api_key()
         if not api_key:
             logger.info(
                 "No MP API key available (local env or MARC27 credentials) — skipping MP native"
             )
-            return []
+            return
 
-        try:
-            from mp_api.client import MPRester
-
-            kwargs = QueryTranslator.to_mp_kwargs(query)
-            kwargs.setdefault(
-                "fields",
-                [
-                    "material_id",
-                    "formula_pretty",
-                    "elements",
-                    "nelements",
-                    "band_gap",
-                    "formation_energy_per_atom",
-                    "energy_above_hull",
-                    "symmetry",
-                ],
+        kwargs = QueryTranslator.to_mp_kwargs(query)
+        kwargs.setdefault("fields", _SUMMARY_FIELDS)
+        chunk_size = min(query.limit, CHUNK_SIZE)
+        last_page = math.ceil(query.limit / chunk_size)
+        next_page = 1
+        remaining = query.limit
+        loop = asyncio.get_running_loop()
+        pending: dict[asyncio.Future, int] = {}
+
+        if not await loop.run_in_executor(_mp_executor(), self._paged, api_key):
+            materials = await loop.run_in_executor(
+                _mp_executor(), self._fetch_all, api_key, kwargs, last_page, chunk_size,
             )
+            if materials:
+                yield Page(materials[:query.limit], more=len(materials) >= query.limit)
+            return
 
-            with MPRester(api_key) as mpr:
-                docs = mpr.materials.summary.search(
-                    num_chunks=1,
-                    chunk_size=min(query.limit, 100),
-                    **kwargs,
+        def fill() -> None:
+            nonlocal next_page
+            while next_page <= last_page and len(pending) < MAX_PARALLEL_CHUNKS:
+                fut = loop.run_in_executor(
+                    _mp_executor(), self._fetch_chunk,
+                    api_key, kwargs, next_page, chunk_size,
                 )
+                pending[fut] = next_page
+                next_page += 1
 
-            return [self._parse_doc(self._doc_to_dict(d)) for d in docs]
-        except Exception as e:
-            logger.warning("MP native query failed: %s", e)
-            raise
+        try:
+            fill()
+            while pending and remaining > 0:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED,
+                )
+                for fut in sorted(done, key=pending.__getitem__):
+                    page = pending.pop(fut)
+                    try:
+                        materials = fut.result()
+                    except Exception as e:
+                        logger.warning("MP native query failed: %s", e)
+                        raise
+                    if len(materials) < chunk_size:
+                        last_page = min(last_page, page)
+                    take = min(len(materials), remaining)
+                    if take:
+                        remaining -= take
+                        # Stopping at the limit on a full chunk: MP may hold more
+                        yield Page(materials[:take], more=not remaining and (
+                            len(materials) > take or len(materials) == chunk_size
+                        ))
+                fill()
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    @staticmethod
+    def _paged(api_key: str) -> bool:
+        return _accepts_page(_rester(api_key).materials.summary.search)
+
+    def _fetch_chunk(
+        self, api_key: str, kwargs: dict, page: int, chunk_size: int,
+    ) -> list[Material]:
+        """One summary page, fetched and parsed on an MP worker thread."""
+        docs = _rester(api_key).materials.summary.search(
+            num_chunks=1, chunk_size=chunk_size, _page=page, **kwargs,
+        )
+        return [self._parse_doc(self._doc_to_dict(d)) for d in docs]
+
+    def _fetch_all(
+        self, api_key: str, kwargs: dict, num_chunks: int, chunk_size: int,
+    ) -> list[Material]:
+        """The first ``num_chunks`` pages in one call (clients without ``_page``)."""
+        docs = _rester(api_key).materials.summary.search(
+            num_chunks=num_chunks, chunk_size=chunk_size, **kwargs,
+        )
+        return [self._parse_doc(self._doc_to_dict(d)) for d in docs]
 
     def _resolve_api_key(self) -> str:
         """Resolve the Materials Project API key.
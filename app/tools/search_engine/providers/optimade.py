@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import logging
 import time
+from typing import AsyncIterator
 
-from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+from app.tools.search_engine.http import HTTPClientPool, get_http_pool
+from app.tools.search_engine.providers.base import Page, Provider, ProviderCapabilities
 from app.tools.search_engine.providers.endpoint import ProviderEndpoint
 from app.tools.search_engine.query import MaterialSearchQuery
 from app.tools.search_engine.result import Material, PropertyValue, ProviderQueryLog
@@ -13,35 +15,95 @@ from app.tools.search_engine.translator import QueryTranslator
 
 logger = logging.getLogger(__name__)
 
+# Standard attributes _parse_entry reads; everything else stays on the server
+_RESPONSE_FIELDS = (
+    "chemical_formula_descriptive", "chemical_formula_reduced", "chemical_formula_hill",
+    "elements", "nelements", "space_group_symbol", "lattice_vectors",
+)
+
+_PROPERTY_UNITS = {
+    "band_gap": "eV", "formation_energy": "eV/atom", "energy_above_hull": "eV/atom",
+    "bulk_modulus": "GPa", "debye_temperature": "K",
+}
+
 
 class OptimadeProvider(Provider):
     """Single OPTIMADE endpoint provider."""
 
-    def __init__(self, endpoint: ProviderEndpoint):
+    def __init__(self, endpoint: ProviderEndpoint, http: HTTPClientPool | None = None):
         self._endpoint = endpoint
+        self._http = http
         self.id = endpoint.id
         self.name = endpoint.name
         self.capabilities = ProviderCapabilities(
             filterable_fields=set(endpoint.capabilities.filterable_fields),
             returned_properties=set(endpoint.capabilities.returned_properties),
             provider_specific_fields=endpoint.capabilities.provider_specific_fields,
+            property_fields=endpoint.capabilities.property_fields,
             supports_pagination=endpoint.capabilities.supports_pagination,
             max_results=endpoint.behavior.max_results,
         )
 
+    @property
+    def http(self) -> HTTPClientPool:
+        """The pool requests go through (the process-wide one by default)."""
+        return self._http or get_http_pool()
+
     async def search(self, query: MaterialSearchQuery) -> list[Material]:
-        """Query this OPTIMADE endpoint via async httpx (not OptimadeClient).
+        """Query this OPTIMADE endpoint, following pages up to ``query.limit``."""
+        materials: list[Material] = []
+        async for page in self.search_pages(query):
+            materials.extend(page)
+        return materials
+
+    async def search_pages(self, query: MaterialSearchQuery) -> AsyncIterator[list[Material]]:
+        """Yield parsed pages from this endpoint via async httpx (not OptimadeClient).
 
         The OptimadeClient library uses synchronous HTTP which blocks the
         event loop. We use httpx directly for a clean async path with
-        proper timeouts.
+        proper timeouts, through the shared ``HTTPClientPool`` so repeated
+        searches reuse keep-alive (or HTTP/2) connections to this host.
+
+        Follows ``links.next`` until ``query.limit`` entries were yielded
+        or the server has no further page. Each page is parsed and handed
+        on before the next is requested, so only one raw page is in memory.
         """
-        import httpx
+        filter_string = QueryTranslator.to_optimade(query, self.capabilities.property_fields)
+        async for page in self._filter_pages(filter_string, query.limit):
+            yield page
+
+    async def search_union(
+        self, queries: list[MaterialSearchQuery],
+    ) -> tuple[Page, str] | None:
+        """One request for the OR of ``queries``' filters, up to their summed limits.
+
+        The rows come back as a ``Page`` whose ``more`` says the walk
+        stopped with matches left on the server.
+        """
+        filters = [
+            QueryTranslator.to_optimade(q, self.capabilities.property_fields) for q in queries
+        ]
+        if not all(filters):
+            # An unfiltered member would turn the union into a full scan
+            return None
+        filter_string = " OR ".join(f"({f})" for f in dict.fromkeys(filters))
+        materials = Page()
+        async for page in self._filter_pages(filter_string, sum(q.limit for q in queries)):
+            materials.extend(page)
+            materials.more = page.more
+        return materials, filter_string
 
-        filter_string = QueryTranslator.to_optimade(query)
+    async def _filter_pages(self, filter_string: str, limit: int) -> AsyncIterator[Page]:
+        """Pages of ``/structures`` matching ``filter_string``, up to ``limit`` entries.
+
+        The last page has ``more`` set when the walk stopped with results
+        left over: at ``limit``, with a next link the endpoint cannot
+        follow (``supports_pagination`` off), on a full unpaginated page,
+        or when the response says ``more_data_available``.
+        """
         base_url = self._endpoint.base_url
         if not base_url:
-            return []
+            return
 
         # Build the structures URL. OPTIMADE spec requires /v1/structures.
         # Some base_urls already include /v1 (e.g. from discovery), others
@@ -51,25 +113,70 @@ class OptimadeProvider(Provider):
             url = f"{base}/structures"
         else:
             url = f"{base}/v1/structures"
-        params = {}
+        params: dict[str, str] | None = {}
         if filter_string:
             params["filter"] = filter_string
-        params["page_limit"] = str(
-            min(query.limit, self._endpoint.behavior.max_results)
-        )
+        # Only the attributes we parse; skips site positions, species, etc.
+        params["response_fields"] = ",".join(dict.fromkeys((
+            *_RESPONSE_FIELDS,
+            *self.capabilities.provider_specific_fields,
+            *self.capabilities.property_fields.values(),
+        )))
+        # max_results caps the page size; pagination reaches the limit
+        page_size = min(limit, self._endpoint.behavior.max_results)
+        params["page_limit"] = str(page_size)
+        paginate = self._endpoint.capabilities.supports_pagination
 
-        timeout = self._endpoint.behavior.timeout_ms / 1000
-        headers = {"Accept": "application/json"}
+        remaining = limit
+        while url and remaining > 0:
+            data = await self._fetch_page(url, params)
+
+            # Check for OPTIMADE error responses
+            errors = data.get("errors", [])
+            entries = data.get("data", [])
+            if errors and not entries:
+                err = errors[0]
+                if isinstance(err, dict):
+                    err = err.get("detail", err.get("title", str(err)))
+                raise RuntimeError(f"Provider '{self.id}' returned error: {str(err)[:200]}")
+            if not isinstance(entries, list) or not entries:
+                return
 
+            materials = []
+            for entry in entries[:remaining]:
+                try:
+                    m = self._parse_entry(entry)
+                    if m:
+                        materials.append(m)
+                except Exception as e:
+                    logger.debug("Failed to parse entry: %s", e)
+            taken = min(len(entries), remaining)
+            remaining -= taken
+            nxt = self._next_link(data)
+            if remaining > 0 and paginate and nxt:
+                yield Page(materials)
+                url = nxt
+                # The next link carries the filter and page cursor itself
+                params = None
+                continue
+            # Last page: say whether the server had rows we did not take
+            meta = data.get("meta") or {}
+            yield Page(materials, more=bool(
+                nxt
+                or len(entries) > taken
+                or meta.get("more_data_available")
+                or (not paginate and remaining > 0 and len(entries) >= page_size)
+            ))
+            return
+
+    async def _fetch_page(self, url: str, params: dict[str, str] | None) -> dict:
+        import httpx
+
+        timeout = self._endpoint.behavior.timeout_ms / 1000
         try:
-            async with httpx.AsyncClient(
-                timeout=timeout,
-                headers=headers,
-                follow_redirects=True,
-            ) as client:
-                resp = await client.get(url, params=params)
-                resp.raise_for_status()
-                data = resp.json()
+            resp = await self.http.get(url, params=params, timeout=timeout)
+            resp.raise_for_status()
+            return resp.json()
         except httpx.TimeoutException:
             logger.warning("OPTIMADE timeout for %s (%.1fs)", self.id, timeout)
             raise
@@ -85,27 +192,13 @@ class OptimadeProvider(Provider):
             logger.warning("OPTIMADE query failed for %s: %s", self.id, e)
             raise
 
-        # Check for OPTIMADE error responses
-        errors = data.get("errors", [])
-        entries = data.get("data", [])
-        if errors and not entries:
-            err = errors[0]
-            if isinstance(err, dict):
-                err = err.get("detail", err.get("title", str(err)))
-            raise RuntimeError(f"Provider '{self.id}' returned error: {str(err)[:200]}")
-
-        materials = []
-        if isinstance(entries, list):
-            for entry in entries:
-                try:
-                    m = self._parse_entry(entry)
-                    if m:
-                        materials.append(m)
-                except Exception as e:
-                    logger.debug("Failed to parse entry: %s", e)
-
-        limit = min(query.limit, self._endpoint.behavior.max_results)
-        return materials[:limit]
+    @staticmethod
+    def _next_link(data: dict) -> str | None:
+        """``links.next`` is either a URL string or a ``{"href": ...}`` link object."""
+        nxt = (data.get("links") or {}).get("next")
+        if isinstance(nxt, dict):
+            nxt = nxt.get("href")
+        return nxt or None
 
     def _parse_response(self, results: dict, filter_string: str) -> list[Material]:
         """Parse the nested OptimadeClient response into Material objects.
@@ -170,6 +263,15 @@ class OptimadeProvider(Provider):
         if lv_val:
             lattice = PropertyValue(value=lv_val, source=source)
 
+        # Query properties this provider returns under its own field names
+        props: dict[str, PropertyValue] = {}
+        for name, field in self.capabilities.property_fields.items():
+            val = attrs.get(field)
+            if val is not None:
+                props[name] = PropertyValue(
+                    value=val, source=source, unit=_PROPERTY_UNITS.get(name),
+                )
+
         # Provider-specific fields (prefixed with _)
         extra = {}
         for key, val in attrs.items():
@@ -188,17 +290,15 @@ class OptimadeProvider(Provider):
             space_group=space_group,
             lattice_vectors=lattice,
             extra_properties=extra,
+            **props,
             raw=attrs,
         )
 
     async def health_check(self) -> bool:
         """Check if this endpoint is responding."""
-        import httpx
-
         try:
             url = f"{self._endpoint.base_url}/{self._endpoint.api_version}/info"
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(url)
-                return resp.status_code == 200
+            resp = await self.http.get(url, timeout=5.0)
+            return resp.status_code == 200
         except Exception:
             return False
@@ -64,13 +64,33 @@ def build_registry(
     cache_path=None,
     overrides_path=None,
     skip_network: bool = False,
+    local_index: bool | None = None,
 ) -> ProviderRegistry:
     """Build the provider registry from all three layers.
 
     Layer 1: Discovery cache (OPTIMADE auto-discovery)
     Layer 2: Bundled overrides (tiers, capabilities, URL corrections)
     Layer 3: Platform/marketplace providers + user overrides
+
+    With ``PRISM_SEARCH_OFFLINE=1`` the offline materials index is the
+    only provider and no layer is loaded. Online, the index is added
+    (when its DB exists) only on an explicit opt-in: ``local_index=True``
+    or ``PRISM_SEARCH_LOCAL_INDEX=1``. ``local_index=False`` never adds it.
     """
+    from app.tools.search_engine.providers.local_index import (
+        LocalIndexProvider, LocalMaterialsIndex, default_index_path, local_index_opt_in,
+        offline_mode,
+    )
+
+    index_path = default_index_path()
+    if offline_mode():
+        reg = ProviderRegistry()
+        if not index_path.exists():
+            logger.warning("Offline search mode but no materials index at %s", index_path)
+        elif local_index is not False:
+            reg.register(LocalIndexProvider(LocalMaterialsIndex(index_path)))
+        return reg
+
     from pathlib import Path
     from app.tools.search_engine.providers.discovery import (
         load_cache, save_cache, is_cache_fresh, discover_providers,
@@ -115,4 +135,9 @@ def build_registry(
     platform = load_platform_providers()
     resolved.extend(platform)
 
-    return ProviderRegistry.from_endpoints(resolved)
+    reg = ProviderRegistry.from_endpoints(resolved)
+    if local_index is None:
+        local_index = local_index_opt_in()
+    if local_index and index_path.exists():
+        reg.register(LocalIndexProvider(LocalMaterialsIndex(index_path)))
+    return reg
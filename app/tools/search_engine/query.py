@@ -7,6 +7,14 @@ from typing import Literal
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
+# Element-set filters, and the numeric range fields, in the order the
+# query declares them
+COMPOSITION_FIELDS = ("elements", "elements_any", "exclude_elements")
+RANGE_FIELDS = (
+    "n_elements", "band_gap", "formation_energy",
+    "energy_above_hull", "bulk_modulus", "debye_temperature",
+)
+
 # Periodic table symbols — all 118 elements
 VALID_ELEMENTS = {
     "H", "He", "Li", "Be", "B", "C", "N", "O", "F", "Ne",
@@ -29,6 +37,17 @@ class PropertyRange(BaseModel):
     min: float | None = None
     max: float | None = None
 
+    def contains(self, other: PropertyRange | None) -> bool:
+        """True when every value inside ``other`` is inside this range."""
+        if other is None:
+            return self.min is None and self.max is None
+        lo_ok = self.min is None or (other.min is not None and other.min >= self.min)
+        hi_ok = self.max is None or (other.max is not None and other.max <= self.max)
+        return lo_ok and hi_ok
+
+    def admits(self, value: float) -> bool:
+        return (self.min is None or value >= self.min) and (self.max is None or value <= self.max)
+
     @model_validator(mode="after")
     def min_lte_max(self):
         if self.min is not None and self.max is not None and self.min > self.max:
@@ -79,3 +98,48 @@ class MaterialSearchQuery(BaseModel):
         data = self.model_dump(exclude_none=True, mode="json")
         raw = json.dumps(data, sort_keys=True)
         return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+    def filter_hash(self) -> str:
+        """``query_hash`` ignoring ``limit``: same filters, any page size."""
+        data = self.model_dump(exclude_none=True, exclude={"limit"}, mode="json")
+        raw = json.dumps(data, sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+    def subsumes(self, other: MaterialSearchQuery) -> bool:
+        """True when every material matching ``other`` also matches this query.
+
+        Compares filters only (not ``limit``). Conservative: fields whose
+        local check would depend on provider-side normalisation (formula,
+        space group, crystal system) must be equal rather than merely
+        narrower, so ``matches`` never has to evaluate them.
+        """
+        if set(self.providers or ()) != set(other.providers or ()):
+            return False
+        if (self.formula, self.space_group, self.crystal_system) != (
+            other.formula, other.space_group, other.crystal_system,
+        ):
+            return False
+        if not set(self.elements or ()) <= set(other.elements or ()):
+            return False
+        if not set(self.exclude_elements or ()) <= set(other.exclude_elements or ()):
+            return False
+        if self.elements_any is not None and (
+            other.elements_any is None or not set(other.elements_any) <= set(self.elements_any)
+        ):
+            return False
+        for name in RANGE_FIELDS:
+            mine = getattr(self, name)
+            if mine is not None and not mine.contains(getattr(other, name)):
+                return False
+        return True
+
+    def matches(self, material) -> bool:
+        """Evaluate the composition and numeric filters on a fused ``Material``.
+
+        Formula, space group and crystal system are not checked (see
+        ``subsumes``). A range filter rejects materials without a numeric
+        value for that property, as the providers' filters do.
+        """
+        from app.tools.search_engine.postfilter import residual_mask
+
+        return bool(residual_mask([material], self, COMPOSITION_FIELDS + RANGE_FIELDS)[0])
@@ -8,6 +8,9 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Literal
 
+# First-page latencies kept per provider for quantile estimates
+LATENCY_WINDOW = 50
+
 
 @dataclass
 class ProviderHealth:
@@ -18,6 +21,10 @@ class ProviderHealth:
     avg_latency_ms: float = 0.0
     success_count: int = 0
     failure_count: int = 0
+    # Most recent first-page latencies, oldest first (LATENCY_WINDOW long)
+    recent_latencies_ms: list[float] = field(default_factory=list)
+    # EWMA of materials returned per completed query
+    avg_yield: float = 0.0
 
     def should_query(self, cooldown_seconds: float = 300.0) -> bool:
         """Check if this provider should be queried.
@@ -44,6 +51,27 @@ class ProviderHealth:
             self.avg_latency_ms = latency_ms
         else:
             self.avg_latency_ms = 0.9 * self.avg_latency_ms + 0.1 * latency_ms
+        self.recent_latencies_ms.append(latency_ms)
+        del self.recent_latencies_ms[:-LATENCY_WINDOW]
+
+    def record_yield(self, n_results: int) -> None:
+        """Fold one completed query's result count into ``avg_yield``."""
+        if self.avg_yield == 0:
+            self.avg_yield = float(n_results)
+        else:
+            self.avg_yield = 0.8 * self.avg_yield + 0.2 * n_results
+
+    @property
+    def success_rate(self) -> float:
+        """Smoothed success probability (1/2 before any observation)."""
+        return (self.success_count + 1) / (self.success_count + self.failure_count + 2)
+
+    def latency_quantile(self, q: float) -> float | None:
+        """Nearest-rank ``q`` quantile of recent latencies, or ``None`` if unseen."""
+        if not self.recent_latencies_ms:
+            return None
+        ordered = sorted(self.recent_latencies_ms)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
 
     def record_failure(self) -> None:
         self.consecutive_failures += 1
@@ -61,6 +89,8 @@ class ProviderHealth:
             "avg_latency_ms": self.avg_latency_ms,
             "success_count": self.success_count,
             "failure_count": self.failure_count,
+            "recent_latencies_ms": self.recent_latencies_ms,
+            "avg_yield": self.avg_yield,
         }
 
     @classmethod
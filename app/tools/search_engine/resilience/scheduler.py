@@ -0,0 +1,82 @@
+"""Latency-aware provider scheduling from HealthManager statistics.
+
+Three decisions per search, each falling back to the old fixed behaviour
+until a provider has ``min_samples`` recorded latencies:
+
+- **Order.** Providers are started by expected yield per millisecond
+  (success rate x average results / median latency), so the fast,
+  productive ones take the fan-out semaphore first. Providers without
+  history score the median of the known ones and keep registry order
+  among themselves.
+- **Timeout.** Per-page timeout is ``timeout_factor`` x p95 latency,
+  clamped to ``[min_timeout, cap]`` where ``cap`` is the static limit.
+- **Hedging.** A duplicate request is sent once the first page is
+  slower than the provider's p95; whichever answers first is used.
+"""
+from __future__ import annotations
+
+import statistics
+from typing import TYPE_CHECKING
+
+from app.tools.search_engine.resilience.circuit_breaker import HealthManager, ProviderHealth
+
+if TYPE_CHECKING:
+    from app.tools.search_engine.providers.base import Provider
+
+
+class LatencyScheduler:
+    """Orders providers and sizes their timeouts from observed latency."""
+
+    def __init__(
+        self,
+        health: HealthManager,
+        *,
+        min_samples: int = 5,
+        hedge_quantile: float = 0.95,
+        timeout_factor: float = 2.0,
+        min_timeout: float = 0.5,
+    ):
+        self._health = health
+        self.min_samples = min_samples
+        self.hedge_quantile = hedge_quantile
+        self.timeout_factor = timeout_factor
+        self.min_timeout = min_timeout
+
+    def _observed(self, h: ProviderHealth) -> bool:
+        return len(h.recent_latencies_ms) >= self.min_samples
+
+    def score(self, provider_id: str) -> float | None:
+        """Expected materials per millisecond, or ``None`` without history."""
+        h = self._health.get(provider_id)
+        if not self._observed(h):
+            return None
+        latency = max(h.latency_quantile(0.5), 1.0)
+        return h.success_rate * max(h.avg_yield, 1.0) / latency
+
+    def order(self, providers: list[Provider]) -> list[Provider]:
+        """``providers`` by descending score (stable for ties and unknowns)."""
+        scores = {p.id: self.score(p.id) for p in providers}
+        known = [s for s in scores.values() if s is not None]
+        if not known:
+            return list(providers)
+        prior = statistics.median(known)
+        return sorted(
+            providers,
+            key=lambda p: -(scores[p.id] if scores[p.id] is not None else prior),
+        )
+
+    def timeout(self, provider_id: str, cap: float) -> float:
+        """Per-page timeout in seconds: a multiple of p95, never above ``cap``."""
+        h = self._health.get(provider_id)
+        if not self._observed(h):
+            return cap
+        p95 = h.latency_quantile(0.95) / 1000
+        return min(cap, max(self.min_timeout, self.timeout_factor * p95))
+
+    def hedge_after(self, provider_id: str, timeout: float) -> float | None:
+        """Seconds to wait for a first page before hedging, or ``None`` (don't)."""
+        h = self._health.get(provider_id)
+        if not self._observed(h):
+            return None
+        delay = h.latency_quantile(self.hedge_quantile) / 1000
+        return delay if delay < timeout else None
@@ -59,6 +59,10 @@ class ProviderQueryLog(BaseModel):
 
     pages_fetched: int = 1
     truncated: bool = False
+    # Rows the client-side post-filter dropped (filters not pushed down)
+    rejected_count: int = 0
+    # A duplicate first-page request was sent after the provider's p95
+    hedged: bool = False
 
 
 class SearchResult(BaseModel):
@@ -29,7 +29,6 @@ fan out automatically.
 
 from __future__ import annotations
 
-import asyncio
 import logging
 
 from app.tools.base import Tool, ToolRegistry
@@ -176,15 +175,60 @@ _MATERIALS_SEARCH_SCHEMA: dict = {
 }
 
 
-def _materials_search_factory(provider_registry: ProviderRegistry):
+_MATERIALS_SEARCH_BATCH_SCHEMA: dict = {
+    "type": "object",
+    "description": (
+        "Run several materials searches in one call, e.g. every binary of "
+        "a candidate element list. Identical queries run once, queries "
+        "that differ only in their element lists share one request per "
+        "provider, and all provider requests share one concurrency "
+        "budget. Results come back in the order of `queries`."
+    ),
+    "properties": {
+        "queries": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "properties": _MATERIALS_SEARCH_SCHEMA["properties"],
+                "additionalProperties": False,
+            },
+            "description": "Search queries, each shaped like a `materials_search` call.",
+        },
+    },
+    "required": ["queries"],
+    "additionalProperties": False,
+}
+
+
+def _format_result(query: MaterialSearchQuery, result) -> dict:
+    """JSON-serialisable shape of one search result, provenance included."""
+    # The agent should be able to cite "Materials Project says X for
+    # Inconel 718" vs "OPTIMADE-Alexandria says Y."
+    return {
+        "materials": [m.model_dump(mode="json") for m in result.materials],
+        "count": len(result.materials),
+        "providers_queried": [
+            {
+                "provider": log.provider_name,
+                "endpoint": log.endpoint_url,
+                "latency_ms": log.latency_ms,
+                "ok": getattr(log, "ok", True),
+            }
+            for log in result.query_log
+        ],
+        "query_hash": query.query_hash(),
+    }
+
+
+def _materials_search_factory(engine: SearchEngine):
     """Build the closure that knows how to invoke SearchEngine.
 
-    Held over a single SearchEngine instance per process so cache +
-    circuit-breaker state are shared across calls. Cheap to keep alive
-    because the engine itself is mostly references to the registry +
-    cache backends.
+    Held over a single SearchEngine instance per process so cache,
+    circuit-breaker state and pooled HTTP connections are shared across
+    calls. Cheap to keep alive because the engine itself is mostly
+    references to the registry + cache backends.
     """
-    engine = SearchEngine(provider_registry)
 
     def _materials_search(**kwargs) -> dict:
         # Pydantic-validate the inbound shape so a bad agent call fails
@@ -192,16 +236,11 @@ def _materials_search_factory(provider_registry: ProviderRegistry):
         query = MaterialSearchQuery(**_normalize_property_ranges(kwargs))
 
         # SearchEngine.search() is async; we're called from sync MCP.
-        # Spin up a fresh loop per call (the engine spawns its own
-        # tasks internally). This is fine for the tool-call cadence;
-        # if we ever want to share an event loop, refactor the
-        # registration to expose async tools natively.
+        # search_sync runs it on the engine's long-lived I/O loop, so
+        # the pooled provider connections stay warm between calls
+        # instead of dying with a per-call loop.
         try:
-            loop = asyncio.new_event_loop()
-            try:
-                result = loop.run_until_complete(engine.search(query))
-            finally:
-                loop.close()
+            result = engine.search_sync(query)
         except Exception as exc:
             logger.exception("materials_search failed")
             return {
@@ -209,26 +248,33 @@ def _materials_search_factory(provider_registry: ProviderRegistry):
                 "error_type": type(exc).__name__,
                 "query": query.model_dump(exclude_none=True, mode="json"),
             }
+        return _format_result(query, result)
+
+    return _materials_search
 
-        # Return a JSON-serialisable shape that keeps provenance — the
-        # agent should be able to cite "Materials Project says X for
-        # Inconel 718" vs "OPTIMADE-Alexandria says Y."
+
+def _materials_search_batch_factory(engine: SearchEngine):
+    """Closure for ``materials_search_batch`` over the shared engine."""
+
+    def _materials_search_batch(queries: list[dict]) -> dict:
+        # Validate every query before any request goes out
+        try:
+            parsed = [MaterialSearchQuery(**_normalize_property_ranges(q)) for q in queries]
+        except Exception as exc:
+            return {"error": str(exc), "error_type": type(exc).__name__}
+
+        try:
+            results = engine.search_many_sync(parsed)
+        except Exception as exc:
+            logger.exception("materials_search_batch failed")
+            return {"error": str(exc), "error_type": type(exc).__name__}
         return {
-            "materials": [m.model_dump(mode="json") for m in result.materials],
-            "count": len(result.materials),
-            "providers_queried": [
-                {
-                    "provider": log.provider_name,
-                    "endpoint": log.endpoint_url,
-                    "latency_ms": log.latency_ms,
-                    "ok": getattr(log, "ok", True),
-                }
-                for log in result.query_log
-            ],
-            "query_hash": query.query_hash(),
+            "results": [_format_result(q, r) for q, r in zip(parsed, results)],
+            "count": len(results),
+            "unique_queries": len({q.query_hash() for q in parsed}),
         }
 
-    return _materials_search
+    return _materials_search_batch
 
 
 def _normalize_property_ranges(kwargs: dict) -> dict:
@@ -264,10 +310,12 @@ def create_search_engine_tools(
     registry: ToolRegistry,
     provider_registry: ProviderRegistry,
 ) -> None:
-    """Register `materials_search` as the federated MCP tool surface.
+    """Register `materials_search` and `materials_search_batch` as the
+    federated MCP tool surface. Both share one SearchEngine.
 
     Idempotent — safe to call multiple times if bootstrap reloads.
     """
+    engine = SearchEngine(provider_registry)
     registry.register(
         Tool(
             name="materials_search",
@@ -280,10 +328,26 @@ def create_search_engine_tools(
                 "queries instead of picking a per-DB tool."
             ),
             input_schema=_MATERIALS_SEARCH_SCHEMA,
-            func=_materials_search_factory(provider_registry),
+            func=_materials_search_factory(engine),
+            requires_approval=False,
+            source="builtin",
+            source_detail="search_engine.federated",
+        )
+    )
+    registry.register(
+        Tool(
+            name="materials_search_batch",
+            description=(
+                "Run many federated materials searches at once (e.g. a "
+                "screening sweep over element combinations). Deduplicates "
+                "queries and merges sibling queries into shared provider "
+                "requests. Prefer this over repeated materials_search calls."
+            ),
+            input_schema=_MATERIALS_SEARCH_BATCH_SCHEMA,
+            func=_materials_search_batch_factory(engine),
             requires_approval=False,
             source="builtin",
             source_detail="search_engine.federated",
         )
     )
-    logger.info("Registered materials_search tool (federated provider registry)")
+    logger.info("Registered materials_search tools (federated provider registry)")
@@ -1,16 +1,22 @@
 """Deterministic query translation -- MaterialSearchQuery to provider-native syntax."""
 from __future__ import annotations
 
-from app.tools.search_engine.query import MaterialSearchQuery
+from app.tools.search_engine.query import RANGE_FIELDS, MaterialSearchQuery
 
 
 class QueryTranslator:
     """Converts MaterialSearchQuery into provider-specific query formats."""
 
     @staticmethod
-    def to_optimade(query: MaterialSearchQuery) -> str:
-        """MaterialSearchQuery -> OPTIMADE filter string."""
+    def to_optimade(query: MaterialSearchQuery, property_fields: dict[str, str] | None = None) -> str:
+        """MaterialSearchQuery -> OPTIMADE filter string.
+
+        Property ranges and ``crystal_system`` have no standard OPTIMADE
+        field; they are emitted only when ``property_fields`` names the
+        provider's own field for them.
+        """
         parts: list[str] = []
+        property_fields = property_fields or {}
 
         if query.elements:
             quoted = ",".join(f'"{e}"' for e in query.elements)
@@ -36,6 +42,19 @@ class QueryTranslator:
         if query.space_group:
             parts.append(f'space_group_symbol="{query.space_group}"')
 
+        for name in RANGE_FIELDS:
+            rng = getattr(query, name)
+            field = property_fields.get(name)
+            if rng is None or field is None or name == "n_elements":
+                continue
+            if rng.min is not None:
+                parts.append(f"{field}>={rng.min!r}")
+            if rng.max is not None:
+                parts.append(f"{field}<={rng.max!r}")
+
+        if query.crystal_system and "crystal_system" in property_fields:
+            parts.append(f'{property_fields["crystal_system"]}="{query.crystal_system}"')
+
         return " AND ".join(parts) if parts else ""
 
     @staticmethod
@@ -42,6 +42,8 @@ class FakeBackend(Backend):
 
     def __init__(self) -> None:
         self._cancelled: set[str] = set()
+        # (element, head, dtype) already "relaxed" by prewarm_references
+        self._mu_table: set[tuple[str, str, str]] = set()
 
     # ------------------------------------------------------------------
     def execute(self, job: BackendJob, progress: ProgressCb | None = None) -> dict[str, Any]:
@@ -59,6 +61,8 @@ class FakeBackend(Backend):
             return self._md(job, progress)
         if tool == "phonon_harmonic":
             return self._phonon(job, progress)
+        if tool == "prewarm_references":
+            return self._prewarm(job, progress)
         raise ValueError(f"FakeBackend does not implement tool {tool!r}")
 
     def cancel(self, job_id: str) -> None:
@@ -233,6 +237,28 @@ class FakeBackend(Backend):
             "backend_details": {"backend": "fake"},
         }
 
+    def _prewarm(self, job: BackendJob, progress: ProgressCb | None) -> dict[str, Any]:
+        ip = job.input_payload
+        opts = ip.get("options", {})
+        head, dtype = opts.get("head", "omat_pbe"), opts.get("dtype", "float64")
+        elements = list(dict.fromkeys(ip["elements"]))
+        cached = [el for el in elements if (el, head, dtype) in self._mu_table]
+        computed = [el for el in elements if el not in cached]
+        for i, el in enumerate(computed):
+            if job.cache_key in self._cancelled:
+                raise InterruptedError("cancelled")
+            self._mu_table.add((el, head, dtype))
+            if progress is not None:
+                progress(100.0 * (i + 1) / len(computed), f"element {i + 1}/{len(computed)}", i + 1, len(computed))
+        return {
+            "mu_eV_per_atom": {el: _E_REF[el] for el in elements},
+            "computed": computed,
+            "cached": cached,
+            "head": head,
+            "wall_time_s": 0.01,
+            "backend_details": {"backend": "fake"},
+        }
+
     # ------------------------------------------------------------------
     @staticmethod
     def _resolve_composition(ip: dict[str, Any]) -> dict[str, int]:
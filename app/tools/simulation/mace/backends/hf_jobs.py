@@ -171,7 +171,9 @@ class HfJobsBackend(Backend):
             )
             if (artifacts / "structure.cif").exists():
                 result["cif_text"] = (artifacts / "structure.cif").read_text()
-            if (artifacts / "traj.json").exists():
+            if (artifacts / "traj" / "meta.json").exists():
+                result["traj_dir"] = str(artifacts / "traj")
+            elif (artifacts / "traj.json").exists():  # payloads from before the binary format
                 result["traj_json"] = json.loads((artifacts / "traj.json").read_text())
             return result
 
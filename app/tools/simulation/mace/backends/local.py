@@ -11,7 +11,9 @@ from __future__ import annotations
 
 import io
 import time
-from typing import Any
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Iterator
 
 import numpy as np
 
@@ -21,8 +23,10 @@ from .base import Backend, BackendJob, ProgressCb
 class LocalBackend(Backend):
     name = "local"
 
-    def __init__(self) -> None:
+    def __init__(self, cache_root: Path | None = None) -> None:
         self._cancelled: set[str] = set()
+        # Where the μ-reference table lives; the bridge passes its cache root
+        self._cache_root = Path(cache_root) if cache_root else None
 
     def cancel(self, job_id: str) -> None:
         self._cancelled.add(job_id)
@@ -30,28 +34,72 @@ class LocalBackend(Backend):
     # ------------------------------------------------------------------
     def execute(self, job: BackendJob, progress: ProgressCb | None = None) -> dict[str, Any]:
         tool = job.tool_name
-        if tool == "relax_structure":
-            return self._relax(job, progress)
-        if tool == "compute_elastic":
-            return self._elastic(job, progress)
-        if tool == "compute_dilute_solute":
-            return self._dilute(job, progress)
-        if tool == "md_equilibrate":
-            return self._md(job, progress)
-        if tool == "phonon_harmonic":
-            return self._phonon(job, progress)
-        raise ValueError(f"LocalBackend does not implement tool {tool!r}")
+        handlers = {
+            "relax_structure": self._relax,
+            "compute_elastic": self._elastic,
+            "compute_dilute_solute": self._dilute,
+            "md_equilibrate": self._md,
+            "phonon_harmonic": self._phonon,
+            "prewarm_references": self._prewarm,
+        }
+        if tool not in handlers:
+            raise ValueError(f"LocalBackend does not implement tool {tool!r}")
+        with self._calc(job.input_payload) as calc:
+            return handlers[tool](job, calc, progress)
 
     # ------------------------------------------------------------------
-    def _make_calc(self, ip: dict[str, Any]):
-        from app.tools.simulation.mace.core.calculator import make_calc
+    @contextmanager
+    def _calc(self, ip: dict[str, Any]) -> Iterator[Any]:
+        """A warm calculator from the process-wide pool, held for one job."""
+        from app.tools.simulation.mace.core.calculator import get_calculator_pool
 
         opts = ip.get("options", {})
         head = opts.get("head", "omat_pbe")
         dtype = opts.get("dtype", "float64")
         dev_pref = opts.get("device_preference", "auto")
         device = None if dev_pref == "auto" else dev_pref
-        return make_calc(head=head, device=device, dtype=dtype)
+        with get_calculator_pool().checkout(head=head, device=device, dtype=dtype) as calc:
+            yield calc
+
+    def _references(self):
+        """The μ-reference table in this backend's cache root."""
+        from app.tools.simulation.mace.auth import get_cache_dir
+        from app.tools.simulation.mace.cache.references import get_reference_table
+
+        return get_reference_table(self._cache_root or get_cache_dir())
+
+    def prewarm_references(
+        self,
+        elements: list[str],
+        head: str = "omat_pbe",
+        dtype: str = "float64",
+        device: str | None = None,
+    ) -> dict[str, Any]:
+        """Compute the missing pure-element μ for ``elements`` under one calculator."""
+        opts = {"head": head, "dtype": dtype, "device_preference": device or "auto"}
+        with self._calc({"options": opts}) as calc:
+            return self._references().prewarm(elements, calc, head=head, dtype=dtype)
+
+    def _prewarm(self, job: BackendJob, calc, progress: ProgressCb | None) -> dict[str, Any]:
+        opts = job.input_payload.get("options", {})
+        head = opts.get("head", "omat_pbe")
+        t0 = time.time()
+        prog_cb = None
+        if progress is not None:
+            def prog_cb(done: int, total: int):
+                if job.cache_key in self._cancelled:
+                    raise InterruptedError("cancelled")
+                progress(min(99.0, 100.0 * done / max(total, 1)), f"element {done}/{total}", done, total)
+        out = self._references().prewarm(
+            job.input_payload["elements"], calc,
+            head=head, dtype=opts.get("dtype", "float64"), progress=prog_cb,
+        )
+        return {
+            **out,
+            "head": head,
+            "wall_time_s": time.time() - t0,
+            "backend_details": {"backend": "local"},
+        }
 
     def _build_supercell(self, comp: dict[str, int], phase: str, seed: int):
         from app.tools.simulation.mace.core.builders import build_supercell, build_c14_laves
@@ -129,12 +177,11 @@ class LocalBackend(Backend):
         return buf.getvalue().decode("utf-8")
 
     # ------------------------------------------------------------------
-    def _relax(self, job: BackendJob, progress: ProgressCb | None) -> dict[str, Any]:
+    def _relax(self, job: BackendJob, calc, progress: ProgressCb | None) -> dict[str, Any]:
         from app.tools.simulation.mace.core.relax import relax
 
         ip = job.input_payload
         atoms, comp, phase = self._atoms_from_input(ip, job.seed)
-        calc = self._make_calc(ip)
         fmax = ip.get("fmax_eV_per_A", 0.05)
         max_steps = ip.get("max_steps", 200)
 
@@ -164,12 +211,11 @@ class LocalBackend(Backend):
         }
 
     # ------------------------------------------------------------------
-    def _elastic(self, job: BackendJob, progress: ProgressCb | None) -> dict[str, Any]:
+    def _elastic(self, job: BackendJob, calc, progress: ProgressCb | None) -> dict[str, Any]:
         from app.tools.simulation.mace.core.elastic import elastic_tensor, summarize_elastic
 
         ip = job.input_payload
         atoms, _, _ = self._atoms_from_input(ip, job.seed)
-        calc = self._make_calc(ip)
         atoms.calc = calc
         # First relax (cheap) so reference stress is near zero.
         from app.tools.simulation.mace.core.relax import relax as _relax_fn
@@ -196,13 +242,11 @@ class LocalBackend(Backend):
         }
 
     # ------------------------------------------------------------------
-    def _dilute(self, job: BackendJob, progress: ProgressCb | None) -> dict[str, Any]:
+    def _dilute(self, job: BackendJob, calc, progress: ProgressCb | None) -> dict[str, Any]:
         from app.tools.simulation.mace.core.relax import relax
-        from app.tools.simulation.mace.core.compositions import pure_element_energy
 
         ip = job.input_payload
         atoms, comp, phase = self._atoms_from_input(ip, job.seed)
-        calc = self._make_calc(ip)
         atoms.calc = calc
         relax(atoms, calc, fmax=0.05, steps=200)
         e_matrix = float(atoms.get_potential_energy() / len(atoms))
@@ -222,8 +266,12 @@ class LocalBackend(Backend):
         e_sub_total = float(test.get_potential_energy())
         e_alloy_total = e_matrix * len(atoms)
 
-        mu_sol = pure_element_energy(solute, calc)
-        mu_disp = pure_element_energy(displaced, calc)
+        opts = ip.get("options", {})
+        mu = self._references().mu(
+            [solute, displaced], calc,
+            head=opts.get("head", "omat_pbe"), dtype=opts.get("dtype", "float64"),
+        )
+        mu_sol, mu_disp = mu[solute], mu[displaced]
         e_sub = (e_sub_total - e_alloy_total) - mu_sol + mu_disp
 
         return {
@@ -239,12 +287,12 @@ class LocalBackend(Backend):
         }
 
     # ------------------------------------------------------------------
-    def _md(self, job: BackendJob, progress: ProgressCb | None) -> dict[str, Any]:
+    def _md(self, job: BackendJob, calc, progress: ProgressCb | None) -> dict[str, Any]:
+        from app.tools.simulation.mace.cache.trajectory import TrajectoryWriter
         from app.tools.simulation.mace.core.md import langevin_run
 
         ip = job.input_payload
         atoms, comp, phase = self._atoms_from_input(ip, job.seed)
-        calc = self._make_calc(ip)
         # Pre-relax
         from app.tools.simulation.mace.core.relax import relax as _relax_fn
 
@@ -256,37 +304,51 @@ class LocalBackend(Backend):
                     raise InterruptedError("cancelled")
                 progress(min(99.0, 100.0 * step / max(total, 1)), f"md {step}/{total}", step, total)
 
-        mdr = langevin_run(
-            atoms,
-            calc,
-            T_K=ip["T_K"],
-            n_steps=ip.get("n_steps", 1000),
-            timestep_fs=ip.get("timestep_fs", 1.0),
-            friction_per_fs=ip.get("friction_per_fs", 0.01),
-            sample_every=ip.get("sample_every"),
-            seed=job.seed,
-            progress=prog_cb,
-        )
+        traj_dir = job.extras.get("traj_dir")
+        writer = TrajectoryWriter(
+            traj_dir,
+            atoms.get_chemical_symbols(),
+            pbc=atoms.pbc,
+            dtype=ip.get("traj_dtype", "float32"),
+            compress=ip.get("traj_compress", False),
+        ) if traj_dir else None
+        with writer or nullcontext():
+            mdr = langevin_run(
+                atoms,
+                calc,
+                T_K=ip["T_K"],
+                n_steps=ip.get("n_steps", 1000),
+                timestep_fs=ip.get("timestep_fs", 1.0),
+                friction_per_fs=ip.get("friction_per_fs", 0.01),
+                sample_every=ip.get("sample_every"),
+                seed=job.seed,
+                progress=prog_cb,
+                trajectory=writer,
+            )
+        if writer is not None:
+            traj = {"traj_dir": traj_dir}
+        else:
+            traj = {"traj_json": {"steps": mdr.steps, "energies": mdr.energies, "temperatures": mdr.temperatures}}
         return {
             "mean_E_per_atom_eV": mdr.mean_E_per_atom_eV,
             "std_E_per_atom_eV": mdr.std_E_per_atom_eV,
             "mean_T_K": mdr.mean_T_K,
             "rdf_r_A": mdr.rdf_r_A,
             "rdf_g": mdr.rdf_g,
+            "rdf_partials": mdr.rdf_partials,
             "is_dynamically_stable": mdr.is_dynamically_stable,
             "wall_time_s": mdr.wall_time_s,
             "cif_text": self._cif_text(mdr.final_atoms),
-            "traj_json": {"steps": mdr.steps, "energies": mdr.energies, "temperatures": mdr.temperatures},
+            **traj,
             "backend_details": {"backend": "local"},
         }
 
     # ------------------------------------------------------------------
-    def _phonon(self, job: BackendJob, progress: ProgressCb | None) -> dict[str, Any]:
+    def _phonon(self, job: BackendJob, calc, progress: ProgressCb | None) -> dict[str, Any]:
         from app.tools.simulation.mace.core.phonons import harmonic_free_energy
 
         ip = job.input_payload
         atoms, _, _ = self._atoms_from_input(ip, job.seed)
-        calc = self._make_calc(ip)
         # Pre-relax
         from app.tools.simulation.mace.core.relax import relax as _relax_fn
 
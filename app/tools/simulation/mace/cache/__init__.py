@@ -1,6 +1,16 @@
 """Content-addressed cache for MACE results."""
 
 from .hashing import cache_key, canonical_structure_repr
+from .references import ReferenceTable, get_reference_table
 from .store import CacheStore
+from .trajectory import TrajectoryReader, TrajectoryWriter
 
-__all__ = ["cache_key", "canonical_structure_repr", "CacheStore"]
+__all__ = [
+    "cache_key",
+    "canonical_structure_repr",
+    "CacheStore",
+    "ReferenceTable",
+    "get_reference_table",
+    "TrajectoryReader",
+    "TrajectoryWriter",
+]
@@ -0,0 +1,211 @@
+"""Persistent pure-element chemical-potential (μ) references.
+
+The μ of an element is the energy per atom of its relaxed ground-state
+bulk (:func:`~app.tools.simulation.mace.core.compositions.pure_element_energy`).
+It depends only on the element, the model weights, the head, the dtype
+and the relaxation protocol — never on the job that asked for it — so it
+is computed once and kept in ``<cache_root>/mu_references.db`` next to the
+job database. Each row records the versions and git sha it was computed
+with.
+
+A single connection is shared across threads (WAL mode,
+check_same_thread=False), like :class:`~..jobs.store.JobStore`. Two jobs
+that miss on the same element concurrently both compute it; the first
+row written wins.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+REFERENCES_DB = "mu_references.db"
+
+# pure_element_energy's relaxation protocol; part of every row's key
+REFERENCE_FMAX = 0.02
+REFERENCE_STEPS = 80
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mu_references (
+    element         TEXT NOT NULL,
+    head            TEXT NOT NULL,
+    dtype           TEXT NOT NULL,
+    model_sha256    TEXT NOT NULL,
+    fmax            REAL NOT NULL,
+    steps           INTEGER NOT NULL,
+    mu_eV_per_atom  REAL NOT NULL,
+    phase           TEXT NOT NULL,
+    provenance_json TEXT NOT NULL,
+    created_at      TEXT NOT NULL,
+    PRIMARY KEY (element, head, dtype, model_sha256, fmax, steps)
+);
+"""
+
+
+class ReferenceTable:
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    def lookup(
+        self,
+        elements: Iterable[str],
+        *,
+        head: str,
+        dtype: str,
+        model_sha256: str,
+        fmax: float = REFERENCE_FMAX,
+        steps: int = REFERENCE_STEPS,
+    ) -> dict[str, float]:
+        """Stored μ for those of ``elements`` that have one."""
+        elements = list(dict.fromkeys(elements))
+        if not elements:
+            return {}
+        marks = ",".join("?" * len(elements))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT element, mu_eV_per_atom FROM mu_references
+                    WHERE head = ? AND dtype = ? AND model_sha256 = ?
+                      AND fmax = ? AND steps = ? AND element IN ({marks})""",
+                (head, dtype, model_sha256, fmax, steps, *elements),
+            ).fetchall()
+        return {r["element"]: r["mu_eV_per_atom"] for r in rows}
+
+    def put(
+        self,
+        element: str,
+        mu_eV_per_atom: float,
+        *,
+        head: str,
+        dtype: str,
+        model_sha256: str,
+        phase: str,
+        provenance: dict[str, Any],
+        fmax: float = REFERENCE_FMAX,
+        steps: int = REFERENCE_STEPS,
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR IGNORE INTO mu_references
+                   (element, head, dtype, model_sha256, fmax, steps,
+                    mu_eV_per_atom, phase, provenance_json, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    element, head, dtype, model_sha256, fmax, steps,
+                    float(mu_eV_per_atom), phase,
+                    json.dumps(provenance, default=str),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def rows(self, head: str | None = None) -> list[dict[str, Any]]:
+        """Every stored reference (optionally for one head), with provenance."""
+        q = "SELECT * FROM mu_references"
+        args: tuple = ()
+        if head is not None:
+            q += " WHERE head = ?"
+            args = (head,)
+        with self._lock:
+            rows = self._conn.execute(q + " ORDER BY head, element", args).fetchall()
+        out = []
+        for r in rows:
+            d = dict(r)
+            d["provenance"] = json.loads(d.pop("provenance_json"))
+            out.append(d)
+        return out
+
+    # ------------------------------------------------------------------
+    def mu(
+        self,
+        elements: Iterable[str],
+        calc,
+        *,
+        head: str,
+        dtype: str,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> dict[str, float]:
+        """μ for every element in ``elements``, computing and storing the misses.
+
+        ``calc`` must be the calculator for ``head``/``dtype``; its weights
+        are identified by :func:`~..core.calculator.model_fingerprint`.
+        ``progress(done, total)`` is called after each computed element.
+        """
+        from ..core.calculator import model_fingerprint
+        from ..core.compositions import pure_element_energy
+        from ..core.lattices import GROUND_STATE_PHASE
+
+        elements = list(dict.fromkeys(elements))
+        sha = model_fingerprint(calc)
+        found = self.lookup(elements, head=head, dtype=dtype, model_sha256=sha)
+        missing = [el for el in elements if el not in found]
+        for i, el in enumerate(missing):
+            found[el] = pure_element_energy(el, calc, fmax=REFERENCE_FMAX, steps=REFERENCE_STEPS)
+            self.put(
+                el, found[el], head=head, dtype=dtype, model_sha256=sha,
+                phase=GROUND_STATE_PHASE[el], provenance=_provenance(),
+            )
+            if progress is not None:
+                progress(i + 1, len(missing))
+        return {el: found[el] for el in elements}
+
+    def prewarm(
+        self,
+        elements: Iterable[str],
+        calc,
+        *,
+        head: str,
+        dtype: str,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> dict[str, Any]:
+        """Fill in μ for a whole element set with one calculator; report what was new."""
+        from ..core.calculator import model_fingerprint
+
+        elements = list(dict.fromkeys(elements))
+        before = self.lookup(elements, head=head, dtype=dtype, model_sha256=model_fingerprint(calc))
+        mu = self.mu(elements, calc, head=head, dtype=dtype, progress=progress)
+        return {
+            "mu_eV_per_atom": mu,
+            "computed": [el for el in elements if el not in before],
+            "cached": [el for el in elements if el in before],
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _provenance() -> dict[str, Any]:
+    from ..ids import git_dirty, git_sha
+    from ..jobs.provenance import collect_versions
+
+    return {
+        "source": "pure_element_energy",
+        "versions": collect_versions(),
+        "git": {"mace_mcp_sha": git_sha(), "dirty": git_dirty()},
+    }
+
+
+_tables: dict[Path, ReferenceTable] = {}
+_tables_lock = threading.Lock()
+
+
+def get_reference_table(cache_root: Path) -> ReferenceTable:
+    """The shared table stored under ``cache_root``."""
+    path = Path(cache_root) / REFERENCES_DB
+    with _tables_lock:
+        if path not in _tables:
+            _tables[path] = ReferenceTable(path)
+        return _tables[path]
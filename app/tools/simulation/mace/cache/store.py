@@ -6,7 +6,8 @@ Layout::
       <sha256>/
         result.json         # tool result (serialised)
         structure.cif       # primary structure (if any)
-        traj.json           # trajectory (md_equilibrate)
+        traj/               # chunked binary trajectory (md_equilibrate, see trajectory.py)
+        .traj-<job_id>/     # a running job's trajectory, renamed to traj/ on success
         provenance.json     # full provenance
         meta.json           # bookkeeping (tool, created_at, source_job_id)
 
@@ -22,7 +23,10 @@ import shutil
 import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .trajectory import TrajectoryReader
 
 
 class CacheStore:
@@ -62,8 +66,55 @@ class CacheStore:
             return None
         return p.read_text()
 
-    def write_traj_json(self, key: str, traj: dict[str, Any]) -> None:
-        self._atomic_write_json(self.entry(key) / "traj.json", traj)
+    def traj_dir(self, key: str) -> Path:
+        return self.root / key / "traj"
+
+    def job_traj_dir(self, key: str, job_id: str) -> Path:
+        """Where job ``job_id`` writes its trajectory until it succeeds."""
+        return self.root / key / f".traj-{job_id}"
+
+    def write_traj_columns(self, key: str, columns: dict[str, Any]) -> None:
+        """Store per-frame scalar columns (``steps``, ``energies``, ...) as a trajectory."""
+        from .trajectory import write_columns
+
+        write_columns(self.traj_dir(key), columns)
+
+    def import_traj(self, key: str, src: Path) -> None:
+        """Make the trajectory directory ``src`` this entry's ``traj/``.
+
+        A directory inside the entry (:meth:`job_traj_dir`) is renamed into
+        place, so readers see the old trajectory or the new one, never a
+        mix. Anything else is copied.
+        """
+        src, dest = Path(src), self.traj_dir(key)
+        if src.resolve() == dest.resolve():
+            return
+        if src.parent.resolve() != dest.parent.resolve():
+            if dest.exists():
+                shutil.rmtree(dest)
+            shutil.copytree(src, dest)
+            return
+        old = None
+        if dest.exists():
+            old = Path(tempfile.mkdtemp(dir=dest.parent, prefix=".traj-old-"))
+            os.replace(dest, old)
+        os.replace(src, dest)
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+
+    def read_traj(self, key: str) -> "TrajectoryReader | None":
+        from .trajectory import TrajectoryReader
+
+        if not (self.traj_dir(key) / "meta.json").exists():
+            return None
+        return TrajectoryReader(self.traj_dir(key))
+
+    def traj_files(self, key: str) -> dict[str, Path]:
+        """``{"traj/<name>": path}`` for every file of the entry's trajectory."""
+        d = self.traj_dir(key)
+        if not d.is_dir():
+            return {}
+        return {f"traj/{p.name}": p for p in sorted(d.iterdir()) if p.suffix != ".tmp"}
 
     def write_meta(self, key: str, meta: dict[str, Any]) -> None:
         meta = dict(meta)
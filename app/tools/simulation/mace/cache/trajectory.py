@@ -0,0 +1,259 @@
+"""Chunked binary trajectories (md_equilibrate).
+
+Layout::
+
+    <cache_root>/<sha256>/traj/
+      meta.json           # symbols, pbc, field shapes/dtypes, chunk index
+      chunk_00000.npz     # frames [0, chunk_frames)
+      chunk_00001.npz     # ...
+
+Each chunk is an ordinary ``.npz`` holding one array per field, with the
+frame axis first (``positions``: ``(n, n_atoms, 3)``, ``energies``:
+``(n,)``, ...). Floating-point fields are stored as float32 unless the
+writer is given another dtype. Chunks are written whole, to a temp file
+renamed into place, and ``meta.json`` is rewritten after each one. A
+reader therefore sees every completed chunk while the run is still going.
+
+Uncompressed chunks (the default) keep their members stored, so a frame
+range is read through ``np.memmap`` without loading or decompressing the
+rest of the file. Compressed chunks are inflated one chunk at a time, and
+only the chunks overlapping the requested range are read.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import struct
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ase import Atoms
+
+FORMAT = "mace-mcp-traj"
+FORMAT_VERSION = 1
+DEFAULT_CHUNK_FRAMES = 64
+
+
+class TrajectoryWriter:
+    """Append frames and flush them to ``directory`` one chunk at a time.
+
+    The first frame fixes the set of fields and their per-frame shapes.
+    An existing trajectory in ``directory`` is replaced.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        symbols: Sequence[str] = (),
+        *,
+        pbc: Iterable[bool] = (True, True, True),
+        dtype: str = "float32",
+        compress: bool = False,
+        chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+    ) -> None:
+        self.directory = Path(directory)
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+        self.directory.mkdir(parents=True)
+        self.dtype = np.dtype(dtype)
+        self.compress = compress
+        self.chunk_frames = max(1, int(chunk_frames))
+        self._meta: dict[str, Any] = {
+            "format": FORMAT,
+            "version": FORMAT_VERSION,
+            "symbols": list(symbols),
+            "pbc": [bool(p) for p in pbc],
+            "compressed": compress,
+            "chunk_frames": self.chunk_frames,
+            "fields": {},
+            "chunks": [],
+            "n_frames": 0,
+            "complete": False,
+        }
+        self._buffer: list[dict[str, np.ndarray]] = []
+        self._write_meta()
+
+    def append(self, **frame: Any) -> None:
+        """Add one frame; every frame must carry the same fields."""
+        arrays = {name: self._cast(np.asarray(value)) for name, value in frame.items()}
+        fields = self._meta["fields"]
+        if not fields:
+            for name, a in arrays.items():
+                fields[name] = {"dtype": a.dtype.str, "shape": list(a.shape)}
+        elif set(arrays) != set(fields):
+            raise ValueError(f"frame fields {sorted(arrays)} differ from {sorted(fields)}")
+        self._buffer.append(arrays)
+        if len(self._buffer) >= self.chunk_frames:
+            self.flush()
+
+    def append_atoms(self, atoms: "Atoms", **scalars: Any) -> None:
+        """Append positions, velocities and cell of ``atoms`` plus ``scalars``."""
+        self.append(
+            positions=atoms.get_positions(),
+            velocities=atoms.get_velocities(),
+            cells=atoms.cell.array,
+            **scalars,
+        )
+
+    def flush(self) -> None:
+        """Write the buffered frames as one chunk."""
+        if not self._buffer:
+            return
+        index = len(self._meta["chunks"])
+        name = f"chunk_{index:05d}.npz"
+        stacked = {f: np.stack([fr[f] for fr in self._buffer]) for f in self._meta["fields"]}
+        with tempfile.NamedTemporaryFile(
+            "wb", delete=False, dir=self.directory, suffix=".tmp"
+        ) as fh:
+            (np.savez_compressed if self.compress else np.savez)(fh, **stacked)
+            tmp = fh.name
+        os.replace(tmp, self.directory / name)
+        self._meta["chunks"].append(
+            {"file": name, "start": self._meta["n_frames"], "n_frames": len(self._buffer)}
+        )
+        self._meta["n_frames"] += len(self._buffer)
+        self._buffer = []
+        self._write_meta()
+
+    def close(self, complete: bool = True) -> None:
+        self.flush()
+        self._meta["complete"] = complete
+        self._write_meta()
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(complete=exc_type is None)
+
+    # ------------------------------------------------------------------
+    def _cast(self, a: np.ndarray) -> np.ndarray:
+        if np.issubdtype(a.dtype, np.floating):
+            return a.astype(self.dtype, copy=False)
+        if np.issubdtype(a.dtype, np.integer):
+            return a.astype(np.int64, copy=False)
+        return a
+
+    def _write_meta(self) -> None:
+        from .store import CacheStore
+
+        CacheStore._atomic_write_text(
+            self.directory / "meta.json", json.dumps(self._meta, indent=2)
+        )
+
+
+def write_columns(
+    directory: str | os.PathLike,
+    columns: dict[str, Sequence[Any]],
+    **writer_kwargs: Any,
+) -> None:
+    """Store a column dict (``{"steps": [...], "energies": [...]}``) as a trajectory.
+
+    Used for backends that only report per-frame scalars. Columns shorter
+    than the longest are padded with NaN.
+    """
+    n = max((len(v) for v in columns.values()), default=0)
+    padded = {
+        k: np.concatenate([np.asarray(v, dtype=float), np.full(n - len(v), np.nan)])
+        if len(v) < n else np.asarray(v)
+        for k, v in columns.items()
+    }
+    with TrajectoryWriter(directory, **writer_kwargs) as w:
+        for i in range(n):
+            w.append(**{k: v[i] for k, v in padded.items()})
+
+
+class TrajectoryReader:
+    """Frame-range access to a trajectory written by :class:`TrajectoryWriter`."""
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        self.directory = Path(directory)
+        self.meta = json.loads((self.directory / "meta.json").read_text())
+        if self.meta.get("format") != FORMAT:
+            raise ValueError(f"{self.directory} is not a {FORMAT} trajectory")
+        self._mapped: dict[tuple[str, str], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return int(self.meta["n_frames"])
+
+    @property
+    def fields(self) -> list[str]:
+        return list(self.meta["fields"])
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self.meta["symbols"])
+
+    def read(self, field: str, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """``field`` for frames ``[start, stop)`` (Python slice semantics)."""
+        if field not in self.meta["fields"]:
+            raise KeyError(f"trajectory has no field {field!r}; has {self.fields}")
+        start, stop, _ = slice(start, stop).indices(len(self))
+        spec = self.meta["fields"][field]
+        parts = []
+        for chunk in self.meta["chunks"]:
+            lo, n = chunk["start"], chunk["n_frames"]
+            if lo + n <= start or lo >= stop:
+                continue
+            data = self._member(chunk["file"], field)
+            parts.append(data[max(start - lo, 0):min(stop - lo, n)])
+        if not parts:
+            return np.empty((0, *spec["shape"]), dtype=np.dtype(spec["dtype"]))
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def atoms(self, index: int = -1) -> "Atoms":
+        """Frame ``index`` as ASE Atoms (needs ``positions`` and ``cells``)."""
+        from ase import Atoms
+
+        i = range(len(self))[index]
+        atoms = Atoms(
+            symbols=self.symbols,
+            positions=self.read("positions", i, i + 1)[0],
+            cell=self.read("cells", i, i + 1)[0],
+            pbc=self.meta["pbc"],
+        )
+        if "velocities" in self.meta["fields"]:
+            atoms.set_velocities(self.read("velocities", i, i + 1)[0])
+        return atoms
+
+    # ------------------------------------------------------------------
+    def _member(self, filename: str, field: str) -> np.ndarray:
+        key = (filename, field)
+        if key not in self._mapped:
+            path = self.directory / filename
+            if self.meta["compressed"]:
+                with np.load(path) as z:
+                    return z[field]
+            self._mapped[key] = _memmap_npz_member(path, field + ".npy")
+        return self._mapped[key]
+
+
+def _memmap_npz_member(path: Path, member: str) -> np.ndarray:
+    """Memory-map an uncompressed (stored) ``.npy`` member of an ``.npz``."""
+    with zipfile.ZipFile(path) as zf:
+        info = zf.getinfo(member)
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise ValueError(f"{path}:{member} is compressed and cannot be memory-mapped")
+    with open(path, "rb") as f:
+        f.seek(info.header_offset)
+        local = f.read(30)
+        name_len, extra_len = struct.unpack("<HH", local[26:30])
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(
+        path, dtype=dtype, mode="r", offset=offset, shape=shape, order="F" if fortran else "C",
+    )
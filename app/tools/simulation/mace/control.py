@@ -186,11 +186,13 @@ async def get_cached_structure(
     inp: GetCachedStructureInput,
     runner: JobRunner,
 ) -> GetCachedStructureResult:
-    key, _kind = parse_cache_uri(inp.cache_ref)
+    key, kind = parse_cache_uri(inp.cache_ref)
+    meta = runner.cache.read_meta(key) or {}
+    if kind == "traj" or kind.startswith("traj/"):
+        return _trajectory_frame(runner.cache, key, kind, meta, inp.cache_ref)
     cif = runner.cache.read_structure_cif(key)
     if cif is None:
         raise ValueError(f"no cached structure for {inp.cache_ref!r}")
-    meta = runner.cache.read_meta(key) or {}
     return GetCachedStructureResult(
         cif_text=cif,
         n_atoms=int(meta.get("n_atoms", 0)),
@@ -200,3 +202,36 @@ async def get_cached_structure(
         source_job_id=meta.get("source_job_id"),
         created_at=meta.get("created_at"),
     )
+
+
+def _trajectory_frame(
+    cache: CacheStore, key: str, kind: str, meta: dict[str, Any], ref: str,
+) -> GetCachedStructureResult:
+    """One frame (``cache://<key>/traj/<i>``, last if omitted) of a cached trajectory."""
+    import io
+    from collections import Counter
+
+    from ase.io import write as ase_write
+
+    reader = cache.read_traj(key)
+    if reader is None or "positions" not in reader.fields or len(reader) == 0:
+        raise ValueError(f"no cached trajectory frames for {ref!r}")
+    _, _, index = kind.partition("/")
+    try:
+        frame = range(len(reader))[int(index) if index else -1]
+    except (ValueError, IndexError):
+        raise ValueError(f"frame {index!r} out of range for {ref!r} ({len(reader)} frames)") from None
+    atoms = reader.atoms(frame)
+    buf = io.BytesIO()
+    ase_write(buf, atoms, format="cif")
+    return GetCachedStructureResult(
+        cif_text=buf.getvalue().decode("utf-8"),
+        n_atoms=len(atoms),
+        composition=dict(Counter(atoms.get_chemical_symbols())),
+        phase=meta.get("phase"),
+        head=meta.get("head"),
+        source_job_id=meta.get("source_job_id"),
+        created_at=meta.get("created_at"),
+        frame=frame,
+        n_frames=len(reader),
+    )
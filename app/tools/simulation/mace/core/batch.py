@@ -0,0 +1,156 @@
+"""Batched multi-structure evaluation.
+
+Finite-difference workflows (elastic strains, phonon displacements,
+reference cells) evaluate many small structures with one model. Calling
+the ASE interface per structure pays one graph build and one forward pass
+each, and on CPU that per-call overhead dominates. :func:`evaluate_batch`
+packs up to ``batch_size`` structures into one MACE graph batch and
+returns energies, forces and stresses for all of them from a single
+forward pass per ensemble member.
+
+Calculators that are not MACE calculators (ASE's EMT in tests, for
+example) or that were compiled with graph padding are evaluated one
+structure at a time through the ASE interface, with identical results.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ase import Atoms
+
+log = logging.getLogger("mace_mcp.batch")
+
+DEFAULT_BATCH_SIZE = 16
+
+
+@dataclass
+class BatchResult:
+    energies: np.ndarray  # (n,) eV
+    forces: list[np.ndarray]  # per structure, (n_atoms_i, 3) eV/Å
+    stresses: np.ndarray | None  # (n, 6) Voigt, eV/Å³ (ASE sign convention)
+
+
+def _packable(calc: Any) -> bool:
+    """True for an uncompiled MACE calculator whose models can take a batch."""
+    return (
+        all(hasattr(calc, a) for a in ("models", "z_table", "r_max", "device"))
+        and not getattr(calc, "use_compile", False)
+    )
+
+
+def _graphs(calc: Any, structures: Sequence["Atoms"]) -> list:
+    """One ``AtomicData`` graph per structure, built the way ``calc`` builds its own."""
+    from mace import data as mace_data
+    from mace.tools import torch_tools
+
+    arrays_keys = dict(getattr(calc, "arrays_keys", {}))
+    if hasattr(calc, "charges_key"):
+        arrays_keys[calc.charges_key] = "charges"
+    keyspec = mace_data.KeySpecification(
+        info_keys=getattr(calc, "info_keys", {}), arrays_keys=arrays_keys,
+    )
+    with torch_tools.default_dtype(calc.default_dtype):
+        return [
+            mace_data.AtomicData.from_config(
+                mace_data.config_from_atoms(a, key_specification=keyspec, head_name=calc.head),
+                z_table=calc.z_table,
+                cutoff=calc.r_max,
+                heads=calc.available_heads,
+            )
+            for a in structures
+        ]
+
+
+def _forward(calc: Any, structures: Sequence["Atoms"], compute_stress: bool) -> BatchResult:
+    """One packed forward pass per ensemble member, averaged like the calculator does."""
+    import torch
+    from ase.stress import full_3x3_to_voigt_6_stress
+    from mace.tools import torch_geometric
+
+    batch = torch_geometric.Batch.from_data_list(_graphs(calc, structures)).to(calc.device)
+    totals: dict[str, torch.Tensor] = {}
+    for model in calc.models:
+        b = batch.clone()
+        dtype = next(model.parameters()).dtype
+        for key in b.keys:
+            if torch.is_tensor(b[key]) and torch.is_floating_point(b[key]):
+                b[key] = b[key].to(dtype=dtype)
+        out = model(b.to_dict(), compute_stress=compute_stress, training=False)
+        for key in ("energy", "forces", "stress") if compute_stress else ("energy", "forces"):
+            val = out[key].detach()
+            totals[key] = totals[key] + val if key in totals else val
+
+    n_models = len(calc.models)
+    e_unit = getattr(calc, "energy_units_to_eV", 1.0)
+    l_unit = getattr(calc, "length_units_to_A", 1.0)
+    energies = (totals["energy"] / n_models).cpu().numpy() * e_unit
+    forces_all = (totals["forces"] / n_models).cpu().numpy() * (e_unit / l_unit)
+    bounds = batch.ptr.cpu().numpy()
+    forces = [forces_all[bounds[i]:bounds[i + 1]] for i in range(len(structures))]
+    stresses = None
+    if compute_stress:
+        full = (totals["stress"] / n_models).cpu().numpy() * (e_unit / l_unit**3)
+        stresses = np.array([full_3x3_to_voigt_6_stress(s) for s in full])
+    return BatchResult(energies=energies, forces=forces, stresses=stresses)
+
+
+def _sequential(calc: Any, structures: Sequence["Atoms"], compute_stress: bool) -> BatchResult:
+    energies, forces, stresses = [], [], []
+    for a in structures:
+        a = a.copy()
+        a.calc = calc
+        energies.append(a.get_potential_energy())
+        forces.append(a.get_forces())
+        if compute_stress:
+            stresses.append(a.get_stress())
+    return BatchResult(
+        energies=np.array(energies),
+        forces=forces,
+        stresses=np.array(stresses) if compute_stress else None,
+    )
+
+
+def evaluate_batch(
+    structures: Sequence["Atoms"],
+    calc,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    compute_stress: bool = True,
+    progress: Callable[[int, int], None] | None = None,
+) -> BatchResult:
+    """Energies, forces and (optionally) stresses of ``structures`` under ``calc``.
+
+    Structures are packed ``batch_size`` at a time; ``progress(done, total)``
+    is called after each pack. Inputs are not modified and keep no
+    reference to ``calc``.
+    """
+    n = len(structures)
+    packed = _packable(calc)
+    parts: list[BatchResult] = []
+    for start in range(0, n, max(1, batch_size)):
+        chunk = structures[start:start + batch_size]
+        if packed:
+            try:
+                parts.append(_forward(calc, chunk, compute_stress))
+            except (ImportError, AttributeError, TypeError) as exc:
+                # mace-torch without the batch API this module expects
+                log.warning("batched MACE evaluation unavailable (%s); evaluating one by one", exc)
+                packed = False
+        if not packed:
+            parts.append(_sequential(calc, chunk, compute_stress))
+        if progress is not None:
+            progress(min(start + batch_size, n), n)
+
+    return BatchResult(
+        energies=np.concatenate([p.energies for p in parts]) if parts else np.zeros(0),
+        forces=[f for p in parts for f in p.forces],
+        stresses=(
+            np.concatenate([p.stresses for p in parts]) if parts else np.zeros((0, 6))
+        ) if compute_stress else None,
+    )
@@ -13,11 +13,23 @@ Heads (as of MACE-MH-1 v1):
 
 This module imports ``mace`` lazily so unit tests can run without mace-torch
 installed (the FakeBackend never touches it).
+
+Loading the model (Hub resolution, deserialisation, device transfer) costs
+more than a small relax, so backends check calculators out of the
+process-wide :class:`CalculatorPool` instead of calling :func:`make_calc`
+per job.
 """
 
 from __future__ import annotations
 
-from typing import Literal
+import hashlib
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Literal
 
 Head = Literal[
     "omat_pbe",
@@ -37,6 +49,8 @@ HEADS: tuple[Head, ...] = (
     "rgd1_b3lyp",
 )
 
+log = logging.getLogger("mace_mcp.calculator")
+
 DEFAULT_HEAD: Head = "omat_pbe"
 DEFAULT_DTYPE = "float64"  # CUDA supports float64; MPS does not.
 MODEL_REPO_ID = "mace-foundations/mace-mh-1"
@@ -69,16 +83,50 @@ def make_calc(
     from huggingface_hub import hf_hub_download
     from mace.calculators import mace_mp
 
-    import torch
-
-    if device is None:
-        device = "cuda" if torch.cuda.is_available() else "cpu"
+    device = resolve_device(device)
 
     if device == "mps" and dtype == "float64":
         raise ValueError("MPS does not support float64; use float32 or cuda/cpu.")
 
     path = hf_hub_download(repo_id=MODEL_REPO_ID, filename=MODEL_FILENAME)
-    return mace_mp(model=path, default_dtype=dtype, device=device, head=head)
+    calc = mace_mp(model=path, default_dtype=dtype, device=device, head=head)
+    calc.model_sha256 = model_sha256(path)
+    return calc
+
+
+_SHA256_NAME = re.compile(r"[0-9a-f]{64}")
+
+
+def model_sha256(path: str | os.PathLike) -> str:
+    """SHA-256 of the model file at ``path``.
+
+    The Hub cache stores LFS files as ``blobs/<sha256>`` behind a symlink,
+    so the digest is read from the resolved name when it has that form;
+    otherwise the file is hashed.
+    """
+    real = os.path.realpath(path)
+    name = os.path.basename(real)
+    if _SHA256_NAME.fullmatch(name):
+        return name
+    h = hashlib.sha256()
+    with open(real, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def model_fingerprint(calc: Any) -> str:
+    """Identity of the weights behind ``calc`` (class name for non-MACE calculators)."""
+    return getattr(calc, "model_sha256", None) or type(calc).__name__
+
+
+def resolve_device(device: str | None) -> str:
+    """``device`` or, if None, the auto-detected one (cuda > cpu)."""
+    if device is not None:
+        return device
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
 
 
 def calc_signature(head: Head, device: str, dtype: str) -> dict[str, str]:
@@ -90,3 +138,190 @@ def calc_signature(head: Head, device: str, dtype: str) -> dict[str, str]:
         "device": device,
         "dtype": dtype,
     }
+
+
+# ---------------------------------------------------------------------------
+# Warm calculator pool
+# ---------------------------------------------------------------------------
+
+PoolKey = tuple[str, str, str]  # (head, device, dtype)
+
+DEFAULT_POOL_BUDGET_MB = 4096
+
+
+def _model_bytes(calc: Any) -> int:
+    """Parameter + buffer bytes of the torch models behind ``calc`` (0 if unknown)."""
+    total = 0
+    for model in getattr(calc, "models", None) or []:
+        for t in (*model.parameters(), *model.buffers()):
+            total += t.numel() * t.element_size()
+    return total
+
+
+@dataclass
+class _Slot:
+    key: PoolKey
+    calc: Any
+    nbytes: int
+    busy: bool = False
+
+
+class CalculatorPool:
+    """Loaded calculators kept resident across jobs, keyed by (head, device, dtype).
+
+    :meth:`checkout` hands one calculator to one thread at a time (an ASE
+    calculator caches per-structure state, so it is never shared). A busy
+    key gets a second copy only if it fits in ``budget_bytes``; otherwise
+    the caller waits for the copy in use. Idle calculators are evicted in
+    least-recently-used order to make room. A model that alone exceeds the
+    budget is still loaded rather than refused.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int | None = None,
+        factory: Callable[..., Any] | None = None,
+    ) -> None:
+        if budget_bytes is None:
+            mb = int(os.environ.get("MACE_MCP_POOL_MB", DEFAULT_POOL_BUDGET_MB))
+            budget_bytes = mb * 1024 * 1024
+        self.budget_bytes = budget_bytes
+        # None: resolve make_calc at load time, so tests can monkey-patch it
+        self._factory = factory
+        self._slots: list[_Slot] = []  # least recently used first
+        self._loading: set[PoolKey] = set()
+        self._cond = threading.Condition()
+        self._stats = {"hits": 0, "loads": 0, "evictions": 0, "waits": 0}
+
+    @staticmethod
+    def key(head: str = DEFAULT_HEAD, device: str | None = None, dtype: str = DEFAULT_DTYPE) -> PoolKey:
+        return (head, resolve_device(device), dtype)
+
+    def _used(self) -> int:
+        return sum(s.nbytes for s in self._slots)
+
+    def _evict_idle(self, need: int) -> None:
+        """Drop idle slots, oldest first, until ``need`` more bytes fit."""
+        for slot in [s for s in self._slots if not s.busy]:
+            if self._used() + need <= self.budget_bytes:
+                return
+            self._slots.remove(slot)
+            self._stats["evictions"] += 1
+            log.info("evicted MACE calculator %s (%.0f MB)", slot.key, slot.nbytes / 2**20)
+
+    def _acquire(self, key: PoolKey) -> _Slot | None:
+        """An idle slot for ``key`` (now busy), or None if the caller should load one."""
+        with self._cond:
+            while True:
+                for slot in self._slots:
+                    if slot.key == key and not slot.busy:
+                        slot.busy = True
+                        self._slots.remove(slot)
+                        self._slots.append(slot)
+                        self._stats["hits"] += 1
+                        return slot
+                copies = [s for s in self._slots if s.key == key]
+                if key not in self._loading:
+                    need = copies[0].nbytes if copies else 0
+                    self._evict_idle(need)
+                    if not copies or self._used() + need <= self.budget_bytes:
+                        self._loading.add(key)
+                        return None
+                self._stats["waits"] += 1
+                self._cond.wait()
+
+    def _load(self, key: PoolKey) -> _Slot:
+        head, device, dtype = key
+        try:
+            calc = (self._factory or make_calc)(head=head, device=device, dtype=dtype)
+        except BaseException:
+            with self._cond:
+                self._loading.discard(key)
+                self._cond.notify_all()
+            raise
+        slot = _Slot(key, calc, _model_bytes(calc), busy=True)
+        with self._cond:
+            self._loading.discard(key)
+            self._evict_idle(slot.nbytes)
+            self._slots.append(slot)
+            self._stats["loads"] += 1
+            self._cond.notify_all()
+        log.info("loaded MACE calculator %s (%.0f MB)", key, slot.nbytes / 2**20)
+        return slot
+
+    def _release(self, slot: _Slot) -> None:
+        reset = getattr(slot.calc, "reset", None)
+        if callable(reset):
+            reset()
+        with self._cond:
+            slot.busy = False
+            self._evict_idle(0)
+            self._cond.notify_all()
+
+    @contextmanager
+    def checkout(
+        self, head: str = DEFAULT_HEAD, device: str | None = None, dtype: str = DEFAULT_DTYPE,
+    ) -> Iterator[Any]:
+        """Exclusive use of a warm calculator for the duration of the block."""
+        key = self.key(head, device, dtype)
+        slot = self._acquire(key) or self._load(key)
+        try:
+            yield slot.calc
+        finally:
+            self._release(slot)
+
+    def preload(self, keys: list[tuple[str, str | None, str]]) -> None:
+        """Load one calculator per ``(head, device, dtype)`` ahead of the first job."""
+        for head, device, dtype in keys:
+            with self.checkout(head, device, dtype):
+                pass
+
+    def clear(self) -> None:
+        """Drop every idle calculator."""
+        with self._cond:
+            self._slots = [s for s in self._slots if s.busy]
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                **self._stats,
+                "resident": [
+                    {"head": s.key[0], "device": s.key[1], "dtype": s.key[2],
+                     "mb": round(s.nbytes / 2**20, 1), "busy": s.busy}
+                    for s in self._slots
+                ],
+                "used_mb": round(self._used() / 2**20, 1),
+                "budget_mb": round(self.budget_bytes / 2**20, 1),
+            }
+
+
+_pool: CalculatorPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_calculator_pool() -> CalculatorPool:
+    """The process-wide pool (budget from ``MACE_MCP_POOL_MB``)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = CalculatorPool()
+        return _pool
+
+
+def parse_preload_spec(spec: str) -> list[tuple[str, str | None, str]]:
+    """``"omat_pbe,matpes_r2scan:cuda:float32"`` -> pool keys (device None = auto).
+
+    Each comma-separated item is ``head[:device[:dtype]]``; empty parts
+    take the defaults.
+    """
+    keys = []
+    for item in spec.split(","):
+        parts = [p.strip() for p in item.strip().split(":")]
+        if not parts[0]:
+            continue
+        if parts[0] not in HEADS:
+            raise ValueError(f"unknown MACE head {parts[0]!r}; expected one of {HEADS}")
+        device = parts[1] if len(parts) > 1 and parts[1] not in ("", "auto") else None
+        dtype = parts[2] if len(parts) > 2 and parts[2] else DEFAULT_DTYPE
+        keys.append((parts[0], device, dtype))
+    return keys
@@ -63,7 +63,8 @@ def pure_element_energy(symbol: str, calc, fmax: float = 0.02, steps: int = 80)
     """Energy per atom of a pure element in its conventional ground state.
 
     Used as a per-element chemical-potential reference μ for formation
-    enthalpies ΔH_f. Imports of ASE/MACE happen lazily.
+    enthalpies ΔH_f; callers read it through the cached reference table
+    rather than calling this per job. Imports of ASE/MACE happen lazily.
     """
     from ase.build import bulk
     from ase.filters import FrechetCellFilter
@@ -88,7 +89,12 @@ def formation_energy(
     composition: dict[str, int],
     mu: dict[str, float],
 ) -> float:
-    """ΔH_f per atom relative to pure-element references μ."""
+    """ΔH_f per atom relative to pure-element references μ.
+
+    ``mu`` normally comes from the persistent table
+    (:meth:`~app.tools.simulation.mace.cache.references.ReferenceTable.mu`),
+    so composition sweeps relax each pure element once per model.
+    """
     n = sum(composition.values())
     e_ref = sum(composition[el] * mu[el] for el in composition) / n
     return energy_per_atom - e_ref
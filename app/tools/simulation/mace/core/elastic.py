@@ -18,6 +18,8 @@ from typing import TYPE_CHECKING
 
 import numpy as np
 
+from .batch import DEFAULT_BATCH_SIZE, evaluate_batch
+
 if TYPE_CHECKING:
     from ase import Atoms
 
@@ -67,28 +69,34 @@ def apply_strain(atoms: "Atoms", strain: np.ndarray) -> "Atoms":
     return new
 
 
-def _strained_stress(atoms: "Atoms", calc, comp: int, eps: float) -> np.ndarray:
-    a = apply_strain(atoms, voigt_strain_tensor(comp, eps))
-    a.calc = calc
-    a.get_potential_energy()  # trigger stress computation
-    return a.get_stress()
+def strained_cells(atoms: "Atoms", strain_amplitude: float) -> list["Atoms"]:
+    """The 12 central-difference cells: (+ε, -ε) for each Voigt component in order."""
+    return [
+        apply_strain(atoms, voigt_strain_tensor(comp, sign * strain_amplitude))
+        for comp in range(N_VOIGT)
+        for sign in (+1, -1)
+    ]
 
 
 def elastic_tensor(
     atoms_relaxed: "Atoms",
     calc,
     strain_amplitude: float = 0.005,
+    batch_size: int = DEFAULT_BATCH_SIZE,
 ) -> np.ndarray:
     """Compute the 6×6 stiffness tensor in GPa by central differences.
 
     The reference cell is assumed to already be relaxed. Reference stress
     is reported in the caller's logs but not subtracted (its absolute value
-    is a sanity check on the reference state).
+    is a sanity check on the reference state). The strained cells are
+    evaluated together with :func:`evaluate_batch`.
     """
+    stresses = evaluate_batch(
+        strained_cells(atoms_relaxed, strain_amplitude), calc, batch_size=batch_size,
+    ).stresses
     C = np.zeros((N_VOIGT, N_VOIGT))
     for j in range(N_VOIGT):
-        sigma_plus = _strained_stress(atoms_relaxed, calc, j, +strain_amplitude)
-        sigma_minus = _strained_stress(atoms_relaxed, calc, j, -strain_amplitude)
+        sigma_plus, sigma_minus = stresses[2 * j], stresses[2 * j + 1]
         dC = (sigma_plus - sigma_minus) / (2.0 * strain_amplitude)
         C[:, j] = dC
     # Symmetrise (small residual from numerical stress noise)
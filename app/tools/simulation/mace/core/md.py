@@ -3,14 +3,18 @@
 from __future__ import annotations
 
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Callable
 
 import numpy as np
 
+from .rdf import RdfAccumulator
+
 if TYPE_CHECKING:
     from ase import Atoms
 
+    from ..cache.trajectory import TrajectoryWriter
+
 
 @dataclass
 class MdResult:
@@ -25,6 +29,7 @@ class MdResult:
     rdf_g: list[float]
     is_dynamically_stable: bool
     wall_time_s: float
+    rdf_partials: dict[str, list[float]] = field(default_factory=dict)  # "A-B" -> g_AB
 
 
 def langevin_run(
@@ -37,13 +42,21 @@ def langevin_run(
     sample_every: int | None = None,
     seed: int = 20260506,
     progress: Callable[[int, int], None] | None = None,
+    rdf_rmax: float = 6.0,
+    rdf_nbins: int = 80,
+    trajectory: "TrajectoryWriter | None" = None,
 ) -> MdResult:
     """Run NVT Langevin MD on a copy of ``atoms_seed``.
 
-    Returns the time-series of E/atom and temperature, the final-frame RDF,
-    and an energy-drift-based dynamic-stability flag (set True if the
-    last-quarter mean energy differs from the first-quarter mean by less
-    than 50 meV/atom, i.e. no runaway).
+    Returns the time-series of E/atom and temperature, the total and
+    per-species-pair RDFs averaged over the second half of the sampled
+    frames, and an energy-drift-based dynamic-stability flag (set True if
+    the last-quarter mean energy differs from the first-quarter mean by
+    less than 50 meV/atom, i.e. no runaway).
+
+    If ``trajectory`` is given, each sampled frame (positions, velocities,
+    cell, step, E/atom, T) is appended to it as the run goes; the caller
+    closes it.
     """
     from ase import units
     from ase.md.langevin import Langevin
@@ -69,6 +82,8 @@ def langevin_run(
     temps: list[float] = []
     steps: list[int] = []
 
+    rdf = RdfAccumulator(atoms.get_chemical_symbols(), rmax=rdf_rmax, nbins=rdf_nbins)
+
     t0 = time.time()
     for step in range(n_steps):
         dyn.run(1)
@@ -77,11 +92,17 @@ def langevin_run(
             energies.append(float(ep))
             temps.append(float(atoms.get_temperature()))
             steps.append(step)
+            if trajectory is not None:
+                trajectory.append_atoms(
+                    atoms, steps=step, energies=energies[-1], temperatures=temps[-1],
+                )
+            # skip the first half as equilibration; always include the last sample
+            if 2 * step >= n_steps or step + sample_every >= n_steps:
+                rdf.add(atoms)
         if progress is not None and step % 50 == 49:
             progress(step + 1, n_steps)
 
     wall = time.time() - t0
-    r_centers, g_r = compute_rdf(atoms)
 
     # Dynamic stability heuristic
     if len(energies) >= 4:
@@ -101,10 +122,11 @@ def langevin_run(
         steps=steps,
         energies=energies,
         temperatures=temps,
-        rdf_r_A=r_centers.tolist(),
-        rdf_g=g_r.tolist(),
+        rdf_r_A=rdf.r.tolist(),
+        rdf_g=rdf.total().tolist(),
         is_dynamically_stable=stable,
         wall_time_s=wall,
+        rdf_partials={k: g.tolist() for k, g in rdf.partials().items()},
     )
 
 
@@ -113,27 +135,7 @@ def compute_rdf(
     rmax: float = 6.0,
     nbins: int = 80,
 ) -> tuple[np.ndarray, np.ndarray]:
-    """Total (species-agnostic) radial distribution function via minimum image."""
-    pos = atoms.get_positions()
-    cell = atoms.cell.array
-    n = len(atoms)
-    inv = np.linalg.inv(cell)
-    dists: list[np.ndarray] = []
-    for i in range(n):
-        d = pos - pos[i]
-        f = d @ inv
-        f -= np.round(f)
-        d = f @ cell
-        r = np.linalg.norm(d, axis=1)
-        r = r[(r > 1e-3) & (r < rmax)]
-        dists.append(r)
-    all_dists = np.concatenate(dists) if dists else np.array([])
-    edges = np.linspace(0.0, rmax, nbins + 1)
-    hist, _ = np.histogram(all_dists, bins=edges)
-    r_centers = 0.5 * (edges[:-1] + edges[1:])
-    dr = edges[1] - edges[0]
-    rho = n / atoms.get_volume()
-    shell_vol = 4.0 * np.pi * r_centers ** 2 * dr
-    with np.errstate(divide="ignore", invalid="ignore"):
-        g = hist / (n * rho * shell_vol)
-    return r_centers, np.nan_to_num(g)
+    """Total (species-agnostic) radial distribution function of one frame."""
+    acc = RdfAccumulator(atoms.get_chemical_symbols(), rmax=rmax, nbins=nbins)
+    acc.add(atoms)
+    return acc.r, acc.total()
@@ -17,6 +17,8 @@ from typing import TYPE_CHECKING, Callable
 
 import numpy as np
 
+from .batch import DEFAULT_BATCH_SIZE, evaluate_batch
+
 if TYPE_CHECKING:
     from ase import Atoms
 
@@ -44,8 +46,14 @@ def harmonic_free_energy(
     displacement_A: float = 0.01,
     q_mesh: tuple[int, int, int] = (4, 4, 4),
     progress: Callable[[int, int], None] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
 ) -> PhononResult:
-    """Compute F_vib(T) per atom on the supplied relaxed supercell."""
+    """Compute F_vib(T) per atom on the supplied relaxed supercell.
+
+    Displaced supercells are evaluated ``batch_size`` at a time with
+    :func:`evaluate_batch`. ``progress(done, n_disp)`` counts displacements
+    as before, but is called once per pack rather than per displacement.
+    """
     import time
 
     from ase import Atoms
@@ -69,21 +77,24 @@ def harmonic_free_energy(
     n_disp = len(phonon.supercells_with_displacements)
 
     t0 = time.time()
-    forces_set: list[np.ndarray] = []
-    for i, sc in enumerate(phonon.supercells_with_displacements):
-        if sc is None:
-            forces_set.append(np.zeros((n_atoms, 3)))
-            continue
-        a = Atoms(
-            symbols=sc.symbols,
-            cell=sc.cell,
-            scaled_positions=sc.scaled_positions,
-            pbc=True,
-        )
-        a.calc = calc
-        forces_set.append(a.get_forces())
-        if progress is not None:
-            progress(i + 1, n_disp)
+    displaced = [
+        (i, Atoms(symbols=sc.symbols, cell=sc.cell, scaled_positions=sc.scaled_positions, pbc=True))
+        for i, sc in enumerate(phonon.supercells_with_displacements)
+        if sc is not None
+    ]
+    forces_set: list[np.ndarray] = [np.zeros((n_atoms, 3)) for _ in range(n_disp)]
+
+    def pack_done(done: int, _total: int) -> None:
+        # report the displacement index reached, out of every displacement
+        progress(displaced[done - 1][0] + 1, n_disp)
+
+    batch = evaluate_batch(
+        [a for _, a in displaced], calc,
+        batch_size=batch_size, compute_stress=False,
+        progress=pack_done if progress is not None else None,
+    )
+    for (i, _), forces in zip(displaced, batch.forces):
+        forces_set[i] = forces
 
     phonon.forces = forces_set
     phonon.produce_force_constants()
@@ -0,0 +1,131 @@
+"""Radial distribution functions, total and per species pair.
+
+Pairs within ``rmax`` come from a cell list in fractional coordinates.
+Each bin spans at least ``rmax`` along its cell height, so only
+neighbouring bins are searched. An axis shorter than three bins is not
+binned; its periodic images are enumerated explicitly instead. ``rmax``
+may therefore exceed half the cell (small supercells), and the cost grows
+with N rather than N². Bins are padded to equal occupancy, so each
+neighbour offset is one array expression with no Python loop over atoms.
+
+:class:`RdfAccumulator` keeps only the running histograms. MD can add
+every sampled frame and read a time-averaged g(r) at the end without
+keeping the frames.
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import TYPE_CHECKING, Iterator, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ase import Atoms
+
+
+def _pairs(atoms: "Atoms", rmax: float) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """``(i, j, d)`` for every ordered pair i≠j (any image) closer than ``rmax``.
+
+    Yields one chunk per neighbour-bin offset.
+    """
+    if not atoms.pbc.all():
+        raise ValueError("RDF needs a cell that is periodic along all three axes")
+    cell = atoms.cell.array
+    frac = atoms.get_scaled_positions(wrap=True)
+    pos = frac @ cell
+    n = len(atoms)
+
+    heights = abs(np.linalg.det(cell)) / np.linalg.norm(
+        np.cross(cell[[1, 2, 0]], cell[[2, 0, 1]]), axis=1,
+    )
+    n_bins = np.floor(heights / rmax).astype(int)
+    unbinned = n_bins < 3
+    n_bins[unbinned] = 1
+    reach = np.where(unbinned, np.ceil(rmax / heights).astype(int), 1)
+
+    # bin -> padded row of atom indices (-1 = empty slot)
+    bin3 = np.minimum((frac * n_bins).astype(int), n_bins - 1)
+    flat = np.ravel_multi_index(bin3.T, n_bins)
+    n_total = int(np.prod(n_bins))
+    counts = np.bincount(flat, minlength=n_total)
+    order = np.argsort(flat, kind="stable")
+    first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    table = np.full((n_total, max(int(counts.max()), 1)), -1, dtype=np.intp)
+    table[flat[order], np.arange(n) - first[flat[order]]] = order
+    pos_pad = np.vstack([pos, np.zeros((1, 3))])  # index -1 -> padding row
+
+    home = np.stack(np.unravel_index(np.arange(n_total), n_bins), axis=1)
+    for offset in itertools.product(*(range(-r, r + 1) for r in reach)):
+        target = home + offset
+        shift = (target // n_bins) @ cell  # (n_total, 3) image translation
+        other = table[np.ravel_multi_index((target % n_bins).T, n_bins)]
+        delta = pos_pad[other][:, None, :, :] + shift[:, None, None, :] - pos_pad[table][:, :, None, :]
+        d2 = np.einsum("bijk,bijk->bij", delta, delta)
+        ok = (table[:, :, None] >= 0) & (other[:, None, :] >= 0) & (d2 < rmax * rmax) & (d2 > 1e-12)
+        b, a_slot, o_slot = np.nonzero(ok)
+        yield table[b, a_slot], other[b, o_slot], np.sqrt(d2[ok])
+
+
+class RdfAccumulator:
+    """Time-averaged total and partial g(r) for a fixed set of atoms.
+
+    Partial g_ab(r) is normalised so that it tends to 1 at large r:
+    pairs (i in a, j in b) per shell, divided by N_a · N_b / V and the
+    shell volume. The total g(r) uses N² / V. Volume is read per frame,
+    so NPT frames average correctly.
+    """
+
+    def __init__(self, symbols: Sequence[str], rmax: float = 6.0, nbins: int = 80) -> None:
+        self.species = sorted(set(symbols))
+        self.rmax = float(rmax)
+        self.nbins = int(nbins)
+        self.edges = np.linspace(0.0, self.rmax, self.nbins + 1)
+        self._kind = np.searchsorted(self.species, list(symbols))
+        self._counts = np.bincount(self._kind, minlength=len(self.species)).astype(float)
+        n_sp = len(self.species)
+        self._partial = np.zeros((n_sp, n_sp, self.nbins))
+        self._total = np.zeros(self.nbins)
+        self.n_frames = 0
+
+    @property
+    def r(self) -> np.ndarray:
+        """Bin centres (Å)."""
+        return 0.5 * (self.edges[:-1] + self.edges[1:])
+
+    def add(self, atoms: "Atoms") -> None:
+        """Accumulate one frame (same atoms, same order as the constructor's)."""
+        n_sp = len(self.species)
+        hist = np.zeros(n_sp * n_sp * self.nbins)
+        for i, j, d in _pairs(atoms, self.rmax):
+            b = (d * (self.nbins / self.rmax)).astype(np.intp)
+            keep = b < self.nbins
+            flat = (self._kind[i[keep]] * n_sp + self._kind[j[keep]]) * self.nbins + b[keep]
+            hist += np.bincount(flat, minlength=hist.size)
+        hist = hist.reshape(n_sp, n_sp, self.nbins)
+        volume = atoms.get_volume()
+        pair_norm = np.outer(self._counts, self._counts)[:, :, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._partial += np.nan_to_num(hist * volume / pair_norm)
+        self._total += hist.sum(axis=(0, 1)) * volume / len(self._kind) ** 2
+        self.n_frames += 1
+
+    def _shell_volumes(self) -> np.ndarray:
+        return 4.0 / 3.0 * np.pi * (self.edges[1:] ** 3 - self.edges[:-1] ** 3)
+
+    def total(self) -> np.ndarray:
+        """Species-agnostic g(r) averaged over the added frames."""
+        return self._total / (max(self.n_frames, 1) * self._shell_volumes())
+
+    def partial(self, a: str, b: str) -> np.ndarray:
+        """g_ab(r) averaged over the added frames."""
+        ia, ib = self.species.index(a), self.species.index(b)
+        return self._partial[ia, ib] / (max(self.n_frames, 1) * self._shell_volumes())
+
+    def partials(self) -> dict[str, np.ndarray]:
+        """``{"A-B": g_AB}`` for every unordered species pair (A ≤ B)."""
+        return {
+            f"{a}-{b}": self.partial(a, b)
+            for k, a in enumerate(self.species)
+            for b in self.species[k:]
+        }
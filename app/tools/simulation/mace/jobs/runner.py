@@ -16,8 +16,9 @@ from __future__ import annotations
 
 import asyncio
 import json
+import shutil
 import traceback
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Awaitable, Callable
@@ -161,30 +162,37 @@ class JobRunner:
                 pass
 
         from ..backends.base import BackendJob  # local import to avoid cycle
+        job_traj = self.cache.job_traj_dir(cache_key, job_id)
         bj = BackendJob(
             tool_name=tool_name,
             input_payload=input_payload,
             cache_key=cache_key,
             seed=seed,
             timeout_seconds=timeout_seconds,
+            # backends that can stream a trajectory write it here; it only
+            # becomes the entry's traj/ once the job succeeds
+            extras={"traj_dir": str(job_traj)},
         )
         self.store.transition(job_id, "submitted")
         self.store.transition(job_id, "running")
         t0_iso = datetime.now(timezone.utc).isoformat()
+        work = self.executor.submit(backend.execute, bj, on_progress)
         try:
             result = await asyncio.wait_for(
-                loop.run_in_executor(self.executor, backend.execute, bj, on_progress),
-                timeout=timeout_seconds + 60,
+                asyncio.wrap_future(work, loop=loop), timeout=timeout_seconds + 60,
             )
         except asyncio.CancelledError:
+            _discard_when_done(work, job_traj)
             self.store.set_error(job_id, {"kind": "cancelled", "message": "task cancelled"})
             self.store.transition(job_id, "cancelled")
             backend.cancel(cache_key)
             return
         except InterruptedError:
+            _discard_when_done(work, job_traj)
             self.store.transition(job_id, "cancelled")
             return
         except Exception as ex:
+            _discard_when_done(work, job_traj)
             tb = traceback.format_exc()
             self.store.set_error(
                 job_id,
@@ -196,24 +204,28 @@ class JobRunner:
             )
             self.store.transition(job_id, "failed")
             log.error(
-                "job_failed",
-                job_id=job_id,
-                tool_name=tool_name,
-                error=scrub_token(str(ex)),
+                "job_failed job_id=%s tool_name=%s error=%s",
+                job_id, tool_name, scrub_token(str(ex)),
             )
             return
 
         # Persist artefacts (CIF, traj) + provenance + result
         cif_text = result.pop("cif_text", None)
+        traj_dir = result.pop("traj_dir", None)
         traj_json = result.pop("traj_json", None)
         backend_details = result.pop("backend_details", {})
 
         if cif_text:
             self.cache.write_structure_cif(cache_key, cif_text)
             result["structure_cif_ref"] = f"cache://{cache_key}/structure.cif"
-        if traj_json is not None:
-            self.cache.write_traj_json(cache_key, traj_json)
-            result["traj_ref"] = f"cache://{cache_key}/traj.json"
+        if traj_dir is not None:
+            self.cache.import_traj(cache_key, Path(traj_dir))
+            result["traj_ref"] = f"cache://{cache_key}/traj"
+        elif traj_json is not None:
+            # scalar columns only (fake backend, older payloads)
+            self.cache.write_traj_columns(cache_key, traj_json)
+            result["traj_ref"] = f"cache://{cache_key}/traj"
+        shutil.rmtree(job_traj, ignore_errors=True)  # unused or imported from elsewhere
 
         wall = float(result.get("wall_time_s", 0.0))
         head = input_payload.get("options", {}).get("head", "omat_pbe")
@@ -254,13 +266,13 @@ class JobRunner:
                     "provenance.json": self.cache.root / cache_key / "provenance.json",
                     "result.json": self.cache.root / cache_key / "result.json",
                     "structure.cif": self.cache.root / cache_key / "structure.cif",
-                    "traj.json": self.cache.root / cache_key / "traj.json",
+                    **self.cache.traj_files(cache_key),
                 },
             )
             if push_url:
                 self.store.set_provenance_ref(job_id, push_url)
         except Exception as ex:
-            log.warning("dataset_push_failed_after_result", error=scrub_token(str(ex)))
+            log.warning("dataset_push_failed_after_result error=%s", scrub_token(str(ex)))
 
         # Write result + finalise
         self.cache.write_result(cache_key, result)
@@ -308,6 +320,15 @@ def _pseudo_job(tool: str, ip: dict[str, Any], cache_key: str):
     return BackendJob(tool_name=tool, input_payload=ip, cache_key=cache_key)
 
 
+def _discard_when_done(work: Future, path: Path) -> None:
+    """Remove a failed job's trajectory once its worker thread has stopped.
+
+    ``wait_for`` timing out or being cancelled does not stop the thread,
+    which may still be writing chunks into ``path``.
+    """
+    work.add_done_callback(lambda _: shutil.rmtree(path, ignore_errors=True))
+
+
 def _summarise_result(result: dict[str, Any]) -> dict[str, Any]:
     """Trim large arrays out of the result for the provenance summary."""
     out: dict[str, Any] = {}
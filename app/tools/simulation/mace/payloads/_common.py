@@ -3,7 +3,7 @@
 Imported by every ``relax.py`` / ``elastic.py`` / etc. payload. Provides:
 
   - ``read_spec()``  — parse the JSON arg file into a dict
-  - ``write_result()`` — write result.json + structure.cif + traj.json
+  - ``write_result()`` — write result.json + structure.cif
   - ``push_to_dataset()`` — upload artifacts to MACE_MCP_RESULTS_REPO under
                               ``<cache_key>/``
   - ``ensure_mace_core()`` — install mace-mcp (which ships mace_core) into
@@ -40,10 +40,6 @@ def write_cif(cache_key: str, cif_text: str) -> None:
     (out_dir(cache_key) / "structure.cif").write_text(cif_text)
 
 
-def write_traj(cache_key: str, traj: dict[str, Any]) -> None:
-    (out_dir(cache_key) / "traj.json").write_text(json.dumps(traj, default=str))
-
-
 def push_to_dataset(cache_key: str, repo_id: str) -> str | None:
     token = os.environ.get("HF_TOKEN")
     if not token:
@@ -53,12 +49,12 @@ def push_to_dataset(cache_key: str, repo_id: str) -> str | None:
     api = HfApi(token=token)
     create_repo(repo_id, repo_type="dataset", exist_ok=True, token=token)
     d = out_dir(cache_key)
-    for fn in d.iterdir():
+    for fn in sorted(d.rglob("*")):
         if not fn.is_file():
             continue
         api.upload_file(
             path_or_fileobj=str(fn),
-            path_in_repo=f"{cache_key}/{fn.name}",
+            path_in_repo=f"{cache_key}/{fn.relative_to(d).as_posix()}",
             repo_id=repo_id,
             repo_type="dataset",
             token=token,
@@ -25,8 +25,8 @@ def main() -> None:
         push_to_dataset,
         read_spec,
         write_cif,
+        out_dir,
         write_result,
-        write_traj,
     )
 
     ensure_mace_core()
@@ -35,22 +35,31 @@ def main() -> None:
     ip = spec["input_payload"]
     seed = int(spec.get("seed", 20260506))
 
+    from app.tools.simulation.mace.cache.trajectory import TrajectoryWriter
     from app.tools.simulation.mace.core.md import langevin_run
     from app.tools.simulation.mace.core.relax import relax
 
     atoms, _, _ = build_atoms(ip, seed)
     calc = make_calc_for(ip)
     relax(atoms, calc, fmax=0.05, steps=200)
-    mdr = langevin_run(
-        atoms,
-        calc,
-        T_K=ip["T_K"],
-        n_steps=ip.get("n_steps", 1000),
-        timestep_fs=ip.get("timestep_fs", 1.0),
-        friction_per_fs=ip.get("friction_per_fs", 0.01),
-        sample_every=ip.get("sample_every"),
-        seed=seed,
-    )
+    with TrajectoryWriter(
+        out_dir(cache_key) / "traj",
+        atoms.get_chemical_symbols(),
+        pbc=atoms.pbc,
+        dtype=ip.get("traj_dtype", "float32"),
+        compress=ip.get("traj_compress", False),
+    ) as traj:
+        mdr = langevin_run(
+            atoms,
+            calc,
+            T_K=ip["T_K"],
+            n_steps=ip.get("n_steps", 1000),
+            timestep_fs=ip.get("timestep_fs", 1.0),
+            friction_per_fs=ip.get("friction_per_fs", 0.01),
+            sample_every=ip.get("sample_every"),
+            seed=seed,
+            trajectory=traj,
+        )
 
     result = {
         "mean_E_per_atom_eV": mdr.mean_E_per_atom_eV,
@@ -58,15 +67,12 @@ def main() -> None:
         "mean_T_K": mdr.mean_T_K,
         "rdf_r_A": mdr.rdf_r_A,
         "rdf_g": mdr.rdf_g,
+        "rdf_partials": mdr.rdf_partials,
         "is_dynamically_stable": mdr.is_dynamically_stable,
         "wall_time_s": mdr.wall_time_s,
     }
     write_result(cache_key, result)
     write_cif(cache_key, cif_text(mdr.final_atoms))
-    write_traj(
-        cache_key,
-        {"steps": mdr.steps, "energies": mdr.energies, "temperatures": mdr.temperatures},
-    )
     repo = spec.get("results_repo")
     if repo:
         push_to_dataset(cache_key, repo)
@@ -1,4 +1,4 @@
-"""The 5 MACE primitive tools.
+"""The 5 MACE primitive tools, plus the μ-reference prewarm job.
 
 Every primitive:
   1. Validates input via its pydantic schema.
@@ -19,7 +19,7 @@ from . import __version__ as TOOL_VERSION
 from .backends.base import select_backend
 from .cache.hashing import cache_key as compute_cache_key
 from .cache.hashing import canonical_structure_repr
-from .ids import git_sha
+from .ids import git_sha, new_job_id
 from .jobs.runner import JobRunner
 from .schemas import (
     ComputeDiluteSoluteInput,
@@ -27,6 +27,7 @@ from .schemas import (
     JobHandle,
     MdEquilibrateInput,
     PhononHarmonicInput,
+    PrewarmReferencesInput,
     RelaxStructureInput,
     StructureRef,
 )
@@ -165,6 +166,8 @@ async def md_equilibrate(
         "timestep_fs": inp.timestep_fs,
         "friction_per_fs": inp.friction_per_fs,
         "ensemble": inp.ensemble,
+        "traj_dtype": inp.traj_dtype,
+        "traj_compress": inp.traj_compress,
     }
     key = compute_cache_key(
         tool_name="md_equilibrate",
@@ -220,3 +223,36 @@ async def phonon_harmonic(
         timeout_seconds=inp.options.timeout_seconds,
     )
     return handle
+
+
+async def prewarm_references(
+    inp: PrewarmReferencesInput,
+    runner: JobRunner,
+    backends: dict[str, Any],
+) -> JobHandle:
+    """Compute the missing pure-element μ for ``inp.elements`` as one job.
+
+    The μ table lives in the local cache root, so this runs on the local
+    backend (or the fake one). Each call is a new job: the table is the
+    cache, and a replayed result would misreport what was computed.
+    """
+    if inp.options.backend not in ("auto", "local", "fake"):
+        raise ValueError("prewarm_references runs on the local backend only")
+    backend = backends["fake" if inp.options.backend == "fake" else "local"]
+    key = compute_cache_key(
+        tool_name="prewarm_references",
+        tool_version=TOOL_VERSION,
+        structure={"elements": sorted(inp.elements)},
+        head=inp.options.head,
+        calc_params={"dtype": inp.options.dtype, "run": new_job_id()},
+        mace_core_git_sha=git_sha(),
+    )
+    return await runner.submit(
+        tool_name="prewarm_references",
+        input_payload=inp.model_dump(by_alias=False),
+        cache_key=key,
+        backend_name=backend.name,
+        seed=inp.options.seed,
+        progress_token=inp.options.progress_token,
+        timeout_seconds=inp.options.timeout_seconds,
+    )
@@ -274,6 +274,9 @@ class MdEquilibrateInput(_Base):
     friction_per_fs: float = Field(0.01, gt=0.0, le=1.0)
     ensemble: Literal["nvt_langevin"] = "nvt_langevin"
     sample_every: int | None = Field(None, ge=1)
+    # Sampled frames are stored in the cache as a chunked binary trajectory
+    traj_dtype: Literal["float32", "float64"] = "float32"
+    traj_compress: bool = False
     options: PrimitiveOptions = Field(default_factory=PrimitiveOptions)
 
 
@@ -285,6 +288,8 @@ class MdEquilibrateResult(_Base):
     traj_ref: str
     rdf_r_A: list[float]
     rdf_g: list[float]
+    # Partial g_AB(r) on the rdf_r_A grid, keyed "A-B" with A <= B
+    rdf_partials: dict[str, list[float]] = Field(default_factory=dict)
     is_dynamically_stable: bool
     wall_time_s: float
     provenance_ref: str
@@ -318,6 +323,34 @@ class PhononHarmonicResult(_Base):
     provenance_ref: str
 
 
+# ---------------------------------------------------------------------------
+# Batch job: prewarm_references
+# ---------------------------------------------------------------------------
+
+class PrewarmReferencesInput(_Base):
+    """Fill the pure-element μ reference table for a whole element set."""
+
+    elements: list[str] = Field(..., min_length=1, max_length=len(ALLOWED_ELEMENTS))
+    options: PrimitiveOptions = Field(default_factory=PrimitiveOptions)
+
+    @field_validator("elements")
+    @classmethod
+    def _known_elements(cls, v: list[str]) -> list[str]:
+        unknown = sorted(set(v) - ALLOWED_ELEMENTS)
+        if unknown:
+            raise ValueError(f"elements not in the allowed set: {unknown}")
+        return list(dict.fromkeys(v))
+
+
+class PrewarmReferencesResult(_Base):
+    mu_eV_per_atom: dict[str, float]
+    computed: list[str]  # relaxed by this job
+    cached: list[str]  # already in the table
+    head: Head
+    wall_time_s: float
+    provenance_ref: str
+
+
 # ---------------------------------------------------------------------------
 # Control plane
 # ---------------------------------------------------------------------------
@@ -404,3 +437,6 @@ class GetCachedStructureResult(_Base):
     head: Head | None = None
     source_job_id: str | None = None
     created_at: str | None = None
+    # Set when cache_ref points into a trajectory (cache://<key>/traj[/<frame>])
+    frame: int | None = None
+    n_frames: int | None = None
@@ -15,6 +15,7 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
 from typing import TYPE_CHECKING, Any
 
 logger = logging.getLogger(__name__)
@@ -122,7 +123,7 @@ class MaceBridge:
         # huggingface_hub transitive import for users without one).
         backends: dict[str, "Backend"] = {
             "fake": FakeBackend(),
-            "local": LocalBackend(),
+            "local": LocalBackend(cache_root=Path(resolved_cache_dir)),
             "platform": PlatformBackend(),
         }
 
@@ -156,6 +157,7 @@ class MaceBridge:
 
 
 _BRIDGE: MaceBridge | None = None
+_BRIDGE_LOCK = threading.Lock()
 
 
 def get_mace_bridge() -> MaceBridge:
@@ -163,11 +165,15 @@ def get_mace_bridge() -> MaceBridge:
 
     Singleton because JobRunner owns a background thread pool + sqlite handle;
     re-instantiating per tool call would leak resources and corrupt the
-    cache database on concurrent writes.
+    cache database on concurrent writes. Construction is locked, so a
+    background thread (e.g. the server's ``mace-preload``) and the first
+    tool call cannot each build one.
     """
     global _BRIDGE
     if _BRIDGE is None:
-        _BRIDGE = MaceBridge()
+        with _BRIDGE_LOCK:
+            if _BRIDGE is None:
+                _BRIDGE = MaceBridge()
     return _BRIDGE
 
 
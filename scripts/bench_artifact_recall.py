@@ -0,0 +1,126 @@
+"""Micro-benchmark: per-recall() latency of the artifact store.
+
+Builds (or reuses) a DB of synthetic artifacts and times hybrid recall
+with pooled per-thread connections against a baseline that opens a fresh
+connection — PRAGMAs and all — for every sub-query, which is how the
+store behaved before pooling, and against `recall(parallel=True)`.
+
+Run from the repo root:
+
+    PYTHONPATH=. python3 scripts/bench_artifact_recall.py --artifacts 50000
+    PYTHONPATH=. python3 scripts/bench_artifact_recall.py --db /tmp/bench.db --queries 500
+
+The DB is kept when --db is given, so repeated runs skip the build.
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from app.tools.memory.embedder import HashEmbedder
+from app.tools.memory.store import ArtifactStore
+
+ELEMENTS = ["Fe", "Ni", "Co", "Cr", "Al", "Ti", "Cu", "Mo", "Nb", "W", "V", "Mn"]
+
+
+class UnpooledStore(ArtifactStore):
+    """Baseline: one new connection per call, no shared read snapshot."""
+
+    def _connection(self):
+        return self._connect()
+
+    @contextmanager
+    def _snapshot(self):
+        yield self._connect()
+
+
+def build(db: Path, n: int, emb: HashEmbedder) -> None:
+    store = ArtifactStore(db)
+    t0 = time.perf_counter()
+    for i in range(n):
+        a, b = ELEMENTS[i % len(ELEMENTS)], ELEMENTS[(i * 7 + 3) % len(ELEMENTS)]
+        result = {
+            "results": [
+                {"formula": f"{a}{j + 1}{b}{i % 5 + 1}", "band_gap": (i * j) % 7 / 2}
+                for j in range(3)
+            ]
+        }
+        summary = f"search_materials {a}-{b} alloys batch {i}"
+        store.record(
+            tool_name="search_materials" if i % 3 else "calculate_phase_diagram",
+            args={"elements": [a, b], "i": i},
+            result=result,
+            session_id=f"s{i % 20}",
+            summary=summary,
+            embedding=emb.embed(summary),
+            record_embeddings=[emb.embed(f"{a}{j + 1}{b} record {i}") for j in range(3)],
+        )
+        if (i + 1) % 10000 == 0:
+            print(f"  built {i + 1}/{n} ({time.perf_counter() - t0:.0f}s)", file=sys.stderr)
+
+
+def time_recall(
+    store: ArtifactStore, queries: list[str], emb: HashEmbedder, parallel: bool = False,
+) -> dict:
+    # warm-up: index load / scan cache, not what we're measuring
+    store.recall(query_text=queries[0], query_embedding=emb.embed(queries[0]), parallel=parallel)
+    vecs = [emb.embed(q) for q in queries]
+    samples = []
+    for q, v in zip(queries, vecs):
+        t0 = time.perf_counter()
+        store.recall(query_text=q, query_embedding=v, limit=10, parallel=parallel)
+        samples.append((time.perf_counter() - t0) * 1e3)
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95)], 3),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--artifacts", type=int, default=50000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--dim", type=int, default=64)
+    ap.add_argument("--db", type=Path, help="reuse/keep this DB instead of a temp file")
+    ap.add_argument("--no-index", action="store_true", help="time the row-scan path")
+    args = ap.parse_args()
+
+    emb = HashEmbedder(dim=args.dim)
+    tmp = None
+    db = args.db
+    if db is None:
+        tmp = tempfile.TemporaryDirectory()
+        db = Path(tmp.name) / "bench.db"
+    if not db.exists():
+        print(f"building {args.artifacts} artifacts in {db}", file=sys.stderr)
+        build(db, args.artifacts, emb)
+
+    # element pair + batch number: selective enough that BM25 ranking of
+    # a near-universal token doesn't swamp the connection overhead
+    queries = [
+        f"{ELEMENTS[i % len(ELEMENTS)]} {ELEMENTS[(i * 5) % len(ELEMENTS)]} "
+        f"{(i * 7919) % args.artifacts}"
+        for i in range(args.queries)
+    ]
+    out = {"artifacts": args.artifacts, "queries": args.queries, "index": not args.no_index}
+    for name, cls in (("unpooled", UnpooledStore), ("pooled", ArtifactStore)):
+        out[name] = time_recall(cls(db, vector_index=not args.no_index), queries, emb)
+    # the four rankers concurrently, one connection each
+    out["parallel"] = time_recall(
+        ArtifactStore(db, vector_index=not args.no_index), queries, emb, parallel=True,
+    )
+    out["speedup_p50"] = round(out["unpooled"]["p50_ms"] / out["pooled"]["p50_ms"], 2)
+    print(json.dumps(out, indent=2))
+    if tmp is not None:
+        tmp.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,422 @@
+"""Benchmark: the federated search stack against a local replaying stand-in.
+
+No network. An in-process ASGI app plays N fake OPTIMADE providers (one
+virtual host each, ``p0.bench.local`` ...) and one Materials Project
+summary endpoint. Every response is built from replayed entries with
+configurable latency (lognormal jitter), error rate and page count. The
+OPTIMADE providers go through the real ``HTTPClientPool`` via
+``httpx.ASGITransport``. The MP provider keeps its real thread pool and
+chunking; only the request it sends is redirected to the stand-in.
+
+Measured:
+
+- ``latency``: cold ``SearchEngine.search`` end to end (p50/p95/p99)
+- ``throughput``: searches/s with C concurrent cold searches
+- ``fusion``: ``IncrementalFuser`` cost against result size
+- ``cache``: LRU hit, SQLite hit, containment hit, miss, cached search
+
+Run from the repo root:
+
+    PYTHONPATH=. python3 scripts/bench_search_engine.py --out bench_search.json
+    PYTHONPATH=. python3 scripts/bench_search_engine.py --providers 20 --latency-ms 80 --error-rate 0.05
+    PYTHONPATH=. python3 scripts/bench_search_engine.py --recordings ~/prism-recordings
+
+``--recordings DIR`` replays ``DIR/optimade.json`` (an OPTIMADE
+``/structures`` response) and ``DIR/mp.json`` (an MP summary response)
+instead of synthetic entries; either file may be missing. The same app
+can be served for manual poking with ``uvicorn``, via ``build_app()``.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from app.tools.search_engine.cache.engine import SearchCache
+from app.tools.search_engine.engine import SearchEngine
+from app.tools.search_engine.fusion import IncrementalFuser
+from app.tools.search_engine.http import HTTPClientPool
+from app.tools.search_engine.providers.endpoint import (
+    BehaviorConfig, CapabilitiesConfig, ProviderEndpoint,
+)
+from app.tools.search_engine.providers.materials_project import MaterialsProjectProvider
+from app.tools.search_engine.providers.optimade import OptimadeProvider
+from app.tools.search_engine.providers.registry import ProviderRegistry
+from app.tools.search_engine.query import MaterialSearchQuery, PropertyRange
+from app.tools.search_engine.resilience.circuit_breaker import HealthManager
+from app.tools.search_engine.result import Material, PropertyValue
+
+ELEMENTS = ["Fe", "Ni", "Co", "Cr", "Al", "Ti", "Cu", "Mo", "Nb", "W", "V", "Mn"]
+SPACE_GROUPS = ["Fm-3m", "Im-3m", "P6_3/mmc", "Pm-3m", "I4/mmm"]
+_HAS_ALL = re.compile(r'elements HAS ALL ((?:"[A-Za-z]+",?)+)')
+
+
+def _percentiles(samples: list[float]) -> dict:
+    samples = sorted(samples)
+
+    def q(p):
+        return round(samples[min(len(samples) - 1, int(len(samples) * p))], 3)
+
+    return {
+        "n": len(samples),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": q(0.50), "p95_ms": q(0.95), "p99_ms": q(0.99),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Stand-in server
+# ---------------------------------------------------------------------------
+
+def _formula(a: str, b: str, k: int) -> str:
+    """The ``k``-th synthetic ``a``-``b`` formula (distinct for k < 23 * 29)."""
+    return f"{a}{k % 23 + 1}{b}{k % 29 + 1}"
+
+
+class Replay:
+    """Entry templates: recorded responses when given, synthetic otherwise.
+
+    Synthetic formulas come from one shared pool, so the same material
+    shows up at several providers and fusion has real merging to do.
+    """
+
+    def __init__(self, recordings: Path | None = None):
+        self.optimade: list[dict] = []
+        self.mp: list[dict] = []
+        if recordings is not None:
+            for name in ("optimade", "mp"):
+                path = recordings / f"{name}.json"
+                if path.exists():
+                    setattr(self, name, json.loads(path.read_text()).get("data", []))
+
+    def optimade_entry(self, provider: str, i: int, elements: list[str]) -> dict:
+        """Entry ``i`` of ``provider``; providers are offset by 20 entries, so neighbours overlap."""
+        if self.optimade:
+            entry = dict(self.optimade[i % len(self.optimade)])
+            return {**entry, "id": f"{provider}-{i}"}
+        a, b = (elements + ELEMENTS)[:2] if len(elements) < 2 else elements[:2]
+        k = i + 20 * int(provider.lstrip("p") or 0)
+        return {"id": f"{provider}-{i}", "type": "structures", "attributes": {
+            "chemical_formula_descriptive": _formula(a, b, k),
+            "elements": sorted({a, b}), "nelements": len({a, b}),
+            "space_group_symbol": SPACE_GROUPS[k % len(SPACE_GROUPS)],
+            "_bench_band_gap": round((k * 37 % 50) / 10, 2),
+        }}
+
+    def mp_doc(self, i: int, elements: list[str]) -> dict:
+        if self.mp:
+            return {**self.mp[i % len(self.mp)], "material_id": f"mp-{i}"}
+        a, b = (elements + ELEMENTS)[:2] if len(elements) < 2 else elements[:2]
+        return {
+            "material_id": f"mp-{i}", "formula_pretty": _formula(a, b, i),
+            "elements": sorted({a, b}), "nelements": len({a, b}),
+            "band_gap": round((i * 37 % 50) / 10, 2), "formation_energy_per_atom": -0.1 * (i % 9),
+            "energy_above_hull": 0.01 * (i % 7), "symmetry": {"symbol": SPACE_GROUPS[i % len(SPACE_GROUPS)]},
+        }
+
+
+class StandIn:
+    """ASGI app: ``/v1/structures`` per virtual host, plus ``/materials/summary/``."""
+
+    def __init__(
+        self, replay: Replay, *, latency_ms: float, jitter: float, error_rate: float,
+        pages: int, seed: int = 0,
+    ):
+        self.replay = replay
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.pages = pages
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.mp_requests = 0
+        self.errors = 0
+
+    async def _respond(self, send, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": payload})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":  # uvicorn
+            while True:
+                msg = await receive()
+                await send({"type": msg["type"] + ".complete"})
+                if msg["type"] == "lifespan.shutdown":
+                    return
+        headers = dict(scope["headers"])
+        host = headers.get(b"host", b"p0").decode().split(".")[0]
+        params = {k: v[-1] for k, v in parse_qs(scope["query_string"].decode()).items()}
+        self.requests += 1
+        # lognormal: median = latency_ms, with a realistic tail
+        await asyncio.sleep(self.latency_ms * math.exp(self.rng.gauss(0, self.jitter)) / 1000)
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            return await self._respond(send, 500, {"errors": [{"detail": "stand-in failure"}]})
+
+        match = _HAS_ALL.search(params.get("filter", "") or params.get("elements", ""))
+        elements = re.findall(r"[A-Z][a-z]?", match.group(1)) if match else []
+        if scope["path"].startswith("/materials/summary"):
+            self.mp_requests += 1
+            elements = elements or params.get("elements", "").split(",")
+            size = int(params.get("_per_page") or params.get("_limit") or 100)
+            page = int(params.get("_page", 1))
+            total = size * self.pages
+            docs = [self.replay.mp_doc(i, elements) for i in range((page - 1) * size, min(page * size, total))]
+            return await self._respond(send, 200, {"data": docs, "meta": {"total_doc": total}})
+
+        size = int(params.get("page_limit", 20))
+        page = int(params.get("page", 0))
+        data = [self.replay.optimade_entry(host, page * size + j, elements) for j in range(size)]
+        links = {}
+        if page + 1 < self.pages:
+            # the stand-in is stateless, so the cursor carries the page size
+            links["next"] = {"href": f"http://{host}.bench.local/v1/structures?page={page + 1}&page_limit={size}"}
+        return await self._respond(send, 200, {"data": data, "links": links, "meta": {}})
+
+
+def build_app(providers: int = 8, **kwargs) -> StandIn:
+    """The stand-in with default settings (``uvicorn`` entry point)."""
+    kwargs.setdefault("latency_ms", 50.0)
+    kwargs.setdefault("jitter", 0.4)
+    kwargs.setdefault("error_rate", 0.0)
+    kwargs.setdefault("pages", 3)
+    return StandIn(Replay(), **kwargs)
+
+
+class ReplayMPProvider(MaterialsProjectProvider):
+    """Real MP provider (thread pool, chunks); the request goes to the stand-in.
+
+    Every hook that would build an MPRester is replaced, so the bench
+    needs no mp-api install and never reaches the network.
+    """
+
+    def __init__(self, app: StandIn):
+        super().__init__(ProviderEndpoint(
+            id="mp_native", name="MP (stand-in)", api_type="mp_native", tier=1, enabled=True,
+            capabilities=CapabilitiesConfig(filterable_fields=["elements", "formula", "band_gap"]),
+        ))
+        self._app = app
+
+    def _resolve_api_key(self) -> str:
+        return "bench"
+
+    @staticmethod
+    def _paged(api_key) -> bool:
+        return True
+
+    def _fetch_all(self, api_key, kwargs, num_chunks, chunk_size):
+        out = []
+        for page in range(1, num_chunks + 1):
+            out.extend(self._fetch_chunk(api_key, kwargs, page, chunk_size))
+        return out
+
+    def _fetch_chunk(self, api_key, kwargs, page, chunk_size):
+        import httpx
+
+        async def get():
+            transport = httpx.ASGITransport(app=self._app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://mp.bench.local") as c:
+                params = {"_page": page, "_per_page": chunk_size, "elements": ",".join(kwargs.get("elements", []))}
+                resp = await c.get("/materials/summary/", params=params)
+                resp.raise_for_status()
+                return resp.json()["data"]
+
+        # MP workers are plain threads: one short-lived loop per request
+        return [self._parse_doc(d) for d in asyncio.run(get())]
+
+
+def build_registry(app: StandIn, providers: int, with_mp: bool) -> ProviderRegistry:
+    reg = ProviderRegistry()
+    for i in range(providers):
+        reg.register(OptimadeProvider(ProviderEndpoint(
+            id=f"p{i}", name=f"Stand-in {i}", base_url=f"http://p{i}.bench.local/v1",
+            tier=2, enabled=True, behavior=BehaviorConfig(timeout_ms=5000, max_results=50),
+            capabilities=CapabilitiesConfig(
+                filterable_fields=["elements", "nelements", "space_group", "band_gap"],
+                property_fields={"band_gap": "_bench_band_gap"},
+            ),
+        )))
+    if with_mp:
+        reg.register(ReplayMPProvider(app))
+    return reg
+
+
+# ---------------------------------------------------------------------------
+# Measurements
+# ---------------------------------------------------------------------------
+
+def _queries(n: int, limit: int) -> list[MaterialSearchQuery]:
+    pairs = [(a, b) for i, a in enumerate(ELEMENTS) for b in ELEMENTS[i + 1:]]
+    return [
+        MaterialSearchQuery(elements=list(pairs[i % len(pairs)]), limit=limit + i // len(pairs))
+        for i in range(n)
+    ]
+
+
+async def bench_latency(engine: SearchEngine, cache: SearchCache, queries) -> dict:
+    await engine.search(queries[0])  # warm-up: pooled clients, MP workers
+    samples, counts = [], []
+    for q in queries:
+        cache.clear()
+        t0 = time.perf_counter()
+        result = await engine.search(q)
+        samples.append((time.perf_counter() - t0) * 1e3)
+        counts.append(result.total_count)
+    return {**_percentiles(samples), "mean_results": round(statistics.fmean(counts), 1)}
+
+
+async def bench_throughput(engine: SearchEngine, cache: SearchCache, queries, levels) -> dict:
+    out = {}
+    for c in levels:
+        cache.clear()
+        rounds = max(1, len(queries) // c)
+        t0 = time.perf_counter()
+        for r in range(rounds):
+            batch = queries[r * c:(r + 1) * c] or queries[:c]
+            await asyncio.gather(*(engine.search(q) for q in batch))
+        wall = time.perf_counter() - t0
+        out[str(c)] = {"searches": rounds * c, "wall_s": round(wall, 3),
+                       "searches_per_s": round(rounds * c / wall, 2)}
+    return out
+
+
+def _materials(n: int, provider: str, offset: int) -> list[Material]:
+    return [
+        Material(
+            id=f"{provider}-{i}", formula=f"Fe{i % 97 + 1}Ni{i // 97 + 1}", elements=["Fe", "Ni"],
+            n_elements=2, sources=[provider],
+            space_group=PropertyValue(value=SPACE_GROUPS[i % len(SPACE_GROUPS)], source=provider),
+            band_gap=PropertyValue(value=(i % 40) / 10, source=provider, unit="eV"),
+        )
+        for i in range(offset, offset + n)
+    ]
+
+
+def bench_fusion(sizes: list[int], providers: int = 4, repeats: int = 3) -> dict:
+    out = {}
+    for n in sizes:
+        # each provider overlaps half of the previous one's identities
+        pages = [_materials(n, f"p{k}", k * n // 2) for k in range(providers)]
+        samples = []
+        for _ in range(repeats):
+            fuser = IncrementalFuser(limit=None)
+            t0 = time.perf_counter()
+            for page in pages:
+                fuser.add(page)
+            samples.append((time.perf_counter() - t0) * 1e3)
+        best = min(samples)
+        out[str(n)] = {"input_rows": n * providers, "unique": len(fuser), "ms": round(best, 3),
+                       "us_per_row": round(best * 1e3 / (n * providers), 3)}
+    return out
+
+
+def _time(fn, repeats: int) -> dict:
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e3)
+    return _percentiles(samples)
+
+
+async def bench_cache(engine: SearchEngine, cache_dir: Path, query, repeats: int) -> dict:
+    result = await engine.search(query)
+    lru = SearchCache(disk_dir=cache_dir)
+    lru.put(query, result)
+    sqlite = SearchCache(disk_dir=cache_dir, memory_entries=0)
+    narrow = query.model_copy(update={"band_gap": PropertyRange(min=1.0), "limit": 10})
+    miss = query.model_copy(update={"elements": ["Xe"]})
+    searches = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        cached = await engine.search(query)
+        searches.append((time.perf_counter() - t0) * 1e3)
+    return {
+        "result_size": result.total_count,
+        "lru_hit": _time(lambda: lru.get(query), repeats),
+        "sqlite_hit": _time(lambda: sqlite.get(query), repeats),
+        "containment_hit": _time(lambda: sqlite.get_containing(narrow), repeats),
+        "miss": _time(lambda: sqlite.get(miss) or sqlite.get_containing(miss), repeats),
+        "engine_search": {**_percentiles(searches), "cached": cached.cached},
+    }
+
+
+async def run(args) -> dict:
+    app = StandIn(
+        Replay(args.recordings), latency_ms=args.latency_ms, jitter=args.jitter,
+        error_rate=args.error_rate, pages=args.pages, seed=args.seed,
+    )
+    import httpx
+
+    pool = HTTPClientPool(transport=httpx.ASGITransport(app=app), http2=False)
+    registry = build_registry(app, args.providers, not args.no_mp)
+    tmp = tempfile.TemporaryDirectory()
+    cache_dir = Path(tmp.name)
+    cache = SearchCache(disk_dir=None)
+    engine = SearchEngine(
+        registry, cache=cache, health_manager=HealthManager(persist_path=None),
+        http=pool, global_timeout=args.global_timeout,
+    )
+    queries = _queries(args.searches, args.limit)
+    out = {
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items() if k != "out"},
+        "latency": await bench_latency(engine, cache, queries),
+        "throughput": await bench_throughput(engine, cache, queries, args.concurrency),
+        "fusion": bench_fusion(args.fusion_sizes),
+        "cache": await bench_cache(
+            SearchEngine(registry, cache=SearchCache(disk_dir=cache_dir),
+                         health_manager=HealthManager(persist_path=None), http=pool),
+            cache_dir, queries[0], args.cache_repeats,
+        ),
+        "stand_in": {"requests": app.requests, "mp_requests": app.mp_requests, "errors": app.errors},
+    }
+    await pool.aclose()
+    tmp.cleanup()
+    if not args.no_mp and not app.mp_requests:
+        # MP errors are per-provider warnings; without this the numbers
+        # would silently exclude the MP replay path
+        raise RuntimeError("the MP stand-in saw no requests; ReplayMPProvider is not replaying")
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--providers", type=int, default=8, help="fake OPTIMADE providers")
+    ap.add_argument("--no-mp", action="store_true", help="leave the MP stand-in out")
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="median per-request latency")
+    ap.add_argument("--jitter", type=float, default=0.4, help="lognormal sigma of the latency")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 500")
+    ap.add_argument("--pages", type=int, default=3, help="pages each provider has per query")
+    ap.add_argument("--limit", type=int, default=100, help="query limit")
+    ap.add_argument("--searches", type=int, default=60, help="cold searches for latency/throughput")
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--fusion-sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    ap.add_argument("--cache-repeats", type=int, default=200)
+    ap.add_argument("--global-timeout", type=float, default=5.0)
+    ap.add_argument("--recordings", type=Path, help="dir with optimade.json / mp.json to replay")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, help="write results JSON here (default: stdout only)")
+    args = ap.parse_args()
+
+    # injected failures would otherwise log one warning per request
+    logging.basicConfig(level=logging.ERROR)
+    out = asyncio.run(run(args))
+    text = json.dumps(out, indent=2)
+    print(text)
+    if args.out is not None:
+        args.out.write_text(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
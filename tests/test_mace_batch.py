@@ -0,0 +1,107 @@
+"""Batched structure evaluation (ASE fallback path; no mace-torch needed)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+ase = pytest.importorskip("ase")
+
+from ase.build import bulk  # noqa: E402
+from ase.calculators.emt import EMT  # noqa: E402
+
+from app.tools.simulation.mace.core.batch import (  # noqa: E402
+    _forward,
+    _packable,
+    _sequential,
+    evaluate_batch,
+)
+from app.tools.simulation.mace.core.elastic import (  # noqa: E402
+    EV_PER_A3_TO_GPA,
+    apply_strain,
+    elastic_tensor,
+    voigt_strain_tensor,
+)
+
+
+def test_evaluate_batch_matches_per_structure_calls():
+    cells = [bulk("Cu", "fcc", a=3.6 + 0.02 * i, cubic=True) for i in range(5)]
+    cells[2].rattle(0.02, seed=1)
+    seen = []
+    res = evaluate_batch(cells, EMT(), batch_size=2, progress=lambda d, n: seen.append((d, n)))
+    assert seen == [(2, 5), (4, 5), (5, 5)]
+    for a, e, f, s in zip(cells, res.energies, res.forces, res.stresses):
+        assert a.calc is None
+        ref = a.copy()
+        ref.calc = EMT()
+        assert e == pytest.approx(ref.get_potential_energy())
+        np.testing.assert_allclose(f, ref.get_forces())
+        np.testing.assert_allclose(s, ref.get_stress())
+    assert evaluate_batch(cells, EMT(), compute_stress=False).stresses is None
+
+
+def test_elastic_tensor_from_batch_matches_cell_by_cell():
+    atoms = bulk("Cu", "fcc", a=3.59, cubic=True)
+    C = elastic_tensor(atoms, EMT(), batch_size=5)
+
+    eps = 0.005
+    ref = np.zeros((6, 6))
+    for j in range(6):
+        pair = []
+        for sign in (+1, -1):
+            a = apply_strain(atoms, voigt_strain_tensor(j, sign * eps))
+            a.calc = EMT()
+            pair.append(a.get_stress())
+        ref[:, j] = (pair[0] - pair[1]) / (2 * eps)
+    ref = 0.5 * (ref + ref.T) * EV_PER_A3_TO_GPA
+    np.testing.assert_allclose(C, ref)
+    assert C[0, 0] > C[0, 1] > 0
+
+
+def test_phonon_progress_counts_displacements():
+    pytest.importorskip("phonopy")
+    from app.tools.simulation.mace.core.phonons import harmonic_free_energy
+
+    atoms = bulk("Cu", "fcc", a=3.6, cubic=True)
+    atoms.symbols[0] = "Ni"  # two inequivalent sites, several displacements
+    seen = []
+    harmonic_free_energy(
+        atoms, EMT(), [300.0], q_mesh=(2, 2, 2), batch_size=2,
+        progress=lambda d, n: seen.append((d, n)),
+    )
+    n_disp = seen[-1][1]
+    assert n_disp > 2 and all(n == n_disp for _, n in seen)
+    assert [d for d, _ in seen] == sorted({d for d, _ in seen}) and seen[-1][0] == n_disp
+
+
+def test_packed_forward_matches_sequential_mace_calls(tmp_path):
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("mace")
+    from e3nn import o3
+    from mace import modules
+    from mace.calculators import MACECalculator
+
+    torch.manual_seed(0)
+    model = modules.MACE(
+        r_max=4.0, num_bessel=8, num_polynomial_cutoff=6, max_ell=2,
+        interaction_cls=modules.interaction_classes["RealAgnosticResidualInteractionBlock"],
+        interaction_cls_first=modules.interaction_classes["RealAgnosticResidualInteractionBlock"],
+        num_interactions=2, num_elements=2, hidden_irreps=o3.Irreps("8x0e + 8x1o"),
+        MLP_irreps=o3.Irreps("16x0e"), gate=torch.nn.functional.silu,
+        atomic_energies=np.array([-3.0, -4.0]), avg_num_neighbors=8.0,
+        atomic_numbers=[28, 29], correlation=2, radial_type="bessel",
+    ).to(torch.float64)
+    path = tmp_path / "tiny.model"
+    torch.save(model, path)
+    calc = MACECalculator(model_paths=str(path), device="cpu", default_dtype="float64")
+    assert _packable(calc)
+
+    cells = [bulk("Cu", "fcc", a=3.6 + 0.02 * i, cubic=True) * (1, 1, 2) for i in range(3)]
+    cells[1].symbols[0] = "Ni"
+    cells[2].rattle(0.03, seed=2)
+    packed = _forward(calc, cells, compute_stress=True)
+    ref = _sequential(calc, cells, compute_stress=True)
+    np.testing.assert_allclose(packed.energies, ref.energies, rtol=1e-10, atol=1e-10)
+    for f, g in zip(packed.forces, ref.forces):
+        np.testing.assert_allclose(f, g, atol=1e-10)
+    np.testing.assert_allclose(packed.stresses, ref.stresses, atol=1e-10)
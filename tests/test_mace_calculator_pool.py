@@ -0,0 +1,85 @@
+"""Warm MACE calculator pool: reuse, exclusive checkout, LRU eviction."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from app.tools.simulation.mace.core import calculator
+from app.tools.simulation.mace.core.calculator import CalculatorPool, parse_preload_spec
+
+MB = 2**20
+
+
+class _FakeCalc:
+    def __init__(self, head, device, dtype):
+        self.key = (head, device, dtype)
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    monkeypatch.setattr(calculator, "_model_bytes", lambda calc: 100 * MB)
+    made = []
+
+    def factory(head, device, dtype):
+        made.append((head, device, dtype))
+        return _FakeCalc(head, device, dtype)
+
+    return made, factory
+
+
+def test_checkout_reuses_the_loaded_calculator(loads):
+    made, factory = loads
+    pool = CalculatorPool(budget_bytes=1000 * MB, factory=factory)
+    with pool.checkout("omat_pbe", "cpu", "float64") as a:
+        pass
+    with pool.checkout("omat_pbe", "cpu", "float64") as b:
+        pass
+    assert a is b and a.resets == 2
+    assert made == [("omat_pbe", "cpu", "float64")]
+    assert pool.stats()["hits"] == 1
+
+
+def test_busy_key_waits_when_no_room_for_a_copy(loads):
+    made, factory = loads
+    pool = CalculatorPool(budget_bytes=150 * MB, factory=factory)
+    held = []
+
+    def worker():
+        with pool.checkout("omat_pbe", "cpu", "float64") as c:
+            held.append(c)
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(made) == 1 and len({id(c) for c in held}) == 1
+    assert pool.stats()["waits"] >= 1
+
+
+def test_idle_models_are_evicted_oldest_first(loads):
+    made, factory = loads
+    pool = CalculatorPool(budget_bytes=250 * MB, factory=factory)
+    for head in ("omat_pbe", "matpes_r2scan", "omol"):
+        with pool.checkout(head, "cpu", "float32"):
+            pass
+    resident = [r["head"] for r in pool.stats()["resident"]]
+    assert resident == ["matpes_r2scan", "omol"]
+    assert pool.stats()["evictions"] == 1
+
+
+def test_parse_preload_spec():
+    assert parse_preload_spec("omat_pbe, matpes_r2scan:cuda:float32") == [
+        ("omat_pbe", None, "float64"),
+        ("matpes_r2scan", "cuda", "float32"),
+    ]
+    with pytest.raises(ValueError):
+        parse_preload_spec("not_a_head")
@@ -0,0 +1,81 @@
+"""Neighbour-list RDF engine and its accumulation during MD."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+ase = pytest.importorskip("ase")
+
+from ase.build import bulk  # noqa: E402
+from ase.calculators.emt import EMT  # noqa: E402
+
+from app.tools.simulation.mace.core.md import compute_rdf, langevin_run  # noqa: E402
+from app.tools.simulation.mace.core.rdf import RdfAccumulator, _pairs  # noqa: E402
+
+
+def _minimum_image_pairs(atoms, rmax):
+    """Brute-force pair distances; valid while rmax < half the cell."""
+    pos = atoms.get_positions()
+    cell = atoms.cell.array
+    f = (pos[:, None, :] - pos[None, :, :]) @ np.linalg.inv(cell)
+    f -= np.round(f)
+    r = np.linalg.norm(f @ cell, axis=-1)
+    return r[(r > 1e-3) & (r < rmax)]
+
+
+@pytest.mark.parametrize("reps", [(1, 1, 1), (3, 2, 5), (5, 5, 5)])
+def test_pairs_match_ase_neighbor_list_on_triclinic_cells(reps):
+    from ase.neighborlist import neighbor_list
+
+    atoms = bulk("Cu", "fcc", a=3.63) * reps  # primitive fcc cell: triclinic
+    atoms.rattle(0.05, seed=1)
+    i_ref, j_ref, d_ref = neighbor_list("ijd", atoms, 6.0)
+    i, j, d = (np.concatenate(x) for x in zip(*_pairs(atoms, 6.0)))
+    assert len(d) == len(d_ref)
+    np.testing.assert_allclose(np.sort(d), np.sort(d_ref))
+    np.testing.assert_array_equal(np.bincount(i, minlength=len(atoms)), np.bincount(i_ref))
+
+
+def test_small_cell_sees_images_beyond_minimum_image():
+    # 3.63 Å box, rmax 6 Å; rattled so no distance sits on a bin edge
+    cell = bulk("Cu", "fcc", a=3.63, cubic=True)
+    cell.rattle(0.05, seed=7)
+    big = cell * (4, 4, 4)
+    rmax, nbins = 6.0, 60
+    r, g_small = compute_rdf(cell, rmax=rmax, nbins=nbins)
+
+    edges = np.linspace(0.0, rmax, nbins + 1)
+    hist, _ = np.histogram(_minimum_image_pairs(big, rmax), bins=edges)
+    shell = 4.0 / 3.0 * np.pi * (edges[1:] ** 3 - edges[:-1] ** 3)
+    g_brute = hist * big.get_volume() / (len(big) ** 2 * shell)
+    np.testing.assert_allclose(g_small, g_brute, atol=1e-10)
+    assert g_small[r > 3.0].max() > 1.0  # second and later shells present
+
+
+def test_partials_weight_to_total_and_average_over_frames():
+    atoms = bulk("Cu", "fcc", a=3.7, cubic=True) * (2, 2, 2)
+    atoms.symbols[::3] = "Au"
+    atoms.rattle(0.05, seed=3)
+    acc = RdfAccumulator(atoms.get_chemical_symbols(), rmax=5.0, nbins=50)
+    acc.add(atoms)
+    acc.add(atoms)
+    assert acc.n_frames == 2
+    assert set(acc.partials()) == {"Au-Au", "Au-Cu", "Cu-Cu"}
+
+    n = len(atoms)
+    c = {el: atoms.get_chemical_symbols().count(el) / n for el in acc.species}
+    weighted = sum(c[a] * c[b] * acc.partial(a, b) for a in acc.species for b in acc.species)
+    np.testing.assert_allclose(weighted, acc.total(), atol=1e-10)
+    np.testing.assert_allclose(acc.partial("Au", "Cu"), acc.partial("Cu", "Au"))
+    np.testing.assert_allclose(acc.total(), compute_rdf(atoms, rmax=5.0, nbins=50)[1])
+
+
+def test_langevin_run_returns_time_averaged_partials():
+    atoms = bulk("Cu", "fcc", a=3.6, cubic=True) * (2, 2, 2)
+    atoms.symbols[0] = "Ni"
+    mdr = langevin_run(atoms, EMT(), T_K=300.0, n_steps=20, sample_every=5, rdf_nbins=40)
+    assert len(mdr.rdf_r_A) == len(mdr.rdf_g) == 40
+    assert set(mdr.rdf_partials) == {"Cu-Cu", "Cu-Ni", "Ni-Ni"}
+    assert all(len(g) == 40 for g in mdr.rdf_partials.values())
+    assert max(mdr.rdf_g) > 1.0
@@ -0,0 +1,121 @@
+"""Persistent pure-element μ reference table."""
+
+from __future__ import annotations
+
+import hashlib
+
+import pytest
+
+from app.tools.simulation.mace.cache import references
+from app.tools.simulation.mace.cache.references import ReferenceTable
+from app.tools.simulation.mace.core import compositions
+from app.tools.simulation.mace.core.calculator import model_fingerprint, model_sha256
+
+
+class _Calc:
+    model_sha256 = "a" * 64
+
+
+@pytest.fixture
+def relaxations(monkeypatch):
+    calls = []
+
+    def fake(symbol, calc, fmax=0.02, steps=80):
+        calls.append(symbol)
+        return -float(len(symbol)) - len(calls) * 1e-3
+
+    monkeypatch.setattr(compositions, "pure_element_energy", fake)
+    monkeypatch.setattr(references, "_provenance", lambda: {"source": "test"})
+    return calls
+
+
+def test_mu_is_computed_once_and_persists(tmp_path, relaxations):
+    db = tmp_path / "mu_references.db"
+    table = ReferenceTable(db)
+    mu = table.mu(["Fe", "Ti", "Fe"], _Calc(), head="omat_pbe", dtype="float64")
+    assert list(mu) == ["Fe", "Ti"]
+    assert relaxations == ["Fe", "Ti"]
+    table.close()
+
+    reopened = ReferenceTable(db)
+    again = reopened.mu(["Ti", "Fe"], _Calc(), head="omat_pbe", dtype="float64")
+    assert again == {"Ti": mu["Ti"], "Fe": mu["Fe"]}
+    assert relaxations == ["Fe", "Ti"]
+    row = reopened.rows()[0]
+    assert row["phase"] == "bcc" and row["model_sha256"] == "a" * 64
+    assert row["provenance"] == {"source": "test"}
+
+
+def test_key_includes_head_dtype_and_model(tmp_path, relaxations):
+    table = ReferenceTable(tmp_path / "mu.db")
+    table.mu(["Fe"], _Calc(), head="omat_pbe", dtype="float64")
+    table.mu(["Fe"], _Calc(), head="matpes_r2scan", dtype="float64")
+    table.mu(["Fe"], _Calc(), head="omat_pbe", dtype="float32")
+    other = _Calc()
+    other.model_sha256 = "b" * 64
+    table.mu(["Fe"], other, head="omat_pbe", dtype="float64")
+    assert relaxations == ["Fe"] * 4
+
+
+def test_prewarm_reports_new_and_cached(tmp_path, relaxations):
+    table = ReferenceTable(tmp_path / "mu.db")
+    table.mu(["Nb"], _Calc(), head="omat_pbe", dtype="float64")
+    seen = []
+    out = table.prewarm(
+        ["Mo", "Nb", "Ta"], _Calc(), head="omat_pbe", dtype="float64",
+        progress=lambda d, n: seen.append((d, n)),
+    )
+    assert out["computed"] == ["Mo", "Ta"] and out["cached"] == ["Nb"]
+    assert set(out["mu_eV_per_atom"]) == {"Mo", "Nb", "Ta"}
+    assert seen == [(1, 2), (2, 2)]
+
+
+def test_model_sha256_and_fingerprint(tmp_path):
+    blob = tmp_path / ("c" * 64)
+    blob.write_bytes(b"weights")
+    link = tmp_path / "mace-mh-1.model"
+    link.symlink_to(blob)
+    assert model_sha256(link) == "c" * 64
+
+    plain = tmp_path / "model.bin"
+    plain.write_bytes(b"weights")
+    assert model_sha256(plain) == hashlib.sha256(b"weights").hexdigest()
+    assert model_fingerprint(_Calc()) == "a" * 64
+    assert model_fingerprint(object()) == "object"
+
+
+def test_local_backend_uses_its_cache_root_without_the_bridge(tmp_path, monkeypatch):
+    from app.tools.simulation import mace_bridge
+    from app.tools.simulation.mace.backends.local import LocalBackend
+    from app.tools.simulation.mace.cache.references import get_reference_table
+
+    def no_bridge():
+        raise AssertionError("LocalBackend must not build the bridge")
+
+    monkeypatch.setattr(mace_bridge, "get_mace_bridge", no_bridge)
+    backend = LocalBackend(cache_root=tmp_path)
+    assert backend._references() is get_reference_table(tmp_path)
+
+
+async def test_prewarm_references_runs_as_a_tracked_job(tmp_path, runner_factory):
+    from app.tools.simulation.mace.primitives import prewarm_references
+    from app.tools.simulation.mace.schemas import PrewarmReferencesInput, PrimitiveOptions
+
+    runner, store, backends = runner_factory(tmp_path)
+    inp = PrewarmReferencesInput(elements=["Fe", "Ti"], options=PrimitiveOptions(backend="fake"))
+
+    async def run(inp):
+        handle = await prewarm_references(inp, runner, backends)
+        await runner._tasks[handle.job_id]
+        rec = store.get(handle.job_id)
+        assert rec.status == "succeeded" and rec.progress.percent == 100.0
+        return rec.result
+
+    first = await run(inp)
+    assert first["computed"] == ["Fe", "Ti"] and first["cached"] == []
+    again = await run(inp.model_copy(update={"elements": ["Ti", "Nb"]}))
+    assert again["computed"] == ["Nb"] and again["cached"] == ["Ti"]
+    assert set(again["mu_eV_per_atom"]) == {"Ti", "Nb"}
+
+    with pytest.raises(ValueError):
+        PrewarmReferencesInput(elements=["Xx"])
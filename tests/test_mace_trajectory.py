@@ -0,0 +1,156 @@
+"""Chunked binary trajectory format."""
+
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.tools.simulation.mace.cache import CacheStore, TrajectoryReader, TrajectoryWriter
+from app.tools.simulation.mace.cache.trajectory import write_columns
+
+
+def _frames(n, n_atoms=4, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "positions": rng.random((n_atoms, 3)) * 5.0,
+            "cells": np.eye(3) * 5.0,
+            "steps": i * 10,
+            "energies": -4.0 + 0.01 * i,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip_across_chunks(tmp_path, compress):
+    frames = _frames(11)
+    with TrajectoryWriter(tmp_path / "traj", ["Fe"] * 4, compress=compress, chunk_frames=4) as w:
+        for f in frames:
+            w.append(**f)
+
+    r = TrajectoryReader(tmp_path / "traj")
+    assert len(r) == 11 and r.meta["complete"]
+    assert [c["n_frames"] for c in r.meta["chunks"]] == [4, 4, 3]
+    pos = r.read("positions", 3, 9)
+    assert pos.dtype == np.float32 and pos.shape == (6, 4, 3)
+    np.testing.assert_allclose(pos, [f["positions"] for f in frames[3:9]], rtol=1e-6)
+    assert r.read("steps").dtype == np.int64
+    assert r.read("steps", -2).tolist() == [90, 100]
+    assert r.read("energies", 5, 5).shape == (0,)
+    if not compress:
+        assert isinstance(r.read("positions", 0, 2), np.memmap)
+
+
+def test_chunks_are_readable_before_close(tmp_path):
+    w = TrajectoryWriter(tmp_path / "traj", ["Fe"] * 4, chunk_frames=2, dtype="float64")
+    for f in _frames(5):
+        w.append(**f)
+    r = TrajectoryReader(tmp_path / "traj")
+    assert len(r) == 4 and not r.meta["complete"]
+    assert r.read("energies").dtype == np.float64
+    w.close()
+    assert len(TrajectoryReader(tmp_path / "traj")) == 5
+
+
+def test_frames_must_keep_their_fields(tmp_path):
+    w = TrajectoryWriter(tmp_path / "traj")
+    w.append(steps=0, energies=1.0)
+    with pytest.raises(ValueError):
+        w.append(steps=1)
+
+
+def test_write_columns_pads_short_columns(tmp_path):
+    write_columns(tmp_path / "traj", {"steps": [0, 100], "energies": [-1.0]})
+    r = TrajectoryReader(tmp_path / "traj")
+    assert r.read("steps").tolist() == [0, 100]
+    assert np.isnan(r.read("energies")[1])
+    assert json.loads((tmp_path / "traj" / "meta.json").read_text())["n_frames"] == 2
+
+
+async def test_get_cached_structure_reads_trajectory_frames(tmp_path):
+    pytest.importorskip("ase")
+    from ase.build import bulk
+
+    from app.tools.simulation.mace.control import get_cached_structure
+    from app.tools.simulation.mace.schemas import GetCachedStructureInput
+
+    cache = CacheStore(tmp_path)
+    atoms = bulk("Fe", "bcc", a=2.87, cubic=True) * (2, 2, 2)
+    with TrajectoryWriter(cache.traj_dir("k"), atoms.get_chemical_symbols()) as w:
+        for dx in (0.0, 0.1, 0.2):
+            moved = atoms.copy()
+            moved.positions[0, 0] += dx
+            w.append_atoms(moved, steps=0, energies=0.0, temperatures=300.0)
+
+    runner = SimpleNamespace(cache=cache)
+    last = await get_cached_structure(GetCachedStructureInput(cache_ref="cache://k/traj"), runner)
+    assert (last.frame, last.n_frames, last.n_atoms) == (2, 3, 16)
+    assert last.composition == {"Fe": 16}
+    first = await get_cached_structure(GetCachedStructureInput(cache_ref="cache://k/traj/0"), runner)
+    assert first.frame == 0 and first.cif_text != last.cif_text
+    with pytest.raises(ValueError):
+        await get_cached_structure(GetCachedStructureInput(cache_ref="cache://k/traj/7"), runner)
+
+
+def test_langevin_run_streams_sampled_frames(tmp_path):
+    pytest.importorskip("ase")
+    from ase.build import bulk
+    from ase.calculators.emt import EMT
+
+    from app.tools.simulation.mace.core.md import langevin_run
+
+    atoms = bulk("Cu", "fcc", a=3.6, cubic=True) * (2, 2, 2)
+    with TrajectoryWriter(tmp_path / "traj", atoms.get_chemical_symbols(), chunk_frames=3) as w:
+        mdr = langevin_run(atoms, EMT(), T_K=300.0, n_steps=20, sample_every=2, trajectory=w)
+
+    r = TrajectoryReader(tmp_path / "traj")
+    assert r.read("steps").tolist() == mdr.steps
+    np.testing.assert_allclose(r.read("energies"), mdr.energies, rtol=1e-6)
+    np.testing.assert_allclose(r.read("temperatures"), mdr.temperatures, rtol=1e-5)
+    assert set(r.fields) == {"positions", "velocities", "cells", "steps", "energies", "temperatures"}
+    np.testing.assert_allclose(r.atoms(-1).cell.array, atoms.cell.array, rtol=1e-6)
+
+
+async def test_runner_publishes_traj_only_when_the_job_succeeds(tmp_path):
+    from app.tools.simulation.mace.backends.base import Backend
+    from app.tools.simulation.mace.jobs import JobRunner, JobStore
+
+    class StreamingBackend(Backend):
+        name = "local"
+
+        def __init__(self):
+            self.fail = False
+
+        def execute(self, job, progress=None):
+            with TrajectoryWriter(job.extras["traj_dir"], ["Fe"] * 4, chunk_frames=2) as w:
+                for f in _frames(3):
+                    w.append(**f)
+                if self.fail:
+                    raise RuntimeError("md blew up")
+            return {"traj_dir": job.extras["traj_dir"]}
+
+        def cancel(self, job_id):
+            pass
+
+    backend = StreamingBackend()
+    runner = JobRunner(JobStore(tmp_path / "jobs.db"), {"local": backend}, cache_root=tmp_path / "cache")
+
+    async def run(key):
+        handle = await runner.submit("md_equilibrate", {}, key, "local", seed=0)
+        await runner._tasks[handle.job_id]
+        return runner.store.get(handle.job_id).status
+
+    entry = tmp_path / "cache" / "k"
+    backend.fail = True
+    assert await run("k") == "failed"
+    assert not list(entry.glob("*traj*"))
+
+    backend.fail = False
+    assert await run("k") == "succeeded"
+    assert [p.name for p in entry.glob("*traj*")] == ["traj"]
+    r = runner.cache.read_traj("k")
+    assert len(r) == 3 and r.meta["complete"]
@@ -0,0 +1,133 @@
+"""Tests for the recorder's background embedding queue.
+
+Covers cross-call coalescing into one embed_batch, one store
+transaction per batch, overflow backpressure (inline embedding), the
+flush/shutdown hooks, and the stats surface.
+"""
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.tools.memory import (
+    ArtifactStore,
+    EmbedQueue,
+    HashEmbedder,
+    configure as configure_memory,
+    embed_queue_stats,
+    flush_embeddings,
+    record_if_enabled,
+    reset as reset_memory,
+)
+from app.tools.memory.recorder import _EmbedJob
+
+
+class CountingEmbedder(HashEmbedder):
+    """HashEmbedder that records batch sizes and can be held closed."""
+
+    def __init__(self) -> None:
+        super().__init__(dim=16)
+        self.batches: list[int] = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def embed_batch(self, texts):
+        self.gate.wait(timeout=5)
+        self.batches.append(len(texts))
+        return [self.embed(t) for t in texts]
+
+
+class CountingStore(ArtifactStore):
+    def __init__(self, *a, **kw):
+        super().__init__(*a, **kw)
+        self.transactions: list[int] = []
+
+    def update_embeddings(self, updates):
+        self.transactions.append(len(updates))
+        super().update_embeddings(updates)
+
+
+def _payload(i: int) -> dict:
+    return {"results": [{"name": f"mat-{i}-{j}", "pad": "x" * 200} for j in range(4)]}
+
+
+@pytest.fixture
+def queued_env(tmp_path: Path):
+    store = CountingStore(tmp_path / "artifacts.db", vector_index=False)
+    embedder = CountingEmbedder()
+    reset_memory()  # earlier suites may leave recording switched off
+    configure_memory(store=store, embedder=embedder, session_id="s", embed_async=True)
+    try:
+        yield store, embedder
+    finally:
+        reset_memory()
+
+
+def test_calls_coalesce_into_one_batch(queued_env):
+    store, embedder = queued_env
+    embedder.gate.clear()  # hold the worker so jobs pile up
+    ids = [
+        record_if_enabled(tool_name="search", args={"i": i}, result=_payload(i))["_artifact_id"]
+        for i in range(5)
+    ]
+    embedder.gate.set()
+    assert flush_embeddings(timeout=5)
+
+    # The first job may be taken before the others arrive; the rest share a batch
+    assert sum(embedder.batches) == 5 * (1 + 4)
+    assert len(embedder.batches) <= 2
+    assert len(store.transactions) == len(embedder.batches)
+    conn = sqlite3.connect(store.db_path)
+    missing = conn.execute(
+        "SELECT COUNT(*) FROM artifact_records WHERE embedding IS NULL"
+    ).fetchone()[0]
+    embedded = conn.execute(
+        f"SELECT COUNT(*) FROM artifacts WHERE embedding IS NOT NULL "
+        f"AND id IN ({','.join('?' * len(ids))})", ids,
+    ).fetchone()[0]
+    conn.close()
+    assert missing == 0
+    assert embedded == 5
+
+
+def test_stats_report_depth_and_throughput(queued_env):
+    _, embedder = queued_env
+    embedder.gate.clear()
+    for i in range(3):
+        record_if_enabled(tool_name="search", args={"i": i}, result=_payload(i))
+    assert embed_queue_stats()["depth"] == 3
+    embedder.gate.set()
+    flush_embeddings(timeout=5)
+    st = embed_queue_stats()
+    assert st["depth"] == 0
+    assert st["submitted"] == st["completed"] == 3
+    assert st["texts"] == 15
+    assert st["mean_batch_size"] > 0
+    assert st["texts_per_second"] > 0
+
+
+def test_overflow_embeds_inline(tmp_path: Path):
+    store = CountingStore(tmp_path / "artifacts.db", vector_index=False)
+    embedder = CountingEmbedder()
+    embedder.gate.clear()
+    q = EmbedQueue(max_pending=1, linger_s=0.0)
+    try:
+        assert q.submit(store, embedder, _EmbedJob("art_a", "a", []))
+        # The worker holds the first job; the second fills the queue
+        q.submit(store, embedder, _EmbedJob("art_b", "b", []))
+        assert not q.submit(store, embedder, _EmbedJob("art_c", "c", []))
+        assert q.stats()["overflow"] >= 1
+    finally:
+        embedder.gate.set()
+        assert q.shutdown(timeout=5)
+
+
+def test_shutdown_drains_and_rejects(tmp_path: Path):
+    store = CountingStore(tmp_path / "artifacts.db", vector_index=False)
+    aid = store.record(tool_name="t", args={}, result={"answer": "x"}, session_id="s")
+    q = EmbedQueue()
+    assert q.submit(store, HashEmbedder(dim=16), _EmbedJob(aid, "x", []))
+    assert q.shutdown(timeout=5)
+    assert store.transactions == [1]
+    assert not q.submit(store, HashEmbedder(dim=16), _EmbedJob(aid, "x", []))
@@ -16,9 +16,11 @@ from app.tools.base import Tool, ToolRegistry
 from app.tools.memory import (
     ArtifactStore,
     HashEmbedder,
+    clear_recall_cache,
     configure as configure_memory,
     create_memory_tools,
     is_configured,
+    recall_cache_stats,
     reset as reset_memory,
 )
 
@@ -381,3 +383,73 @@ def test_cross_session_recall(memory_env):
     assert all_artifact_ids & alpha_ids, (
         f"scope='all' missed alpha artifacts. all={all_artifact_ids}, alpha={alpha_ids}"
     )
+
+
+# ---------------------------------------------------------------------------
+# Scenario: async recall path used by the MCP server
+# ---------------------------------------------------------------------------
+
+def test_async_recall_matches_sync(memory_env):
+    import asyncio
+
+    registry, store = memory_env
+    store.record(
+        tool_name="materials_search", args={}, session_id="test-session",
+        result={"answer": "ruthenium on alumina catalyst"},
+        summary="ruthenium on alumina catalyst",
+    )
+    recall = registry.get("search_artifacts")
+    assert recall.async_func is not None
+    sync_hits = recall.execute(query="ruthenium catalyst")
+    async_hits = asyncio.run(recall.aexecute(query="ruthenium catalyst"))
+    assert async_hits == sync_hits
+    assert async_hits["count"] == 1
+    # Same error contract as execute()
+    bad = asyncio.run(recall.aexecute(query="x", scope="galaxy"))
+    assert "error" in bad
+
+    async def _explode(**_kwargs):
+        raise RuntimeError("kaboom")
+
+    tool = Tool(
+        name="explode", description="", input_schema={}, func=lambda **_: {},
+        async_func=_explode,
+    )
+    assert asyncio.run(tool.aexecute()) == {"error": "RuntimeError: kaboom", "tool": "explode"}
+
+
+# ---------------------------------------------------------------------------
+# Scenario: repeated recall served from the result cache
+# ---------------------------------------------------------------------------
+
+def test_repeated_recall_is_cached_until_store_changes(memory_env, monkeypatch):
+    registry, store = memory_env
+    clear_recall_cache()
+    aid = store.record(
+        tool_name="materials_search", args={}, session_id="test-session",
+        result={"answer": "tungsten carbide hardness"},
+        summary="tungsten carbide hardness",
+    )
+    recall = registry.get("search_artifacts")
+    first = recall.execute(query="tungsten carbide")
+
+    def _no_sql(**_kwargs):
+        raise AssertionError("cache hit must not reach the store")
+
+    with monkeypatch.context() as m:
+        m.setattr(store, "recall", _no_sql)
+        assert recall.execute(query="tungsten carbide") == first
+    assert recall_cache_stats()["hits"] == 1
+    # Different filters are a different key
+    recall.execute(query="tungsten carbide", limit=3)
+    assert recall_cache_stats()["misses"] == 2
+
+    store.mark_promoted(aid)
+    recall.execute(query="tungsten carbide")
+    assert recall_cache_stats()["misses"] == 3
+    store.record(
+        tool_name="materials_search", args={}, session_id="test-session",
+        result={"answer": "tungsten carbide cobalt binder"},
+        summary="tungsten carbide cobalt binder",
+    )
+    assert recall.execute(query="tungsten carbide")["count"] == 2
@@ -0,0 +1,292 @@
+"""Tests for artifact retention: hit tracking, deletion, compaction, policies.
+
+Covers FTS cleanup on delete, owner hand-over for deduplicated content,
+LRU ordering from recall hits, the age / session / size policies, the
+v4 -> v5 records_fts re-key, and the CLI entry point.
+"""
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app.tools.memory import (
+    ArtifactStore,
+    HashEmbedder,
+    RetentionPolicy,
+    run_maintenance,
+    start_background_maintenance,
+)
+from app.tools.memory.maintenance import main
+
+
+@pytest.fixture
+def emb() -> HashEmbedder:
+    return HashEmbedder(dim=32)
+
+
+def _result(i: int, n: int = 3) -> dict:
+    return {"results": [{"formula": f"Fe{i}Ni{j}", "pad": "x" * 50} for j in range(n)]}
+
+
+def _count(db: Path, sql: str, *params) -> int:
+    conn = sqlite3.connect(db)
+    try:
+        return conn.execute(sql, params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestHitTracking:
+    def test_recall_hits_are_flushed(self, tmp_path: Path, emb: HashEmbedder):
+        db = tmp_path / "artifacts.db"
+        store = ArtifactStore(db)
+        aid = store.record(
+            tool_name="t", args={}, result={"answer": "nickel superalloy"},
+            session_id="s", summary="nickel superalloy",
+            embedding=emb.embed("nickel superalloy"),
+        )
+        for _ in range(3):
+            store.recall(query_text="nickel", query_embedding=emb.embed("nickel"))
+        assert store.flush_hits() == 1
+        conn = sqlite3.connect(db)
+        hits, last = conn.execute(
+            "SELECT hit_count, last_hit_at FROM artifacts WHERE id = ?", (aid,)
+        ).fetchone()
+        conn.close()
+        assert hits == 3 and last is not None
+        assert store.flush_hits() == 0
+
+
+class TestDelete:
+    def test_delete_cleans_fts_and_records(self, tmp_path: Path):
+        db = tmp_path / "artifacts.db"
+        store = ArtifactStore(db)
+        keep = store.record(tool_name="t", args={}, result=_result(1), session_id="s")
+        gone = store.record(tool_name="t", args={}, result=_result(2), session_id="s")
+        assert store.delete_artifacts([gone, "art_missing"]) == 1
+        assert store.get(gone) is None
+        assert _count(db, "SELECT COUNT(*) FROM artifact_records") == 3
+        assert _count(db, "SELECT COUNT(*) FROM records_fts WHERE artifact_id = ?", gone) == 0
+        assert _count(db, "SELECT COUNT(*) FROM artifacts_fts WHERE artifact_id = ?", gone) == 0
+        hits = store.recall(query_text="Fe2Ni0 Fe1Ni0", limit=10)
+        assert {h["artifact_id"] for h in hits} == {keep}
+
+    def test_deleted_owner_hands_content_to_duplicate(self, tmp_path: Path, emb: HashEmbedder):
+        db = tmp_path / "artifacts.db"
+        store = ArtifactStore(db)
+        recs = [emb.embed(f"r{j}") for j in range(3)]
+        owner = store.record(
+            tool_name="t", args={}, result=_result(1), session_id="s1", record_embeddings=recs,
+        )
+        dup_a = store.record(tool_name="t", args={}, result=_result(1), session_id="s2")
+        dup_b = store.record(tool_name="t", args={}, result=_result(1), session_id="s3")
+        store.recall(query_text="x", query_embedding=emb.embed("r1"))  # load the index
+
+        assert store.delete_artifacts([owner]) == 1
+        assert store.get(dup_a).result == _result(1)
+        assert store.get(dup_b).result == _result(1)
+        assert store.get_record(dup_b, 2) == {"formula": "Fe1Ni2", "pad": "x" * 50}
+        assert _count(db, "SELECT content_of IS NULL FROM artifacts WHERE id = ?", dup_a) == 1
+        assert _count(db, "SELECT content_of = ? FROM artifacts WHERE id = ?", dup_a, dup_b) == 1
+
+        for session, aid in (("s2", dup_a), ("s3", dup_b)):
+            hits = store.recall(
+                query_text="Fe1Ni1", query_embedding=emb.embed("r1"), session_id=session,
+            )
+            rec = [h for h in hits if h.get("record_idx") is not None]
+            assert rec and rec[0]["artifact_id"] == aid and rec[0]["record_idx"] == 1
+        # A fresh process rebuilding from the log sees the same
+        fresh = ArtifactStore(db)
+        hits = fresh.recall(query_text="zzzz", query_embedding=emb.embed("r1"), session_id="s2")
+        assert (hits[0]["artifact_id"], hits[0]["record_idx"]) == (dup_a, 1)
+
+    def test_delete_invalidates_scan_cache(self, tmp_path: Path, emb: HashEmbedder):
+        store = ArtifactStore(tmp_path / "artifacts.db", vector_index=False)
+        ids = [
+            store.record(
+                tool_name="t", args={}, result={"answer": i}, session_id="s",
+                summary=f"s{i}", embedding=emb.embed(f"s{i}"),
+            )
+            for i in range(3)
+        ]
+        assert store.recall(query_text="zzzz", query_embedding=emb.embed("s0"))[0]["artifact_id"] == ids[0]
+        store.delete_artifacts([ids[0]])
+        hits = store.recall(query_text="zzzz", query_embedding=emb.embed("s0"))
+        assert ids[0] not in {h["artifact_id"] for h in hits}
+
+
+class TestCandidates:
+    def test_lru_prefers_unrecalled_then_oldest_hit(self, tmp_path: Path):
+        store = ArtifactStore(tmp_path / "artifacts.db")
+        ids = [
+            store.record(tool_name="t", args={}, result=_result(i), session_id="s")
+            for i in range(3)
+        ]
+        store._note_hits([ids[0]])
+        store.flush_hits()
+        order = store.eviction_candidates(lru=True, limit=10)
+        assert order[-1] == ids[0]
+        assert set(order[:2]) == {ids[1], ids[2]}
+
+    def test_promoted_are_kept(self, tmp_path: Path):
+        store = ArtifactStore(tmp_path / "artifacts.db")
+        a = store.record(tool_name="t", args={}, result=_result(1), session_id="s")
+        b = store.record(tool_name="t", args={}, result=_result(2), session_id="s")
+        store.mark_promoted(a)
+        assert store.eviction_candidates(lru=True) == [b]
+        assert set(store.eviction_candidates(lru=True, include_promoted=True)) == {a, b}
+
+    def test_no_selector_selects_nothing(self, tmp_path: Path):
+        store = ArtifactStore(tmp_path / "artifacts.db")
+        store.record(tool_name="t", args={}, result=_result(1), session_id="s")
+        assert store.eviction_candidates() == []
+
+
+class TestPolicies:
+    def test_age_policy(self, tmp_path: Path):
+        db = tmp_path / "artifacts.db"
+        store = ArtifactStore(db)
+        old = store.record(tool_name="t", args={}, result=_result(1), session_id="s")
+        new = store.record(tool_name="t", args={}, result=_result(2), session_id="s")
+        conn = sqlite3.connect(db)
+        conn.execute("UPDATE artifacts SET created_at = '2020-01-01T00:00:00+00:00' WHERE id = ?", (old,))
+        conn.commit()
+        conn.close()
+        policy = RetentionPolicy(max_age_days=30, max_bytes=None)
+        dry = run_maintenance(store, policy, dry_run=True)
+        assert dry["evicted"]["age"] == 1 and store.get(old) is not None
+        report = run_maintenance(store, policy)
+        assert report["evicted"]["age"] == 1
+        assert store.get(old) is None and store.get(new) is not None
+
+    def test_session_policy_keeps_most_recent(self, tmp_path: Path):
+        store = ArtifactStore(tmp_path / "artifacts.db")
+        ids = {
+            s: store.record(tool_name="t", args={}, result=_result(i), session_id=s)
+            for i, s in enumerate(["s1", "s2", "s3"])
+        }
+        report = run_maintenance(store, RetentionPolicy(max_sessions=2, max_bytes=None))
+        assert report["evicted"]["sessions"] == 1
+        assert store.get(ids["s1"]) is None
+        assert store.get(ids["s3"]) is not None
+
+    def test_size_policy_evicts_lru_until_under_budget(self, tmp_path: Path):
+        store = ArtifactStore(tmp_path / "artifacts.db", vector_index=False)
+        ids = [
+            store.record(tool_name="t", args={}, result=_result(i, n=40), session_id="s")
+            for i in range(60)
+        ]
+        store._note_hits(ids[-5:])
+        before = store.storage_stats()["used_bytes"]
+        report = run_maintenance(store, RetentionPolicy(max_bytes=before // 2))
+        assert report["evicted"]["size"] > 0
+        assert report["after"]["used_bytes"] <= before // 2
+        assert all(store.get(a) is not None for a in ids[-5:])
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("PRISM_ARTIFACT_MAX_AGE_DAYS", "7")
+        monkeypatch.setenv("PRISM_ARTIFACT_MAX_MB", "0")
+        monkeypatch.setenv("PRISM_ARTIFACT_MAX_SESSIONS", "bogus")
+        monkeypatch.setenv("PRISM_ARTIFACT_MAX_EMBEDDING_CACHE", "1000")
+        policy = RetentionPolicy.from_env()
+        assert policy.max_age_days == 7
+        assert policy.max_bytes is None
+        assert policy.max_sessions is None
+        assert policy.max_embedding_cache == 1000
+
+    def test_default_policy_deletes_nothing(self, tmp_path: Path, monkeypatch):
+        for name in ("AGE_DAYS", "MB", "SESSIONS", "EMBEDDING_CACHE"):
+            monkeypatch.delenv(f"PRISM_ARTIFACT_MAX_{name}", raising=False)
+        store = ArtifactStore(tmp_path / "artifacts.db")
+        ids = [
+            store.record(tool_name="t", args={}, result=_result(i), session_id=f"s{i}")
+            for i in range(3)
+        ]
+        store.put_cached_embeddings({"h": [1.0, 0.0]})
+        report = run_maintenance(store)
+        assert report["evicted"] == {"age": 0, "sessions": 0, "size": 0}
+        assert "embedding_cache_trimmed" not in report
+        assert report["compact"]["fts"].startswith("merge")
+        assert all(store.get(a) is not None for a in ids)
+        assert store.get_cached_embeddings(["h"]).keys() == {"h"}
+
+    def test_background_task_disabled_by_zero_interval(self, tmp_path: Path):
+        store = ArtifactStore(tmp_path / "artifacts.db")
+        assert start_background_maintenance(store, interval_s=0) is None
+        task = start_background_maintenance(store, interval_s=3600)
+        task.stop(timeout=1)
+
+
+class TestCompact:
+    def test_compact_frees_pages_and_keeps_search(self, tmp_path: Path):
+        db = tmp_path / "artifacts.db"
+        store = ArtifactStore(db)
+        ids = [
+            store.record(tool_name="t", args={}, result=_result(i, n=40), session_id="s")
+            for i in range(30)
+        ]
+        store.delete_artifacts(ids[:20])
+        store.delete_artifacts(ids[20:25])
+        out = store.compact(optimize=True)
+        assert out["orphans"] == 1  # the first delete's log marker; the head stays
+        assert out["vacuum"] == "incremental"
+        assert out["pages_freed"] > 0
+        assert store.recall(query_text="Fe29Ni3")[0]["artifact_id"] == ids[29]
+
+    def test_full_vacuum_converts_legacy_db(self, tmp_path: Path):
+        db = tmp_path / "artifacts.db"
+        conn = sqlite3.connect(db)
+        conn.execute("PRAGMA auto_vacuum = NONE")
+        conn.execute("CREATE TABLE t (x)")
+        conn.commit()
+        conn.close()
+        store = ArtifactStore(db)
+        ids = [
+            store.record(tool_name="t", args={}, result=_result(i), session_id="s")
+            for i in range(5)
+        ]
+        store.delete_artifacts(ids[:2])
+        out = store.compact(full_vacuum=True)
+        assert out["vacuum"] == "full"
+        assert _count(db, "PRAGMA auto_vacuum") == 2
+        assert store.recall(query_text="Fe4Ni1")[0]["artifact_id"] == ids[4]
+        assert _count(
+            db,
+            "SELECT COUNT(*) FROM records_fts f JOIN artifact_records ar "
+            "ON ar.rowid = f.rowid AND ar.artifact_id = f.artifact_id",
+        ) == 9
+
+
+def test_v4_records_fts_is_rekeyed(tmp_path: Path):
+    db = tmp_path / "artifacts.db"
+    store = ArtifactStore(db)
+    aid = store.record(tool_name="t", args={}, result=_result(1), session_id="s")
+    store.close()
+    # v4 records_fts rows had their own rowids, unrelated to artifact_records
+    conn = sqlite3.connect(db)
+    conn.executescript(
+        """
+        DELETE FROM records_fts;
+        INSERT INTO records_fts(rowid, record_summary, artifact_id, record_idx)
+            SELECT rowid + 100, record_summary, artifact_id, record_idx FROM artifact_records;
+        UPDATE schema_version SET version = 4;
+        """
+    )
+    conn.close()
+
+    migrated = ArtifactStore(db)
+    migrated._requantize_thread.join(timeout=10)
+    assert _count(db, "SELECT MIN(rowid) FROM records_fts") == 1
+    migrated.delete_artifacts([aid])
+    assert _count(db, "SELECT COUNT(*) FROM records_fts") == 0
+
+
+def test_cli_dry_run(tmp_path: Path, capsys):
+    db = tmp_path / "artifacts.db"
+    ArtifactStore(db).record(tool_name="t", args={}, result=_result(1), session_id="s")
+    assert main(["--db", str(db), "--max-sessions", "1", "--dry-run"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["dry_run"] is True
+    assert report["evicted"]["sessions"] == 0
+    assert report["after"]["artifacts"] == 1
@@ -0,0 +1,163 @@
+"""Tests for ShardedArtifactStore: partitioning, id routing, read-only cold
+shards, federated recall, legacy mount, and retention across shards."""
+import asyncio
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from app.tools.memory import (
+    ArtifactStore,
+    HashEmbedder,
+    RetentionPolicy,
+    ShardedArtifactStore,
+    run_maintenance,
+)
+from app.tools.memory.sharded import _shard_tag, _tag_of
+
+
+@pytest.fixture
+def emb() -> HashEmbedder:
+    return HashEmbedder(dim=32)
+
+
+def _result(name: str) -> dict:
+    return {"results": [{"formula": f"{name}{j}", "pad": "x" * 40} for j in range(3)]}
+
+
+def _record(store, session: str, name: str, emb: HashEmbedder) -> str:
+    return store.record(
+        tool_name="search", args={"q": name}, result=_result(name), session_id=session,
+        summary=f"{name} alloys", embedding=emb.embed(f"{name} alloys"),
+        record_embeddings=[emb.embed(f"{name}{j}") for j in range(3)],
+    )
+
+
+class TestRouting:
+    def test_session_partition_writes_one_file_per_session(self, tmp_path: Path, emb):
+        store = ShardedArtifactStore(tmp_path, partition="session")
+        a = _record(store, "s1", "Fe", emb)
+        b = _record(store, "s2", "Ni", emb)
+        assert _tag_of(a) == _shard_tag("session", "s1")
+        assert _tag_of(b) != _tag_of(a)
+        assert sorted(p.name for p in tmp_path.glob("shard-*.db")) == sorted(
+            f"shard-{_tag_of(x)}.db" for x in (a, b)
+        )
+        assert store.get(a).result == _result("Fe")
+        assert store.get_record(b, 2) == {"formula": "Ni2", "pad": "x" * 40}
+
+    def test_month_partition_tag(self, tmp_path: Path, emb):
+        store = ShardedArtifactStore(tmp_path, partition="month")
+        aid = _record(store, "s1", "Fe", emb)
+        assert _tag_of(aid) == "m" + datetime.now(timezone.utc).strftime("%Y%m")
+
+    def test_untagged_ids_route_to_legacy(self):
+        assert _tag_of("art_abcdefgh") == ""
+        assert _tag_of("art_m202610_abcdefgh") == "m202610"
+
+    def test_unknown_partition_rejected(self, tmp_path: Path):
+        with pytest.raises(ValueError):
+            ShardedArtifactStore(tmp_path, partition="week")
+
+    def test_late_embeddings_and_promotion_route_by_id(self, tmp_path: Path, emb):
+        store = ShardedArtifactStore(tmp_path, partition="session")
+        aid = store.record(tool_name="t", args={}, result=_result("Co"), session_id="s1")
+        store.update_embeddings([(aid, emb.embed("cobalt"), None)])
+        store.mark_promoted(aid)
+        assert store.get(aid).promoted_to_kg
+        hits = store.recall(query_text="zzzz", query_embedding=emb.embed("cobalt"), session_id="s1")
+        assert hits[0]["artifact_id"] == aid
+
+
+class TestFederatedRecall:
+    def test_all_scope_fuses_across_shards(self, tmp_path: Path, emb):
+        store = ShardedArtifactStore(tmp_path, partition="session")
+        fe = _record(store, "s1", "Fe", emb)
+        ni = _record(store, "s2", "Ni", emb)
+        hits = store.recall(query_text="Ni alloys", query_embedding=emb.embed("Ni alloys"))
+        assert hits[0]["artifact_id"] == ni
+        assert {h["artifact_id"] for h in hits} == {fe, ni}
+        scores = [h["score"] for h in hits]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_session_scope_touches_one_shard(self, tmp_path: Path, emb):
+        store = ShardedArtifactStore(tmp_path, partition="session")
+        _record(store, "s1", "Fe", emb)
+        ni = _record(store, "s2", "Ni", emb)
+        hits = store.recall(query_text="alloys", query_embedding=emb.embed("alloys"), session_id="s2")
+        assert {h["artifact_id"] for h in hits} == {ni}
+
+    def test_async_matches_sync(self, tmp_path: Path, emb):
+        store = ShardedArtifactStore(tmp_path, partition="session")
+        for i, name in enumerate(["Fe", "Ni", "Co"]):
+            _record(store, f"s{i}", name, emb)
+        kw = {"query_text": "Co alloys", "query_embedding": emb.embed("Co alloys"), "limit": 5}
+        assert asyncio.run(store.arecall(**kw)) == store.recall(**kw)
+
+    def test_other_process_shards_open_read_only(self, tmp_path: Path, emb):
+        writer = ShardedArtifactStore(tmp_path, partition="session")
+        aid = _record(writer, "s1", "Fe", emb)
+        reader = ShardedArtifactStore(tmp_path, partition="session")
+        hits = reader.recall(query_text="Fe alloys", query_embedding=emb.embed("Fe alloys"))
+        assert hits[0]["artifact_id"] == aid
+        shard = reader._reader(_tag_of(aid))
+        assert shard.read_only
+        with pytest.raises(sqlite3.OperationalError):
+            shard.mark_promoted(aid)
+
+    def test_list_merges_newest_first(self, tmp_path: Path, emb):
+        store = ShardedArtifactStore(tmp_path, partition="session")
+        ids = [_record(store, f"s{i}", f"E{i}", emb) for i in range(3)]
+        rows = store.list_artifacts(limit=10)
+        assert {r["artifact_id"] for r in rows} == set(ids)
+        assert store.list_artifacts(session_id="s1")[0]["artifact_id"] == ids[1]
+
+
+class TestLegacyAndRetention:
+    def test_legacy_db_is_recallable(self, tmp_path: Path, emb):
+        legacy = tmp_path / "artifacts.db"
+        old = _record(ArtifactStore(legacy), "s0", "W", emb)
+        store = ShardedArtifactStore(tmp_path / "shards", partition="month", legacy_db=legacy)
+        new = _record(store, "s1", "Mo", emb)
+        hits = store.recall(query_text="alloys", query_embedding=emb.embed("W alloys"))
+        assert {h["artifact_id"] for h in hits} == {old, new}
+        assert store.get(old).result == _result("W")
+
+    def test_session_policy_ranks_globally_and_drops_empty_shards(self, tmp_path: Path, emb):
+        store = ShardedArtifactStore(tmp_path, partition="session")
+        ids = [_record(store, f"s{i}", f"E{i}", emb) for i in range(3)]
+        store.close()
+        for i, aid in enumerate(ids):
+            conn = sqlite3.connect(tmp_path / f"shard-{_tag_of(aid)}.db")
+            conn.execute("UPDATE artifacts SET created_at = ?", (f"2026-01-0{i + 1}T00:00:00+00:00",))
+            conn.commit()
+            conn.close()
+        # a later process: none of the shards are its own writers
+        store = ShardedArtifactStore(tmp_path, partition="session")
+        report = run_maintenance(store, RetentionPolicy(max_sessions=2, max_bytes=None))
+        assert report["evicted"]["sessions"] == 1
+        assert store.get(ids[0]) is None and store.get(ids[2]) is not None
+        assert report["compact"]["dropped"] == [_tag_of(ids[0])]
+        assert report["after"]["shards"] == 2
+        assert not (tmp_path / f"shard-{_tag_of(ids[0])}.db").exists()
+
+    def test_empty_shard_open_elsewhere_is_kept_until_released(self, tmp_path: Path, emb):
+        writer = ShardedArtifactStore(tmp_path, partition="session")
+        aid = _record(writer, "s1", "Fe", emb)
+        writer.close()
+        other = ShardedArtifactStore(tmp_path, partition="session")
+        assert other.get(aid) is not None  # holds the shard open
+
+        store = ShardedArtifactStore(tmp_path, partition="session")
+        store.delete_artifacts([aid])
+        shard = tmp_path / f"shard-{_tag_of(aid)}.db"
+        assert store.compact()["dropped"] == [] and shard.exists()
+        other.close()
+        assert store.compact()["dropped"] == [_tag_of(aid)] and not shard.exists()
+        assert store.get(aid) is None
+
+    def test_embedding_cache_is_shared(self, tmp_path: Path):
+        store = ShardedArtifactStore(tmp_path, partition="session")
+        store.put_cached_embeddings({"h": [1.0, 0.0]})
+        assert store.get_cached_embeddings(["h", "x"]).keys() == {"h"}
@@ -8,6 +8,7 @@ All tests use a temp DB file so they're hermetic. The HashEmbedder is
 deterministic, so embeddings are reproducible across runs.
 """
 import os
+import sqlite3
 import tempfile
 from pathlib import Path
 
@@ -19,10 +20,14 @@ from app.tools.memory.store import (
     _cosine,
     _extract_records,
     _rrf,
+    _rrf_top,
     _summarize,
     _summarize_record,
     _vec_to_blob,
     _blob_to_vec,
+    _blob_format,
+    _blobs_to_matrix,
+    _top_k,
     default_db_path,
 )
 from app.tools.memory.embedder import HashEmbedder
@@ -332,6 +337,22 @@ class TestUtils:
     def test_cosine_zero_vector(self):
         assert _cosine([0, 0], [1, 1]) == 0.0
 
+    def test_blobs_to_matrix_normalizes_rows(self):
+        np = pytest.importorskip("numpy")
+        mat = _blobs_to_matrix([_vec_to_blob([3.0, 4.0]), _vec_to_blob([0.0, 0.0])], 2)
+        assert mat.codes.shape == (2, 2)
+        assert np.allclose(mat.codes[0], [0.6, 0.8])
+        assert np.allclose(mat.codes[1], [0.0, 0.0])
+
+    def test_top_k_orders_best_first(self):
+        pytest.importorskip("numpy")
+        mat = _blobs_to_matrix(
+            [_vec_to_blob(v) for v in ([1, 0], [0, 1], [0.7, 0.7])], 2,
+        )
+        assert _top_k(mat, [1.0, 0.1], 2) == [0, 2]
+        assert _top_k(mat, [0.0, 1.0], 10) == [1, 2, 0]
+        assert _top_k(mat, [1.0, 0.0], 0) == []
+
     def test_extract_records_finds_results_key(self):
         recs = _extract_records({"results": [{"x": 1}, {"x": 2}]})
         assert recs == [{"x": 1}, {"x": 2}]
@@ -365,6 +386,37 @@ class TestUtils:
         # First item is the one with the highest score
         assert merged[0][0] == "A"
 
+    def test_rrf_top_matches_full_fusion(self):
+        import random
+
+        rng = random.Random(7)
+        for _ in range(500):
+            universe = list(range(rng.randint(1, 80)))
+            rankings = [
+                rng.sample(universe, rng.randint(0, len(universe)))
+                for _ in range(rng.randint(1, 4))
+            ]
+            limit = rng.randint(1, 12)
+            assert _rrf_top(rankings, limit) == _rrf(rankings)[:limit]
+
+    def test_rrf_top_stops_early_on_agreeing_rankings(self):
+        class Probe(list):
+            deepest = -1
+
+            def __getitem__(self, i):
+                Probe.deepest = max(Probe.deepest, i)
+                return super().__getitem__(i)
+
+        # Four rankers agreeing on the head, each with a long private tail
+        rankings = [
+            Probe(["a", "b", "c"] + [f"{r}-{i}" for i in range(2000)])
+            for r in range(4)
+        ]
+        merged = _rrf_top(rankings, 3)
+        assert [item for item, _ in merged] == ["a", "b", "c"]
+        assert merged == _rrf(rankings)[:3]
+        assert Probe.deepest < 1000
+
     def test_rrf_handles_empty_rankings(self):
         merged = _rrf([])
         assert merged == []
@@ -420,3 +472,373 @@ class TestFetchEdgeCases:
             session_id="s1",
         )
         assert tmp_store.get_record(aid, 99) is None
+
+
+class TestRowScanSearch:
+    """Vector recall with the ANN index disabled."""
+
+    @pytest.fixture
+    def scan_store(self, tmp_path: Path) -> ArtifactStore:
+        return ArtifactStore(tmp_path / "artifacts.db", vector_index=False)
+
+    def test_scan_finds_best_match(self, scan_store: ArtifactStore, emb: HashEmbedder):
+        ids = [
+            scan_store.record(
+                tool_name="t", args={"i": i}, result={"answer": i}, session_id="s1",
+                embedding=emb.embed(f"text {i}"),
+            )
+            for i in range(5)
+        ]
+        hits = scan_store.recall(
+            query_text="zzzz", query_embedding=emb.embed("text 3"), limit=2,
+        )
+        assert hits[0]["artifact_id"] == ids[3]
+
+    def test_matrix_cache_reused_until_embeddings_change(
+        self, scan_store: ArtifactStore, emb: HashEmbedder,
+    ):
+        scan_store.record(
+            tool_name="t", args={}, result={"answer": 1}, session_id="s1",
+            embedding=emb.embed("one"),
+        )
+        scan_store.recall(query_text="zzzz", query_embedding=emb.embed("one"))
+        cached = dict(scan_store._scan_cache)
+        assert cached
+        scan_store.recall(query_text="zzzz", query_embedding=emb.embed("one"))
+        assert all(scan_store._scan_cache[k] is v for k, v in cached.items())
+
+        aid = scan_store.record(
+            tool_name="t", args={}, result={"answer": 2}, session_id="s1",
+        )
+        scan_store.update_embedding(artifact_id=aid, embedding=emb.embed("two"))
+        hits = scan_store.recall(query_text="zzzz", query_embedding=emb.embed("two"))
+        assert hits[0]["artifact_id"] == aid
+
+    def test_scan_skips_other_dimensions(self, scan_store: ArtifactStore, emb: HashEmbedder):
+        scan_store.record(
+            tool_name="t", args={}, result={"answer": 1}, session_id="s1",
+            embedding=[1.0, 0.0, 0.0],
+        )
+        aid = scan_store.record(
+            tool_name="t", args={}, result={"answer": 2}, session_id="s1",
+            embedding=emb.embed("right dim"),
+        )
+        hits = scan_store.recall(query_text="zzzz", query_embedding=emb.embed("right dim"))
+        assert [h["artifact_id"] for h in hits] == [aid]
+
+
+class TestQuantizedEmbeddings:
+    def test_float16_round_trip_is_unit_norm(self):
+        blob = _vec_to_blob([3.0, 4.0, 0.0], "float16")
+        assert _blob_format(blob) == ("float16", 3)
+        assert len(blob) == 4 + 2 * 3
+        v = _blob_to_vec(blob)
+        assert v == pytest.approx([0.6, 0.8, 0.0], abs=1e-3)
+
+    def test_int8_round_trip_is_unit_norm(self):
+        blob = _vec_to_blob([3.0, -4.0, 0.0], "int8")
+        assert _blob_format(blob) == ("int8", 3)
+        assert len(blob) == 4 + 4 + 3
+        v = _blob_to_vec(blob)
+        assert v == pytest.approx([0.6, -0.8, 0.0], abs=1e-2)
+
+    def test_legacy_float32_is_detected(self):
+        assert _blob_format(_vec_to_blob([0.1, 0.2])) == ("float32", 2)
+
+    def test_unknown_dtype_rejected(self, tmp_path: Path):
+        with pytest.raises(ValueError):
+            _vec_to_blob([1.0], "float8")
+        with pytest.raises(ValueError):
+            ArtifactStore(tmp_path / "a.db", embedding_dtype="float8")
+
+    def test_quantized_cosine_close_to_float32(self, emb: HashEmbedder):
+        pytest.importorskip("numpy")
+        vecs = [emb.embed(f"vector {i}") for i in range(20)]
+        q = emb.embed("vector 7")
+        for dtype in ("float16", "int8"):
+            packed = _blobs_to_matrix([_vec_to_blob(v, dtype) for v in vecs], 64)
+            assert _top_k(packed, q, 1) == [7]
+
+    def test_mixed_formats_decode_together(self, emb: HashEmbedder):
+        np = pytest.importorskip("numpy")
+        blobs = [
+            _vec_to_blob(emb.embed("a")),
+            _vec_to_blob(emb.embed("b"), "float16"),
+            _vec_to_blob(emb.embed("c"), "int8"),
+        ]
+        packed = _blobs_to_matrix(blobs, 64)
+        assert packed.codes.dtype == np.float32
+        assert _top_k(packed, emb.embed("c"), 1) == [2]
+
+    @pytest.mark.parametrize("dtype,size", [("float16", 4 + 2 * 64), ("int8", 8 + 64)])
+    def test_store_writes_configured_format(
+        self, tmp_path: Path, emb: HashEmbedder, dtype: str, size: int,
+    ):
+        for vector_index in (True, False):
+            db = tmp_path / f"{dtype}-{vector_index}.db"
+            store = ArtifactStore(db, embedding_dtype=dtype, vector_index=vector_index)
+            aid = store.record(
+                tool_name="t", args={}, result={"results": [{"a": 1}, {"a": 2}]},
+                session_id="s1", embedding=emb.embed("packed"),
+                record_embeddings=[emb.embed("r0"), emb.embed("r1")],
+            )
+            conn = sqlite3.connect(db)
+            blob = conn.execute("SELECT embedding FROM artifacts").fetchone()[0]
+            conn.close()
+            assert len(blob) == size
+            hits = store.recall(query_text="zzzz", query_embedding=emb.embed("r1"), limit=5)
+            rec_hits = [h for h in hits if h.get("record_idx") is not None]
+            assert (rec_hits[0]["artifact_id"], rec_hits[0]["record_idx"]) == (aid, 1)
+
+    def test_v2_database_is_requantized_online(self, tmp_path: Path, emb: HashEmbedder):
+        db = tmp_path / "artifacts.db"
+        legacy = ArtifactStore(db, embedding_dtype="float32")
+        aid = legacy.record(
+            tool_name="t", args={}, result={"results": [{"a": 1}, {"a": 2}]},
+            session_id="s1", embedding=emb.embed("legacy"),
+            record_embeddings=[emb.embed("r0"), emb.embed("r1")],
+        )
+        conn = sqlite3.connect(db)
+        conn.execute("UPDATE schema_version SET version = 2")
+        conn.commit()
+        conn.close()
+
+        store = ArtifactStore(db)
+        store._requantize_thread.join(timeout=10)
+        conn = sqlite3.connect(db)
+        blobs = [r[0] for r in conn.execute(
+            "SELECT embedding FROM artifacts UNION ALL SELECT embedding FROM artifact_records"
+        )]
+        conn.close()
+        assert {_blob_format(b)[0] for b in blobs} == {"float16"}
+        assert store.requantize_embeddings() == 0
+        hits = store.recall(query_text="zzzz", query_embedding=emb.embed("legacy"), limit=1)
+        assert hits[0]["artifact_id"] == aid
+
+
+class TestContentDedup:
+    RESULT = {"results": [{"formula": "Fe2O3"}, {"formula": "Al2O3"}]}
+
+    def test_identical_result_shares_record_rows(self, tmp_path: Path, emb: HashEmbedder):
+        db = tmp_path / "artifacts.db"
+        store = ArtifactStore(db)
+        first = store.record(
+            tool_name="search", args={"q": 1}, result=self.RESULT, session_id="s1",
+            record_embeddings=[emb.embed("r0"), emb.embed("r1")],
+        )
+        second = store.record(
+            tool_name="search", args={"q": 1}, result=self.RESULT, session_id="s2",
+        )
+        assert first != second
+        conn = sqlite3.connect(db)
+        assert conn.execute("SELECT COUNT(*) FROM artifact_records").fetchone()[0] == 2
+        assert conn.execute(
+            "SELECT content_of, result_json FROM artifacts WHERE id = ?", (second,)
+        ).fetchone() == (first, "")
+        conn.close()
+        assert store.get(second).result == self.RESULT
+        assert store.get_record(second, 1) == {"formula": "Al2O3"}
+
+    def test_duplicate_is_recallable_in_its_own_session(
+        self, tmp_path: Path, emb: HashEmbedder,
+    ):
+        for vector_index in (True, False):
+            store = ArtifactStore(tmp_path / f"{vector_index}.db", vector_index=vector_index)
+            store.record(
+                tool_name="search", args={}, result=self.RESULT, session_id="s1",
+                record_embeddings=[emb.embed("r0"), emb.embed("r1")],
+            )
+            dup = store.record(
+                tool_name="search", args={}, result=self.RESULT, session_id="s2",
+            )
+            hits = store.recall(
+                query_text="Al2O3", query_embedding=emb.embed("r1"),
+                session_id="s2", limit=5,
+            )
+            rec_hits = [h for h in hits if h.get("record_idx") is not None]
+            assert rec_hits and {h["artifact_id"] for h in rec_hits} == {dup}
+            assert rec_hits[0]["record_idx"] == 1
+
+    def test_duplicate_reuses_artifact_embedding(self, tmp_path: Path, emb: HashEmbedder):
+        db = tmp_path / "artifacts.db"
+        store = ArtifactStore(db)
+        store.record(
+            tool_name="t", args={}, result={"answer": 42}, session_id="s1",
+            summary="the answer", embedding=emb.embed("the answer"),
+        )
+        dup = store.record(
+            tool_name="t", args={}, result={"answer": 42}, session_id="s2",
+            summary="the answer",
+        )
+        conn = sqlite3.connect(db)
+        blobs = [r[0] for r in conn.execute("SELECT embedding FROM artifacts")]
+        conn.close()
+        assert blobs[0] is not None and blobs[0] == blobs[1]
+        hits = store.recall(
+            query_text="zzzz", query_embedding=emb.embed("the answer"), session_id="s2",
+        )
+        assert hits[0]["artifact_id"] == dup
+
+    def test_late_record_embeddings_reach_duplicate(self, tmp_path: Path, emb: HashEmbedder):
+        store = ArtifactStore(tmp_path / "artifacts.db")
+        owner = store.record(tool_name="t", args={}, result=self.RESULT, session_id="s1")
+        dup = store.record(tool_name="t", args={}, result=self.RESULT, session_id="s2")
+        store.update_embedding(
+            artifact_id=dup, record_embeddings=[emb.embed("r0"), emb.embed("r1")],
+        )
+        for session, aid in (("s1", owner), ("s2", dup)):
+            hits = store.recall(
+                query_text="zzzz", query_embedding=emb.embed("r0"),
+                session_id=session, limit=5,
+            )
+            assert (hits[0]["artifact_id"], hits[0]["record_idx"]) == (aid, 0)
+
+    def test_v3_rows_are_hashed_for_dedup(self, tmp_path: Path):
+        db = tmp_path / "artifacts.db"
+        store = ArtifactStore(db)
+        old = store.record(tool_name="t", args={}, result=self.RESULT, session_id="s1")
+        conn = sqlite3.connect(db)
+        conn.execute("UPDATE artifacts SET content_hash = NULL")
+        conn.execute("UPDATE schema_version SET version = 3")
+        conn.commit()
+        conn.close()
+
+        migrated = ArtifactStore(db)
+        migrated._requantize_thread.join(timeout=10)
+        assert migrated.backfill_content_hashes() == 0
+        dup = migrated.record(tool_name="t", args={}, result=self.RESULT, session_id="s2")
+        conn = sqlite3.connect(db)
+        assert conn.execute(
+            "SELECT content_of FROM artifacts WHERE id = ?", (dup,)
+        ).fetchone()[0] == old
+        conn.close()
+
+
+class TestEmbeddingCache:
+    class _Counting(HashEmbedder):
+        def __init__(self) -> None:
+            super().__init__(dim=64)
+            self.calls: list[str] = []
+
+        def embed(self, text: str) -> list[float]:
+            self.calls.append(text)
+            return super().embed(text)
+
+    def test_repeated_texts_embed_once(self, tmp_store: ArtifactStore):
+        from app.tools.memory.embedder import CachedEmbedder
+
+        inner = self._Counting()
+        cached = CachedEmbedder(inner, tmp_store)
+        first = cached.embed_batch(["alpha", "beta", "alpha"])
+        again = cached.embed_batch(["beta", "gamma"])
+        assert inner.calls == ["alpha", "beta", "gamma"]
+        assert first[0] == first[2]
+        assert again[0] == pytest.approx(first[1], abs=1e-3)
+        assert cached.stats()["hits"] == 1 and cached.stats()["misses"] == 3
+
+    def test_cache_persists_across_instances(self, tmp_path: Path):
+        from app.tools.memory.embedder import CachedEmbedder
+
+        db = tmp_path / "artifacts.db"
+        CachedEmbedder(self._Counting(), ArtifactStore(db)).embed("shared summary")
+        inner = self._Counting()
+        CachedEmbedder(inner, ArtifactStore(db)).embed("shared summary")
+        assert inner.calls == []
+
+    def test_key_includes_model(self, tmp_store: ArtifactStore):
+        from app.tools.memory.embedder import CachedEmbedder
+
+        CachedEmbedder(HashEmbedder(dim=64), tmp_store).embed("text")
+        other = self._Counting()
+        other._dim = 32
+        assert len(CachedEmbedder(other, tmp_store).embed("text")) == 32
+        assert other.calls == ["text"]
+
+
+class TestConnectionPool:
+    def test_connection_is_reused_per_thread(self, tmp_store: ArtifactStore):
+        import threading
+
+        conn = tmp_store._connection()
+        tmp_store.record(tool_name="t", args={}, result={"a": 1}, session_id="s1")
+        assert tmp_store._connection() is conn
+        other: list = []
+        t = threading.Thread(target=lambda: other.append(tmp_store._connection()))
+        t.start()
+        t.join()
+        assert other[0] is not conn
+
+    def test_dead_thread_connections_are_reaped(self, tmp_store: ArtifactStore):
+        import threading
+
+        threads = [threading.Thread(target=tmp_store._connection) for _ in range(4)]
+        for t in threads:
+            t.start()
+            t.join()
+        tmp_store._connection()
+        assert len(tmp_store._pool) == 1
+
+    def test_recall_reads_one_snapshot(self, tmp_store: ArtifactStore, emb: HashEmbedder):
+        tmp_store.record(
+            tool_name="t", args={}, result={"answer": "x"}, session_id="s1",
+            summary="snapshot target", embedding=emb.embed("snapshot target"),
+        )
+        seen: list[bool] = []
+        real = tmp_store._bm25_record_search
+
+        def spy(*a, **kw):
+            seen.append(tmp_store._connection().in_transaction)
+            return real(*a, **kw)
+
+        tmp_store._bm25_record_search = spy
+        hits = tmp_store.recall(
+            query_text="snapshot", query_embedding=emb.embed("snapshot target"),
+        )
+        assert seen == [True]
+        assert hits[0]["summary"] == "snapshot target"
+        # the snapshot is released once recall returns
+        assert not tmp_store._connection().in_transaction
+
+    def test_close_reopens_lazily(self, tmp_store: ArtifactStore):
+        aid = tmp_store.record(tool_name="t", args={}, result={"a": 1}, session_id="s1")
+        tmp_store.close()
+        assert tmp_store._pool == {}
+        assert tmp_store.get(aid) is not None
+
+
+class TestParallelRecall:
+    def _fill(self, store: ArtifactStore, emb: HashEmbedder) -> None:
+        for i in range(30):
+            store.record(
+                tool_name="search" if i % 2 else "compute", args={"i": i},
+                result={"results": [{"formula": f"Fe{i}Ni", "gap": i / 10}]},
+                session_id="s1", summary=f"iron nickel alloy number {i}",
+                embedding=emb.embed(f"alloy {i}"),
+                record_embeddings=[emb.embed(f"Fe{i}Ni")],
+            )
+
+    @pytest.mark.parametrize("vector_index", [True, False])
+    def test_parallel_matches_sequential(
+        self, tmp_path: Path, emb: HashEmbedder, vector_index: bool,
+    ):
+        store = ArtifactStore(tmp_path / "artifacts.db", vector_index=vector_index)
+        self._fill(store, emb)
+        kwargs = dict(
+            query_text="nickel alloy 7", query_embedding=emb.embed("alloy 7"), limit=8,
+        )
+        sequential = store.recall(**kwargs)
+        assert store.recall(parallel=True, **kwargs) == sequential
+        assert store.recall(parallel=True, tool_name="search", **kwargs) == (
+            store.recall(tool_name="search", **kwargs)
+        )
+        store.close()
+
+    def test_arecall_matches_recall(self, tmp_store: ArtifactStore, emb: HashEmbedder):
+        import asyncio
+
+        self._fill(tmp_store, emb)
+        kwargs = dict(query_text="iron alloy", query_embedding=emb.embed("alloy 3"))
+        assert asyncio.run(tmp_store.arecall(**kwargs)) == tmp_store.recall(**kwargs)
+        # BM25-only still works without an embedding
+        hits = asyncio.run(tmp_store.arecall(query_text="number 12", limit=3))
+        assert hits and all("score" in h for h in hits)
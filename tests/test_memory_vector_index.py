@@ -0,0 +1,231 @@
+"""Unit tests for the persistent ANN vector index behind ArtifactStore recall.
+
+Covers exact + IVF search, supersede/tombstone semantics, session/tool
+filters, snapshot persistence, and the store integration: incremental
+maintenance from record()/update_embedding(), catch-up from
+embedding_log across store instances, and the v1 -> v2 migration.
+"""
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.tools.memory.embedder import HashEmbedder
+from app.tools.memory.store import _SCHEMA_VERSION, ArtifactStore
+from app.tools.memory.vector_index import VectorIndex
+
+
+@pytest.fixture
+def emb() -> HashEmbedder:
+    return HashEmbedder(dim=32)
+
+
+def _items(emb, texts, session="s1", tool="t"):
+    return [((f"art_{t}", None), emb.embed(t), session, tool) for t in texts]
+
+
+class TestVectorIndex:
+    def test_exact_match_ranks_first(self, tmp_path: Path, emb: HashEmbedder):
+        idx = VectorIndex(tmp_path / "idx")
+        idx.add(_items(emb, ["alpha", "beta", "gamma"]))
+        hits = idx.search(emb.embed("beta"), 2)
+        assert hits[0][0] == ("art_beta", None)
+        assert abs(hits[0][1] - 1.0) < 1e-5
+        assert len(hits) == 2
+
+    def test_readd_supersedes_old_vector(self, tmp_path: Path, emb: HashEmbedder):
+        idx = VectorIndex(tmp_path / "idx")
+        idx.add([(("art_x", None), emb.embed("old"), "s1", "t")])
+        idx.add([(("art_x", None), emb.embed("new"), "s1", "t")])
+        assert len(idx) == 1
+        hits = idx.search(emb.embed("new"), 5)
+        assert hits == [(("art_x", None), pytest.approx(1.0, abs=1e-5))]
+
+    def test_filters(self, tmp_path: Path, emb: HashEmbedder):
+        idx = VectorIndex(tmp_path / "idx")
+        idx.add(_items(emb, ["a1", "a2"], session="alpha", tool="search"))
+        idx.add(_items(emb, ["b1"], session="beta", tool="compute"))
+        keys = {k for k, _ in idx.search(emb.embed("a1"), 10, session_id="beta")}
+        assert keys == {("art_b1", None)}
+        keys = {k for k, _ in idx.search(emb.embed("a1"), 10, tool_name="search")}
+        assert keys == {("art_a1", None), ("art_a2", None)}
+        assert idx.search(emb.embed("a1"), 10, session_id="nope") == []
+
+    def test_dim_mismatch_returns_nothing(self, tmp_path: Path, emb: HashEmbedder):
+        idx = VectorIndex(tmp_path / "idx")
+        idx.add(_items(emb, ["a"]))
+        assert idx.search([1.0, 0.0], 5) == []
+
+    def test_remove_tombstones(self, tmp_path: Path, emb: HashEmbedder):
+        idx = VectorIndex(tmp_path / "idx")
+        idx.add(_items(emb, ["a", "b"]))
+        assert idx.remove([("art_a", None)]) == 1
+        keys = [k for k, _ in idx.search(emb.embed("a"), 5)]
+        assert keys == [("art_b", None)]
+
+    def test_snapshot_round_trip(self, tmp_path: Path, emb: HashEmbedder):
+        idx = VectorIndex(tmp_path / "idx")
+        idx.add(_items(emb, ["a", "b", "c"]), watermark=7)
+        idx.save()
+        idx.add(_items(emb, ["d"]))  # lands in the in-memory tail
+        idx.save()
+
+        reopened = VectorIndex(tmp_path / "idx")
+        assert reopened.watermark == 7
+        assert len(reopened) == 4
+        assert reopened.search(emb.embed("d"), 1)[0][0] == ("art_d", None)
+        # Only the current generation stays on disk
+        assert len(list((tmp_path / "idx").glob("vectors.*.npy"))) == 1
+
+    def test_concurrent_saves_never_clobber_a_published_snapshot(
+        self, tmp_path: Path, emb: HashEmbedder,
+    ):
+        first = VectorIndex(tmp_path / "idx")
+        second = VectorIndex(tmp_path / "idx")
+        first.add(_items(emb, ["a", "b"]), watermark=2)
+        second.add(_items(emb, ["c"]), watermark=1)
+        assert first.save()
+        # second loaded before first published: its save must not win
+        assert not second.save()
+        reopened = VectorIndex(tmp_path / "idx")
+        assert reopened.watermark == 2 and len(reopened) == 2
+        assert len(list((tmp_path / "idx").glob("vectors.*.npy"))) == 1
+        assert not list((tmp_path / "idx").glob("*.tmp"))
+        # Now based on first's snapshot, the retry publishes
+        assert second.save()
+        assert VectorIndex(tmp_path / "idx").search(emb.embed("c"), 1)[0][0] == ("art_c", None)
+
+    def test_corrupt_snapshot_starts_empty(self, tmp_path: Path, emb: HashEmbedder):
+        idx = VectorIndex(tmp_path / "idx")
+        idx.add(_items(emb, ["a"]))
+        idx.save()
+        (tmp_path / "idx" / "meta.json").write_text("{not json")
+        rebuilt = VectorIndex(tmp_path / "idx")
+        assert len(rebuilt) == 0
+        rebuilt.add(_items(emb, ["b"]))
+        assert rebuilt.save()
+
+    def test_ivf_training_keeps_recall(self, tmp_path: Path):
+        rng = np.random.default_rng(1)
+        data = rng.normal(size=(600, 16)).astype(np.float32)
+        idx = VectorIndex(tmp_path / "idx", train_threshold=256, nprobe=4)
+        idx.add(((f"art_{i}", None), data[i], "s", "t") for i in range(600))
+        assert idx.trained
+        found = sum(
+            idx.search(data[i], 1)[0][0] == (f"art_{i}", None)
+            for i in range(0, 600, 10)
+        )
+        # A stored vector always lands in its own nearest list
+        assert found == 60
+
+
+class TestStoreIntegration:
+    def test_recall_reaches_past_scan_window(self, tmp_path: Path, emb: HashEmbedder):
+        store = ArtifactStore(tmp_path / "artifacts.db")
+        first = store.record(
+            tool_name="t", args={}, result={"answer": "first"}, session_id="s1",
+            embedding=emb.embed("the very first artifact"),
+        )
+        for i in range(520):
+            store.record(
+                tool_name="t", args={"i": i}, result={"answer": i}, session_id="s1",
+                embedding=emb.embed(f"filler {i}"),
+            )
+        hits = store.recall(
+            query_text="zzzz", query_embedding=emb.embed("the very first artifact"),
+            limit=3,
+        )
+        assert hits[0]["artifact_id"] == first
+
+    def test_update_embedding_maintains_index(self, tmp_path: Path, emb: HashEmbedder):
+        store = ArtifactStore(tmp_path / "artifacts.db")
+        store.recall(query_text="x", query_embedding=emb.embed("x"))  # load index
+        aid = store.record(
+            tool_name="t", args={}, result={"results": [{"a": 1}, {"a": 2}]},
+            session_id="s1",
+        )
+        store.update_embedding(
+            artifact_id=aid, record_embeddings=[None, emb.embed("second record")],
+        )
+        art_idx, rec_idx = store._indexes
+        assert len(rec_idx) == 1
+        hits = store.recall(
+            query_text="zzzz", query_embedding=emb.embed("second record"), limit=1,
+        )
+        assert (hits[0]["artifact_id"], hits[0]["record_idx"]) == (aid, 1)
+
+    def test_second_instance_catches_up_from_log(self, tmp_path: Path, emb: HashEmbedder):
+        db = tmp_path / "artifacts.db"
+        reader = ArtifactStore(db)
+        reader.recall(query_text="x", query_embedding=emb.embed("x"))
+        writer = ArtifactStore(db)  # stands in for another agent process
+        aid = writer.record(
+            tool_name="t", args={}, result={"answer": "y"}, session_id="s1",
+            embedding=emb.embed("written elsewhere"),
+        )
+        hits = reader.recall(
+            query_text="zzzz", query_embedding=emb.embed("written elsewhere"), limit=1,
+        )
+        assert hits[0]["artifact_id"] == aid
+
+    def test_index_persists_next_to_db(self, tmp_path: Path, emb: HashEmbedder):
+        db = tmp_path / "artifacts.db"
+        store = ArtifactStore(db)
+        store.record(
+            tool_name="t", args={}, result={"answer": "y"}, session_id="s1",
+            embedding=emb.embed("persist me"),
+        )
+        store.recall(query_text="x", query_embedding=emb.embed("persist me"))
+        store.flush_index()
+        assert (tmp_path / "artifacts.db-vec" / "artifacts" / "meta.json").exists()
+        assert VectorIndex(store.index_dir / "artifacts").watermark == 1
+
+    def test_stale_index_is_rebuilt(self, tmp_path: Path, emb: HashEmbedder):
+        db = tmp_path / "artifacts.db"
+        store = ArtifactStore(db)
+        store.record(
+            tool_name="t", args={}, result={"answer": "y"}, session_id="s1",
+            embedding=emb.embed("gone"),
+        )
+        store.recall(query_text="x", query_embedding=emb.embed("gone"))
+        store.flush_index()
+        for f in tmp_path.glob("artifacts.db*"):
+            if f.is_file():
+                f.unlink()
+        fresh = ArtifactStore(db)
+        assert fresh.recall(query_text="x", query_embedding=emb.embed("gone")) == []
+
+    def test_v1_database_is_migrated(self, tmp_path: Path, emb: HashEmbedder):
+        db = tmp_path / "artifacts.db"
+        store = ArtifactStore(db, vector_index=False)
+        aid = store.record(
+            tool_name="t", args={}, result={"answer": "old"}, session_id="s1",
+            embedding=emb.embed("legacy vector"),
+        )
+        conn = sqlite3.connect(db)
+        conn.execute("DROP TABLE embedding_log")
+        conn.execute("UPDATE schema_version SET version = 1")
+        conn.commit()
+        conn.close()
+
+        migrated = ArtifactStore(db)
+        conn = sqlite3.connect(db)
+        assert conn.execute("SELECT version FROM schema_version").fetchone()[0] == _SCHEMA_VERSION
+        assert conn.execute("SELECT COUNT(*) FROM embedding_log").fetchone()[0] == 1
+        conn.close()
+        hits = migrated.recall(
+            query_text="zzzz", query_embedding=emb.embed("legacy vector"), limit=1,
+        )
+        assert hits[0]["artifact_id"] == aid
+
+    def test_row_scan_fallback_still_works(self, tmp_path: Path, emb: HashEmbedder):
+        store = ArtifactStore(tmp_path / "artifacts.db", vector_index=False)
+        aid = store.record(
+            tool_name="t", args={}, result={"answer": "y"}, session_id="s1",
+            embedding=emb.embed("scan me"),
+        )
+        hits = store.recall(query_text="zzzz", query_embedding=emb.embed("scan me"))
+        assert hits[0]["artifact_id"] == aid
+        assert not store.index_dir.exists()
@@ -108,8 +108,11 @@ async def test_md_writes_traj_ref(tmp_path):
     handle = await tprim.md_equilibrate(inp, runner, backends)
     rec = await _wait_until(runner, store, handle.job_id)
     assert rec.status == "succeeded"
-    assert rec.result["traj_ref"].startswith("cache://")
+    assert rec.result["traj_ref"] == f"cache://{handle.cache_key}/traj"
     assert rec.result["is_dynamically_stable"] is True
+    traj = runner.cache.read_traj(handle.cache_key)
+    assert traj.read("steps").tolist() == [0, 200]
+    assert not (runner.cache.root / handle.cache_key / "traj.json").exists()
 
 
 async def test_phonon_returns_fvib_per_temp(tmp_path):
@@ -76,3 +76,177 @@ def test_cache_disk_persist(tmp_path):
     cache2.load_from_disk()
     hit = cache2.get(q)
     assert hit is not None
+
+
+def _result_of(query, formulas, pid="mp"):
+    mats = [
+        Material(id=f"{pid}-{f}", formula=f, elements=["Fe"], n_elements=1, sources=[pid])
+        for f in formulas
+    ]
+    return SearchResult(materials=mats, total_count=len(mats), query=query, query_log=[])
+
+
+def test_cache_shared_between_instances(tmp_path):
+    from app.tools.search_engine.cache.engine import SearchCache
+    q = MaterialSearchQuery(elements=["Fe"])
+    SearchCache(disk_dir=tmp_path).put(q, _result_of(q, ["Fe", "Fe2O3"]))
+    other = SearchCache(disk_dir=tmp_path)  # e.g. another tool_server process
+    hit = other.get(q)
+    assert hit.cached and [m.formula for m in hit.materials] == ["Fe", "Fe2O3"]
+    assert other.stats()["total_hits"] == 1
+
+
+def test_cache_stores_materials_once(tmp_path):
+    from app.tools.search_engine.cache.engine import SearchCache
+    cache = SearchCache(disk_dir=tmp_path)
+    q1, q2 = MaterialSearchQuery(elements=["Fe"]), MaterialSearchQuery(elements=["Fe", "O"])
+    cache.put(q1, _result_of(q1, ["Fe2O3", "FeO"]))
+    cache.put(q2, _result_of(q2, ["Fe2O3"]))
+    assert cache.stats()["material_count"] == 2
+    # Same id from another provider is a different material
+    q3 = MaterialSearchQuery(elements=["O"])
+    cache.put(q3, _result_of(q3, ["Fe2O3"], pid="oqmd"))
+    assert cache.stats()["material_count"] == 3
+
+
+def test_cache_ttl_expiry(tmp_path):
+    from app.tools.search_engine.cache.engine import SearchCache
+    cache = SearchCache(disk_dir=tmp_path, default_ttl=0)
+    q = MaterialSearchQuery(elements=["Fe"])
+    cache.put(q, _result_of(q, ["Fe"]))
+    assert cache.get(q) is None
+    cache.flush_to_disk()
+    assert cache.stats()["material_count"] == 0
+
+
+def test_cache_lru_eviction_drops_orphans(tmp_path):
+    from app.tools.search_engine.cache.engine import SearchCache
+    cache = SearchCache(disk_dir=tmp_path, max_entries=2, memory_entries=0)
+    qs = [MaterialSearchQuery(elements=[el]) for el in ("Fe", "Ni", "Co")]
+    cache.put(qs[0], _result_of(qs[0], ["Fe"]))
+    cache.put(qs[1], _result_of(qs[1], ["Ni"]))
+    assert cache.get(qs[0]) is not None  # Fe is now the most recently hit
+    cache.put(qs[2], _result_of(qs[2], ["Co"]))
+    assert cache.get(qs[1]) is None
+    assert cache.get(qs[0]) is not None and cache.get(qs[2]) is not None
+    assert {m.formula for m in cache.get_all_materials()} == {"Fe", "Co"}
+
+
+def test_cache_size_cap(tmp_path):
+    from app.tools.search_engine.cache.engine import SearchCache
+    cache = SearchCache(disk_dir=tmp_path, max_bytes=4000)
+    for i in range(40):
+        q = MaterialSearchQuery(elements=["Fe"], limit=i + 1)
+        cache.put(q, _result_of(q, [f"Fe{i}O{j}" for j in range(3)]))
+    assert cache.stats()["bytes"] <= 4000
+    last = MaterialSearchQuery(elements=["Fe"], limit=40)
+    assert cache.get(last) is not None
+
+
+def test_cache_running_totals_and_batched_hits(tmp_path):
+    import sqlite3
+    from app.tools.search_engine.cache.engine import SearchCache
+    cache = SearchCache(disk_dir=tmp_path)
+    q1, q2 = MaterialSearchQuery(elements=["Fe"]), MaterialSearchQuery(elements=["Ni"])
+    cache.put(q1, _result_of(q1, ["Fe", "FeO"]))
+    cache.put(q2, _result_of(q2, ["FeO", "Ni"]))
+    cache.put(q1, _result_of(q1, ["Fe"]))  # replaces the entry and a material
+
+    def summed():
+        db = sqlite3.connect(cache.db_path)
+        q = db.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM queries").fetchone()
+        m, = db.execute("SELECT COALESCE(SUM(bytes), 0) FROM materials").fetchone()
+        return q[0], q[1] + m
+
+    assert cache._totals() == summed()
+
+    for _ in range(3):
+        cache.get(q1)
+    stored = sqlite3.connect(cache.db_path).execute(
+        "SELECT hit_count FROM queries WHERE key = ?", (q1.query_hash(),),
+    ).fetchone()
+    assert stored == (0,)  # buffered, not one write per hit
+    assert cache.stats()["total_hits"] == 3
+
+    # the recorded hits keep Fe ahead of Ni for eviction
+    cache.max_entries = 2
+    q3 = MaterialSearchQuery(elements=["Co"])
+    cache.put(q3, _result_of(q3, ["Co"]))
+    assert cache.get(q2) is None and cache.get(q1) is not None
+    assert cache._totals() == summed() and summed()[0] == 2
+
+
+def test_engine_warm_loads_and_imports_legacy_json(tmp_path):
+    import json
+    import time
+    from app.tools.search_engine.cache.engine import SearchCache
+    from app.tools.search_engine.engine import SearchEngine
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+    from app.tools.search_engine.resilience.circuit_breaker import HealthManager
+
+    q = MaterialSearchQuery(elements=["Fe", "O"])
+    legacy = tmp_path / f"{q.query_hash()}.json"
+    legacy.write_text(json.dumps({
+        "query": q.model_dump(mode="json"),
+        "result": _result_of(q, ["Fe2O3"]).model_dump(mode="json"),
+        "timestamp": time.time(), "ttl": 86400,
+    }))
+    cache = SearchCache(disk_dir=tmp_path)
+    SearchEngine(ProviderRegistry(), cache=cache, health_manager=HealthManager(persist_path=None))
+    assert not legacy.exists()
+    assert cache.stats()["memory_entries"] == 1
+    assert cache.get(q).materials[0].formula == "Fe2O3"
+
+
+def _logged_result(query, materials, truncated=False):
+    from app.tools.search_engine.result import ProviderQueryLog
+    log = ProviderQueryLog(
+        provider_id="mp", provider_name="MP", endpoint_url="mp", query_sent="",
+        started_at=0, completed_at=0, latency_ms=1, status="success",
+        result_count=len(materials), truncated=truncated,
+    )
+    return SearchResult(materials=materials, total_count=len(materials), query=query, query_log=[log])
+
+
+def _alloy(formula, elements, band_gap=None):
+    from app.tools.search_engine.result import PropertyValue
+    return Material(
+        id=formula, formula=formula, elements=elements, n_elements=len(elements), sources=["mp"],
+        band_gap=PropertyValue(value=band_gap, source="optimade:mp") if band_gap is not None else None,
+    )
+
+
+def test_cache_answers_narrower_query_from_complete_result(tmp_path):
+    from app.tools.search_engine.cache.engine import SearchCache
+    from app.tools.search_engine.query import PropertyRange
+    cache = SearchCache(disk_dir=tmp_path)
+    broad = MaterialSearchQuery(elements=["Ni", "Al"])
+    cache.put(broad, _logged_result(broad, [
+        _alloy("NiAl", ["Al", "Ni"], 0.0),
+        _alloy("Ni3Al", ["Al", "Ni"], 0.1),
+        _alloy("NiAlO", ["Al", "Ni", "O"], 3.0),
+        _alloy("NiAlCr", ["Al", "Cr", "Ni"]),
+    ]))
+    narrow = MaterialSearchQuery(
+        elements=["Ni", "Al"], exclude_elements=["O"], band_gap=PropertyRange(max=1), limit=1,
+    )
+    assert cache.get(narrow) is None
+    hit = SearchCache(disk_dir=tmp_path).get_containing(narrow)
+    assert hit.cached and hit.query == narrow
+    assert [m.formula for m in hit.materials] == ["NiAl"]
+    assert cache.get_containing(MaterialSearchQuery(elements=["Ni", "Al", "Cr"])).total_count == 1
+    # Not subsumed: a different element set needs a real search
+    assert cache.get_containing(MaterialSearchQuery(elements=["Ni"])) is None
+
+
+def test_cache_truncated_result_answers_only_when_enough_match(tmp_path):
+    from app.tools.search_engine.cache.engine import SearchCache
+    cache = SearchCache(disk_dir=tmp_path)
+    broad = MaterialSearchQuery(elements=["Ni"], limit=3)
+    cache.put(broad, _logged_result(broad, [
+        _alloy("Ni", ["Ni"]), _alloy("NiAl", ["Al", "Ni"]), _alloy("NiO", ["Ni", "O"]),
+    ]))
+    enough = MaterialSearchQuery(elements=["Ni"], exclude_elements=["O"], limit=2)
+    assert [m.formula for m in cache.get_containing(enough).materials] == ["Ni", "NiAl"]
+    too_few = MaterialSearchQuery(elements=["Ni"], exclude_elements=["O"], limit=5)
+    assert cache.get_containing(too_few) is None
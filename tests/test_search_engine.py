@@ -138,3 +138,247 @@ def test_engine_audit_trail_has_url():
     result = asyncio.run(engine.search(q))
     assert len(result.query_log) == 1
     assert result.query_log[0].provider_id == "mock"
+
+
+def _paging_provider(pid, n_pages, per_page, fetched, delay=0.0):
+    from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+
+    class PagingProvider(Provider):
+        id = pid
+        name = pid
+        capabilities = ProviderCapabilities(filterable_fields={"elements"})
+
+        async def search(self, query):
+            return [m async for page in self.search_pages(query) for m in page]
+
+        async def search_pages(self, query):
+            for page in range(n_pages):
+                await asyncio.sleep(delay)
+                fetched.append((pid, page))
+                yield [_mock_material(pid, formula=f"Fe{page}O{i}") for i in range(per_page)]
+
+    return PagingProvider()
+
+
+def test_engine_fuses_pages_and_stops_at_limit():
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+
+    fetched = []
+    reg = ProviderRegistry()
+    reg.register(_paging_provider("fast", 50, 10, fetched))
+    reg.register(_paging_provider("slow", 50, 10, fetched, delay=0.05))
+    engine = _isolated_engine(reg)
+    result = asyncio.run(engine.search(MaterialSearchQuery(elements=["Fe"], limit=35)))
+    assert result.total_count == 35
+    assert len({m.formula for m in result.materials}) == 35
+    logs = {log.provider_id: log for log in result.query_log}
+    assert logs["fast"].pages_fetched == 4 and logs["fast"].truncated
+    assert logs["slow"].status == "skipped"
+    assert len(fetched) == 4
+
+
+def test_engine_keeps_pages_before_a_later_failure():
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+    from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+
+    class FlakyProvider(Provider):
+        id = "flaky"
+        name = "Flaky"
+        capabilities = ProviderCapabilities(filterable_fields={"elements"})
+
+        async def search(self, query):
+            return []
+
+        async def search_pages(self, query):
+            yield [_mock_material("flaky", formula="Fe2O3")]
+            raise ConnectionError("page 2 went away")
+
+    reg = ProviderRegistry()
+    reg.register(FlakyProvider())
+    engine = _isolated_engine(reg)
+    result = asyncio.run(engine.search(MaterialSearchQuery(elements=["Fe"], limit=10)))
+    assert result.total_count == 1
+    log = result.query_log[0]
+    assert log.status == "success" and log.truncated and log.pages_fetched == 1
+    assert log.error_type == "ConnectionError"
+    assert any("flaky" in w for w in result.warnings)
+
+
+def test_engine_answers_narrower_query_from_cache():
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+    from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+
+    calls = []
+
+    class CountingProvider(Provider):
+        id = "mock"
+        name = "Mock"
+        capabilities = ProviderCapabilities(filterable_fields={"elements", "band_gap"})
+
+        async def search(self, query):
+            calls.append(query)
+            return [_mock_material("mock"), _mock_material("mock", formula="FeO")]
+
+    reg = ProviderRegistry()
+    reg.register(CountingProvider())
+    engine = _isolated_engine(reg)
+    asyncio.run(engine.search(MaterialSearchQuery(elements=["Fe", "O"])))
+    narrow = MaterialSearchQuery(elements=["Fe", "O"], band_gap=PropertyRange(min=2), limit=5)
+    result = asyncio.run(engine.search(narrow))
+    assert result.cached and result.query == narrow
+    assert result.total_count == 2
+    assert len(calls) == 1
+
+
+def test_engine_post_filters_fields_the_provider_cannot_filter():
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+    from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+
+    sent = []
+
+    class ReturnsBandGap(Provider):
+        id = "oqmd"
+        name = "OQMD"
+        capabilities = ProviderCapabilities(
+            filterable_fields={"elements"}, property_fields={"band_gap": "_oqmd_band_gap"},
+        )
+
+        async def search(self, query):
+            sent.append(query)
+            low = _mock_material("oqmd", formula="FeO")
+            low.band_gap = PropertyValue(value=0.1, source="optimade:oqmd")
+            return [_mock_material("oqmd"), low]
+
+    reg = ProviderRegistry()
+    reg.register(ReturnsBandGap())
+    engine = _isolated_engine(reg)
+    q = MaterialSearchQuery(elements=["Fe"], band_gap=PropertyRange(min=1.0))
+    result = asyncio.run(engine.search(q))
+    assert sent[0].band_gap is None  # not pushed down
+    assert [m.formula for m in result.materials] == ["Fe2O3"]
+    log = result.query_log[0]
+    assert log.result_count == 2 and log.rejected_count == 1
+
+
+def test_search_many_dedupes_and_splits_a_merged_request():
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+    from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+
+    unions, singles = [], []
+
+    class MergingProvider(Provider):
+        id = "mock"
+        name = "Mock"
+        capabilities = ProviderCapabilities(filterable_fields={"elements"})
+
+        async def search(self, query):
+            singles.append(query)
+            return []
+
+        async def search_union(self, queries):
+            unions.append(queries)
+            ni = _mock_material("mock", formula="NiO")
+            ni.elements = ["Ni", "O"]
+            return [_mock_material("mock"), ni], "(Fe) OR (Ni)"
+
+    reg = ProviderRegistry()
+    reg.register(MergingProvider())
+    engine = _isolated_engine(reg)
+    fe, ni = MaterialSearchQuery(elements=["Fe"]), MaterialSearchQuery(elements=["Ni"])
+    results = asyncio.run(engine.search_many([fe, ni, fe]))
+
+    assert len(unions) == 1 and len(unions[0]) == 2
+    assert singles == []  # the merged answer was complete for both
+    assert [[m.formula for m in r.materials] for r in results] == [["Fe2O3"], ["NiO"], ["Fe2O3"]]
+    assert results[0] is results[2]
+    assert results[1].query_log[0].query_sent == "(Fe) OR (Ni)"
+
+
+def test_search_many_distrusts_a_short_union_that_stopped_early():
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+    from app.tools.search_engine.providers.base import Page, Provider, ProviderCapabilities
+
+    singles = []
+
+    class CappedProvider(Provider):
+        id = "mock"
+        name = "Mock"
+        capabilities = ProviderCapabilities(filterable_fields={"elements"})
+
+        async def search(self, query):
+            singles.append(query)
+            return [_mock_material("mock")]
+
+        async def search_union(self, queries):
+            # server capped the page: 1 row of 20, but more were available
+            return Page([_mock_material("mock")], more=True), "(Fe) OR (Ni)"
+
+    reg = ProviderRegistry()
+    reg.register(CappedProvider())
+    engine = _isolated_engine(reg)
+    fe = MaterialSearchQuery(elements=["Fe"], limit=10)
+    ni = MaterialSearchQuery(elements=["Ni"], limit=10)
+    asyncio.run(engine.search_many([fe, ni]))
+    assert len(singles) == 2  # neither share was provably complete
+
+
+def test_search_many_falls_back_per_query_without_union_support():
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+    from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+
+    calls = []
+
+    class PlainProvider(Provider):
+        id = "mock"
+        name = "Mock"
+        capabilities = ProviderCapabilities(filterable_fields={"elements"})
+
+        async def search(self, query):
+            calls.append(query)
+            return [_mock_material("mock")]
+
+    reg = ProviderRegistry()
+    reg.register(PlainProvider())
+    engine = _isolated_engine(reg)
+    cached = MaterialSearchQuery(elements=["Fe"])
+    asyncio.run(engine.search(cached))
+    calls.clear()
+    queries = [cached, MaterialSearchQuery(elements=["O"]), MaterialSearchQuery(elements=["Ni"])]
+    results = asyncio.run(engine.search_many(queries))
+    assert results[0].cached
+    assert len(calls) == 2
+    assert all(r.total_count == 1 for r in results)
+
+
+def test_fused_count_below_limit_is_not_a_complete_answer():
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+    from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+
+    # x0-x4 fuse into one FeO record; x5-x9 are distinct
+    rows = []
+    for i in range(10):
+        m = _mock_material("mock", formula="FeO" if i < 5 else f"Fe{i}O")
+        m.id, m.band_gap = f"x{i}", PropertyValue(value=float(i), source="optimade:mock")
+        rows.append(m)
+    calls = []
+
+    class LimitedProvider(Provider):
+        id = "mock"
+        name = "Mock"
+        capabilities = ProviderCapabilities(filterable_fields={"elements", "band_gap"})
+
+        async def search(self, query):
+            calls.append(query)
+            lo = query.band_gap.min if query.band_gap else None
+            return [m for m in rows if lo is None or m.band_gap.value >= lo][:query.limit]
+
+    reg = ProviderRegistry()
+    reg.register(LimitedProvider())
+    engine = _isolated_engine(reg)
+    first = asyncio.run(engine.search(MaterialSearchQuery(elements=["Fe", "O"], limit=6)))
+    assert first.total_count == 2 and first.query_log[0].result_count == 6
+
+    gapped = MaterialSearchQuery(elements=["Fe", "O"], band_gap=PropertyRange(min=4), limit=6)
+    result = asyncio.run(engine.search(gapped))
+    assert not result.cached and len(calls) == 2
+    assert sorted(m.id for m in result.materials) == [f"x{i}" for i in range(4, 10)]
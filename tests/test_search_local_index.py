@@ -0,0 +1,194 @@
+"""Tests for the offline columnar materials index provider."""
+import asyncio
+
+from app.tools.search_engine.query import MaterialSearchQuery, PropertyRange
+from app.tools.search_engine.result import Material, PropertyValue
+
+
+def _mat(formula, elements, pid="mp", band_gap=None, sg=None):
+    return Material(
+        id=f"{pid}-{formula}", formula=formula, elements=elements, n_elements=len(elements),
+        sources=[pid],
+        band_gap=PropertyValue(value=band_gap, source=f"optimade:{pid}") if band_gap is not None else None,
+        space_group=PropertyValue(value=sg, source=f"optimade:{pid}") if sg else None,
+    )
+
+
+MATS = [
+    _mat("Fe2O3", ["Fe", "O"], band_gap=2.2, sg="R-3c"),
+    _mat("FeO", ["Fe", "O"], band_gap=0.0, sg="Fm-3m"),
+    _mat("Fe", ["Fe"], sg="Im-3m"),
+    _mat("NiAl", ["Al", "Ni"], band_gap=0.0),
+    _mat("UO2", ["O", "U"], band_gap=2.5),  # U sits in the high mask word
+]
+
+
+def _index(tmp_path=None):
+    from app.tools.search_engine.providers.local_index import LocalMaterialsIndex
+    index = LocalMaterialsIndex(tmp_path / "idx.db" if tmp_path else None)
+    index.add(MATS)
+    return index
+
+
+def _formulas(index, **kw):
+    return [m.formula for m in index.search(MaterialSearchQuery(**kw))]
+
+
+def test_element_mask_spans_both_words():
+    from app.tools.search_engine.providers.local_index import ELEMENT_BITS, element_mask
+    assert len(ELEMENT_BITS) == 118
+    lo, hi = element_mask(["Zr", "Ac"])
+    assert lo == 1 << ELEMENT_BITS["Ac"] and hi == 1 << (ELEMENT_BITS["Zr"] - 64)
+
+
+def test_index_bitmask_filters():
+    index = _index()
+    assert _formulas(index, elements=["Fe", "O"]) == ["Fe2O3", "FeO"]
+    assert _formulas(index, elements=["O"], exclude_elements=["Fe"]) == ["UO2"]
+    assert _formulas(index, elements_any=["Ni", "U"]) == ["NiAl", "UO2"]
+    assert _formulas(index, elements=["U"]) == ["UO2"]
+
+
+def test_index_ranges_and_labels():
+    index = _index()
+    assert _formulas(index, band_gap=PropertyRange(min=2.0)) == ["Fe2O3", "UO2"]
+    assert _formulas(index, band_gap=PropertyRange(max=0.0)) == ["FeO", "NiAl"]
+    assert _formulas(index, n_elements=PropertyRange(max=1)) == ["Fe"]
+    assert _formulas(index, formula="O3Fe2") == ["Fe2O3"]
+    assert _formulas(index, space_group="Fm-3m") == ["FeO"]
+    assert _formulas(index, elements=["O"], limit=1) == ["Fe2O3"]
+
+
+def test_index_matches_post_filter():
+    from app.tools.search_engine.postfilter import post_filter
+    index = _index()
+    for q in (
+        MaterialSearchQuery(elements=["O"], band_gap=PropertyRange(min=0.5, max=2.4)),
+        MaterialSearchQuery(elements_any=["Al", "Fe"], exclude_elements=["O"]),
+    ):
+        assert [m.formula for m in index.search(q)] == [m.formula for m in post_filter(MATS, q)]
+
+
+def test_index_upserts_and_reloads_across_handles(tmp_path):
+    from app.tools.search_engine.providers.local_index import LocalMaterialsIndex
+    index = _index(tmp_path)
+    assert len(index.columns()) == 5
+    other = LocalMaterialsIndex(tmp_path / "idx.db")
+    other.add([_mat("FeO", ["Fe", "O"], band_gap=0.5), _mat("CoO", ["Co", "O"])])
+    assert index.stats()["material_count"] == 6
+    assert _formulas(index, elements=["O"], band_gap=PropertyRange(min=0.4, max=1)) == ["FeO"]
+    assert "CoO" in _formulas(index, elements=["Co"])
+
+
+def test_harvest_is_incremental(tmp_path):
+    from app.tools.search_engine.cache.engine import SearchCache
+    from app.tools.search_engine.engine import SearchEngine
+    from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+    from app.tools.search_engine.providers.local_index import LocalMaterialsIndex, harvest
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+    from app.tools.search_engine.resilience.circuit_breaker import HealthManager
+
+    calls = []
+
+    class Remote(Provider):
+        id = "mp"
+        name = "MP"
+        capabilities = ProviderCapabilities(filterable_fields={"elements"})
+
+        async def search(self, query):
+            calls.append(query)
+            return [m for m in MATS if set(query.elements) <= set(m.elements)]
+
+    reg = ProviderRegistry()
+    reg.register(Remote())
+    engine = SearchEngine(reg, cache=SearchCache(disk_dir=None), health_manager=HealthManager(persist_path=None))
+    index = LocalMaterialsIndex(tmp_path / "idx.db")
+    queries = [MaterialSearchQuery(elements=["Fe"]), MaterialSearchQuery(elements=["Ni"])]
+    report = asyncio.run(harvest(engine, index, queries))
+    assert report["queries"] == 2 and report["materials"] == 4
+    report = asyncio.run(harvest(engine, index, queries + [MaterialSearchQuery(elements=["U"])]))
+    assert report["skipped"] == 2 and report["queries"] == 1
+    assert len(calls) == 3
+    assert index.stats()["material_count"] == 5
+
+
+def test_harvest_retries_queries_with_a_failed_provider(tmp_path):
+    from app.tools.search_engine.cache.engine import SearchCache
+    from app.tools.search_engine.engine import SearchEngine
+    from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+    from app.tools.search_engine.providers.local_index import LocalMaterialsIndex, harvest
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+    from app.tools.search_engine.resilience.circuit_breaker import HealthManager
+
+    class Remote(Provider):
+        capabilities = ProviderCapabilities(filterable_fields={"elements"})
+
+        def __init__(self, pid, fail=False):
+            self.id = self.name = pid
+            self.fail = fail
+
+        async def search(self, query):
+            if self.fail:
+                raise ConnectionError("down")
+            return [m for m in MATS if set(query.elements) <= set(m.elements)]
+
+    flaky = Remote("oqmd", fail=True)
+    reg = ProviderRegistry()
+    reg.register(Remote("mp"))
+    reg.register(flaky)
+    index = LocalMaterialsIndex(tmp_path / "idx.db")
+    queries = [MaterialSearchQuery(elements=["Fe"])]
+
+    def run():
+        engine = SearchEngine(reg, cache=SearchCache(disk_dir=None), health_manager=HealthManager(persist_path=None))
+        return asyncio.run(harvest(engine, index, queries))
+
+    report = run()
+    assert report["partial"] == 1 and report["materials"] == 3
+    assert index.harvested_at(queries[0]) is None
+    flaky.fail = False
+    report = run()
+    assert report["queries"] == 1 and report["partial"] == 0
+    assert run()["skipped"] == 1
+
+
+def test_harvest_refuses_offline_mode(tmp_path, monkeypatch, capsys):
+    import pytest
+    from app.tools.search_engine.providers.local_index import main
+
+    monkeypatch.setenv("PRISM_SEARCH_OFFLINE", "1")
+    with pytest.raises(SystemExit):
+        main(["--index", str(tmp_path / "idx.db"), "harvest", "--chemsys", "Fe-O"])
+    assert "PRISM_SEARCH_OFFLINE" in capsys.readouterr().err
+
+
+def test_offline_registry_serves_from_index(tmp_path, monkeypatch):
+    from app.tools.search_engine.cache.engine import SearchCache
+    from app.tools.search_engine.engine import SearchEngine
+    from app.tools.search_engine.providers.registry import build_registry
+    from app.tools.search_engine.resilience.circuit_breaker import HealthManager
+
+    _index(tmp_path).close()
+    monkeypatch.setenv("PRISM_MATERIALS_INDEX", str(tmp_path / "idx.db"))
+    monkeypatch.setenv("PRISM_SEARCH_OFFLINE", "1")
+    reg = build_registry(skip_network=True)
+    assert [p.id for p in reg.get_all()] == ["local_index"]
+    engine = SearchEngine(reg, cache=SearchCache(disk_dir=None), health_manager=HealthManager(persist_path=None))
+    result = asyncio.run(engine.search(MaterialSearchQuery(elements=["Fe", "O"])))
+    assert {m.formula for m in result.materials} == {"Fe2O3", "FeO"}
+
+
+def test_online_registry_adds_index_only_on_opt_in(tmp_path, monkeypatch):
+    from app.tools.search_engine.providers.registry import build_registry
+
+    _index(tmp_path).close()
+    monkeypatch.setenv("PRISM_MATERIALS_INDEX", str(tmp_path / "idx.db"))
+    monkeypatch.delenv("PRISM_SEARCH_OFFLINE", raising=False)
+    monkeypatch.delenv("PRISM_SEARCH_LOCAL_INDEX", raising=False)
+    cache = tmp_path / "discovery.json"
+    assert "local_index" not in [p.id for p in build_registry(cache, skip_network=True).get_all()]
+    assert "local_index" in [
+        p.id for p in build_registry(cache, skip_network=True, local_index=True).get_all()
+    ]
+    monkeypatch.setenv("PRISM_SEARCH_LOCAL_INDEX", "1")
+    assert "local_index" in [p.id for p in build_registry(cache, skip_network=True).get_all()]
@@ -0,0 +1,58 @@
+"""Tests for client-side predicate evaluation on Material records."""
+from app.tools.search_engine.query import MaterialSearchQuery, PropertyRange
+from app.tools.search_engine.result import Material, PropertyValue
+
+
+def _mat(formula, elements, band_gap=None, sg=None, cs=None):
+    return Material(
+        id=formula, formula=formula, elements=elements, n_elements=len(elements), sources=["oqmd"],
+        band_gap=PropertyValue(value=band_gap, source="optimade:oqmd") if band_gap is not None else None,
+        space_group=PropertyValue(value=sg, source="optimade:oqmd") if sg else None,
+        crystal_system=PropertyValue(value=cs, source="optimade:mpdd") if cs else None,
+    )
+
+
+MATS = [
+    _mat("Fe2O3", ["Fe", "O"], band_gap=2.2, sg="R-3c", cs="Trigonal"),
+    _mat("FeO", ["Fe", "O"], band_gap=0.0, sg="Fm-3m", cs="cubic"),
+    _mat("Fe", ["Fe"], sg="Im-3m"),
+    _mat("NiAl", ["Al", "Ni"], band_gap=0.0),
+]
+
+
+def test_post_filter_composition():
+    from app.tools.search_engine.postfilter import post_filter
+    q = MaterialSearchQuery(elements=["Fe"], exclude_elements=["O"])
+    assert [m.formula for m in post_filter(MATS, q)] == ["Fe"]
+    q = MaterialSearchQuery(elements_any=["O", "Ni"], n_elements=PropertyRange(min=2))
+    assert [m.formula for m in post_filter(MATS, q)] == ["Fe2O3", "FeO", "NiAl"]
+
+
+def test_post_filter_ranges_reject_missing_values():
+    from app.tools.search_engine.postfilter import post_filter
+    q = MaterialSearchQuery(band_gap=PropertyRange(max=1.0))
+    assert [m.formula for m in post_filter(MATS, q)] == ["FeO", "NiAl"]
+    q = MaterialSearchQuery(formation_energy=PropertyRange(max=0))
+    assert post_filter(MATS, q) == []
+
+
+def test_post_filter_string_fields_are_normalised():
+    from app.tools.search_engine.postfilter import post_filter
+    assert [m.formula for m in post_filter(MATS, MaterialSearchQuery(formula="O3Fe2"))] == ["Fe2O3"]
+    assert [m.formula for m in post_filter(MATS, MaterialSearchQuery(space_group="Fm-3m"))] == ["FeO"]
+    q = MaterialSearchQuery(crystal_system="trigonal")
+    assert [m.formula for m in post_filter(MATS, q)] == ["Fe2O3"]
+
+
+def test_post_filter_only_requested_fields():
+    from app.tools.search_engine.postfilter import post_filter
+    q = MaterialSearchQuery(elements=["Fe"], band_gap=PropertyRange(min=1))
+    assert len(post_filter(MATS, q, {"elements"})) == 3
+    assert post_filter(MATS, q, set()) is MATS
+
+
+def test_reduced_formula():
+    from app.tools.search_engine.postfilter import reduced_formula
+    assert reduced_formula("Fe4O6") == reduced_formula("Fe2O3") == "Fe2O3"
+    assert reduced_formula("Ni3 Al") == "AlNi3"
+    assert reduced_formula("Ca(OH)2") == "Ca(OH)2"
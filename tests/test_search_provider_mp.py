@@ -76,3 +76,91 @@ def test_mp_provider_skips_without_api_key():
 
         results = asyncio.run(p.search(MaterialSearchQuery(elements=["Fe"])))
         assert results == []
+
+
+def _fake_mp_api(total, pages, threads, paged=True):
+    """Install a stand-in ``mp_api.client`` whose summary search serves ``total`` docs.
+
+    ``paged=False`` mimics a client older than ``_page`` (mp-api < 0.46).
+    """
+    import sys
+    import threading
+    import types
+
+    def docs(start, stop):
+        return [
+            {"material_id": f"mp-{i}", "formula_pretty": "Fe", "elements": ["Fe"], "nelements": 1}
+            for i in range(start, min(stop, total))
+        ]
+
+    class FakeSummary:
+        def search(self, num_chunks, chunk_size, _page, **kwargs):
+            pages.append(_page)
+            threads.add(threading.current_thread().name)
+            start = (_page - 1) * chunk_size
+            return docs(start, start + chunk_size)
+
+    class UnpagedSummary:
+        def search(self, num_chunks=None, chunk_size=1000, **kwargs):
+            pages.append((num_chunks, chunk_size))
+            threads.add(threading.current_thread().name)
+            return docs(0, num_chunks * chunk_size)
+
+    class FakeRester:
+        def __init__(self, api_key, **kwargs):
+            self.materials = types.SimpleNamespace(
+                summary=FakeSummary() if paged else UnpagedSummary(),
+            )
+
+    module = types.ModuleType("mp_api.client")
+    module.MPRester = FakeRester
+    return patch.dict(sys.modules, {"mp_api": types.ModuleType("mp_api"), "mp_api.client": module})
+
+
+def test_mp_provider_fetches_chunks_off_the_event_loop():
+    import asyncio
+    from app.tools.search_engine.providers.materials_project import (
+        MaterialsProjectProvider,
+    )
+
+    p = MaterialsProjectProvider(endpoint=_make_mp_endpoint())
+    pages, threads = [], set()
+
+    async def collect(limit):
+        return [len(pg) async for pg in p.search_pages(MaterialSearchQuery(elements=["Fe"], limit=limit))]
+
+    with _fake_mp_api(1000, pages, threads), patch.dict("os.environ", {"MP_API_KEY": "k1"}):
+        sizes = asyncio.run(collect(250))
+    assert sorted(sizes) == [50, 100, 100]
+    assert sorted(pages) == [1, 2, 3]
+    assert threads and all(t.startswith("mp-rester") for t in threads)
+
+    # a short page ends the results (new key: workers cache one client per key)
+    with _fake_mp_api(130, pages, threads), patch.dict("os.environ", {"MP_API_KEY": "k2"}):
+        materials = asyncio.run(p.search(MaterialSearchQuery(elements=["Fe"], limit=1000)))
+    assert len(materials) == 130
+    assert len({m.id for m in materials}) == 130
+
+
+def test_mp_provider_without_page_support_makes_one_sequential_request():
+    import asyncio
+    from app.tools.search_engine.providers.materials_project import (
+        MaterialsProjectProvider,
+    )
+
+    p = MaterialsProjectProvider(endpoint=_make_mp_endpoint())
+    pages, threads = [], set()
+
+    async def collect(limit):
+        return [pg async for pg in p.search_pages(MaterialSearchQuery(elements=["Fe"], limit=limit))]
+
+    with _fake_mp_api(1000, pages, threads, paged=False), patch.dict("os.environ", {"MP_API_KEY": "k3"}):
+        got = asyncio.run(collect(250))
+    assert pages == [(3, 100)]
+    assert [len(pg) for pg in got] == [250] and got[0].more
+
+    pages.clear()
+    with _fake_mp_api(130, pages, threads, paged=False), patch.dict("os.environ", {"MP_API_KEY": "k4"}):
+        got = asyncio.run(collect(1000))
+    assert pages == [(10, 100)]
+    assert [len(pg) for pg in got] == [130] and not got[0].more
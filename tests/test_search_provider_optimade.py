@@ -82,3 +82,189 @@ def test_optimade_parse_provider_specific_fields():
     assert material.id == "12345"
     assert "_oqmd_band_gap" in material.extra_properties
     assert material.extra_properties["_oqmd_band_gap"].value == 2.1
+
+
+def _mock_pool(calls):
+    import httpx
+    from app.tools.search_engine.http import HTTPClientPool
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"data": [{
+            "id": "mp-1", "attributes": {"chemical_formula_descriptive": "Fe", "elements": ["Fe"]},
+        }]})
+
+    return HTTPClientPool(transport=httpx.MockTransport(handler), http2=False)
+
+
+def test_optimade_search_reuses_pooled_client():
+    import asyncio
+    from app.tools.search_engine.providers.optimade import OptimadeProvider
+
+    calls = []
+    pool = _mock_pool(calls)
+    p = OptimadeProvider(endpoint=_make_endpoint(), http=pool)
+
+    async def twice():
+        first = pool.client()
+        await p.search(MaterialSearchQuery(elements=["Fe"], limit=5))
+        await p.search(MaterialSearchQuery(elements=["Fe"], limit=5))
+        return first is pool.client()
+
+    assert asyncio.run(twice())
+    assert len(calls) == 2
+    assert calls[0].url.path == "/v1/structures"
+    assert pool.stats()["clients_opened"] == 1
+    pool.close()
+    assert pool.stats()["open_clients"] == 0
+
+
+def test_engine_search_sync_keeps_one_client_across_calls():
+    from app.tools.search_engine.cache.engine import SearchCache
+    from app.tools.search_engine.engine import SearchEngine
+    from app.tools.search_engine.providers.optimade import OptimadeProvider
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+    from app.tools.search_engine.resilience.circuit_breaker import HealthManager
+
+    calls = []
+    pool = _mock_pool(calls)
+    reg = ProviderRegistry()
+    provider = OptimadeProvider(endpoint=_make_endpoint())
+    reg.register(provider)
+    engine = SearchEngine(
+        reg, cache=SearchCache(disk_dir=None),
+        health_manager=HealthManager(persist_path=None), http=pool,
+    )
+    assert provider.http is pool
+    r1 = engine.search_sync(MaterialSearchQuery(elements=["Fe"], limit=5))
+    # Not answerable from the first result, so it goes out again
+    r2 = engine.search_sync(MaterialSearchQuery(elements=["O"], limit=5))
+    assert r1.materials[0].id == r2.materials[0].id == "mp-1"
+    assert len(calls) == 2
+    assert pool.stats()["clients_opened"] == 1
+    engine.close()
+    assert pool.stats()["open_clients"] == 0
+
+
+def test_pool_limits_concurrency_per_host():
+    import asyncio
+    import httpx
+    from app.tools.search_engine.http import HTTPClientPool
+
+    state = {"live": 0, "peak": 0}
+
+    async def handler(request):
+        state["live"] += 1
+        state["peak"] = max(state["peak"], state["live"])
+        await asyncio.sleep(0.01)
+        state["live"] -= 1
+        return httpx.Response(200, json={})
+
+    pool = HTTPClientPool(transport=httpx.MockTransport(handler), per_host=2, http2=False)
+
+    async def burst():
+        await asyncio.gather(*(pool.get("https://a.example/v1/info") for _ in range(6)))
+        await pool.aclose()
+
+    asyncio.run(burst())
+    assert state["peak"] == 2
+
+
+def _paged_pool(n_pages, per_page, calls):
+    import httpx
+    from app.tools.search_engine.http import HTTPClientPool
+
+    def handler(request):
+        calls.append(request)
+        page = int(request.url.params.get("page", "0"))
+        data = [
+            {"id": f"x-{page}-{i}", "attributes": {
+                "chemical_formula_descriptive": f"Fe{page}O{i}", "elements": ["Fe", "O"],
+            }}
+            for i in range(per_page)
+        ]
+        links = {}
+        if page + 1 < n_pages:
+            links["next"] = {"href": f"https://optimade.materialsproject.org/v1/structures?page={page + 1}"}
+        return httpx.Response(200, json={"data": data, "links": links})
+
+    return HTTPClientPool(transport=httpx.MockTransport(handler), http2=False)
+
+
+def test_optimade_search_pages_follows_next_links():
+    import asyncio
+    from app.tools.search_engine.providers.optimade import OptimadeProvider
+
+    calls = []
+    p = OptimadeProvider(endpoint=_make_endpoint(), http=_paged_pool(5, 4, calls))
+
+    async def collect(limit):
+        return [page async for page in p.search_pages(MaterialSearchQuery(elements=["Fe"], limit=limit))]
+
+    pages = asyncio.run(collect(10))
+    assert [len(pg) for pg in pages] == [4, 4, 2]
+    assert len(calls) == 3
+    assert calls[0].url.params["filter"]
+    assert "filter" not in calls[1].url.params  # the next link carries the cursor
+    assert pages[-1].more and not pages[0].more  # stopped at the limit, rows left
+
+    calls.clear()
+    assert len(asyncio.run(p.search(MaterialSearchQuery(elements=["Fe"], limit=100)))) == 20
+    assert len(calls) == 5
+    assert not asyncio.run(collect(100))[-1].more
+
+
+def test_optimade_unpaginated_endpoint_reports_the_unfollowed_next_link():
+    import asyncio
+    from app.tools.search_engine.providers.optimade import OptimadeProvider
+
+    ep = _make_endpoint()
+    ep.capabilities.supports_pagination = False
+    calls = []
+    p = OptimadeProvider(endpoint=ep, http=_paged_pool(5, 4, calls))
+
+    async def collect():
+        return [page async for page in p.search_pages(MaterialSearchQuery(elements=["Fe"], limit=10))]
+
+    pages = asyncio.run(collect())
+    assert [len(pg) for pg in pages] == [4] and pages[0].more
+
+
+def test_optimade_property_fields_are_requested_and_parsed():
+    import asyncio
+    from app.tools.search_engine.providers.optimade import OptimadeProvider
+    from app.tools.search_engine.query import PropertyRange
+
+    ep = _make_endpoint(pid="oqmd")
+    ep.capabilities.filterable_fields.append("band_gap")
+    ep.capabilities.property_fields = {"band_gap": "_oqmd_band_gap"}
+    calls = []
+    p = OptimadeProvider(endpoint=ep, http=_paged_pool(1, 2, calls))
+    q = MaterialSearchQuery(elements=["Fe"], band_gap=PropertyRange(min=1.0))
+    asyncio.run(p.search(q))
+    params = calls[0].url.params
+    assert "_oqmd_band_gap>=1.0" in params["filter"]
+    assert "_oqmd_band_gap" in params["response_fields"].split(",")
+    assert "cartesian_site_positions" not in params["response_fields"]
+
+    m = p._parse_entry({"id": "1", "attributes": {
+        "chemical_formula_descriptive": "FeO", "elements": ["Fe", "O"], "_oqmd_band_gap": 1.4,
+    }})
+    assert m.band_gap.value == 1.4 and m.band_gap.unit == "eV"
+
+
+def test_optimade_search_union_sends_one_or_filter():
+    import asyncio
+    from app.tools.search_engine.providers.optimade import OptimadeProvider
+
+    calls = []
+    p = OptimadeProvider(endpoint=_make_endpoint(), http=_paged_pool(5, 4, calls))
+    queries = [MaterialSearchQuery(elements=["Fe"], limit=3), MaterialSearchQuery(elements=["Ni"], limit=3)]
+    materials, sent = asyncio.run(p.search_union(queries))
+    assert len(materials) == 6 and len(calls) == 2
+    assert materials.more  # stopped at the summed limits with a next link
+    assert sent == calls[0].url.params["filter"]
+    assert sent.count(" OR ") == 1 and '"Fe"' in sent and '"Ni"' in sent
+
+    # an unfiltered member would fetch everything: not merged
+    assert asyncio.run(p.search_union([MaterialSearchQuery(), queries[0]])) is None
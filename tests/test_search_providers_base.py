@@ -73,3 +73,19 @@ def test_provider_endpoint_model():
     assert ep.id == "test"
     assert ep.api_type == "optimade"
     assert ep.behavior.timeout_ms == 5000
+
+
+def test_provider_capabilities_pushdown():
+    from app.tools.search_engine.providers.base import ProviderCapabilities
+    from app.tools.search_engine.query import MaterialSearchQuery, PropertyRange
+    cap = ProviderCapabilities(
+        filterable_fields={"elements"},
+        returned_properties={"elements"},
+        property_fields={"band_gap": "_oqmd_band_gap"},
+    )
+    q = MaterialSearchQuery(elements=["Fe"], band_gap=PropertyRange(min=1.0))
+    assert cap.can_handle(q) is True
+    pushed, residual = cap.pushdown(q)
+    assert residual == {"band_gap"}
+    assert pushed.band_gap is None and pushed.elements == ["Fe"]
+    assert cap.pushdown(MaterialSearchQuery(elements=["Fe"])) == (MaterialSearchQuery(elements=["Fe"]), set())
@@ -68,3 +68,35 @@ def test_query_hash_different():
     q1 = MaterialSearchQuery(elements=["Fe", "O"])
     q2 = MaterialSearchQuery(elements=["Fe", "Si"])
     assert q1.query_hash() != q2.query_hash()
+
+
+def test_subsumes_narrower_filters():
+    from app.tools.search_engine.query import MaterialSearchQuery, PropertyRange
+    broad = MaterialSearchQuery(elements=["Ni", "Al"])
+    narrow = MaterialSearchQuery(
+        elements=["Ni", "Al"], exclude_elements=["O"], limit=10,
+        band_gap=PropertyRange(min=0, max=1), n_elements=PropertyRange(max=3),
+    )
+    assert broad.subsumes(narrow)
+    assert not narrow.subsumes(broad)
+    assert not broad.subsumes(MaterialSearchQuery(elements=["Ni"]))
+    assert not broad.subsumes(MaterialSearchQuery(elements=["Ni", "Al"], formula="NiAl"))
+    assert not broad.subsumes(MaterialSearchQuery(elements=["Ni", "Al"], providers=["mp"]))
+    ranged = MaterialSearchQuery(band_gap=PropertyRange(min=0, max=2))
+    assert ranged.subsumes(MaterialSearchQuery(band_gap=PropertyRange(min=0.5, max=1)))
+    assert not ranged.subsumes(MaterialSearchQuery(band_gap=PropertyRange(min=0.5)))
+
+
+def test_matches_material():
+    from app.tools.search_engine.query import MaterialSearchQuery, PropertyRange
+    from app.tools.search_engine.result import Material, PropertyValue
+    m = Material(
+        id="x", formula="Ni3Al", elements=["Al", "Ni"], n_elements=2, sources=["mp"],
+        band_gap=PropertyValue(value=0.0, source="optimade:mp"),
+    )
+    assert MaterialSearchQuery(elements=["Ni"], band_gap=PropertyRange(max=0.5)).matches(m)
+    assert not MaterialSearchQuery(exclude_elements=["Al"]).matches(m)
+    assert not MaterialSearchQuery(elements_any=["Fe", "Co"]).matches(m)
+    assert not MaterialSearchQuery(n_elements=PropertyRange(min=3)).matches(m)
+    # Missing property never passes a range filter
+    assert not MaterialSearchQuery(formation_energy=PropertyRange(max=0)).matches(m)
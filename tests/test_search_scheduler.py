@@ -0,0 +1,91 @@
+"""Tests for latency-aware provider scheduling, timeouts and hedging."""
+import asyncio
+
+from app.tools.search_engine.query import MaterialSearchQuery
+from app.tools.search_engine.resilience.circuit_breaker import HealthManager, ProviderHealth
+from app.tools.search_engine.resilience.scheduler import LatencyScheduler
+
+
+class _P:
+    def __init__(self, pid):
+        self.id = pid
+
+
+def _seed(health, pid, latencies, yield_=10, failures=0):
+    h = health.get(pid)
+    for ms in latencies:
+        h.record_success(ms)
+    h.record_yield(yield_)
+    h.failure_count = failures
+
+
+def test_latency_quantile_and_window():
+    h = ProviderHealth(provider_id="mp")
+    assert h.latency_quantile(0.95) is None
+    for ms in range(1, 101):
+        h.record_success(float(ms))
+    assert len(h.recent_latencies_ms) == 50
+    assert h.latency_quantile(0.5) == 76.0
+    assert h.latency_quantile(0.95) == 98.0
+    restored = ProviderHealth.from_dict(h.to_dict())
+    assert restored.recent_latencies_ms == h.recent_latencies_ms
+
+
+def test_order_by_yield_per_ms():
+    health = HealthManager(persist_path=None)
+    _seed(health, "slow", [2000] * 5)
+    _seed(health, "fast", [100] * 5)
+    _seed(health, "flaky", [100] * 5, failures=50)
+    providers = [_P("new"), _P("slow"), _P("flaky"), _P("fast")]
+    order = [p.id for p in LatencyScheduler(health).order(providers)]
+    assert order[0] == "fast"
+    assert order[-1] == "slow"
+    # Without any history the registry order is kept
+    fresh = LatencyScheduler(HealthManager(persist_path=None))
+    assert [p.id for p in fresh.order(providers)] == ["new", "slow", "flaky", "fast"]
+
+
+def test_timeout_and_hedge_from_distribution():
+    health = HealthManager(persist_path=None)
+    sched = LatencyScheduler(health)
+    assert sched.timeout("mp", 5.0) == 5.0
+    assert sched.hedge_after("mp", 5.0) is None
+    _seed(health, "mp", [100, 120, 150, 200, 400])
+    assert sched.timeout("mp", 5.0) == 0.8
+    assert sched.hedge_after("mp", 5.0) == 0.4
+    _seed(health, "oqmd", [4000] * 5)
+    assert sched.timeout("oqmd", 5.0) == 5.0
+    assert sched.hedge_after("oqmd", 3.0) is None
+
+
+def test_engine_hedges_slow_first_page():
+    from app.tools.search_engine.cache.engine import SearchCache
+    from app.tools.search_engine.engine import SearchEngine
+    from app.tools.search_engine.providers.base import Provider, ProviderCapabilities
+    from app.tools.search_engine.providers.registry import ProviderRegistry
+    from app.tools.search_engine.result import Material
+
+    calls = []
+
+    class StallsOnce(Provider):
+        id = "mp"
+        name = "MP"
+        capabilities = ProviderCapabilities(filterable_fields={"elements"})
+
+        async def search(self, query):
+            calls.append(query)
+            if len(calls) == 1:
+                await asyncio.sleep(10)
+            return [Material(id="mp-1", formula="Fe", elements=["Fe"], n_elements=1, sources=["mp"])]
+
+    health = HealthManager(persist_path=None)
+    _seed(health, "mp", [20] * 5)
+    reg = ProviderRegistry()
+    reg.register(StallsOnce())
+    engine = SearchEngine(reg, cache=SearchCache(disk_dir=None), health_manager=health)
+    result = asyncio.run(engine.search(MaterialSearchQuery(elements=["Fe"])))
+    assert result.total_count == 1
+    assert len(calls) == 2
+    log = result.query_log[0]
+    assert log.status == "success" and log.hedged
+    assert log.latency_ms < 1000
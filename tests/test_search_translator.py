@@ -72,3 +72,11 @@ def test_to_mp_kwargs_empty():
     q = MaterialSearchQuery()
     kw = QueryTranslator.to_mp_kwargs(q)
     assert kw == {}
+
+
+def test_to_optimade_property_ranges_need_a_provider_field():
+    from app.tools.search_engine.translator import QueryTranslator
+    q = MaterialSearchQuery(band_gap=PropertyRange(min=0.5, max=2), crystal_system="cubic")
+    assert QueryTranslator.to_optimade(q) == ""
+    f = QueryTranslator.to_optimade(q, {"band_gap": "_oqmd_band_gap", "crystal_system": "_x_cs"})
+    assert f == '_oqmd_band_gap>=0.5 AND _oqmd_band_gap<=2.0 AND _x_cs="cubic"'